@@ -1,4 +1,3 @@
-import os
 from dotenv import load_dotenv
 
 from logging.config import fileConfig
@@ -27,7 +26,9 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 
 from todolist.db import Base
-from todolist.core.Models.models import Project , Task
+from todolist.db.backends import databaseUrl
+from todolist.config.setting import Setting
+from todolist.core.Models.models import Project , Task , Counter , JobRun
 
 target_metadata = Base.metadata 
 
@@ -36,7 +37,8 @@ target_metadata = Base.metadata
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
-database_url = os.getenv("DATABASE_URL")
+# the database of STORAGE_BACKEND (DATABASE_URL or the SQLITE_PATH file)
+database_url = databaseUrl(Setting.initializeSettings())
 if database_url:
     config.set_main_option("sqlalchemy.url", database_url)
 
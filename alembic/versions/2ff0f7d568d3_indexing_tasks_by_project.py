@@ -0,0 +1,37 @@
+"""indexing tasks by project
+
+Revision ID: 2ff0f7d568d3
+Revises: 41a3a3934371
+Create Date: 2026-10-18 11:40:52.116730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2ff0f7d568d3'
+down_revision: Union[str, Sequence[str], None] = '41a3a3934371'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_for_project_id',
+            'tasks',
+            ['for_project', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_for_project_id', table_name='tasks', postgresql_concurrently=True)
@@ -0,0 +1,33 @@
+"""adding row versions
+
+Revision ID: 8c41e07b9d25
+Revises: 2ff0f7d568d3
+Create Date: 2026-10-18 14:05:37.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41e07b9d25'
+down_revision: Union[str, Sequence[str], None] = '2ff0f7d568d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # constant server defaults , existing rows are filled without rewriting the tables
+    op.add_column('projects', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('projects', sa.Column('tasks_version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('tasks', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tasks', 'version')
+    op.drop_column('projects', 'tasks_version')
+    op.drop_column('projects', 'version')
@@ -0,0 +1,40 @@
+"""indexing task filters
+
+Revision ID: a7d3e1f5b920
+Revises: 5e2a9c7d1f43
+Create Date: 2026-10-18 18:42:15.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e1f5b920'
+down_revision: Union[str, Sequence[str], None] = '5e2a9c7d1f43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = (
+    ('ix_tasks_for_project_deadline_id', ['for_project', 'deadline', 'id']),
+    ('ix_tasks_status_deadline_id', ['status', 'deadline', 'id']),
+    ('ix_tasks_at_closed_id', ['at_closed', 'id']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'tasks', columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='tasks', postgresql_concurrently=True)
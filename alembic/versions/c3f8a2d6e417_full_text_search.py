@@ -0,0 +1,68 @@
+"""full text search
+
+Revision ID: c3f8a2d6e417
+Revises: a7d3e1f5b920
+Create Date: 2026-10-18 20:07:51.318442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8a2d6e417'
+down_revision: Union[str, Sequence[str], None] = 'a7d3e1f5b920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ('projects', 'tasks')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for table in TABLES:
+        if dialect == 'postgresql':
+            # generated column , filled for the existing rows by the ALTER (rewrites the table)
+            op.execute(
+                f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+                "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(\"desc\", '')), 'B')) STORED"
+            )
+            op.execute(f"CREATE INDEX ix_{table}_search_vector ON {table} USING gin (search_vector)")
+        elif dialect == 'sqlite':
+            op.execute(
+                f"CREATE VIRTUAL TABLE {table}_fts USING fts5(name, \"desc\", content='{table}', content_rowid='rowid', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+            op.execute(
+                f"CREATE TRIGGER {table}_fts_insert AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {table}_fts(rowid, name, \"desc\") VALUES (new.rowid, new.name, new.\"desc\"); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER {table}_fts_delete AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {table}_fts({table}_fts, rowid, name, \"desc\") VALUES ('delete', old.rowid, old.name, old.\"desc\"); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER {table}_fts_update AFTER UPDATE OF name, \"desc\" ON {table} BEGIN "
+                f"INSERT INTO {table}_fts({table}_fts, rowid, name, \"desc\") VALUES ('delete', old.rowid, old.name, old.\"desc\"); "
+                f"INSERT INTO {table}_fts(rowid, name, \"desc\") VALUES (new.rowid, new.name, new.\"desc\"); END"
+            )
+            # indexes the existing rows
+            op.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for table in TABLES:
+        if dialect == 'postgresql':
+            op.drop_index(f'ix_{table}_search_vector', table_name=table)
+            op.drop_column(table, 'search_vector')
+        elif dialect == 'sqlite':
+            for trigger in ('insert', 'delete', 'update'):
+                op.execute(f"DROP TRIGGER {table}_fts_{trigger}")
+            op.execute(f"DROP TABLE {table}_fts")
@@ -0,0 +1,35 @@
+"""adding counters table
+
+Revision ID: ced088ae32f0
+Revises: bcb9ad56c5b8
+Create Date: 2026-10-18 10:12:41.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ced088ae32f0'
+down_revision: Union[str, Sequence[str], None] = 'bcb9ad56c5b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('counters',
+    sa.Column('name', sa.String(length=32), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # seed the counters with the current row counts
+    op.execute("INSERT INTO counters (name, value) SELECT 'projects', count(*) FROM projects")
+    op.execute("INSERT INTO counters (name, value) SELECT 'tasks', count(*) FROM tasks")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('counters')
@@ -0,0 +1,137 @@
+"""adding project stats rollup
+
+Revision ID: e9b4d7c2a615
+Revises: c3f8a2d6e417
+Create Date: 2026-10-18 21:12:40.508131
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9b4d7c2a615'
+down_revision: Union[str, Sequence[str], None] = 'c3f8a2d6e417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = ('todo', 'doing', 'done', 'closed_timed', 'close_seconds', 'closed_late')
+TRACKED = ('for_project', 'status', 'deadline', 'at_closed', 'at_created')
+TRIGGERS = ('insert', 'update', 'delete')
+
+
+def deltas(row: str, dialect: str) -> list[str]:
+    # what a task row adds to the counters of its project (same as todolist/db/rollups.py at this revision)
+    cast = (lambda e: f"({e})::int") if dialect == 'postgresql' else (lambda e: f"({e})")
+    timed = f"{row}.status = 'done' AND {row}.at_closed IS NOT NULL AND {row}.at_created IS NOT NULL"
+    if dialect == 'postgresql':
+        seconds = f"EXTRACT(EPOCH FROM {row}.at_closed - {row}.at_created)"
+    else:
+        seconds = f"(julianday({row}.at_closed) - julianday({row}.at_created)) * 86400.0"
+    return [
+        cast(f"{row}.status = 'todo'"),
+        cast(f"{row}.status = 'doing'"),
+        cast(f"{row}.status = 'done'"),
+        cast(timed),
+        f"CASE WHEN {timed} THEN {seconds} ELSE 0 END",
+        f"coalesce({cast(f'{row}.status = ' + chr(39) + 'done' + chr(39) + f' AND {row}.at_closed > {row}.deadline')}, 0)",
+    ]
+
+
+def postgresDDL() -> list[str]:
+    columns = ", ".join(COLUMNS)
+    add = ", ".join(f"{c} = project_stats.{c} + excluded.{c}" for c in COLUMNS)
+    subtract = ", ".join(f"{c} = project_stats.{c} - d.{c}" for c in COLUMNS)
+    sums = ", ".join(f"sum({c}) AS {c}" for c in COLUMNS)
+    selected = lambda row, sign='': ", ".join(f"{sign}{d} AS {c}" for d, c in zip(deltas(row, 'postgresql'), COLUMNS))
+    changed = f"({', '.join('n.' + c for c in TRACKED)}) IS DISTINCT FROM ({', '.join('o.' + c for c in TRACKED)})"
+    return [
+        "CREATE FUNCTION project_stats_insert() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+        f"INSERT INTO project_stats (project_id, {columns}) "
+        f"SELECT for_project, {sums} FROM (SELECT n.for_project, {selected('n')} FROM new_rows n) d GROUP BY for_project "
+        f"ON CONFLICT (project_id) DO UPDATE SET {add}; "
+        "RETURN NULL; END $$",
+        "CREATE FUNCTION project_stats_update() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+        f"INSERT INTO project_stats (project_id, {columns}) "
+        f"SELECT for_project, {sums} FROM ("
+        f"SELECT n.for_project, {selected('n')} FROM new_rows n JOIN old_rows o ON o.id = n.id WHERE {changed} "
+        f"UNION ALL SELECT o.for_project, {selected('o', '-')} FROM new_rows n JOIN old_rows o ON o.id = n.id WHERE {changed}"
+        f") d GROUP BY for_project "
+        f"ON CONFLICT (project_id) DO UPDATE SET {add}; "
+        "RETURN NULL; END $$",
+        "CREATE FUNCTION project_stats_delete() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+        f"UPDATE project_stats SET {subtract} "
+        f"FROM (SELECT for_project, {sums} FROM (SELECT o.for_project, {selected('o')} FROM old_rows o) x GROUP BY for_project) d "
+        "WHERE project_stats.project_id = d.for_project; "
+        "RETURN NULL; END $$",
+        "CREATE TRIGGER tasks_project_stats_insert AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION project_stats_insert()",
+        "CREATE TRIGGER tasks_project_stats_update AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION project_stats_update()",
+        "CREATE TRIGGER tasks_project_stats_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION project_stats_delete()",
+    ]
+
+
+def sqliteDDL() -> list[str]:
+    columns = ", ".join(COLUMNS)
+    add = ", ".join(f"{c} = project_stats.{c} + excluded.{c}" for c in COLUMNS)
+    upsert = lambda row: (
+        f"INSERT INTO project_stats (project_id, {columns}) VALUES ({row}.for_project, {', '.join(deltas(row, 'sqlite'))}) "
+        f"ON CONFLICT (project_id) DO UPDATE SET {add};"
+    )
+    subtract = lambda row: (
+        f"UPDATE project_stats SET {', '.join(f'{c} = {c} - {d}' for c, d in zip(COLUMNS, deltas(row, 'sqlite')))} "
+        f"WHERE project_id = {row}.for_project;"
+    )
+    return [
+        f"CREATE TRIGGER tasks_project_stats_insert AFTER INSERT ON tasks BEGIN {upsert('new')} END",
+        f"CREATE TRIGGER tasks_project_stats_update AFTER UPDATE OF {', '.join(TRACKED)} ON tasks BEGIN "
+        f"{subtract('old')} {upsert('new')} END",
+        f"CREATE TRIGGER tasks_project_stats_delete AFTER DELETE ON tasks BEGIN {subtract('old')} END",
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    # existing tasks keep a NULL creation time (no time to close) , new ones are stamped by the application
+    op.add_column('tasks', sa.Column('at_created', sa.DateTime(timezone=True), nullable=True))
+    op.create_table('project_stats',
+    sa.Column('project_id', sa.String(length=8), nullable=False),
+    sa.Column('todo', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('doing', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('done', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('closed_timed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('close_seconds', sa.Float(), server_default='0', nullable=False),
+    sa.Column('closed_late', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id')
+    )
+    if dialect == 'postgresql':
+        # no task is written between the seeding and the triggers
+        op.execute("LOCK TABLE tasks IN SHARE MODE")
+        statements = postgresDDL()
+    elif dialect == 'sqlite':
+        statements = sqliteDDL()
+    else:
+        return
+    # seed the rollup with the current tasks
+    sums = ", ".join(f"sum({d}) AS {c}" for d, c in zip(deltas('tasks', dialect), COLUMNS))
+    op.execute(f"INSERT INTO project_stats (project_id, {', '.join(COLUMNS)}) SELECT for_project, {sums} FROM tasks GROUP BY for_project")
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for trigger in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS tasks_project_stats_{trigger}" + (" ON tasks" if dialect == 'postgresql' else ""))
+        if dialect == 'postgresql':
+            op.execute(f"DROP FUNCTION IF EXISTS project_stats_{trigger}()")
+    op.drop_table('project_stats')
+    op.drop_column('tasks', 'at_created')
@@ -0,0 +1,42 @@
+"""widening ids
+
+Revision ID: f4a1c8e3b752
+Revises: e9b4d7c2a615
+Create Date: 2026-10-18 22:31:06.117240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a1c8e3b752'
+down_revision: Union[str, Sequence[str], None] = 'e9b4d7c2a615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# the id columns and the columns referencing them
+COLUMNS = (('projects', 'id'), ('tasks', 'id'), ('tasks', 'for_project'), ('project_stats', 'project_id'))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the 8 character ids stay as they are (and keep resolving) , new rows get 26 character time ordered ids.
+    # sqlite does not enforce the length , a batch alter would recreate the tables without their search and stats triggers
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, column in COLUMNS:
+        # widening a varchar only changes the catalog , no rewrite of the table or its indexes
+        op.alter_column(table, column, existing_type=sa.String(length=8), type_=sa.String(length=26), existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # fails while rows with 26 character ids exist , they have no 8 character form
+    for table, column in reversed(COLUMNS):
+        op.alter_column(table, column, existing_type=sa.String(length=26), type_=sa.String(length=8), existing_nullable=False)
@@ -1,38 +1,61 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from todolist.api.routers import api_router
-from todolist.config.setting import Setting
-from todolist.data.projects_repo import ProjectsRepo
-from todolist.data.tasks_repo import TasksRepo
-from todolist.core.services.project_service import ProjectService
-from todolist.core.services.task_service import TaskService
+from todolist.api.controllers import metrics_controller
+from todolist.api.middleware import RequestConnectionMiddleware, ProfilingMiddleware
+from todolist.api.profiling import RequestProfiler
+from todolist.container import ServiceContainer
 from todolist.core.commands.schedule import scheduleCommands
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    FastAPI lifespan that runs once when the API server starts.
+    Builds the process wide service container, stores it on app.state, starts the change feed broker,
+    the background scheduler and the deadline timer (without waiting on any job).
+    Sets up the request profiler when profiling is enabled.
+    """
+    container = ServiceContainer.build()
+    app.state.container = container
+    setting = container.setting
+    if container.async_engine is None:
+        # the async repos only run on a database
+        raise ValueError(f"The API needs a database , STORAGE_BACKEND={setting.storage.BACKEND} only serves the CLI and the benchmarks")
+    app.state.request_profiler = None
+    if setting.profiling.ENABLED:
+        app.state.request_profiler = RequestProfiler(
+            setting.profiling.SLOW_REQUEST_MS,
+            setting.profiling.SAMPLE_RATE,
+            setting.profiling.DIR,
+            setting.profiling.N_PLUS_ONE_THRESHOLD,
+        )
+    await container.events.start()
+    scheduleCommands(container.scheduler, container.task_service, container.project_service)
+    if container.setting.SCHEDULER_ENABLED:
+        container.scheduler.start()
+    if container.deadline_timer:
+        container.deadline_timer.start()
+    try:
+        yield
+    finally:
+        if container.deadline_timer:
+            await container.deadline_timer.stop()
+        await container.scheduler.stop()
+        await container.events.stop()
+
+
 app = FastAPI(
     title="TodoList API",
     version="1.0.0",
     description="Phase 3 Web API for the TodoList project",
+    lifespan=lifespan,
 )
 
+app.add_middleware(RequestConnectionMiddleware)
+# outermost , so the time and statements of the whole request are counted
+app.add_middleware(ProfilingMiddleware)
 app.include_router(api_router)
-
-
-def _build_services() -> tuple[ProjectService, TaskService]:
-    """
-    Create ProjectService and TaskService
-    """
-    settings = Setting().initializeSettings()
-    project_repo = ProjectsRepo()
-    task_repo = TasksRepo()
-    project_service = ProjectService(project_repo, task_repo, settings)
-    task_service = TaskService(project_repo, task_repo, settings)
-    return project_service, task_service
-
-
-@app.on_event("startup")
-def startup_schedule_autoclose() -> None:
-    """
-    FastAPI startup hook that runs once when the API server starts.
-    """
-    project_service, task_service = _build_services()
-    scheduleCommands(task_service, project_service)
+app.include_router(metrics_controller.router)
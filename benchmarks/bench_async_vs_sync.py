@@ -0,0 +1,76 @@
+"""
+Load benchmark comparing the sync request path with the async one.
+
+Every "request" is a getProject + listTasks pair, the same work the
+GET /api/projects/{id}/tasks handler does. The sync path calls the blocking
+services from inside coroutines (what the controllers used to do), the async
+path awaits the AsyncSession backed services. Both run with the same number
+of requests in flight on one event loop.
+
+Usage:
+    poetry run python benchmarks/bench_async_vs_sync.py --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import time
+
+from todolist.config.setting import Setting
+from todolist.db import configure_engine, configure_async_engine
+from todolist.data.projects_repo import ProjectsRepo
+from todolist.data.tasks_repo import TasksRepo
+from todolist.data.async_projects_repo import AsyncProjectsRepo
+from todolist.data.async_tasks_repo import AsyncTasksRepo
+from todolist.core.services.task_service import TaskService
+from todolist.core.services.async_task_service import AsyncTaskService
+from todolist.core.Models.models import Project
+
+
+async def _run(handler, total: int, concurrency: int) -> float:
+    """
+    Fire `total` requests with at most `concurrency` in flight
+
+    Returns:
+        float: requests per second
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await handler()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def main(total: int, concurrency: int) -> None:
+    setting = Setting.initializeSettings()
+    configure_engine(setting)
+    configure_async_engine(setting)
+    syncService = TaskService(ProjectsRepo(), TasksRepo(), setting)
+    asyncService = AsyncTaskService(AsyncProjectsRepo(), AsyncTasksRepo(), setting)
+
+    project = ProjectsRepo().add(Project(f"bench-{time.time_ns()}", "benchmark project"))
+
+    async def syncHandler():
+        syncService.listTasks(project.id)
+
+    async def asyncHandler():
+        await asyncService.listTasks(project.id)
+
+    try:
+        syncRps = await _run(syncHandler, total, concurrency)
+        asyncRps = await _run(asyncHandler, total, concurrency)
+    finally:
+        ProjectsRepo().delete(project.id)
+
+    print(f"sync  path: {syncRps:10.1f} req/s")
+    print(f"async path: {asyncRps:10.1f} req/s  (x{asyncRps / syncRps:.2f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,94 @@
+"""
+Benchmark of the overdue auto close at a large task count.
+
+Seeds --tasks tasks (every --overdue-every'th one overdue) into one project,
+then times the old close (load every overdue task as an ORM object and flush
+one UPDATE per row) against the set based close_overdue, with and without
+chunking. The seed is restored between runs.
+
+Usage:
+    poetry run python benchmarks/bench_close_overdue.py --tasks 1000000 --chunk 50000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, delete, select, update
+
+from todolist.config.setting import Setting
+from todolist.db import configure_engine, get_session
+from todolist.data.tasks_repo import TasksRepo
+from todolist.core.Models.models import Project, Task
+
+SEED_PROJECT = "bchovdue"
+
+
+def seed(count: int, overdueEvery: int) -> None:
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+    future = datetime.now(timezone.utc) + timedelta(days=30)
+    with get_session() as session:
+        session.execute(insert(Project), [{"id": SEED_PROJECT, "name": SEED_PROJECT, "desc": ""}])
+        for start in range(0, count, 20000):
+            rows = [
+                {"id": f"o{i:07x}", "for_project": SEED_PROJECT, "name": f"task {i}", "desc": "", "status": "todo",
+                 "deadline": past if i % overdueEvery == 0 else future, "at_closed": None}
+                for i in range(start, min(start + 20000, count))
+            ]
+            session.execute(insert(Task.__table__), rows)
+        session.commit()
+
+
+def reopen() -> None:
+    with get_session() as session:
+        session.execute(update(Task).where(Task.for_project == SEED_PROJECT).values(status="todo", at_closed=None))
+        session.commit()
+
+
+def cleanup() -> None:
+    with get_session() as session:
+        session.execute(delete(Task).where(Task.for_project == SEED_PROJECT))
+        session.execute(delete(Project).where(Project.id == SEED_PROJECT))
+        session.commit()
+
+
+def oldCloseOverdue(compareTime: datetime) -> int:
+    """close_overdue as it used to be: ORM objects mutated in Python , one UPDATE per row"""
+    with get_session() as session:
+        stmt = select(Task).where(Task.deadline.is_not(None)).where(Task.deadline < compareTime).where(Task.status != "done")
+        tasks = session.execute(stmt).scalars().all()
+        for task in tasks:
+            task.status = "done"
+            if task.at_closed is None:
+                task.at_closed = compareTime
+        session.commit()
+        return len(tasks)
+
+
+def run(label: str, fn) -> None:
+    reopen()
+    start = time.perf_counter()
+    closed = fn(datetime.now(timezone.utc))
+    print(f"{label:<24} closed {closed:>9}  in {time.perf_counter() - start:8.2f} s")
+
+
+def main(tasks: int, overdueEvery: int, chunk: int, skipOld: bool) -> None:
+    configure_engine(Setting.initializeSettings())
+    repo = TasksRepo()
+    seed(tasks, overdueEvery)
+    try:
+        if not skipOld:
+            run("ORM row by row", oldCloseOverdue)
+        run("set based", repo.close_overdue)
+        run(f"set based, chunk {chunk}", lambda now: repo.close_overdue(now, chunk))
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000000)
+    parser.add_argument("--overdue-every", type=int, default=2)
+    parser.add_argument("--chunk", type=int, default=50000)
+    parser.add_argument("--skip-old", action="store_true", help="skip the (slow) row by row run")
+    args = parser.parse_args()
+    main(args.tasks, args.overdue_every, args.chunk, args.skip_old)
@@ -0,0 +1,89 @@
+"""
+Polling benchmark of the task list with and without conditional requests.
+
+Simulates dashboard clients polling GET /api/projects/{id}/tasks: every
+--write-every polls one task of the project is modified. The same workload
+runs twice, once re-downloading the page every time and once sending back the
+last ETag in If-None-Match (304 while nothing changed). Reports response bytes,
+server CPU time and latency of both runs.
+
+Drives the FastAPI app in-process through httpx's ASGI transport (no network)
+against the database configured in .env.
+
+Usage:
+    poetry run python benchmarks/bench_conditional_polling.py --tasks 500 --polls 2000 --write-every 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from api_main import app
+from todolist.container import ServiceContainer
+
+
+async def poll(client: httpx.AsyncClient, projectId: str, taskIds: list[str], polls: int, writeEvery: int, conditional: bool) -> dict:
+    etag = None
+    received = 0
+    notModified = 0
+    latencies = []
+    cpuStart = time.process_time()
+    for i in range(polls):
+        if writeEvery and i % writeEvery == writeEvery - 1:
+            taskId = taskIds[i % len(taskIds)]
+            (await client.patch(f"/api/tasks/{taskId}", json={"name": f"edited {i}"})).raise_for_status()
+
+        headers = {"If-None-Match": etag} if conditional and etag else {}
+        start = time.perf_counter()
+        response = await client.get(f"/api/projects/{projectId}/tasks", params={"limit": len(taskIds)}, headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code == 304:
+            notModified += 1
+        else:
+            response.raise_for_status()
+        received += len(response.content)
+        etag = response.headers.get("ETag")
+    return {
+        "bytes": received,
+        "304": notModified,
+        "cpu_s": time.process_time() - cpuStart,
+        "p50_ms": statistics.median(latencies),
+    }
+
+
+async def main(tasks: int, polls: int, writeEvery: int) -> None:
+    container = ServiceContainer.build()
+    container.setting.MAX_NUMBER_OF_TASKS = 10 ** 9
+    app.state.container = container
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        project = (await client.post("/api/projects", json={"name": f"bench-{time.time_ns()}"})).json()
+        try:
+            body = "\n".join(f'{{"name": "task {i}"}}' for i in range(tasks))
+            imported = (await client.post(f"/api/projects/{project['id']}/tasks:bulk", content=body)).json()
+            taskIds = [row["id"] for row in imported["results"] if row.get("id")]
+
+            results = {
+                "full": await poll(client, project["id"], taskIds, polls, writeEvery, conditional=False),
+                "conditional": await poll(client, project["id"], taskIds, polls, writeEvery, conditional=True),
+            }
+        finally:
+            await client.delete(f"/api/projects/{project['id']}")
+
+    print(f"{'mode':<12} {'bytes':>12} {'304s':>6} {'cpu s':>8} {'p50 ms':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<12} {r['bytes']:>12} {r['304']:>6} {r['cpu_s']:8.2f} {r['p50_ms']:8.2f}")
+    full , conditional = results["full"] , results["conditional"]
+    print(f"saved: {1 - conditional['bytes'] / full['bytes']:.1%} bytes , {1 - conditional['cpu_s'] / full['cpu_s']:.1%} cpu")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=500, help="tasks in the polled project")
+    parser.add_argument("--polls", type=int, default=2000)
+    parser.add_argument("--write-every", type=int, default=50, help="modify one task every N polls (0: never)")
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.polls, args.write_every))
@@ -0,0 +1,91 @@
+"""
+Benchmark of the id schemes of projects and tasks: the old random ids (first 8
+characters of a uuid4) against the time ordered ids of newId.
+
+Inserts --rows ids of each scheme into a scratch table shaped like the primary
+key of tasks (in batches of --batch rows per transaction , like bulk creates) on
+the database configured in .env , then reports the insert throughput (overall
+and over the last tenth , once the index is large) , the size of the primary key
+index and how many of the generated ids collided (a collision is a failed
+insert in the app). The scratch tables are dropped afterwards.
+
+Usage:
+    poetry run python benchmarks/bench_ids.py --rows 1000000 --batch 1000
+"""
+import argparse
+import time
+from uuid import uuid4
+
+from sqlalchemy import Column, MetaData, String, Table, insert, text
+
+from todolist.config.setting import Setting
+from todolist.db import configure_engine
+from todolist.core.Models.ids import ID_LENGTH, newId
+
+# the database configured in .env
+engine = configure_engine(Setting.initializeSettings())
+
+# name -> (scratch table , id factory)
+SCHEMES = {
+    "uuid4[:8]": ("bench_ids_uuid", lambda: str(uuid4())[:8]),
+    "newId": ("bench_ids_ulid", newId),
+}
+
+
+def indexBytes(table: Table) -> int | None:
+    with engine.connect() as connection:
+        if engine.dialect.name == "postgresql":
+            return connection.execute(text(f"SELECT pg_relation_size('{table.name}_pkey')")).scalar_one()
+        if engine.dialect.name == "sqlite":
+            # the dbstat table is compiled in most builds
+            try:
+                return connection.execute(text(f"SELECT sum(pgsize) FROM dbstat WHERE name = 'sqlite_autoindex_{table.name}_1'")).scalar_one()
+            except Exception:
+                return None
+    return None
+
+
+def run(tableName: str, makeId, rows: int, batch: int) -> dict:
+    metadata = MetaData()
+    table = Table(tableName, metadata, Column("id", String(ID_LENGTH), primary_key=True), Column("name", String(100)))
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    try:
+        ids = [makeId() for _ in range(rows)]
+        unique = list(dict.fromkeys(ids))
+        tail = len(unique) - len(unique) // 10
+        start = time.perf_counter()
+        tailStart = start
+        for offset in range(0, len(unique), batch):
+            if offset <= tail < offset + batch:
+                tailStart = time.perf_counter()
+            with engine.begin() as connection:
+                connection.execute(insert(table), [{"id": id, "name": f"bench {id}"} for id in unique[offset:offset + batch]])
+        end = time.perf_counter()
+        if engine.dialect.name == "postgresql":
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                connection.execute(text(f"VACUUM ANALYZE {table.name}"))
+        return {
+            "rows/s": len(unique) / (end - start),
+            "last 10% rows/s": (len(unique) - tail) / (end - tailStart),
+            "index MB": (indexBytes(table) or 0) / 2 ** 20,
+            "collisions": rows - len(unique),
+        }
+    finally:
+        metadata.drop_all(engine)
+
+
+def main(rows: int, batch: int) -> None:
+    results = {name: run(tableName, makeId, rows, batch) for name, (tableName, makeId) in SCHEMES.items()}
+    print(f"rows: {rows} , batch: {batch} , {engine.dialect.name}")
+    print(f"{'':<18}" + "".join(f"{name:>14}" for name in results))
+    for metric in next(iter(results.values())):
+        print(f"{metric:<18}" + "".join(f"{result[metric]:14.1f}" for result in results.values()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.rows, args.batch)
@@ -0,0 +1,70 @@
+"""
+Benchmark of the project name uniqueness check at a large project count.
+
+Seeds --projects rows into the projects table (bulk insert), then times the
+old check (load every project and loop over them in Python) against the
+indexed existence query used by createProject/editProject now.
+
+Usage:
+    poetry run python benchmarks/bench_project_name_check.py --projects 100000 --checks 200
+"""
+import argparse
+import time
+
+from sqlalchemy import insert, delete
+
+from todolist.config.setting import Setting
+from todolist.db import configure_engine, get_session
+from todolist.data.projects_repo import ProjectsRepo
+from todolist.core.Models.models import Project
+
+SEED_PREFIX = "bnc"
+
+
+def seed(count: int) -> None:
+    rows = [{"id": f"{SEED_PREFIX}{i:05x}", "name": f"{SEED_PREFIX}-project-{i}", "desc": ""} for i in range(count)]
+    with get_session() as session:
+        for start in range(0, count, 10000):
+            session.execute(insert(Project), rows[start:start + 10000])
+        session.commit()
+
+
+def cleanup() -> None:
+    with get_session() as session:
+        session.execute(delete(Project).where(Project.id.like(f"{SEED_PREFIX}%")))
+        session.commit()
+
+
+def oldCheck(repo: ProjectsRepo, name: str) -> bool:
+    """The check as it used to be: every project loaded and compared in Python"""
+    return any(p.name == name for p in repo.list())
+
+
+def timeIt(fn, checks: int) -> float:
+    start = time.perf_counter()
+    for i in range(checks):
+        fn(f"not-taken-{i}")
+    return (time.perf_counter() - start) / checks * 1000
+
+
+def main(projects: int, checks: int) -> None:
+    configure_engine(Setting.initializeSettings())
+    repo = ProjectsRepo()
+    seed(projects)
+    try:
+        oldMs = timeIt(lambda name: oldCheck(repo, name), max(1, checks // 20))
+        newMs = timeIt(repo.name_exists, checks)
+    finally:
+        cleanup()
+
+    print(f"projects: {projects}")
+    print(f"full scan check : {oldMs:10.3f} ms/check")
+    print(f"indexed exists  : {newMs:10.3f} ms/check  (x{oldMs / newMs:.0f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=100000)
+    parser.add_argument("--checks", type=int, default=200)
+    args = parser.parse_args()
+    main(args.projects, args.checks)
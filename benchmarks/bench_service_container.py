@@ -0,0 +1,65 @@
+"""
+Micro-benchmark of the per-request cost of resolving a service.
+
+Compares the old dependency (Setting.initializeSettings() + fresh repos +
+fresh service on every request) with the container lookup used now. Reports
+time per call, peak traced memory (tracemalloc) and files opened per
+call (audit hook on "open").
+
+Usage:
+    poetry run python benchmarks/bench_service_container.py --calls 10000
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+from todolist.config.setting import Setting
+from todolist.container import ServiceContainer
+from todolist.data.async_projects_repo import AsyncProjectsRepo
+from todolist.data.async_tasks_repo import AsyncTasksRepo
+from todolist.core.services.async_project_service import AsyncProjectService
+
+
+_opened = 0
+
+
+def _count_opens(event: str, args: tuple) -> None:
+    global _opened
+    if event == "open":
+        _opened += 1
+
+
+def perRequestBuild() -> AsyncProjectService:
+    """The dependency as it used to be: everything rebuilt on each request"""
+    setting = Setting.initializeSettings()
+    return AsyncProjectService(AsyncProjectsRepo(), AsyncTasksRepo(), setting)
+
+
+def measure(name: str, fn, calls: int) -> None:
+    global _opened
+    _opened = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<18} {elapsed / calls * 1e6:9.2f} us/call  {_opened / calls:5.2f} opens/call  peak {peak / 1024:8.1f} KiB")
+
+
+def main(calls: int) -> None:
+    container = ServiceContainer.build()
+    state = {"container": container}
+    sys.addaudithook(_count_opens)
+
+    measure("per-request build", perRequestBuild, calls)
+    measure("container lookup", lambda: state["container"].async_project_service, calls)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=10000)
+    args = parser.parse_args()
+    main(args.calls)
@@ -0,0 +1,63 @@
+"""
+Per-endpoint latency benchmark of the task endpoints.
+
+Drives the FastAPI app in-process through httpx's ASGI transport (no network)
+against the database configured in .env and reports p50/p95 latency for
+create / get / patch / status change / list / delete.
+
+Usage:
+    poetry run python benchmarks/bench_task_endpoints.py --iterations 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from api_main import app
+from todolist.container import ServiceContainer
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    return statistics.quantiles(samples, n=100)[int(q) - 1] if len(samples) > 1 else samples[0]
+
+
+async def main(iterations: int) -> None:
+    container = ServiceContainer.build()
+    container.setting.MAX_NUMBER_OF_TASKS = 10 ** 9
+    app.state.container = container
+
+    timings: dict[str, list[float]] = {}
+
+    async def call(client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        timings.setdefault(label, []).append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+        return response
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        project = (await call(client, "POST /projects", "POST", "/api/projects", json={"name": f"bench-{time.time_ns()}"})).json()
+        try:
+            for i in range(iterations):
+                task = (await call(client, "POST /projects/{id}/tasks", "POST", f"/api/projects/{project['id']}/tasks", json={"name": f"task {i}"})).json()
+                await call(client, "GET /tasks/{id}", "GET", f"/api/tasks/{task['id']}")
+                await call(client, "PATCH /tasks/{id} (name)", "PATCH", f"/api/tasks/{task['id']}", json={"name": f"renamed {i}"})
+                await call(client, "PATCH /tasks/{id} (status)", "PATCH", f"/api/tasks/{task['id']}", json={"status": "done"})
+                await call(client, "GET /projects/{id}/tasks", "GET", f"/api/projects/{project['id']}/tasks", params={"limit": 50})
+                await call(client, "DELETE /tasks/{id}", "DELETE", f"/api/tasks/{task['id']}")
+        finally:
+            await client.delete(f"/api/projects/{project['id']}")
+
+    print(f"{'endpoint':<30} {'p50 ms':>8} {'p95 ms':>8}")
+    for label, samples in timings.items():
+        print(f"{label:<30} {_percentile(samples, 50):8.2f} {_percentile(samples, 95):8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
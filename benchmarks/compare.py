@@ -0,0 +1,69 @@
+"""
+Regression check of two results of the benchmark suite (benchmarks/suite.py).
+
+Compares every case of the current results against the baseline on --metric
+and fails (exit status 1) when one got worse by more than --threshold
+(relative) and --min-delta (absolute, so sub-millisecond noise does not fail
+the check). Latencies and memory are worse when higher, ops_per_s when lower.
+Cases missing from one side are listed but do not fail the check.
+
+Usage:
+    poetry run python benchmarks/compare.py results/main.json results/branch.json --metric p95_ms --threshold 0.10
+"""
+import argparse
+import json
+import sys
+
+HIGHER_IS_BETTER = {"ops_per_s"}
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "mean_ms", "ops_per_s", "peak_kib")
+# meta fields that make two results comparable
+SAME_WORKLOAD = ("database", "tasks", "tasks_per_project", "overdue_every", "seed", "cache_enabled")
+
+
+def compare(baseline: dict, current: dict, metric: str, threshold: float, minDelta: float) -> list[tuple[str, float, float, float, bool]]:
+    rows = []
+    for name, result in current["cases"].items():
+        if name not in baseline["cases"]:
+            continue
+        before, after = baseline["cases"][name][metric], result[metric]
+        worse = before - after if metric in HIGHER_IS_BETTER else after - before
+        change = worse / before if before else 0.0
+        rows.append((name, before, after, change, change > threshold and worse > minDelta))
+    return rows
+
+
+def main(baselinePath: str, currentPath: str, metric: str, threshold: float, minDelta: float) -> int:
+    with open(baselinePath) as file:
+        baseline = json.load(file)
+    with open(currentPath) as file:
+        current = json.load(file)
+
+    for field in SAME_WORKLOAD:
+        if baseline["meta"].get(field) != current["meta"].get(field):
+            print(f"warning: {field} differs ({baseline['meta'].get(field)} vs {current['meta'].get(field)}) , the results measure different workloads")
+    print(f"baseline {baseline['meta'].get('commit')}  current {current['meta'].get('commit')}  metric {metric}")
+
+    rows = compare(baseline, current, metric, threshold, minDelta)
+    print(f"{'case':<34} {'baseline':>10} {'current':>10} {'worse by':>9}")
+    for name, before, after, change, regressed in rows:
+        print(f"{name:<34} {before:10.2f} {after:10.2f} {change:+9.1%}{'  REGRESSION' if regressed else ''}")
+    for name in sorted(set(baseline["cases"]) ^ set(current["cases"])):
+        print(f"{name:<34} only in {'baseline' if name in baseline['cases'] else 'current'}")
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed by more than {threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print("no regression")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--metric", choices=METRICS, default="p95_ms")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change failing the check")
+    parser.add_argument("--min-delta", type=float, default=0.5, help="absolute change (in the unit of the metric) below which nothing fails")
+    args = parser.parse_args()
+    sys.exit(main(args.baseline, args.current, args.metric, args.threshold, args.min_delta))
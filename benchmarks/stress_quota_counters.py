@@ -0,0 +1,71 @@
+"""
+Concurrency check of the maintained quota counters.
+
+Lets --threads workers race to create --attempts projects while only --slots
+are left below MAX_NUMBER_OF_PROJECTS, then checks that exactly --slots were
+created and that the projects counter still matches count(*). Exits with a
+non-zero status if the limit was exceeded. tests/test_quotas.py runs the same
+race for projects and tasks on a sqlite database in the test suite.
+
+Usage:
+    poetry run python benchmarks/stress_quota_counters.py --threads 16 --attempts 400 --slots 25
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select, func
+
+from todolist.config.setting import Setting
+from todolist.db import configure_engine, get_session
+from todolist.data.counters import PROJECTS_COUNTER
+from todolist.data.projects_repo import ProjectsRepo
+from todolist.data.tasks_repo import TasksRepo
+from todolist.core.services.project_service import ProjectService
+from todolist.core.Models.models import Project, Counter
+
+
+def counts() -> tuple[int, int]:
+    with get_session() as session:
+        rows = session.execute(select(func.count(Project.id))).scalar_one()
+        counter = session.execute(select(Counter.value).where(Counter.name == PROJECTS_COUNTER)).scalar_one()
+        return rows, counter
+
+
+def main(threads: int, attempts: int, slots: int) -> int:
+    setting = Setting.initializeSettings()
+    configure_engine(setting)
+    rowsBefore, counterBefore = counts()
+    setting.MAX_NUMBER_OF_PROJECTS = counterBefore + slots
+    service = ProjectService(ProjectsRepo(), TasksRepo(), setting)
+    prefix = f"quota-{time.time_ns()}"
+
+    def attempt(i: int) -> str | None:
+        try:
+            return service.createProject(f"{prefix}-{i}").id
+        except ValueError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        created = [projectId for projectId in pool.map(attempt, range(attempts)) if projectId]
+
+    rowsAfter, counterAfter = counts()
+    for projectId in created:
+        service.deleteProject(projectId)
+
+    print(f"slots: {slots}  created: {len(created)}  rows: {rowsBefore} -> {rowsAfter}  counter: {counterBefore} -> {counterAfter}")
+    if len(created) > slots or rowsAfter - rowsBefore != len(created) or counterAfter != rowsAfter:
+        print("FAILED: quota exceeded or counter out of sync")
+        return 1
+    print("ok")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--attempts", type=int, default=400)
+    parser.add_argument("--slots", type=int, default=25)
+    args = parser.parse_args()
+    sys.exit(main(args.threads, args.attempts, args.slots))
@@ -0,0 +1,58 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# url (psycopg2) of a postgres database the database tests also run on , emptied by them. postgres is skipped when it is not set
+POSTGRES_URL = os.getenv("TEST_DATABASE_URL" , "")
+
+
+def upgrade(storageBackend: str , **env: str) -> None:
+    """
+    Running the migrations (alembic upgrade head) on the database of a storage backend
+
+    Args:
+        storageBackend (str): STORAGE_BACKEND the migrations read their database from
+        **env (str): the other settings of the database (SQLITE_PATH , DATABASE_URL)
+    """
+    # no ini file , so alembic leaves the logging of the tests alone
+    config = Config()
+    config.set_main_option("script_location" , str(ROOT / "alembic"))
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("STORAGE_BACKEND" , storageBackend)
+        for name , value in env.items():
+            patch.setenv(name , value)
+        command.upgrade(config , "head")
+
+
+@pytest.fixture(scope="session")
+def migrated_sqlite_template(tmp_path_factory) -> Path:
+    path = tmp_path_factory.mktemp("schema") / "todo.db"
+    upgrade("sqlite" , SQLITE_PATH=str(path))
+    return path
+
+
+@pytest.fixture
+def sqlite_path(migrated_sqlite_template , tmp_path) -> Path:
+    """
+    A migrated sqlite database of the test (a copy of the one migrated once per session)
+    """
+    path = tmp_path / "todo.db"
+    shutil.copy(migrated_sqlite_template , path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def postgres_url() -> str:
+    """
+    The migrated postgres database of TEST_DATABASE_URL , skips the test when it is not set
+    """
+    if not POSTGRES_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    upgrade("postgres" , DATABASE_URL=POSTGRES_URL)
+    return POSTGRES_URL
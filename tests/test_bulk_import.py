@@ -0,0 +1,52 @@
+import asyncio
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from todolist.config.setting import Setting
+from todolist.core.Models.models import Counter, Task
+from todolist.core.services import async_task_service
+from todolist.core.services.async_project_service import AsyncProjectService
+from todolist.core.services.async_task_service import AsyncTaskService
+from todolist.data.async_projects_repo import AsyncProjectsRepo
+from todolist.data.async_tasks_repo import AsyncTasksRepo
+from todolist.data.counters import TASKS_COUNTER
+from todolist.db.backends import tuneSqlite
+
+
+def test_project_deleted_during_the_import(sqlite_path , monkeypatch):
+    monkeypatch.setattr(async_task_service , "BULK_BATCH_SIZE" , 2)
+    setting = Setting.initializeSettings()
+    setting.MAX_NUMBER_OF_PROJECTS = setting.MAX_NUMBER_OF_TASKS = 100
+
+    async def scenario() -> list[dict]:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{sqlite_path}")
+        tuneSqlite(engine.sync_engine)
+        factory = async_sessionmaker(bind=engine , autoflush=False , expire_on_commit=False)
+        projectsRepo , tasksRepo = AsyncProjectsRepo(session_factory=factory) , AsyncTasksRepo(session_factory=factory)
+        projectService = AsyncProjectService(projectsRepo , tasksRepo , setting)
+        taskService = AsyncTaskService(projectsRepo , tasksRepo , setting)
+        project = await projectService.createProject("import")
+
+        async def rows():
+            for line in range(1 , 7):
+                if line == 4:
+                    # the first batch (lines 1 and 2) is in , line 3 waits in the next one
+                    await projectService.deleteProject(project.id)
+                yield line , {"name": f"task {line}" , "desc": "" , "status": "todo" , "deadline": None}
+
+        try:
+            return await taskService.addTasksBulk(project.id , rows())
+        finally:
+            await engine.dispose()
+
+    results = asyncio.run(scenario())
+    assert [("id" in result) for result in results[:2]] == [True , True]
+    assert results[2:] == [{"line": line , "error": "Project not found"} for line in range(3 , 7)]
+
+    # the failed batch gave its slots back , the tasks of the first one went with the project
+    engine = create_engine(f"sqlite:///{sqlite_path}")
+    with engine.connect() as connection:
+        assert connection.execute(select(func.count(Task.id))).scalar_one() == 0
+        assert connection.execute(select(Counter.value).where(Counter.name == TASKS_COUNTER)).scalar_one() == 0
+    engine.dispose()
@@ -0,0 +1,16 @@
+import pytest
+
+from todolist.container import ServiceContainer
+
+
+@pytest.mark.parametrize(
+    "storageBackend , engines" ,
+    [("memory" , set()) , ("sqlite" , {"sync_engine" , "async_engine"})] ,
+)
+def test_pool_stats_of_the_built_engines(storageBackend , engines , sqlite_path , monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND" , storageBackend)
+    monkeypatch.setenv("SQLITE_PATH" , str(sqlite_path))
+    container = ServiceContainer.build()
+    pools = container.poolStats()
+    assert set(pools) == engines
+    assert all(stats["checkouts"] >= 0 for stats in pools.values())
@@ -0,0 +1,194 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from todolist.core.commands.deadlines import DeadlineTimer
+from todolist.events import Event, EventHub
+
+START = datetime(2026 , 1 , 1 , 12 , 0 , tzinfo=timezone.utc)
+
+
+class FakeClock:
+    """
+    Clock of the timer under test , only moves when told to
+    """
+
+    def __init__(self , now: datetime = START):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self , **delta) -> None:
+        self.now += timedelta(**delta)
+
+
+class FakeTaskService:
+    """
+    The two calls of the timer on the task service , over a dict of the open tasks and their deadlines
+    """
+
+    def __init__(self , clock , failures: int = 0):
+        self.clock = clock
+        self.failures = failures
+        self.open: dict[str , datetime] = {}
+        self.closed: list[str] = []
+
+    async def upcomingDeadlines(self , after: tuple[datetime , str] , until: datetime , limit: int) -> list:
+        rows = sorted((deadline , taskId) for taskId , deadline in self.open.items() if (deadline , taskId) > after and deadline <= until)
+        return [SimpleNamespace(id=taskId , deadline=deadline) for deadline , taskId in rows[:limit]]
+
+    async def closeOverdueTasks(self , taskIds: list[str]) -> int:
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("db blip")
+        now = self.clock()
+        due = [taskId for taskId in taskIds if taskId in self.open and self.open[taskId] < now]
+        for taskId in due:
+            del self.open[taskId]
+        self.closed += due
+        return len(due)
+
+
+def timer(service: FakeTaskService , hub: EventHub | None = None , **options) -> DeadlineTimer:
+    return DeadlineTimer(service , hub or EventHub() , clock=service.clock , **options)
+
+
+def changed(service: FakeTaskService , taskId: str , deadline: datetime | None , type: str = "task.updated") -> Event:
+    # the task service writes the row , then publishes it
+    if deadline is None:
+        service.open.pop(taskId , None)
+    else:
+        service.open[taskId] = deadline
+    return Event(type , "project" , {"id": taskId , "deadline": deadline , "status": "todo"})
+
+
+def test_insert_inside_horizon_is_closed_at_its_deadline():
+    clock = FakeClock()
+    service = FakeTaskService(clock)
+    deadlines = timer(service)
+    asyncio.run(deadlines.tick())
+
+    deadlines._apply(changed(service , "soon" , START + timedelta(minutes=10) , "task.created"))
+    deadlines._apply(changed(service , "later" , START + timedelta(hours=3) , "task.created"))
+    # only the deadline inside the horizon is held , the other one is loaded when the horizon gets there
+    assert deadlines.stats()["held"] == 1
+    assert deadlines._secondsUntilNext(clock()) == 600
+
+    clock.advance(minutes=10 , seconds=1)
+    assert asyncio.run(deadlines.tick()) == 1
+    assert service.closed == ["soon"]
+
+    clock.advance(hours=3)
+    asyncio.run(deadlines.tick())
+    assert asyncio.run(deadlines.tick()) == 1
+    assert service.closed == ["soon" , "later"]
+
+
+def test_edit_moves_the_deadline():
+    clock = FakeClock()
+    service = FakeTaskService(clock)
+    service.open = {"moved": START + timedelta(minutes=10) , "dropped": START + timedelta(minutes=20)}
+    deadlines = timer(service)
+    asyncio.run(deadlines.tick())
+    assert deadlines.stats()["held"] == 2
+
+    deadlines._apply(changed(service , "moved" , START + timedelta(minutes=40)))
+    deadlines._apply(changed(service , "dropped" , None))
+    # the old entry of the moved task is skipped , the task without a deadline is not closed
+    clock.advance(minutes=30)
+    assert asyncio.run(deadlines.tick()) == 0
+    clock.advance(minutes=11)
+    assert asyncio.run(deadlines.tick()) == 1
+    assert service.closed == ["moved"]
+    assert deadlines.stats()["held"] == 0
+
+
+def test_max_size_shrinks_the_horizon():
+    clock = FakeClock()
+    service = FakeTaskService(clock)
+    service.open = {f"t{minute:02}": START + timedelta(minutes=minute) for minute in range(10 , 60 , 10)}
+    deadlines = timer(service , maxSize=3)
+    asyncio.run(deadlines.tick())
+    assert deadlines.stats()["held"] == 3
+    assert deadlines.stats()["loaded_until"] == START + timedelta(minutes=30)
+
+    # an earlier deadline pushes the latest held one out , the horizon now ends right before it
+    deadlines._apply(changed(service , "t05" , START + timedelta(minutes=5) , "task.created"))
+    assert deadlines.stats()["held"] == 3
+    assert "t30" not in deadlines._deadlines
+    deadlines._apply(changed(service , "t25" , START + timedelta(minutes=25) , "task.created"))
+    assert deadlines.stats()["held"] == 3
+    assert deadlines.stats()["loaded_until"] == START + timedelta(minutes=25)
+    assert sorted(deadlines._deadlines) == ["t05" , "t10" , "t20"]
+
+    # the dropped deadlines are loaded again as the held ones are closed
+    for _ in range(6):
+        clock.advance(minutes=10)
+        asyncio.run(deadlines.tick())
+    assert sorted(service.closed) == ["t05" , "t10" , "t20" , "t25" , "t30" , "t40" , "t50"]
+    assert service.open == {}
+
+
+def test_resubscribes_after_the_hub_overflows():
+    clock = FakeClock()
+    service = FakeTaskService(clock)
+    hub = EventHub(queueSize=1)
+    deadlines = timer(service , hub , resolution=0.01)
+
+    async def scenario():
+        deadlines.start()
+        first = deadlines._subscription
+        # two events before the timer reads any , the second one overflows its queue
+        hub.dispatch(changed(service , "a" , START + timedelta(minutes=10) , "task.created"))
+        hub.dispatch(changed(service , "b" , START + timedelta(minutes=20) , "task.created"))
+        await asyncio.sleep(0.05)
+        assert first.overflowed
+        assert deadlines._subscription is not first
+        assert hub.stats() == {"subscribers": 1 , "dropped": 1}
+        # the deadlines are loaded again from the service , the events missed included
+        assert deadlines.stats()["held"] == 2
+
+        hub.dispatch(changed(service , "c" , START + timedelta(minutes=30) , "task.created"))
+        await asyncio.sleep(0.05)
+        assert deadlines.stats()["held"] == 3
+        await deadlines.stop()
+
+    asyncio.run(scenario())
+    assert hub.stats()["subscribers"] == 0
+
+
+def test_failed_tick_keeps_the_deadlines_and_backs_off():
+    clock = FakeClock()
+    service = FakeTaskService(clock , failures=1)
+    service.open = {"due": START + timedelta(minutes=10)}
+    deadlines = timer(service , retrySeconds=60)
+    asyncio.run(deadlines._guardedTick())
+
+    clock.advance(minutes=11)
+    asyncio.run(deadlines._guardedTick())
+    assert deadlines.stats()["failures"] == 1
+    assert deadlines.stats()["last_error"] == "RuntimeError('db blip')"
+    assert deadlines.stats()["held"] == 1
+    assert deadlines._secondsUntilNext(clock()) == 60
+
+    clock.advance(seconds=60)
+    asyncio.run(deadlines._guardedTick())
+    assert service.closed == ["due"]
+    assert deadlines._secondsUntilNext(clock()) > 60
+
+
+def test_run_loop_survives_a_failed_tick():
+    service = FakeTaskService(lambda: datetime.now(timezone.utc) , failures=2)
+    service.open = {"due": datetime.now(timezone.utc) - timedelta(seconds=1)}
+    deadlines = DeadlineTimer(service , EventHub() , resolution=0.01 , retrySeconds=0.01)
+
+    async def scenario():
+        deadlines.start()
+        await asyncio.sleep(0.2)
+        assert not deadlines._task.done()
+        await deadlines.stop()
+
+    asyncio.run(scenario())
+    assert deadlines.stats()["failures"] == 2
+    assert service.closed == ["due"]
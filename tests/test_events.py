@@ -0,0 +1,109 @@
+import asyncio
+import threading
+
+from todolist.api.streaming import sseEvents
+from todolist.events import Event, EventHub, LocalBroker
+
+
+def drain(subscription) -> list[tuple[int , str]]:
+    events = []
+    while not subscription.queue.empty():
+        event = subscription.queue.get_nowait()
+        events.append((event.id , event.type))
+    return events
+
+
+def test_fan_out_to_the_subscribers():
+    async def scenario():
+        hub = EventHub()
+        everything , first , second = hub.subscribe() , hub.subscribe("a") , hub.subscribe("b")
+        for event in (Event("task.created" , "a") , Event("task.created" , "b") , Event("tasks.closed")):
+            hub.dispatch(event)
+
+        # one sequence for the hub , events of every project go to every subscriber
+        assert drain(everything) == [(1 , "task.created") , (2 , "task.created") , (3 , "tasks.closed")]
+        assert drain(first) == [(1 , "task.created") , (3 , "tasks.closed")]
+        assert drain(second) == [(2 , "task.created") , (3 , "tasks.closed")]
+
+        hub.unsubscribe(second)
+        hub.dispatch(Event("task.created" , "b"))
+        assert drain(second) == [] and drain(everything) == [(4 , "task.created")]
+        assert hub.stats() == {"subscribers": 2 , "dropped": 0}
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_is_cut_off():
+    async def scenario():
+        hub = EventHub(queueSize=2)
+        slow , fast = hub.subscribe() , hub.subscribe()
+        for i in range(3):
+            hub.dispatch(Event(f"event {i}"))
+            drain(fast)
+
+        # the slow one keeps what it had queued , the others are still fed
+        assert slow.overflowed and not fast.overflowed
+        assert drain(slow) == [(1 , "event 0") , (2 , "event 1")]
+        hub.dispatch(Event("event 3"))
+        assert drain(slow) == [] and drain(fast) == [(4 , "event 3")]
+        assert hub.stats() == {"subscribers": 1 , "dropped": 1}
+
+    asyncio.run(scenario())
+
+
+def test_sse_subscribes_once_iterated():
+    async def scenario():
+        hub = EventHub(queueSize=2)
+        stream = sseEvents(hub , None , heartbeat=60)
+        # a response that never starts streaming leaves no subscription behind
+        assert hub.stats()["subscribers"] == 0
+        assert await anext(stream) == b": connected\n\n"
+        assert hub.stats()["subscribers"] == 1
+
+        for i in range(3):
+            hub.dispatch(Event("task.created" , "a" , {"n": i}))
+        messages = [message async for message in stream]
+        assert [message.split(b"\n")[:2] for message in messages[:2]] == [[b"id: 1" , b"event: task.created"] , [b"id: 2" , b"event: task.created"]]
+        # cut off: the queued events , then the overflow message ends the stream
+        assert messages[2:] == [b"event: overflow\ndata: {}\n\n"]
+        assert hub.stats() == {"subscribers": 0 , "dropped": 1}
+
+    asyncio.run(scenario())
+
+
+def test_sse_unsubscribes_when_the_client_leaves():
+    async def scenario():
+        hub = EventHub()
+        stream = sseEvents(hub , "a" , heartbeat=60)
+        await anext(stream)
+        waiting = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        assert hub.stats()["subscribers"] == 1
+        waiting.cancel()
+        await asyncio.gather(waiting , return_exceptions=True)
+        assert hub.stats()["subscribers"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_local_broker_delivers_from_other_threads():
+    async def scenario():
+        hub = EventHub()
+        broker = LocalBroker(hub)
+        # nobody can be subscribed before the broker starts , the event is dropped
+        broker.publish(Event("dropped"))
+        await broker.start()
+        subscription = hub.subscribe()
+
+        thread = threading.Thread(target=broker.publish , args=(Event("from a job" , "a") ,))
+        thread.start()
+        thread.join()
+        event = await asyncio.wait_for(subscription.queue.get() , 1)
+        assert (event.id , event.type) == (1 , "from a job")
+
+        await broker.stop()
+        broker.publish(Event("after stop"))
+        await asyncio.sleep(0)
+        assert subscription.queue.empty()
+
+    asyncio.run(scenario())
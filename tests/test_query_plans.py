@@ -0,0 +1,83 @@
+"""
+Query plans of the task statements of the API (async repo) on the migrated schema , an index regression fails here.
+benchmarks/check_query_plans.py runs the same kind of check on a postgres database.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from todolist.core.Models.models import Project, Task
+from todolist.data.async_tasks_repo import AsyncTasksRepo
+
+INDEX = "ix_tasks_for_project_id"
+PROJECTS = 100
+TASKS = 5000
+
+
+@pytest.fixture
+def seeded(sqlite_path) -> str:
+    """
+    Url of the migrated sqlite database with tasks spread over PROJECTS projects.
+    Not analyzed , like the sqlite databases of the app: with statistics sqlite may pick the as selective
+    ix_tasks_for_project_deadline_id for a for_project equality
+    """
+    url = f"sqlite:///{sqlite_path}"
+    engine = create_engine(url)
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+    with engine.begin() as connection:
+        connection.execute(insert(Project) , [{"id": f"qplan{p:03d}" , "name": f"qplan-{p}" , "desc": ""} for p in range(PROJECTS)])
+        connection.execute(insert(Task.__table__) , [
+            {"id": f"q{i:07x}" , "for_project": f"qplan{i % PROJECTS:03d}" , "name": f"task {i}" , "desc": "" ,
+             "status": "done" if i % 10 else "todo" , "deadline": past , "at_closed": None}
+            for i in range(TASKS)
+        ])
+    engine.dispose()
+    return url
+
+
+def statementsOf(url: str , call) -> list[tuple[str , object]]:
+    """
+    The task statements sent by an async repo call
+    """
+    engine = create_async_engine(url.replace("sqlite://" , "sqlite+aiosqlite://") , poolclass=NullPool)
+    captured = []
+
+    @event.listens_for(engine.sync_engine , "before_cursor_execute")
+    def capture(conn , cursor , statement , parameters , context , executemany):
+        if statement.lstrip().upper().startswith(("SELECT" , "UPDATE" , "DELETE")) and "counters" not in statement:
+            captured.append((statement , parameters))
+
+    repo = AsyncTasksRepo(session_factory=async_sessionmaker(bind=engine , expire_on_commit=False))
+    asyncio.run(call(repo))
+    return captured
+
+
+def plansOf(url: str , statements: list[tuple[str , object]]) -> list[str]:
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        plans = [
+            "\n".join(str(row[-1]) for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement , parameters))
+            for statement , parameters in statements
+        ]
+    engine.dispose()
+    return plans
+
+
+@pytest.mark.parametrize(
+    "call" ,
+    [
+        pytest.param(lambda repo: repo.list_by_project_page("qplan007" , 50) , id="first page") ,
+        pytest.param(lambda repo: repo.list_by_project_page("qplan007" , 50 , after="q0001000") , id="next page") ,
+        pytest.param(lambda repo: repo.list_by_project_page("qplan007" , 50 , fields=["id" , "name"]) , id="projected page") ,
+        pytest.param(lambda repo: repo.delete_project("qplan008") , id="delete project") ,
+    ] ,
+)
+def test_project_task_statements_use_the_project_index(seeded , call):
+    statements = statementsOf(seeded , call)
+    assert statements
+    for (statement , _) , plan in zip(statements , plansOf(seeded , statements)):
+        assert INDEX in plan , f"{statement}\n{plan}"
@@ -0,0 +1,121 @@
+"""
+The project and task quotas under concurrent creates , on a migrated sqlite database: the async services of the API
+raced on one event loop , the sync services of the CLI raced on threads.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from todolist.config.setting import Setting
+from todolist.core.Models.models import Counter, Project, Task
+from todolist.core.services.async_project_service import AsyncProjectService
+from todolist.core.services.async_task_service import AsyncTaskService
+from todolist.core.services.project_service import ProjectService
+from todolist.core.services.task_service import TaskService
+from todolist.data.async_projects_repo import AsyncProjectsRepo
+from todolist.data.async_tasks_repo import AsyncTasksRepo
+from todolist.data.counters import PROJECTS_COUNTER, TASKS_COUNTER
+from todolist.data.projects_repo import ProjectsRepo
+from todolist.data.tasks_repo import TasksRepo
+from todolist.db.backends import tuneSqlite
+
+MAX_PROJECTS = 6
+MAX_TASKS = 10
+ATTEMPTS = 40
+
+
+@pytest.fixture
+def setting() -> Setting:
+    setting = Setting.initializeSettings()
+    setting.MAX_NUMBER_OF_PROJECTS = MAX_PROJECTS
+    setting.MAX_NUMBER_OF_TASKS = MAX_TASKS
+    return setting
+
+
+def assertCountersMatchRows(url: str) -> tuple[int , int]:
+    """
+    The counters rows are the number of projects and tasks
+
+    Returns:
+        tuple[int , int]: number of projects and of tasks
+    """
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        counters = dict(connection.execute(select(Counter.name , Counter.value)).all())
+        projects = connection.execute(select(func.count(Project.id))).scalar_one()
+        tasks = connection.execute(select(func.count(Task.id))).scalar_one()
+    engine.dispose()
+    assert (counters[PROJECTS_COUNTER] , counters[TASKS_COUNTER]) == (projects , tasks)
+    return projects , tasks
+
+
+async def _attempt(call) -> object | None:
+    try:
+        return await call
+    except ValueError:
+        return None
+
+
+def test_async_creates_stop_at_the_quotas(sqlite_path , setting):
+    url = f"sqlite:///{sqlite_path}"
+
+    async def race() -> None:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{sqlite_path}" , pool_size=8)
+        tuneSqlite(engine.sync_engine)
+        factory = async_sessionmaker(bind=engine , autoflush=False , expire_on_commit=False)
+        projectsRepo , tasksRepo = AsyncProjectsRepo(session_factory=factory) , AsyncTasksRepo(session_factory=factory)
+        projectService = AsyncProjectService(projectsRepo , tasksRepo , setting)
+        taskService = AsyncTaskService(projectsRepo , tasksRepo , setting)
+        try:
+            projects = await asyncio.gather(*(_attempt(projectService.createProject(f"quota {i}")) for i in range(ATTEMPTS)))
+            projectIds = [project.id for project in projects if project]
+            assert len(projectIds) == MAX_PROJECTS
+
+            tasks = await asyncio.gather(*(
+                _attempt(taskService.addTask(projectIds[i % len(projectIds)] , f"task {i}")) for i in range(ATTEMPTS)
+            ))
+            assert sum(task is not None for task in tasks) == MAX_TASKS
+            assert assertCountersMatchRows(url) == (MAX_PROJECTS , MAX_TASKS)
+
+            # the slots of the projects deleted with their tasks are free again , for exactly as many creates
+            deleted = await projectService.deleteProjects(projectIds[:2])
+            assert assertCountersMatchRows(url) == (MAX_PROJECTS - 2 , MAX_TASKS - sum(deleted.values()))
+            again = await asyncio.gather(*(_attempt(projectService.createProject(f"again {i}")) for i in range(ATTEMPTS)))
+            assert sum(project is not None for project in again) == 2
+        finally:
+            await engine.dispose()
+
+    asyncio.run(race())
+    assert assertCountersMatchRows(url)[0] == MAX_PROJECTS
+
+
+def test_threaded_creates_stop_at_the_quotas(sqlite_path , setting):
+    url = f"sqlite:///{sqlite_path}"
+    engine = create_engine(url , pool_size=16)
+    tuneSqlite(engine)
+    factory = sessionmaker(bind=engine , autoflush=False , expire_on_commit=False)
+    projectsRepo , tasksRepo = ProjectsRepo(session_factory=factory) , TasksRepo(session_factory=factory)
+    projectService = ProjectService(projectsRepo , tasksRepo , setting)
+    taskService = TaskService(projectsRepo , tasksRepo , setting)
+
+    def attempt(call , *args) -> object | None:
+        try:
+            return call(*args)
+        except ValueError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        projects = list(pool.map(lambda i: attempt(projectService.createProject , f"quota {i}") , range(ATTEMPTS)))
+        projectIds = [project.id for project in projects if project]
+        assert len(projectIds) == MAX_PROJECTS
+        tasks = list(pool.map(lambda i: attempt(taskService.addTask , projectIds[i % MAX_PROJECTS] , f"task {i}") , range(ATTEMPTS)))
+    assert sum(task is not None for task in tasks) == MAX_TASKS
+    assert assertCountersMatchRows(url) == (MAX_PROJECTS , MAX_TASKS)
+
+    deletedTasks = sum(projectService.deleteProject(projectId) for projectId in projectIds[:2])
+    assert assertCountersMatchRows(url) == (MAX_PROJECTS - 2 , MAX_TASKS - deletedTasks)
+    engine.dispose()
@@ -0,0 +1,307 @@
+import asyncio
+import random
+import time as walltime
+from datetime import datetime, time, timedelta, timezone
+
+import pytest
+
+from todolist.core.commands.scheduler import Job, Scheduler
+from todolist.data.memory_jobs_repo import MemoryJobsRepo
+from todolist.data.memory_store import MemoryStore
+
+TEHRAN = timezone(timedelta(hours=3 , minutes=30))
+
+
+class FakeClock:
+    """
+    Clock of the schedulers under test , only moves when told to
+    """
+
+    def __init__(self , now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self , **delta) -> None:
+        self.now += timedelta(**delta)
+
+
+class Calls:
+    """
+    Job counting its runs , sleeping (in its worker thread) for `seconds` on each run
+    """
+
+    def __init__(self , seconds: float = 0):
+        self.seconds = seconds
+        self.count = 0
+
+    def __call__(self) -> None:
+        self.count += 1
+        if self.seconds:
+            walltime.sleep(self.seconds)
+
+
+@pytest.fixture
+def repo() -> MemoryJobsRepo:
+    return MemoryJobsRepo(MemoryStore())
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock(datetime(2026 , 1 , 1 , 12 , 0 , tzinfo=TEHRAN))
+
+
+class FlakyJobsRepo(MemoryJobsRepo):
+    """
+    Jobs repo whose `failing` method raises the next `times` calls , like a database that is briefly unreachable
+    """
+
+    def __init__(self , failing: str , times: int = 1):
+        super().__init__(MemoryStore())
+        self.failing = failing
+        self.times = times
+
+    def __getattribute__(self , name):
+        method = super().__getattribute__(name)
+        if name != super().__getattribute__("failing"):
+            return method
+
+        def flaky(*args , **kwargs):
+            if self.times:
+                self.times -= 1
+                raise RuntimeError("db blip")
+            return method(*args , **kwargs)
+        return flaky
+
+
+def scheduler(repo: MemoryJobsRepo , clock: FakeClock , *jobs: Job , **options) -> Scheduler:
+    result = Scheduler(repo , clock=clock , pollSeconds=options.pop("pollSeconds" , 3600) , **options)
+    for job in jobs:
+        result.add(job)
+    return result
+
+
+def test_due_job_runs_once_across_schedulers(repo , clock):
+    calls = Calls()
+    first = scheduler(repo , clock , Job("hourly" , calls , every=timedelta(hours=1)))
+    second = scheduler(repo , clock , Job("hourly" , calls , every=timedelta(hours=1)))
+
+    assert asyncio.run(first.runPending()) == 1
+    # the second one finds the run of the first under the lease and waits for the next one
+    assert asyncio.run(second.runPending()) == 0
+    assert calls.count == 1
+    assert second.stats()[0]["next_run"] == clock.now + timedelta(hours=1)
+
+    clock.advance(hours=1)
+    assert asyncio.run(second.runPending()) == 1
+    assert asyncio.run(first.runPending()) == 0
+    assert calls.count == 2
+
+
+def test_lease_keeps_concurrent_runs_out(repo , clock):
+    calls = Calls(seconds=0.2)
+    schedulers = [scheduler(repo , clock , Job("daily" , calls , at=time(3 , 0))) for _ in range(2)]
+
+    async def both():
+        return await asyncio.gather(*(one.runPending() for one in schedulers))
+
+    assert sorted(asyncio.run(both())) == [0 , 1]
+    assert calls.count == 1
+    # the scheduler that found the lease taken retries after pollSeconds , then sees the run
+    busy = next(one for one in schedulers if one.stats()[0]["runs"] == 0)
+    assert busy.stats()[0]["next_run"] == clock.now + timedelta(seconds=busy.pollSeconds)
+    clock.advance(seconds=busy.pollSeconds)
+    assert asyncio.run(busy.runPending()) == 0
+    assert calls.count == 1
+
+
+def test_expired_lease_is_taken_over(repo , clock):
+    calls = Calls()
+    # a scheduler died while running the job , its lease holds for 10 minutes
+    repo.ensure("hourly")
+    assert repo.acquire("hourly" , "crashed" , clock.now , 600) is not None
+    survivor = scheduler(repo , clock , Job("hourly" , calls , every=timedelta(hours=1)) , pollSeconds=60)
+
+    assert asyncio.run(survivor.runPending()) == 0
+    clock.advance(minutes=10)
+    assert asyncio.run(survivor.runPending()) == 1
+    assert calls.count == 1
+
+
+def test_missed_runs_are_caught_up_once(repo , clock):
+    calls = Calls()
+    before = scheduler(repo , clock , Job("hourly" , calls , every=timedelta(hours=1)))
+    assert asyncio.run(before.runPending()) == 1
+
+    # down for five hours and a bit , the restarted scheduler reads the last run from the repo
+    clock.advance(hours=5 , minutes=10)
+    after = scheduler(repo , clock , Job("hourly" , calls , every=timedelta(hours=1)))
+    assert asyncio.run(after.runPending()) == 1
+    assert asyncio.run(after.runPending()) == 0
+    assert calls.count == 2
+
+    # the next run is an interval after the catch up , not on the missed slots
+    clock.advance(minutes=59)
+    assert asyncio.run(after.runPending()) == 0
+    clock.advance(minutes=1)
+    assert asyncio.run(after.runPending()) == 1
+    assert calls.count == 3
+
+
+def test_missed_days_are_caught_up_once(repo , clock):
+    calls = Calls()
+    job = Job("daily" , calls , at=time(3 , 0))
+    assert asyncio.run(scheduler(repo , clock , job).runPending()) == 1
+
+    clock.advance(days=3)
+    after = scheduler(repo , clock , Job("daily" , calls , at=time(3 , 0)))
+    assert asyncio.run(after.runPending()) == 1
+    assert asyncio.run(after.runPending()) == 0
+    assert calls.count == 2
+    assert after.stats()[0]["next_run"] == datetime(2026 , 1 , 5 , 3 , 0 , tzinfo=TEHRAN)
+
+
+@pytest.mark.parametrize("failing" , ["ensure" , "last_run" , "acquire"])
+def test_jobs_repo_failure_is_retried(clock , failing):
+    calls = Calls()
+    flaky = scheduler(FlakyJobsRepo(failing) , clock , Job("hourly" , calls , every=timedelta(hours=1)) , pollSeconds=60)
+
+    assert asyncio.run(flaky.runPending()) == 0
+    state = flaky.stats()[0]
+    assert state["failures"] == 1
+    assert state["last_error"] == "RuntimeError('db blip')"
+    assert state["next_run"] == clock.now + timedelta(seconds=60)
+    assert flaky.secondsUntilNext() == 60
+
+    clock.advance(seconds=60)
+    assert asyncio.run(flaky.runPending()) == 1
+    assert calls.count == 1
+
+
+def test_failed_release_keeps_the_run(clock):
+    calls = Calls()
+    flaky = scheduler(FlakyJobsRepo("release") , clock , Job("hourly" , calls , every=timedelta(hours=1)) , pollSeconds=60)
+
+    asyncio.run(flaky.runPending())
+    state = flaky.stats()[0]
+    assert calls.count == 1
+    assert (state["runs"] , state["failures"]) == (1 , 1)
+    # the job ran , it is not run again before its interval
+    assert state["next_run"] == clock.now + timedelta(hours=1)
+    clock.advance(minutes=59)
+    assert asyncio.run(flaky.runPending()) == 0
+    clock.advance(minutes=1)
+    assert asyncio.run(flaky.runPending()) == 1
+    assert calls.count == 2
+
+
+def test_failing_job_is_retried(repo , clock):
+    attempts = []
+
+    def failsOnce():
+        attempts.append(clock.now)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+
+    flaky = scheduler(repo , clock , Job("hourly" , failsOnce , every=timedelta(hours=1)) , pollSeconds=60)
+    assert asyncio.run(flaky.runPending()) == 0
+    assert flaky.stats()[0]["last_error"] == "RuntimeError('boom')"
+    clock.advance(seconds=60)
+    assert asyncio.run(flaky.runPending()) == 1
+    assert flaky.stats()[0]["runs"] == 1
+    assert flaky.stats()[0]["failures"] == 1
+
+
+def test_run_loop_survives_jobs_repo_failure(clock):
+    calls = Calls()
+    sleeps = []
+
+    async def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock.advance(seconds=seconds)
+        if len(sleeps) == 4:
+            raise asyncio.CancelledError
+
+    looping = Scheduler(FlakyJobsRepo("acquire") , clock=clock , sleep=sleep , pollSeconds=60)
+    looping.add(Job("every 2 minutes" , calls , every=timedelta(minutes=2)))
+
+    # fails at 0 , runs at 60 and 180
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(looping.run())
+    assert sleeps == [60.0] * 4
+    assert calls.count == 2
+    assert looping.stats()[0]["failures"] == 1
+
+
+@pytest.mark.parametrize(
+    ("at" , "lastRun" , "expected") ,
+    [
+        # before midnight , the run of the next day
+        (time(0 , 30) , datetime(2026 , 1 , 1 , 23 , 50 , tzinfo=TEHRAN) , datetime(2026 , 1 , 2 , 0 , 30 , tzinfo=TEHRAN)) ,
+        # after midnight , before the time of the day , the same day
+        (time(0 , 30) , datetime(2026 , 1 , 2 , 0 , 10 , tzinfo=TEHRAN) , datetime(2026 , 1 , 2 , 0 , 30 , tzinfo=TEHRAN)) ,
+        # ran right at the time of the day , the next day
+        (time(0 , 30) , datetime(2026 , 1 , 2 , 0 , 30 , tzinfo=TEHRAN) , datetime(2026 , 1 , 3 , 0 , 30 , tzinfo=TEHRAN)) ,
+        # across the end of the year
+        (time(23 , 30) , datetime(2026 , 12 , 31 , 23 , 45 , tzinfo=TEHRAN) , datetime(2027 , 1 , 1 , 23 , 30 , tzinfo=TEHRAN)) ,
+        # last run stored in utc on the previous day , already past midnight in the local time
+        (time(0 , 30) , datetime(2026 , 1 , 1 , 21 , 0 , tzinfo=timezone.utc) , datetime(2026 , 1 , 3 , 0 , 30 , tzinfo=TEHRAN)) ,
+    ] ,
+)
+def test_next_daily_run(at , lastRun , expected):
+    now = datetime(2026 , 6 , 1 , tzinfo=TEHRAN)
+    assert Job("daily" , Calls() , at=at).nextRun(lastRun , now) == expected
+
+
+def test_daily_job_across_midnight(repo):
+    clock = FakeClock(datetime(2026 , 1 , 1 , 23 , 59 , tzinfo=TEHRAN))
+    calls = Calls()
+    daily = scheduler(repo , clock , Job("daily" , calls , at=time(0 , 30)) , pollSeconds=86400)
+
+    assert asyncio.run(daily.runPending()) == 1
+    assert daily.secondsUntilNext() == 31 * 60
+
+    clock.advance(minutes=30)
+    assert asyncio.run(daily.runPending()) == 0
+    clock.advance(minutes=1)
+    assert asyncio.run(daily.runPending()) == 1
+    assert daily.stats()[0]["next_run"] == datetime(2026 , 1 , 3 , 0 , 30 , tzinfo=TEHRAN)
+    assert calls.count == 2
+
+
+def test_jitter_delays_due_time_within_bounds(repo , clock):
+    calls = Calls()
+    jittered = scheduler(repo , clock , Job("hourly" , calls , every=timedelta(hours=1)) , jitter=30 , rng=random.Random(7))
+    rng = random.Random(7)
+    expectedFirst = rng.uniform(0 , 30)
+    expectedSecond = rng.uniform(0 , 30)
+
+    # the first look (never ran) is due now plus jitter
+    assert asyncio.run(jittered.runPending()) == 0
+    assert jittered.stats()[0]["next_run"] == clock.now + timedelta(seconds=expectedFirst)
+    assert 0 <= expectedFirst <= 30
+
+    clock.advance(seconds=expectedFirst)
+    assert asyncio.run(jittered.runPending()) == 1
+    assert jittered.stats()[0]["next_run"] == clock.now + timedelta(hours=1 , seconds=expectedSecond)
+    assert calls.count == 1
+
+
+def test_run_loop_sleeps_until_next_due(repo , clock):
+    calls = Calls()
+    sleeps = []
+
+    async def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock.advance(seconds=seconds)
+        if len(sleeps) == 4:
+            raise asyncio.CancelledError
+
+    looping = Scheduler(repo , clock=clock , sleep=sleep , pollSeconds=3600)
+    looping.add(Job("every 20 minutes" , calls , every=timedelta(minutes=20)))
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(looping.run())
+    assert sleeps == [1200.0] * 4
+    assert calls.count == 4
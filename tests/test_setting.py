@@ -0,0 +1,36 @@
+import pytest
+
+from todolist.config import setting as settingModule
+from todolist.config.setting import Setting
+
+
+@pytest.fixture(autouse=True)
+def no_dotenv(monkeypatch):
+    # only the variables of the test , not the .env of the checkout
+    monkeypatch.setattr(settingModule , "load_dotenv" , lambda: None)
+
+
+@pytest.mark.parametrize("value , expected" , [("1" , True) , (" TRUE " , True) , ("yes" , True) , ("0" , False) , ("no" , False) , ("" , False)])
+def test_boolean_variables(value , expected , monkeypatch):
+    for name in ("CACHE_ENABLED" , "SCHEDULER_ENABLED" , "DEADLINE_TIMER_ENABLED" , "DB_POOL_PRE_PING" , "PROFILING_ENABLED"):
+        monkeypatch.setenv(name , value)
+    setting = Setting.initializeSettings()
+    assert [setting.CACHE_ENABLED , setting.SCHEDULER_ENABLED , setting.DEADLINE_TIMER_ENABLED , setting.pool.PRE_PING , setting.profiling.ENABLED] == [expected] * 5
+
+
+def test_grouped_settings(monkeypatch):
+    for name in ("CACHE_ENABLED" , "SCHEDULER_ENABLED" , "DB_POOL_PRE_PING" , "PROFILING_ENABLED" , "DB_POOL_SIZE" , "ASYNC_DATABASE_URL"):
+        monkeypatch.delenv(name , raising=False)
+    monkeypatch.setenv("STORAGE_BACKEND" , " SQLite ")
+    monkeypatch.setenv("SQLITE_PATH" , "other.db")
+    monkeypatch.setenv("DB_MAX_OVERFLOW" , "3")
+    monkeypatch.setenv("PROFILING_SAMPLE_RATE" , "0.5")
+    setting = Setting.initializeSettings()
+
+    # unset booleans keep their defaults
+    assert (setting.CACHE_ENABLED , setting.SCHEDULER_ENABLED , setting.pool.PRE_PING , setting.profiling.ENABLED) == (False , True , True , False)
+    assert (setting.pool.SIZE , setting.pool.MAX_OVERFLOW) == (5 , 3)
+    assert setting.profiling.SAMPLE_RATE == 0.5
+    assert (setting.storage.BACKEND , setting.storage.SQLITE_PATH , setting.storage.ASYNC_DATABASE_URL) == ("sqlite" , "other.db" , "")
+    # the groups a setting is built without get their defaults
+    assert Setting().storage.BACKEND == "postgres" and Setting().pool.SIZE == 5
@@ -0,0 +1,242 @@
+"""
+The behaviour of the repositories the services rely on (see todolist/data/protocols.py) , the same for every backend:
+the sync repos on memory , sqlite and postgres (CLI , scheduler jobs) and the async repos on sqlite and postgres (API).
+Postgres runs when TEST_DATABASE_URL is set.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, delete, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from todolist.core.Models.models import Counter, Project, Task
+from todolist.data.async_projects_repo import AsyncProjectsRepo
+from todolist.data.async_tasks_repo import AsyncTasksRepo
+from todolist.data.memory_projects_repo import MemoryProjectsRepo
+from todolist.data.memory_store import MemoryStore
+from todolist.data.memory_tasks_repo import MemoryTasksRepo
+from todolist.data.projects_repo import ProjectsRepo
+from todolist.data.tasks_repo import TasksRepo
+from todolist.db.backends import _to_async_url, tuneSqlite
+
+LIMIT = 10 ** 9
+
+DATABASES = ["sqlite"] + (["postgres"] if os.getenv("TEST_DATABASE_URL") else [])
+BACKENDS = ["memory"] + [f"{database} {kind}" for database in DATABASES for kind in ("sync" , "async")]
+
+
+class Awaited:
+    """
+    A sync repo behind the interface of the async ones , so one contract checks both
+    """
+
+    def __init__(self , repo):
+        self._repo = repo
+
+    def __getattr__(self , name):
+        method = getattr(self._repo , name)
+
+        async def call(*args , **kwargs):
+            return method(*args , **kwargs)
+        return call
+
+    @asynccontextmanager
+    async def unit_of_work(self):
+        with self._repo.unit_of_work():
+            yield
+
+
+def _backend(request) -> tuple:
+    name = request.param
+    if name == "memory":
+        store = MemoryStore()
+        return Awaited(MemoryProjectsRepo(store)) , Awaited(MemoryTasksRepo(store))
+    database , kind = name.split()
+    if database == "sqlite":
+        url = f"sqlite:///{request.getfixturevalue('sqlite_path')}"
+    else:
+        url = _emptyPostgres(request.getfixturevalue("postgres_url"))
+    if kind == "sync":
+        engine = create_engine(url)
+        tuneSqlite(engine)
+        request.addfinalizer(engine.dispose)
+        factory = sessionmaker(bind=engine , autoflush=False , expire_on_commit=False)
+        return Awaited(ProjectsRepo(session_factory=factory)) , Awaited(TasksRepo(session_factory=factory))
+    # a connection per session , the engine outlives the event loop of each test step
+    engine = create_async_engine(_to_async_url(url) , poolclass=NullPool)
+    tuneSqlite(engine.sync_engine)
+    factory = async_sessionmaker(bind=engine , autoflush=False , expire_on_commit=False)
+    return AsyncProjectsRepo(session_factory=factory) , AsyncTasksRepo(session_factory=factory)
+
+
+def _emptyPostgres(url: str) -> str:
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(delete(Project))
+        connection.execute(update(Counter).values(value=0))
+    engine.dispose()
+    return url
+
+
+@pytest.fixture(params=BACKENDS)
+def repos(request) -> tuple:
+    """
+    (projects , tasks) repos of the backend , on an empty database
+    """
+    return _backend(request)
+
+
+@pytest.fixture(params=[f"{database} async" for database in DATABASES])
+def async_repos(request) -> tuple:
+    """
+    (projects , tasks) async repos , on an empty database
+    """
+    return _backend(request)
+
+
+def test_projects(repos):
+    projects , _ = repos
+
+    async def contract():
+        # unique names , quota , optimistic versions
+        assert await projects.reserve_slots(2 , 2) and not await projects.reserve_slots(2 , 1)
+        first = Project("contract a" , "first")
+        await projects.add(first)
+        assert (await projects.get(first.id)).name == "contract a"
+        assert await projects.name_exists("contract a") and not await projects.name_exists("contract a" , first.id)
+        with pytest.raises(ValueError):
+            async with projects.unit_of_work():
+                assert await projects.reserve_slots(LIMIT)
+                await projects.add(Project("contract a"))
+        # the unit of work that raised gave its slot back
+        assert not await projects.reserve_slots(2 , 1)
+
+        second = Project("contract b")
+        await projects.add(second)
+        with pytest.raises(ValueError):
+            await projects.update_fields(second.id , Project.editValues(newName="contract a"))
+        edited = await projects.update_fields(first.id , Project.editValues(newDesc="edited") , expectedVersion=1)
+        assert edited is not None and edited.desc == "edited" and edited.version == 2
+        assert await projects.update_fields(first.id , Project.editValues(newDesc="stale") , expectedVersion=1) is None
+        # the returned rows are copies
+        edited.desc = "not stored"
+        assert (await projects.get(first.id)).desc == "edited"
+
+        assert {p.id for p in await projects.list()} == {first.id , second.id} and await projects.length() == 2
+        many = await projects.get_many([second.id , "missing" , first.id , second.id])
+        assert set(many) == {first.id , second.id} and many[first.id].desc == "edited"
+        assert await projects.get_version(first.id) == 2 and await projects.get_version("missing") is None
+
+    asyncio.run(contract())
+
+
+def test_tasks(repos):
+    projects , tasks = repos
+
+    async def contract():
+        now = datetime.now(timezone.utc)
+        assert await projects.reserve_slots(LIMIT , 2)
+        first , second = Project("contract a") , Project("contract b")
+        await projects.add(first)
+        await projects.add(second)
+
+        # only in existing projects , every write bumps the tasks version of the project
+        tasksVersion = await projects.get_tasks_version(first.id)
+        assert not await tasks.add_to_project(Task("missing" , "contract orphan"))
+        assert await tasks.reserve_slots(LIMIT , 3)
+        overdue = Task(first.id , "contract overdue" , deadline=now - timedelta(days=2))
+        later = Task(first.id , "contract later" , deadline=now + timedelta(days=2))
+        other = Task(second.id , "contract other")
+        for task in (overdue , later , other):
+            assert await tasks.add_to_project(task)
+        assert await projects.get_tasks_version(first.id) == tasksVersion + 2
+        assert {t.id for t in await tasks.list_by_project(first.id)} == {overdue.id , later.id}
+        assert set(await tasks.get_many([other.id , "missing" , later.id])) == {other.id , later.id}
+        assert await tasks.get_version(later.id) == 1 and await tasks.get_version("missing") is None
+
+        # at_closed is stamped on the first transition to done only
+        done = await tasks.update_fields(later.id , Task.editValues(newStatus="done"))
+        assert done.status == "done" and done.at_closed is not None and done.version == 2
+        again = await tasks.update_fields(later.id , Task.editValues(newStatus="done"))
+        assert again.at_closed == done.at_closed
+        assert await tasks.update_fields("missing" , Task.editValues(newName="x")) is None
+        both = await tasks.update_many([later.id , other.id , "missing"] , Task.editValues(newStatus="done"))
+        assert {t.id for t in both} == {later.id , other.id}
+        assert all(t.at_closed is not None for t in both) and (await tasks.get(later.id)).at_closed == done.at_closed
+
+        # open overdue tasks are closed once , with a new version
+        openVersion = (await tasks.get(overdue.id)).version
+        assert await tasks.close_overdue(now) == 1
+        closed = await tasks.get(overdue.id)
+        assert closed.status == "done" and closed.at_closed is not None and closed.version == openVersion + 1
+        assert await tasks.close_overdue(now) == 0
+
+    asyncio.run(contract())
+
+
+def test_deletes_give_the_slots_back(repos):
+    projects , tasks = repos
+
+    async def contract():
+        assert await projects.reserve_slots(LIMIT , 3) and await tasks.reserve_slots(LIMIT , 5)
+        first , second , cascaded = Project("contract a") , Project("contract b") , Project("contract c")
+        for project in (first , second , cascaded):
+            await projects.add(project)
+        kept = [Task(first.id , f"contract first {i}") for i in range(2)]
+        other = Task(second.id , "contract other")
+        for task in (*kept , other , *[Task(cascaded.id , f"contract cascaded {i}") for i in range(2)]):
+            assert await tasks.add_to_project(task)
+
+        assert await tasks.delete(other.id , expectedVersion=5) is None
+        assert await tasks.delete(other.id) == second.id and await tasks.get(other.id) is None
+        assert await tasks.delete_project(first.id) == 2 and await tasks.list_by_project(first.id) == []
+        assert await projects.delete_cascade([first.id , second.id]) == {first.id: 0 , second.id: 0}
+        assert await projects.get(first.id) is None
+        # a deleted project frees its name
+        assert not await projects.name_exists("contract a")
+
+        assert await projects.delete_cascade([cascaded.id , "missing"] , expectedVersion=2) == {}
+        assert await projects.delete_cascade([cascaded.id , "missing"]) == {cascaded.id: 2}
+        assert await projects.get(cascaded.id) is None and await tasks.list_by_project(cascaded.id) == []
+
+        # every slot taken above was given back: the counters are at 0
+        for repo in (projects , tasks):
+            assert await repo.reserve_slots(1) and not await repo.reserve_slots(1)
+
+    asyncio.run(contract())
+
+
+def test_async_only_calls(async_repos):
+    projects , tasks = async_repos
+
+    async def contract():
+        now = datetime.now(timezone.utc)
+        assert await projects.reserve_slots(LIMIT) and await tasks.reserve_slots(LIMIT , 4)
+        project = Project("contract a")
+        await projects.add(project)
+        rows = [Task(project.id , f"contract {i}" , deadline=now + timedelta(minutes=i)) for i in range(-1 , 3)]
+        assert await tasks.add_many(rows) == 4
+
+        # deadlines of the open tasks after a (deadline , id) pair , up to a time
+        upcoming = await tasks.upcoming_deadlines((now , "") , now + timedelta(minutes=1) , 10)
+        assert [row.id for row in upcoming] == [rows[1].id , rows[2].id]
+        assert [row.id for row in await tasks.upcoming_deadlines((upcoming[0].deadline , upcoming[0].id) , now + timedelta(hours=1) , 1)] == [rows[2].id]
+
+        # only the open overdue ones are closed
+        assert await tasks.close_overdue_ids([row.id for row in rows] , now + timedelta(seconds=30)) == 2
+        assert await tasks.close_overdue_ids([rows[0].id] , now + timedelta(seconds=30)) == 0
+        assert (await tasks.get(rows[0].id)).version == 2 and (await tasks.get(rows[3].id)).status != "done"
+
+        streamed = [row async for row in tasks.stream_by_project(project.id , ["id" , "status"] , batchSize=3)]
+        assert [row["id"] for row in streamed] == sorted(row.id for row in rows)
+        assert all(set(row.keys()) == {"id" , "status"} for row in streamed)
+
+        page = await tasks.list_by_project_page(project.id , 2 , fields=["id" , "name"])
+        assert [row["id"] for row in page] == sorted(row.id for row in rows)[:2]
+
+    asyncio.run(contract())
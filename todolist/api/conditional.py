@@ -0,0 +1,70 @@
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+
+
+def etagOf(version: int) -> str:
+    """
+    Strong ETag of a representation built from a version counter
+
+    Args:
+        version (int): version of the row (or of the task list)
+
+    Returns:
+        str: the quoted ETag
+    """
+    return f'"{version}"'
+
+
+def _parseETags(header: str) -> list[str]:
+    """
+    Split an If-Match / If-None-Match header into its ETags
+    """
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def isNotModified(ifNoneMatch: Optional[str], etag: str) -> bool:
+    """
+    Whether the client already has the representation with this ETag (weak comparison , as for GET)
+
+    Args:
+        ifNoneMatch (str | None): raw If-None-Match header
+        etag (str): current ETag of the representation
+
+    Returns:
+        bool: True if a 304 can be answered
+    """
+    if not ifNoneMatch:
+        return False
+    tags = _parseETags(ifNoneMatch)
+    return "*" in tags or etag in [tag.removeprefix("W/") for tag in tags]
+
+
+def notModifiedResponse(etag: str) -> Response:
+    """
+    Empty 304 response carrying the current ETag
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def expectedVersion(ifMatch: Optional[str]) -> int | None:
+    """
+    Version a write must find , read from the If-Match header (strong comparison)
+
+    Args:
+        ifMatch (str | None): raw If-Match header
+
+    Raises:
+        HTTPException: 412 if the header can't match any version (weak or malformed ETags , several ETags)
+
+    Returns:
+        int | None: the expected version , None when there is no precondition (no header or *)
+    """
+    if not ifMatch:
+        return None
+    tags = _parseETags(ifMatch)
+    if "*" in tags:
+        return None
+    if len(tags) == 1 and len(tags[0]) > 2 and tags[0][0] == tags[0][-1] == '"' and tags[0][1:-1].isdigit():
+        return int(tags[0][1:-1])
+    raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Precondition failed")
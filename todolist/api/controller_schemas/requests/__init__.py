@@ -1,9 +1,14 @@
-from .project_request_schema import ProjectCreateRequest, ProjectUpdateRequest
-from .task_request_schema import TaskCreateRequest, TaskUpdateRequest
+from .project_request_schema import ProjectCreateRequest, ProjectUpdateRequest, ProjectBulkDeleteRequest, ProjectBatchGetRequest
+from .task_request_schema import TaskCreateRequest, TaskUpdateRequest, TaskBatchGetRequest, TaskBatchUpdateItem, TaskBatchUpdateRequest
 
 __all__ = [
     "ProjectCreateRequest",
     "ProjectUpdateRequest",
+    "ProjectBulkDeleteRequest",
+    "ProjectBatchGetRequest",
     "TaskCreateRequest",
     "TaskUpdateRequest",
+    "TaskBatchGetRequest",
+    "TaskBatchUpdateItem",
+    "TaskBatchUpdateRequest",
 ]
@@ -15,4 +15,17 @@ class ProjectUpdateRequest(BaseModel):
     Data the client can send to update a project.
     """
     name: Optional[str] = Field(default=None, min_length=1, max_length=100)
-    desc: Optional[str] = Field(default=None, max_length=5000)
\ No newline at end of file
+    desc: Optional[str] = Field(default=None, max_length=5000)
+
+class ProjectBulkDeleteRequest(BaseModel):
+    """
+    Ids of the projects to delete at once.
+    """
+    ids: list[str] = Field(..., min_length=1, max_length=10000)
+
+
+class ProjectBatchGetRequest(BaseModel):
+    """
+    Ids of the projects to get at once.
+    """
+    ids: list[str] = Field(..., min_length=1, max_length=1000)
@@ -21,3 +21,24 @@ class TaskUpdateRequest(BaseModel):
     desc: Optional[str] = Field(default=None, max_length=5000)
     status: Optional[str] = None
     deadline: Optional[datetime] = None
+
+
+class TaskBatchGetRequest(BaseModel):
+    """
+    Ids of the tasks to get at once.
+    """
+    ids: list[str] = Field(..., min_length=1, max_length=1000)
+
+
+class TaskBatchUpdateItem(TaskUpdateRequest):
+    """
+    One edit of a batch update: the task and the fields to change.
+    """
+    id: str
+
+
+class TaskBatchUpdateRequest(BaseModel):
+    """
+    Edits to apply to many tasks in one transaction.
+    """
+    updates: list[TaskBatchUpdateItem] = Field(..., min_length=1, max_length=1000)
@@ -1,7 +1,30 @@
-from .project_response_schema import ProjectResponse
-from .task_response_schema import TaskResponse
+from .project_response_schema import ProjectResponse, ProjectDeletedResult, ProjectBulkDeleteResponse, ProjectBatchGetResponse
+from .task_response_schema import TaskResponse, TaskBulkRowResult, TaskBulkResponse, TaskBatchGetResponse, TaskBatchUpdateResult, TaskBatchUpdateResponse
+from .admin_response_schema import CacheStats, CacheStatsResponse, EventStatsResponse, JobStatsResponse, DeadlineTimerStatsResponse, PoolStats, PoolStatsResponse, ProfilingStatsResponse
+from .search_response_schema import SearchResultResponse
+from .stats_response_schema import StatsResponse, ProjectStatsResponse, StatsRebuildResponse
 
 __all__ = [
     "ProjectResponse",
+    "ProjectDeletedResult",
+    "ProjectBulkDeleteResponse",
+    "ProjectBatchGetResponse",
     "TaskResponse",
+    "TaskBulkRowResult",
+    "TaskBulkResponse",
+    "TaskBatchGetResponse",
+    "TaskBatchUpdateResult",
+    "TaskBatchUpdateResponse",
+    "CacheStats",
+    "CacheStatsResponse",
+    "EventStatsResponse",
+    "JobStatsResponse",
+    "DeadlineTimerStatsResponse",
+    "PoolStats",
+    "PoolStatsResponse",
+    "ProfilingStatsResponse",
+    "SearchResultResponse",
+    "StatsResponse",
+    "ProjectStatsResponse",
+    "StatsRebuildResponse",
 ]
@@ -0,0 +1,115 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+from typing import Optional
+
+
+class CacheStats(BaseModel):
+    """
+    Counters of one cache (projects or tasks).
+    """
+    hits: int
+    misses: int
+    evictions: int
+    expirations: Optional[int] = None
+    size: Optional[int] = None
+    max_size: Optional[int] = None
+
+
+class CacheStatsResponse(BaseModel):
+    """
+    Counters of the read-through caches returned by the API.
+    """
+    enabled: bool
+    projects: Optional[CacheStats] = None
+    tasks: Optional[CacheStats] = None
+
+
+class EventStatsResponse(BaseModel):
+    """
+    Counters of the change feed hub of the process returned by the API.
+    """
+    subscribers: int
+    dropped: int
+
+
+class JobStatsResponse(BaseModel):
+    """
+    State of one background job as seen by the scheduler of the process returned by the API.
+    """
+    name: str
+    last_run: Optional[datetime] = None
+    next_run: Optional[datetime] = None
+    runs: int
+    failures: int
+    last_error: Optional[str] = None
+
+
+class DeadlineTimerStatsResponse(BaseModel):
+    """
+    Counters of the deadline timer of the process returned by the API.
+    """
+    enabled: bool
+    held: Optional[int] = None
+    loaded_until: Optional[datetime] = None
+    closed: Optional[int] = None
+    failures: Optional[int] = None
+    last_error: Optional[str] = None
+
+
+class PoolWaitBucket(BaseModel):
+    """
+    One bucket of the checkout wait histogram: checkouts that took at most `le` milliseconds (`le` null: all of them).
+    """
+    le: Optional[float] = None
+    count: int
+
+
+class PoolStats(BaseModel):
+    """
+    State and counters of one connection pool.
+    """
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_sum_ms: float
+    wait_max_ms: float
+    wait_buckets: list[PoolWaitBucket]
+
+
+class PoolStatsResponse(BaseModel):
+    """
+    Connection pools of the process returned by the API , null for an engine the storage backend does not use.
+    """
+    sync_engine: Optional[PoolStats] = None
+    async_engine: Optional[PoolStats] = None
+
+
+class NPlusOneSample(BaseModel):
+    """
+    A request that ran one statement at least the N+1 threshold times.
+    """
+    route: str
+    statement: str
+    runs: int
+
+
+class ProfileSample(BaseModel):
+    """
+    A profile kept for a slow request (a pstats file).
+    """
+    route: str
+    ms: float
+    path: str
+
+
+class ProfilingStatsResponse(BaseModel):
+    """
+    Last N+1 flags and slow request profiles of the request profiler returned by the API.
+    """
+    enabled: bool
+    n_plus_one: list[NPlusOneSample] = []
+    profiles: list[ProfileSample] = []
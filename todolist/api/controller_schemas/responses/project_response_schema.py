@@ -12,3 +12,27 @@ class ProjectResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ProjectDeletedResult(BaseModel):
+    """
+    A project removed by a bulk delete.
+    """
+    id: str
+    deleted_tasks: int
+
+
+class ProjectBulkDeleteResponse(BaseModel):
+    """
+    Outcome of a bulk delete returned by the API.
+    """
+    deleted: list[ProjectDeletedResult]
+    missing: list[str]
+
+
+class ProjectBatchGetResponse(BaseModel):
+    """
+    Projects found by a batch get , in the order of the requested ids.
+    """
+    projects: list[ProjectResponse]
+    missing: list[str]
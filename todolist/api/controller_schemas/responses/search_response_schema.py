@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Literal, Optional
+from datetime import datetime
+
+
+class SearchResultResponse(BaseModel):
+    """
+    Shape of a search result (a project or a task) returned by the API.
+    """
+    kind: Literal["project", "task"]
+    rank: float
+    id: str
+    name: str
+    desc: Optional[str] = None
+    project_id: Optional[str] = None
+    status: Optional[str] = None
+    deadline: Optional[datetime] = None
@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class StatsResponse(BaseModel):
+    """
+    Statistics of the tasks of every project returned by the API.
+    """
+    total: int
+    todo: int
+    doing: int
+    done: int
+    overdue: int
+    closed_late: int
+    mean_close_seconds: Optional[float] = None
+
+
+class ProjectStatsResponse(StatsResponse):
+    """
+    Statistics of the tasks of one project returned by the API.
+    """
+    project_id: str
+
+
+class StatsRebuildResponse(BaseModel):
+    """
+    Outcome of a consistency check (and rebuild) of the statistics returned by the API.
+    """
+    drifted: list[str]
+    rebuilt: bool
@@ -14,6 +14,51 @@ class TaskResponse(BaseModel):
     status: str
     deadline: Optional[datetime] = None
     at_closed: Optional[datetime] = None
+    at_created: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+
+class TaskBulkRowResult(BaseModel):
+    """
+    Outcome of one line of a bulk import.
+    """
+    line: int
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TaskBulkResponse(BaseModel):
+    """
+    Summary of a bulk import returned by the API.
+    """
+    created: int
+    failed: int
+    results: list[TaskBulkRowResult]
+
+
+class TaskBatchGetResponse(BaseModel):
+    """
+    Tasks found by a batch get , in the order of the requested ids.
+    """
+    tasks: list[TaskResponse]
+    missing: list[str]
+
+
+class TaskBatchUpdateResult(BaseModel):
+    """
+    Outcome of one edit of a batch update.
+    """
+    id: str
+    task: Optional[TaskResponse] = None
+    error: Optional[str] = None
+
+
+class TaskBatchUpdateResponse(BaseModel):
+    """
+    Summary of a batch update returned by the API , one result per edit in the order of the request.
+    """
+    updated: int
+    failed: int
+    results: list[TaskBatchUpdateResult]
@@ -0,0 +1,167 @@
+from fastapi import APIRouter, Depends, Query, Request
+
+from todolist.container import ServiceContainer
+from todolist.api.controller_schemas.responses import CacheStatsResponse, EventStatsResponse, JobStatsResponse, DeadlineTimerStatsResponse, PoolStatsResponse, ProfilingStatsResponse, StatsRebuildResponse
+
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+)
+
+
+def get_container(request: Request) -> ServiceContainer:
+    """
+    Dependency that returns the application scoped service container.
+    """
+    return request.app.state.container
+
+
+@router.get(
+    "/cache",
+    response_model=CacheStatsResponse,
+    summary="Cache counters",
+    description=(
+        "Return the hit, miss and eviction counters of the read-through caches of projects and tasks. "
+        "The caches are enabled with `CACHE_ENABLED`."
+    ),
+    responses={
+        200: {"description": "Counters returned."},
+    },
+)
+async def cache_stats(
+    container: ServiceContainer = Depends(get_container),
+):
+    """
+    Return the counters of the caches.
+    """
+    return container.cacheStats()
+
+
+@router.get(
+    "/events",
+    response_model=EventStatsResponse,
+    summary="Change feed counters",
+    description="Return the number of open event streams of this process and of the streams cut off for falling behind.",
+    responses={
+        200: {"description": "Counters returned."},
+    },
+)
+async def event_stats(
+    container: ServiceContainer = Depends(get_container),
+):
+    """
+    Return the counters of the event hub.
+    """
+    return container.event_hub.stats()
+
+
+@router.get(
+    "/scheduler",
+    response_model=list[JobStatsResponse],
+    summary="Background jobs",
+    description=(
+        "Return the last run, next run and run counters of the background jobs as seen by the scheduler of this process. "
+        "Runs are shared between workers, `runs` only counts the ones of this process."
+    ),
+    responses={
+        200: {"description": "Jobs returned."},
+    },
+)
+async def scheduler_stats(
+    container: ServiceContainer = Depends(get_container),
+):
+    """
+    Return the state of the background jobs.
+    """
+    return container.scheduler.stats()
+
+
+@router.get(
+    "/deadlines",
+    response_model=DeadlineTimerStatsResponse,
+    summary="Deadline timer counters",
+    description=(
+        "Return the number of deadlines held by the deadline timer of this process, how far ahead they go "
+        "how many tasks it closed and how many of its ticks failed. The timer is enabled with `DEADLINE_TIMER_ENABLED`."
+    ),
+    responses={
+        200: {"description": "Counters returned."},
+    },
+)
+async def deadline_timer_stats(
+    container: ServiceContainer = Depends(get_container),
+):
+    """
+    Return the counters of the deadline timer.
+    """
+    if container.deadline_timer is None:
+        return {"enabled": False}
+    return {"enabled": True , **container.deadline_timer.stats()}
+
+
+@router.get(
+    "/pool",
+    response_model=PoolStatsResponse,
+    summary="Connection pool counters",
+    description=(
+        "Return the size, checked out and overflow connections of the database pools of this process, "
+        "the number of checkouts and a histogram of how long they waited. The pools are configured with `DB_POOL_*`."
+    ),
+    responses={
+        200: {"description": "Counters returned."},
+    },
+)
+async def pool_stats(
+    container: ServiceContainer = Depends(get_container),
+):
+    """
+    Return the counters of the connection pools.
+    """
+    return container.poolStats()
+
+
+@router.get(
+    "/profiling",
+    response_model=ProfilingStatsResponse,
+    summary="N+1 flags and slow request profiles",
+    description=(
+        "Return the last requests flagged for running one SQL statement many times (N+1) with the statement, "
+        "and the last profiles kept for slow requests. Enabled with `PROFILING_ENABLED`, "
+        "the per route metrics are at `/metrics`."
+    ),
+    responses={
+        200: {"description": "Flags and profiles returned."},
+    },
+)
+async def profiling_stats(request: Request):
+    """
+    Return the last N+1 flags and slow request profiles.
+    """
+    profiler = request.app.state.request_profiler
+    if profiler is None:
+        return {"enabled": False}
+    return {"enabled": True , "n_plus_one": list(profiler.recentNPlusOne) , "profiles": list(profiler.recentProfiles)}
+
+
+@router.post(
+    "/stats/rebuild",
+    response_model=StatsRebuildResponse,
+    summary="Check and rebuild the task statistics",
+    description=(
+        "Compare the counters behind `GET /api/stats` and `GET /api/projects/{project_id}/stats` with the tasks "
+        "and return the projects whose counters drifted. Unless `dry_run`, the counters are then rewritten from the tasks "
+        "(on Postgres the writes to the tasks wait meanwhile)."
+    ),
+    responses={
+        200: {"description": "Check done (and counters rebuilt)."},
+    },
+)
+async def rebuild_stats(
+    dry_run: bool = Query(False, description="Only report the drifted projects."),
+    container: ServiceContainer = Depends(get_container),
+):
+    """
+    Check and rebuild the statistics of the tasks.
+    """
+    return await container.async_stats_service.rebuildStats(dry_run)
@@ -0,0 +1,49 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+
+from todolist.events import EventHub
+from todolist.api.streaming import SSE_MEDIA_TYPE , sseEvents
+
+
+# seconds without events before a keep-alive comment is sent
+HEARTBEAT_SECONDS = 15
+
+router = APIRouter(tags=["events"])
+
+
+def get_event_hub(request: Request) -> EventHub:
+    """
+    Dependency that returns the application scoped EventHub from the service container.
+    """
+    return request.app.state.container.event_hub
+
+
+@router.get(
+    "/events",
+    summary="Change feed",
+    description=(
+        "Stream the created / updated / deleted events of projects and tasks as Server-Sent Events "
+        "(`project.created`, `project.updated`, `project.deleted`, `task.created`, `task.bulk_created`, "
+        "`task.updated`, `task.deleted`, `task.closed`). "
+        "With `project_id` only the events of that project are sent, plus the events that may concern every project "
+        "(`task.closed` from the auto close job, whose `project_id` is null). "
+        "A client that does not keep up receives an `overflow` event and the stream ends: reload the data and reconnect."
+    ),
+    responses={
+        200: {"description": "Event stream.", "content": {SSE_MEDIA_TYPE: {}}},
+    },
+)
+async def stream_events(
+    project_id: Optional[str] = Query(None, description="Only stream the events of this project."),
+    hub: EventHub = Depends(get_event_hub),
+):
+    """
+    Subscribe to the change feed.
+    """
+    return StreamingResponse(
+        sseEvents(hub, project_id, HEARTBEAT_SECONDS),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
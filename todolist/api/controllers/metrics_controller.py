@@ -0,0 +1,30 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from todolist.api.profiling import PROMETHEUS_MEDIA_TYPE
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics",
+    description=(
+        "Return the per route request latency, SQL statement counts and N+1 flags, and the connection pool "
+        "counters of this process in the Prometheus text format. Enabled with `PROFILING_ENABLED`."
+    ),
+    responses={
+        200: {"description": "Metrics returned."},
+        404: {"description": "Profiling is disabled."},
+    },
+)
+async def metrics(request: Request):
+    """
+    Return the metrics of the request profiler.
+    """
+    profiler = request.app.state.request_profiler
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    return PlainTextResponse(profiler.render(request.app.state.container.poolStats()), media_type=PROMETHEUS_MEDIA_TYPE)
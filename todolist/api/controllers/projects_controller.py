@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, status , HTTPException
+from typing import Optional
 
-from todolist.core.services.project_service import ProjectService
-from todolist.data.projects_repo import ProjectsRepo
-from todolist.data.tasks_repo import TasksRepo
-from todolist.config.setting import Setting
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status , HTTPException
 
-from todolist.api.controller_schemas.requests import ProjectCreateRequest , ProjectUpdateRequest
-from todolist.api.controller_schemas.responses import ProjectResponse
+from todolist.core.services.async_project_service import AsyncProjectService
+
+from todolist.api.controller_schemas.requests import ProjectCreateRequest , ProjectUpdateRequest , ProjectBulkDeleteRequest , ProjectBatchGetRequest
+from todolist.api.controller_schemas.responses import ProjectResponse , ProjectBulkDeleteResponse , ProjectBatchGetResponse
+from todolist.api.pagination import DEFAULT_PAGE_LIMIT , MAX_PAGE_LIMIT , NEXT_CURSOR_HEADER , parseFields , projectedResponse
+from todolist.api.conditional import etagOf , isNotModified , notModifiedResponse , expectedVersion
 
 
 router = APIRouter(
@@ -15,33 +16,47 @@ router = APIRouter(
 )
 
 
-def get_project_service() -> ProjectService:
+def get_project_service(request: Request) -> AsyncProjectService:
     """
-    Dependency that creates a ProjectService instance.
+    Dependency that returns the application scoped AsyncProjectService from the service container.
     """
-    setting = Setting.initializeSettings()
-    projects_repo = ProjectsRepo()
-    tasks_repo = TasksRepo()
-    return ProjectService(projects_repo, tasks_repo, setting)
+    return request.app.state.container.async_project_service
 
 
 @router.get(
     "",
     response_model=list[ProjectResponse],
-    summary="List all projects",
+    summary="List projects",
     description=(
-        "Return the complete list of projects stored in the system. "
-        "Projects are returned in the order provided by the repository."
+        "Return one page of projects ordered by id. "
+        f"When more projects exist the `{NEXT_CURSOR_HEADER}` response header holds the value to pass as `after` for the next page. "
+        "`fields` restricts the returned fields (e.g. `fields=id,name`), `id` is always included."
     ),
     responses={
-        200: {"description": "List of projects returned successfully."},
+        200: {"description": "Page of projects returned successfully."},
+        400: {"description": "Unknown field requested."},
     },
 )
-async def list_projects(service: ProjectService = Depends(get_project_service)):
+async def list_projects(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Maximum number of projects in the page."),
+    after: Optional[str] = Query(None, description="Cursor of the page to fetch (id of the last project of the previous page)."),
+    fields: Optional[str] = Query(None, description="Comma separated list of fields to return."),
+    service: AsyncProjectService = Depends(get_project_service),
+):
     """
-    Return all projects.
+    Return one page of projects.
     """
-    projects = service.list()
+    requestedFields = parseFields(fields)
+    try:
+        projects, nextCursor = await service.listPage(limit, after, requestedFields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if requestedFields:
+        return projectedResponse(projects, nextCursor)
+    if nextCursor:
+        response.headers[NEXT_CURSOR_HEADER] = nextCursor
     return projects
 
 
@@ -61,37 +76,76 @@ async def list_projects(service: ProjectService = Depends(get_project_service)):
 )
 async def create_project(
     request: ProjectCreateRequest,
-    service: ProjectService = Depends(get_project_service),
+    service: AsyncProjectService = Depends(get_project_service),
 ):
     """
     Create a new project using the service layer.
     """
-    project = service.createProject(name=request.name, desc=request.desc or "")
+    try:
+        project = await service.createProject(name=request.name, desc=request.desc or "")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return project
 
 
+@router.post(
+    ":batchGet",
+    response_model=ProjectBatchGetResponse,
+    summary="Get many projects by id",
+    description=(
+        "Retrieve up to 1000 projects by their IDs with a single query (projects in the cache are served from it). "
+        "The found projects are returned in the order of the IDs, the IDs of the projects that do not exist in `missing`."
+    ),
+    responses={
+        200: {"description": "Found projects and missing IDs."},
+        422: {"description": "No IDs or too many IDs."},
+    },
+)
+async def batch_get_projects(
+    request: ProjectBatchGetRequest,
+    service: AsyncProjectService = Depends(get_project_service),
+):
+    """
+    Get many projects by their ids.
+    """
+    projects, missing = await service.getProjects(request.ids)
+    return {"projects": projects, "missing": missing}
+
+
 @router.get(
     "/{project_id}",
     response_model=ProjectResponse,
     summary="Get a project by id",
-    description="Retrieve a single project using its ID.",
+    description=(
+        "Retrieve a single project using its ID. "
+        "The `ETag` response header holds the version of the project, send it back in `If-None-Match` to get `304 Not Modified` while it did not change."
+    ),
     responses={
         200: {"description": "Project found and returned."},
+        304: {"description": "Project not modified since the version in If-None-Match."},
         404: {"description": "Project with the given ID was not found."},
     },
 )
 async def get_project(
     project_id: str,
-    service: ProjectService = Depends(get_project_service),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    service: AsyncProjectService = Depends(get_project_service),
 ):
     """
     Get a single project.
     """
     try:
-        project = service.getProject(project_id)
+        if if_none_match:
+            # only the version is read to answer 304 , the project is loaded once it changed
+            etag = etagOf(await service.projectVersion(project_id))
+            if isNotModified(if_none_match, etag):
+                return notModifiedResponse(etag)
+        project = await service.getProject(project_id)
     except ValueError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
 
+    response.headers["ETag"] = etagOf(project.version)
     return project
 
 
@@ -101,30 +155,38 @@ async def get_project(
     summary="Update an existing project",
     description=(
         "Update one or more fields of an existing project. "
-        "Fields that are not provided in the request body remain unchanged."
+        "Fields that are not provided in the request body remain unchanged. "
+        "With `If-Match` the update only happens if the project still has that version (ETag)."
     ),
     responses={
         200: {"description": "Project updated successfully."},
         400: {"description": "Validation error (invalid name, description, etc.)."},
         404: {"description": "Project with the given ID was not found."},
+        412: {"description": "The project changed since the version in If-Match."},
     },
 )
 async def update_project(
     project_id: str,
     request: ProjectUpdateRequest,
-    service: ProjectService = Depends(get_project_service),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    service: AsyncProjectService = Depends(get_project_service),
 ):
     """
     Partially update a project.
     """
+    version = expectedVersion(if_match)
     try:
-        project = service.editProject(projectId=project_id, newName=request.name, newDesc=request.desc)
+        project = await service.editProject(projectId=project_id, newName=request.name, newDesc=request.desc, expectedVersion=version)
     except ValueError as e:
         message = str(e)
         if message == "Project not found":
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=message)
+        if message == "Project version mismatch":
+            raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=message)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
 
+    response.headers["ETag"] = etagOf(project.version)
     return project
 
 
@@ -132,25 +194,59 @@ async def update_project(
     "/{project_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete a project",
-    description="Delete an existing project by its ID.",
+    description=(
+        "Delete an existing project by its ID, its tasks are deleted with it. "
+        "With `If-Match` the project is only deleted if it still has that version (ETag)."
+    ),
     responses={
         204: {"description": "Project deleted successfully (no content)."},
         404: {"description": "Project with the given ID was not found."},
+        412: {"description": "The project changed since the version in If-Match."},
     },
 )
 async def delete_project(
     project_id: str,
-    service: ProjectService = Depends(get_project_service),
+    if_match: Optional[str] = Header(None),
+    service: AsyncProjectService = Depends(get_project_service),
 ):
     """
     Delete a project.
     """
+    version = expectedVersion(if_match)
     try:
-        deleted = service.deleteProject(project_id)
-    except ValueError:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    if not deleted:
+        await service.deleteProject(project_id, version)
+    except ValueError as e:
+        if str(e) == "Project version mismatch":
+            raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e))
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     return
 
 
+@router.delete(
+    "",
+    response_model=ProjectBulkDeleteResponse,
+    summary="Delete many projects",
+    description=(
+        "Delete up to 10000 projects by their IDs, with their tasks. "
+        "They are deleted in batches, each batch in its own transaction, so a failure leaves the earlier batches deleted. "
+        "IDs of projects that do not exist are returned in `missing`."
+    ),
+    responses={
+        200: {"description": "Projects deleted, with the number of deleted tasks of each."},
+        422: {"description": "No IDs or too many IDs."},
+    },
+)
+async def delete_projects(
+    request: ProjectBulkDeleteRequest,
+    service: AsyncProjectService = Depends(get_project_service),
+):
+    """
+    Delete many projects.
+    """
+    deleted = await service.deleteProjects(request.ids)
+    return {
+        "deleted": [{"id": projectId, "deleted_tasks": deletedTasks} for projectId, deletedTasks in deleted.items()],
+        "missing": [projectId for projectId in dict.fromkeys(request.ids) if projectId not in deleted],
+    }
+
+
@@ -0,0 +1,54 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from todolist.core.services.async_search_service import AsyncSearchService
+from todolist.api.controller_schemas.responses import SearchResultResponse
+from todolist.api.pagination import DEFAULT_PAGE_LIMIT , MAX_PAGE_LIMIT , NEXT_CURSOR_HEADER
+
+
+router = APIRouter(tags=["search"])
+
+
+def get_search_service(request: Request) -> AsyncSearchService:
+    """
+    Dependency that returns the application scoped AsyncSearchService from the service container.
+    """
+    return request.app.state.container.async_search_service
+
+
+@router.get(
+    "/search",
+    response_model=list[SearchResultResponse],
+    summary="Search projects and tasks",
+    description=(
+        "Return one page of the projects and tasks whose name or description contain every word of `q`, "
+        "best match first (a match in the name ranks higher than one in the description). "
+        "Served by the full text index of the database (Postgres tsvector / GIN, SQLite FTS5). "
+        f"When more results exist the `{NEXT_CURSOR_HEADER}` response header holds the value to pass as `after` for the next page "
+        "(with the same `q` and `kind`)."
+    ),
+    responses={
+        200: {"description": "Page of results."},
+        400: {"description": "Invalid cursor."},
+    },
+)
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search for."),
+    kind: Optional[Literal["project", "task"]] = Query(None, description="Only return results of this kind."),
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Maximum number of results in the page."),
+    after: Optional[str] = Query(None, description="Cursor of the page to fetch (from the previous page)."),
+    service: AsyncSearchService = Depends(get_search_service),
+):
+    """
+    Search the projects and tasks.
+    """
+    try:
+        results, nextCursor = await service.search(q, limit, after, kind)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if nextCursor:
+        response.headers[NEXT_CURSOR_HEADER] = nextCursor
+    return results
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from todolist.core.services.async_stats_service import AsyncStatsService
+from todolist.api.controller_schemas.responses import StatsResponse, ProjectStatsResponse
+
+
+router = APIRouter(tags=["stats"])
+
+
+def get_stats_service(request: Request) -> AsyncStatsService:
+    """
+    Dependency that returns the application scoped AsyncStatsService from the service container.
+    """
+    return request.app.state.container.async_stats_service
+
+
+@router.get(
+    "/projects/{project_id}/stats",
+    response_model=ProjectStatsResponse,
+    summary="Statistics of the tasks of a project",
+    description=(
+        "Return the number of tasks of a project by status, the open tasks past their deadline (`overdue`), "
+        "the done tasks closed after their deadline (`closed_late`) and the mean time from creation to closing in seconds "
+        "(`null` until a task created with a recorded creation time is done). "
+        "Served from counters maintained on every write to the tasks, the cost does not grow with the number of tasks."
+    ),
+    responses={
+        200: {"description": "Statistics returned."},
+        404: {"description": "Project with the given ID was not found."},
+    },
+)
+async def get_project_stats(
+    project_id: str,
+    service: AsyncStatsService = Depends(get_stats_service),
+):
+    """
+    Get the statistics of a project.
+    """
+    try:
+        return await service.getProjectStats(project_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+
+@router.get(
+    "/stats",
+    response_model=StatsResponse,
+    summary="Statistics of the tasks of every project",
+    description="Return the statistics of `GET /api/projects/{project_id}/stats` over every project.",
+    responses={
+        200: {"description": "Statistics returned."},
+    },
+)
+async def get_stats(
+    service: AsyncStatsService = Depends(get_stats_service),
+):
+    """
+    Get the statistics of every project.
+    """
+    return await service.getStats()
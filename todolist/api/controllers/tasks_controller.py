@@ -1,47 +1,128 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal, Optional
 
-from todolist.core.services.task_service import TaskService
-from todolist.data.projects_repo import ProjectsRepo
-from todolist.data.tasks_repo import TasksRepo
-from todolist.config.setting import Setting
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from todolist.core.services.async_task_service import AsyncTaskService
 
 from todolist.api.controller_schemas.requests import (
     TaskCreateRequest,
     TaskUpdateRequest,
+    TaskBatchGetRequest,
+    TaskBatchUpdateRequest,
 )
-from todolist.api.controller_schemas.responses import TaskResponse
+from todolist.api.controller_schemas.responses import TaskResponse, TaskBulkResponse, TaskBatchGetResponse, TaskBatchUpdateResponse
+from todolist.api.pagination import DEFAULT_PAGE_LIMIT , MAX_PAGE_LIMIT , NEXT_CURSOR_HEADER , parseFields , projectedResponse
+from todolist.api.filters import taskFilters
+from todolist.api.conditional import etagOf , isNotModified , notModifiedResponse , expectedVersion
+from todolist.api.streaming import NDJSON_MEDIA_TYPE , CSV_MEDIA_TYPE , ndjsonLines , ndjsonRows , csvRows
+from todolist.core.validation.validation import TASK_FIELDS
 
 
 router = APIRouter(tags=["tasks"])
 
-def get_task_service() -> TaskService:
+def get_task_service(request: Request) -> AsyncTaskService:
     """
-    Dependency that creates a TaskService instance.
+    Dependency that returns the application scoped AsyncTaskService from the service container.
     """
-    setting = Setting.initializeSettings()
-    projects_repo = ProjectsRepo()
-    tasks_repo = TasksRepo()
-    return TaskService(projects_repo, tasks_repo, setting)
+    return request.app.state.container.async_task_service
 
 
 @router.get(
     "/projects/{project_id}/tasks",
     response_model=list[TaskResponse],
     summary="List tasks of a project",
-    description="Return all tasks that belong to the specified project.",
+    description=(
+        "Return one page of the tasks that belong to the specified project, ordered by id unless `sort` says otherwise. "
+        "`status`, `deadline_before`, `deadline_after` and `closed_since` filter the tasks in the query. "
+        f"When more tasks exist the `{NEXT_CURSOR_HEADER}` response header holds the value to pass as `after` for the next page "
+        "(with the same filters and sort). "
+        "`fields` restricts the returned fields (e.g. `fields=id,status`), `id` is always included. "
+        "The `ETag` response header changes with every write to the tasks of the project, "
+        "send it back in `If-None-Match` to get `304 Not Modified` (no rows are read) while nothing changed."
+    ),
     responses={
-        200: {"description": "List of tasks for the project."},
+        200: {"description": "Page of tasks for the project."},
+        304: {"description": "Tasks not modified since the version in If-None-Match."},
+        400: {"description": "Unknown field, status or sort requested, or invalid cursor."},
         404: {"description": "Project not found."},
     },
 )
-async def list_project_tasks(project_id: str, service: TaskService = Depends(get_task_service)):
+async def list_project_tasks(
+    project_id: str,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Maximum number of tasks in the page."),
+    after: Optional[str] = Query(None, description="Cursor of the page to fetch (from the previous page)."),
+    fields: Optional[str] = Query(None, description="Comma separated list of fields to return."),
+    if_none_match: Optional[str] = Header(None),
+    filters: dict = Depends(taskFilters),
+    service: AsyncTaskService = Depends(get_task_service),
+):
     """
-    List all tasks that belong to a given project.
+    List one page of the tasks that belong to a given project.
     """
+    requestedFields = parseFields(fields)
     try:
-        tasks = service.listTasks(project_id)
+        # read before the page , a write in between only makes the next poll miss
+        etag = etagOf(await service.tasksVersion(project_id))
+        if isNotModified(if_none_match, etag):
+            return notModifiedResponse(etag)
+        tasks, nextCursor = await service.listTasksPage(project_id, limit, after, requestedFields, **filters)
     except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        message = str(e)
+        if message == "Project not found":
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=message)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
+
+    if requestedFields:
+        projected = projectedResponse(tasks, nextCursor)
+        projected.headers["ETag"] = etag
+        return projected
+    if nextCursor:
+        response.headers[NEXT_CURSOR_HEADER] = nextCursor
+    response.headers["ETag"] = etag
+    return tasks
+
+
+@router.get(
+    "/tasks",
+    response_model=list[TaskResponse],
+    summary="List tasks of every project",
+    description=(
+        "Return one page of the tasks of every project, ordered by id unless `sort` says otherwise. "
+        "`status`, `deadline_before`, `deadline_after` and `closed_since` filter the tasks in the query, "
+        "e.g. `status=todo,doing&deadline_before=...&sort=deadline` for the open tasks due soon. "
+        f"When more tasks exist the `{NEXT_CURSOR_HEADER}` response header holds the value to pass as `after` for the next page "
+        "(with the same filters and sort). "
+        "`fields` restricts the returned fields (e.g. `fields=id,status`), `id` is always included."
+    ),
+    responses={
+        200: {"description": "Page of tasks."},
+        400: {"description": "Unknown field, status or sort requested, or invalid cursor."},
+    },
+)
+async def list_tasks(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Maximum number of tasks in the page."),
+    after: Optional[str] = Query(None, description="Cursor of the page to fetch (from the previous page)."),
+    fields: Optional[str] = Query(None, description="Comma separated list of fields to return."),
+    filters: dict = Depends(taskFilters),
+    service: AsyncTaskService = Depends(get_task_service),
+):
+    """
+    List one page of the tasks of every project.
+    """
+    requestedFields = parseFields(fields)
+    try:
+        tasks, nextCursor = await service.listAllTasksPage(limit, after, requestedFields, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if requestedFields:
+        return projectedResponse(tasks, nextCursor)
+    if nextCursor:
+        response.headers[NEXT_CURSOR_HEADER] = nextCursor
     return tasks
 
 
@@ -63,13 +144,13 @@ async def list_project_tasks(project_id: str, service: TaskService = Depends(get
 async def create_task_for_project(
     project_id: str,
     request: TaskCreateRequest,
-    service: TaskService = Depends(get_task_service),
+    service: AsyncTaskService = Depends(get_task_service),
 ):
     """
     Create a new task inside the specified project.
     """
     try:
-        task = service.addTask(projectId=project_id, name=request.name, desc=request.desc or "", status=request.status or "todo", deadline=request.deadline)
+        task = await service.addTask(projectId=project_id, name=request.name, desc=request.desc or "", status=request.status or "todo", deadline=request.deadline)
     except ValueError as e:
         message = str(e)
         if message == "Project not found":
@@ -80,28 +161,166 @@ async def create_task_for_project(
 
 
 
+async def _bulkRows(request: Request):
+    """
+    Parse every NDJSON line of a bulk import body into task fields (or the parse error of the line).
+    """
+    async for lineNumber , line in ndjsonLines(request):
+        try:
+            task = TaskCreateRequest.model_validate_json(line)
+        except ValidationError as e:
+            yield lineNumber , "; ".join(f"{'.'.join(map(str, err['loc'])) or 'body'}: {err['msg']}" for err in e.errors())
+            continue
+        yield lineNumber , {"name": task.name , "desc": task.desc or "" , "status": task.status or "todo" , "deadline": task.deadline}
+
+
+@router.post(
+    "/projects/{project_id}/tasks:bulk",
+    response_model=TaskBulkResponse,
+    summary="Bulk import tasks into a project",
+    description=(
+        "Create many tasks inside the specified project from an NDJSON body "
+        f"(`{NDJSON_MEDIA_TYPE}`, one task object per line, same fields as the single create). "
+        "Rows are validated one by one and inserted in batches, invalid rows are reported and skipped."
+    ),
+    responses={
+        200: {"description": "Import processed, per line outcome returned."},
+        404: {"description": "Project not found."},
+    },
+)
+async def bulk_create_tasks(
+    project_id: str,
+    request: Request,
+    service: AsyncTaskService = Depends(get_task_service),
+):
+    """
+    Import tasks from an NDJSON body.
+    """
+    try:
+        results = await service.addTasksBulk(project_id, _bulkRows(request))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    failed = sum(1 for r in results if "error" in r)
+    return {"created": len(results) - failed, "failed": failed, "results": results}
+
+
+@router.get(
+    "/projects/{project_id}/tasks:export",
+    summary="Export the tasks of a project",
+    description=(
+        "Stream every task of the specified project, ordered by id, as NDJSON (default) or CSV. "
+        f"Both formats carry the same columns: `{'`, `'.join(TASK_FIELDS)}`. "
+        "Rows are read through a server side cursor, so memory does not grow with the number of tasks."
+    ),
+    responses={
+        200: {"description": "Tasks streamed.", "content": {NDJSON_MEDIA_TYPE: {}, CSV_MEDIA_TYPE: {}}},
+        404: {"description": "Project not found."},
+    },
+)
+async def export_tasks(
+    project_id: str,
+    outputFormat: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="Output format."),
+    service: AsyncTaskService = Depends(get_task_service),
+):
+    """
+    Stream all tasks of a project.
+    """
+    try:
+        rows = await service.exportTasks(project_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    if outputFormat == "csv":
+        return StreamingResponse(csvRows(rows, TASK_FIELDS), media_type=CSV_MEDIA_TYPE)
+    return StreamingResponse(ndjsonRows(rows), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.post(
+    "/tasks:batchGet",
+    response_model=TaskBatchGetResponse,
+    summary="Get many tasks by id",
+    description=(
+        "Retrieve up to 1000 tasks by their IDs with a single query (tasks in the cache are served from it). "
+        "The found tasks are returned in the order of the IDs, the IDs of the tasks that do not exist in `missing`."
+    ),
+    responses={
+        200: {"description": "Found tasks and missing IDs."},
+        422: {"description": "No IDs or too many IDs."},
+    },
+)
+async def batch_get_tasks(
+    request: TaskBatchGetRequest,
+    service: AsyncTaskService = Depends(get_task_service),
+):
+    """
+    Get many tasks by their ids.
+    """
+    tasks, missing = await service.getTasks(request.ids)
+    return {"tasks": tasks, "missing": missing}
+
+
+@router.post(
+    "/tasks:batchUpdate",
+    response_model=TaskBatchUpdateResponse,
+    summary="Update many tasks",
+    description=(
+        "Apply up to 1000 edits (`name`, `desc`, `status`, `deadline`) to tasks in one transaction. "
+        "Edits making the same change are applied by a single statement, "
+        "`at_closed` is set on the first transition to `done` like for a single update. "
+        "Every edit gets a result in the order of the request: the updated task, or the error of the edit "
+        "(validation error, task not found, task edited twice in the batch) which leaves the other edits applied."
+    ),
+    responses={
+        200: {"description": "Outcome of every edit."},
+        422: {"description": "No edits or too many edits."},
+    },
+)
+async def batch_update_tasks(
+    request: TaskBatchUpdateRequest,
+    service: AsyncTaskService = Depends(get_task_service),
+):
+    """
+    Update many tasks in one transaction.
+    """
+    results = await service.editTasks([update.model_dump() for update in request.updates])
+    failed = sum(1 for result in results if "error" in result)
+    return {"updated": len(results) - failed, "failed": failed, "results": results}
+
+
 @router.get( 
     "/tasks/{task_id}", 
     response_model=TaskResponse, 
     summary="Get a task by id",
-    description="Retrieve a task using its ID.",
+    description=(
+        "Retrieve a task using its ID. "
+        "The `ETag` response header holds the version of the task, send it back in `If-None-Match` to get `304 Not Modified` while it did not change."
+    ),
     responses={
         200: {"description": "Task found and returned."},
+        304: {"description": "Task not modified since the version in If-None-Match."},
         404: {"description": "Task not found."},
     },
 )
 
-async def get_task( task_id: str, service: TaskService = Depends(get_task_service)):
+async def get_task( task_id: str, response: Response, if_none_match: Optional[str] = Header(None), service: AsyncTaskService = Depends(get_task_service)):
     """
     Get a single task by its id.
     """
     try:
-        task = service.getTask(task_id)
+        if if_none_match:
+            # only the version is read to answer 304 , the task is loaded once it changed
+            etag = etagOf(await service.taskVersion(task_id))
+            if isNotModified(if_none_match, etag):
+                return notModifiedResponse(etag)
+        task = await service.getTask(task_id)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found",
         )
+
+    response.headers["ETag"] = etagOf(task.version)
     return task
 
 
@@ -112,25 +331,29 @@ async def get_task( task_id: str, service: TaskService = Depends(get_task_servic
     summary="Update an existing task" ,
     description=(
         "Update one or more fields of an existing task. "
-        "Fields that are not provided remain unchanged."
+        "Fields that are not provided remain unchanged. "
+        "With `If-Match` the update only happens if the task still has that version (ETag)."
     ),
     responses={
         200: {"description": "Task updated successfully."},
         400: {"description": "Validation error on provided fields."},
         404: {"description": "Task not found."},
+        412: {"description": "The task changed since the version in If-Match."},
     },
 )
-async def update_task( task_id: str, request: TaskUpdateRequest, service: TaskService = Depends(get_task_service)):
+async def update_task( task_id: str, request: TaskUpdateRequest, response: Response, if_match: Optional[str] = Header(None), service: AsyncTaskService = Depends(get_task_service)):
     """
     Partially update a task.
     """
+    version = expectedVersion(if_match)
     try:
-        task = service.editTask(
+        task = await service.editTask(
             taskId=task_id,
             name= request.name ,
             desc= request.desc ,
             status= request.status ,
             deadline= request.deadline ,
+            expectedVersion= version ,
         )
     except ValueError as e:
         message = str(e)
@@ -139,11 +362,17 @@ async def update_task( task_id: str, request: TaskUpdateRequest, service: TaskSe
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=message,
             )
+        if message == "Task version mismatch":
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail=message,
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=message,
         )
 
+    response.headers["ETag"] = etagOf(task.version)
     return task
 
 
@@ -151,19 +380,29 @@ async def update_task( task_id: str, request: TaskUpdateRequest, service: TaskSe
     "/tasks/{task_id}", 
     status_code=status.HTTP_204_NO_CONTENT, 
     summary="Delete a task",
-    description="Delete an existing task by its ID.",
+    description=(
+        "Delete an existing task by its ID. "
+        "With `If-Match` the task is only deleted if it still has that version (ETag)."
+    ),
     responses={
         204: {"description": "Task successfully deleted."},
         404: {"description": "Task not found."},
+        412: {"description": "The task changed since the version in If-Match."},
     },
 )
-async def delete_task(task_id: str, service: TaskService = Depends(get_task_service) ):
+async def delete_task(task_id: str, if_match: Optional[str] = Header(None), service: AsyncTaskService = Depends(get_task_service) ):
     """
     Delete a task by id.
     """
+    version = expectedVersion(if_match)
     try:
-        deleted = service.deleteTask(task_id)
-    except ValueError:
+        deleted = await service.deleteTask(task_id, version)
+    except ValueError as e:
+        if str(e) == "Task version mismatch":
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail=str(e),
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found",
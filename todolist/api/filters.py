@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Query
+
+
+def taskFilters(
+    status: Optional[str] = Query(None, description="Comma separated statuses to keep (e.g. `status=todo,doing`)."),
+    deadline_before: Optional[datetime] = Query(None, description="Only tasks with a deadline before this time."),
+    deadline_after: Optional[datetime] = Query(None, description="Only tasks with a deadline at or after this time."),
+    closed_since: Optional[datetime] = Query(None, description="Only tasks closed at or after this time."),
+    sort: str = Query("id", description="Order of the tasks: `id`, `name`, `deadline` or `at_closed`, prefixed with `-` for a descending order. Tasks without a deadline (or not closed) come last."),
+) -> dict:
+    """
+    Dependency that reads the filter and sort query parameters of the task listings
+
+    Returns:
+        dict: keyword arguments of AsyncTaskService.listTasksPage / listAllTasksPage
+    """
+    statuses = [s.strip() for s in status.split(",") if s.strip()] if status else None
+    return {
+        "statuses": statuses or None,
+        "deadlineBefore": deadline_before,
+        "deadlineAfter": deadline_after,
+        "closedSince": closed_since,
+        "sort": sort,
+    }
@@ -0,0 +1,76 @@
+import time
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from todolist.data.unit_of_work import request_connection
+from todolist.db.profiling import track_statements
+from todolist.api.profiling import RequestProfiler
+
+
+class RequestConnectionMiddleware:
+    """
+    ASGI middleware running every HTTP request on a single connection checkout of the async engine of the
+    application container (app.state.container , built by the lifespan) instead of one checkout per repo call.
+    the connection is only checked out if the request uses the database
+    """
+
+    def __init__(self , app):
+        """
+        Initializing the middleware
+
+        Args:
+            app (ASGIApp): the wrapped application
+        """
+        self.app = app
+
+    async def __call__(self , scope , receive , send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope , receive , send)
+            return
+        engine: AsyncEngine = scope["app"].state.container.async_engine
+        async with request_connection(engine):
+            await self.app(scope , receive , send)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware recording the latency and the SQL statements of every HTTP request in the RequestProfiler
+    of the application (app.state.request_profiler) , and profiling a sample of them. does nothing while
+    there is no profiler (PROFILING_ENABLED off)
+    """
+
+    def __init__(self , app):
+        """
+        Initializing the middleware
+
+        Args:
+            app (ASGIApp): the wrapped application
+        """
+        self.app = app
+
+    async def __call__(self , scope , receive , send) -> None:
+        profiler: RequestProfiler | None = getattr(scope["app"].state , "request_profiler" , None) if "app" in scope else None
+        if scope["type"] != "http" or profiler is None:
+            await self.app(scope , receive , send)
+            return
+
+        status = 500
+
+        async def sendWithStatus(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        cProfiler = profiler.startProfile()
+        start = time.perf_counter()
+        with track_statements() as statements:
+            try:
+                await self.app(scope , receive , sendWithStatus)
+            finally:
+                seconds = time.perf_counter() - start
+                # set by the router , unmatched requests share one series
+                route = getattr(scope.get("route") , "path" , "unmatched")
+                if cProfiler is not None:
+                    profiler.stopProfile(cProfiler , scope["method"] , route , seconds)
+                profiler.observe(scope["method"] , route , status , seconds , statements)
@@ -0,0 +1,40 @@
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def parseFields(fields: Optional[str]) -> list[str] | None:
+    """
+    Parse the comma separated `fields` query parameter
+
+    Args:
+        fields (str | None): raw value of the query parameter
+
+    Returns:
+        list[str] | None: requested field names , None when every field is wanted
+    """
+    if not fields:
+        return None
+    parsed = [f.strip() for f in fields.split(",") if f.strip()]
+    return parsed or None
+
+
+def projectedResponse(rows: list, nextCursor: str | None) -> JSONResponse:
+    """
+    Build the response of a projected page directly , skipping the response model
+
+    Args:
+        rows (list): mappings of the selected columns
+        nextCursor (str | None): cursor of the next page
+
+    Returns:
+        JSONResponse: the rows as json with the next cursor header when there is one
+    """
+    headers = {NEXT_CURSOR_HEADER: nextCursor} if nextCursor else None
+    return JSONResponse(content=jsonable_encoder([dict(r) for r in rows]), headers=headers)
@@ -0,0 +1,235 @@
+import cProfile
+import os
+import random
+import re
+import time
+from collections import Counter, defaultdict, deque
+
+from todolist.db.profiling import StatementStats
+
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005 , 0.01 , 0.025 , 0.05 , 0.1 , 0.25 , 0.5 , 1 , 2.5 , 5 , 10)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\" , "\\\\").replace('"' , '\\"').replace("\n" , "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name , value in labels.items()) + "}"
+
+
+class Histogram:
+    """
+    A class used to represent a cumulative histogram in the prometheus way
+
+    Attributes:
+        bounds (tuple[float , ...]): upper bounds of the buckets (+Inf is implied)
+        counts (list[int]): number of observations per bucket (not cumulative)
+        sum (float): sum of the observations
+        count (int): number of observations
+    """
+
+    def __init__(self , bounds: tuple[float , ...]):
+        """
+        Initializing an empty histogram
+
+        Args:
+            bounds (tuple[float , ...]): upper bounds of the buckets
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self , value: float) -> None:
+        """
+        Recording one observation
+        """
+        self.counts[next((i for i , bound in enumerate(self.bounds) if value <= bound) , len(self.bounds))] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self , name: str , **labels) -> list[str]:
+        """
+        Prometheus text lines of the histogram
+
+        Args:
+            name (str): metric name
+            labels: labels of the series
+
+        Returns:
+            list[str]: the _bucket , _sum and _count lines
+        """
+        lines = []
+        cumulative = 0
+        for bound , count in zip((*self.bounds , "+Inf") , self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(**labels , le=bound)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(**labels)} {self.sum}")
+        lines.append(f"{name}_count{_labels(**labels)} {self.count}")
+        return lines
+
+
+class RequestProfiler:
+    """
+    A class used to collect the per route metrics of the API requests (latency , SQL statements , N+1 patterns)
+    and to cProfile a sample of them , keeping the profiles of the slow ones. Lives on one event loop.
+
+    Attributes:
+        slowMs (float): requests taking at least this long keep their profile (if they were sampled)
+        sampleRate (float): fraction of the requests run under cProfile , 0 never profiles
+        dumpDir (str): directory of the kept profiles (pstats files)
+        nPlusOneThreshold (int): a statement run this many times in one request is flagged as N+1
+        recentNPlusOne (deque): last flagged requests (route , statement , runs)
+        recentProfiles (deque): last kept profiles (route , milliseconds , path)
+    """
+
+    def __init__(self , slowMs: float = 500 , sampleRate: float = 0 , dumpDir: str = "profiles" , nPlusOneThreshold: int = 10 , rng=random.random):
+        """
+        Initializing a request profiler
+
+        Args:
+            slowMs (float , optional): minimum duration of a kept profile in milliseconds. defaults to 500
+            sampleRate (float , optional): fraction of the requests profiled. defaults to 0
+            dumpDir (str , optional): directory of the kept profiles. defaults to "profiles"
+            nPlusOneThreshold (int , optional): runs of one statement flagged as N+1. defaults to 10
+            rng (Callable[[], float] , optional): source of the sampling. defaults to random.random
+        """
+        self.slowMs = slowMs
+        self.sampleRate = sampleRate
+        self.dumpDir = dumpDir
+        self.nPlusOneThreshold = nPlusOneThreshold
+        self.recentNPlusOne = deque(maxlen=20)
+        self.recentProfiles = deque(maxlen=20)
+        self._rng = rng
+        self._profiling = False
+        self._latency: dict[tuple[str , str] , Histogram] = {}
+        self._requests: Counter[tuple[str , str , int]] = Counter()
+        self._sqlStatements: Counter[tuple[str , str]] = Counter()
+        self._sqlSeconds: defaultdict[tuple[str , str] , float] = defaultdict(float)
+        self._sqlPerRequest: dict[tuple[str , str] , Histogram] = {}
+        self._nPlusOne: Counter[tuple[str , str]] = Counter()
+
+    def startProfile(self) -> cProfile.Profile | None:
+        """
+        Starting cProfile for a sampled request. cProfile sees the whole thread , so one request at a time is profiled
+        (the other requests of the event loop running meanwhile show up in its profile too)
+
+        Returns:
+            cProfile.Profile | None: the running profiler , None if the request is not profiled
+        """
+        if self._profiling or self.sampleRate <= 0 or self._rng() >= self.sampleRate:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler (a debugger , coverage ...) is active
+            return None
+        self._profiling = True
+        return profiler
+
+    def stopProfile(self , profiler: cProfile.Profile , method: str , route: str , seconds: float) -> str | None:
+        """
+        Stopping the profiler of a request and keeping the profile if the request was slow
+
+        Returns:
+            str | None: path of the kept profile , None if the request was fast enough
+        """
+        profiler.disable()
+        self._profiling = False
+        milliseconds = seconds * 1000
+        if milliseconds < self.slowMs:
+            return None
+        os.makedirs(self.dumpDir , exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9]+" , "_" , f"{method} {route}").strip("_")
+        path = os.path.join(self.dumpDir , f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{int(milliseconds)}ms.prof")
+        profiler.dump_stats(path)
+        self.recentProfiles.append({"route": f"{method} {route}" , "ms": milliseconds , "path": path})
+        return path
+
+    def observe(self , method: str , route: str , status: int , seconds: float , statements: StatementStats) -> None:
+        """
+        Recording a finished request
+
+        Args:
+            method (str): HTTP method
+            route (str): path template of the matched route (not the raw path , so ids don't blow up the series)
+            status (int): response status
+            seconds (float): time from the request to the end of the response
+            statements (StatementStats): SQL statements run by the request
+        """
+        key = (method , route)
+        self._latency.setdefault(key , Histogram(LATENCY_BUCKETS)).observe(seconds)
+        self._requests[(method , route , status)] += 1
+        self._sqlStatements[key] += statements.count
+        self._sqlSeconds[key] += statements.seconds
+        self._sqlPerRequest.setdefault(key , Histogram((0 , 1 , 2 , 5 , 10 , 25 , 50 , 100))).observe(statements.count)
+        repeated = statements.repeated(self.nPlusOneThreshold)
+        if repeated:
+            self._nPlusOne[key] += 1
+            statement , runs = repeated[0]
+            self.recentNPlusOne.append({"route": f"{method} {route}" , "statement": statement , "runs": runs})
+
+    def render(self , pools: dict | None = None) -> str:
+        """
+        The metrics in the prometheus text format
+
+        Args:
+            pools (dict | None , optional): connection pool stats by engine name (see ServiceContainer.poolStats). defaults to None
+
+        Returns:
+            str: the exposition text
+        """
+        lines = [
+            "# HELP todolist_request_duration_seconds Time to handle a request , by route.",
+            "# TYPE todolist_request_duration_seconds histogram",
+        ]
+        for (method , route) , histogram in sorted(self._latency.items()):
+            lines += histogram.lines("todolist_request_duration_seconds" , method=method , route=route)
+
+        lines += ["# HELP todolist_requests_total Handled requests , by route and status.", "# TYPE todolist_requests_total counter"]
+        for (method , route , status) , count in sorted(self._requests.items()):
+            lines.append(f"todolist_requests_total{_labels(method=method , route=route , status=status)} {count}")
+
+        lines += ["# HELP todolist_sql_statements_total SQL statements run by requests , by route.", "# TYPE todolist_sql_statements_total counter"]
+        for (method , route) , count in sorted(self._sqlStatements.items()):
+            lines.append(f"todolist_sql_statements_total{_labels(method=method , route=route)} {count}")
+
+        lines += ["# HELP todolist_sql_duration_seconds_total Time spent running SQL statements by requests , by route.", "# TYPE todolist_sql_duration_seconds_total counter"]
+        for (method , route) , seconds in sorted(self._sqlSeconds.items()):
+            lines.append(f"todolist_sql_duration_seconds_total{_labels(method=method , route=route)} {seconds}")
+
+        lines += ["# HELP todolist_sql_statements_per_request SQL statements run by one request , by route.", "# TYPE todolist_sql_statements_per_request histogram"]
+        for (method , route) , histogram in sorted(self._sqlPerRequest.items()):
+            lines += histogram.lines("todolist_sql_statements_per_request" , method=method , route=route)
+
+        lines += ["# HELP todolist_n_plus_one_total Requests running one statement at least the N+1 threshold times , by route.", "# TYPE todolist_n_plus_one_total counter"]
+        for (method , route) , count in sorted(self._nPlusOne.items()):
+            lines.append(f"todolist_n_plus_one_total{_labels(method=method , route=route)} {count}")
+
+        if pools:
+            for metric , key , help in (
+                ("todolist_pool_size" , "size" , "Connections kept by the pool."),
+                ("todolist_pool_checked_out" , "checked_out" , "Connections in use."),
+                ("todolist_pool_overflow" , "overflow" , "Connections opened above the pool size (negative while the pool is not full)."),
+            ):
+                lines += [f"# HELP {metric} {help}" , f"# TYPE {metric} gauge"]
+                for engine , stats in pools.items():
+                    lines.append(f"{metric}{_labels(engine=engine)} {stats[key]}")
+            lines += ["# HELP todolist_pool_checkout_timeouts_total Checkouts that gave up waiting for a connection.", "# TYPE todolist_pool_checkout_timeouts_total counter"]
+            for engine , stats in pools.items():
+                lines.append(f"todolist_pool_checkout_timeouts_total{_labels(engine=engine)} {stats['timeouts']}")
+            lines += ["# HELP todolist_pool_checkout_wait_seconds Time to get a connection from the pool.", "# TYPE todolist_pool_checkout_wait_seconds histogram"]
+            for engine , stats in pools.items():
+                for bucket in stats["wait_buckets"]:
+                    bound = "+Inf" if bucket["le"] is None else bucket["le"] / 1000
+                    lines.append(f"todolist_pool_checkout_wait_seconds_bucket{_labels(engine=engine , le=bound)} {bucket['count']}")
+                lines.append(f"todolist_pool_checkout_wait_seconds_sum{_labels(engine=engine)} {stats['wait_sum_ms'] / 1000}")
+                lines.append(f"todolist_pool_checkout_wait_seconds_count{_labels(engine=engine)} {stats['checkouts'] + stats['timeouts']}")
+
+        return "\n".join(lines) + "\n"
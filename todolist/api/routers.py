@@ -1,7 +1,11 @@
 from fastapi import APIRouter
-from todolist.api.controllers import projects_controller , tasks_controller
+from todolist.api.controllers import projects_controller , tasks_controller , admin_controller , events_controller , search_controller , stats_controller
 
 api_router = APIRouter(prefix="/api")
 
 api_router.include_router(projects_controller.router)
 api_router.include_router(tasks_controller.router)
+api_router.include_router(admin_controller.router)
+api_router.include_router(events_controller.router)
+api_router.include_router(search_controller.router)
+api_router.include_router(stats_controller.router)
@@ -0,0 +1,107 @@
+import asyncio
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+
+from todolist.events import EventHub
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+async def ndjsonLines(request: Request) -> AsyncIterator[tuple[int , bytes]]:
+    """
+    Split a NDJSON request body into lines while it is being received (the body is never held whole)
+
+    Args:
+        request (Request): the incoming request
+
+    Yields:
+        tuple[int , bytes]: line number (starting at 1) and content of every non blank line
+    """
+    lineNumber = 0
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines , buffer = buffer.split(b"\n")
+        for line in lines:
+            lineNumber += 1
+            if line.strip():
+                yield lineNumber , line
+    if buffer.strip():
+        yield lineNumber + 1 , buffer
+
+
+async def ndjsonRows(rows: AsyncIterator) -> AsyncIterator[bytes]:
+    """
+    Encode a stream of row mappings as NDJSON
+
+    Args:
+        rows (AsyncIterator): row mappings
+
+    Yields:
+        bytes: one json document per row
+    """
+    async for row in rows:
+        yield (json.dumps(jsonable_encoder(dict(row))) + "\n").encode()
+
+
+async def csvRows(rows: AsyncIterator , columns: list[str]) -> AsyncIterator[bytes]:
+    """
+    Encode a stream of row mappings as CSV with a header line
+
+    Args:
+        rows (AsyncIterator): row mappings
+        columns (list[str]): columns to write , in order
+
+    Yields:
+        bytes: the header then one CSV line per row
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer , fieldnames=columns , extrasaction="ignore")
+    writer.writeheader()
+    async for row in rows:
+        writer.writerow(jsonable_encoder(dict(row)))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # header only export (no rows)
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def sseEvents(hub: EventHub , projectId: str | None , heartbeat: float) -> AsyncIterator[bytes]:
+    """
+    Subscribe to the hub and encode its events as Server-Sent Events until the client leaves or falls behind.
+    The subscription is opened inside the stream , so it is closed whenever the stream ends (the client disconnecting cancels it)
+    and no subscription is left behind by a response that never starts streaming.
+
+    Args:
+        hub (EventHub): hub to subscribe to
+        projectId (str | None): project to follow , None for all
+        heartbeat (float): seconds without events after which a comment line keeps the connection open
+
+    Yields:
+        bytes: one SSE message per event , a final `overflow` message if the subscription was cut off
+    """
+    subscription = hub.subscribe(projectId)
+    try:
+        yield b": connected\n\n"
+        while True:
+            if subscription.overflowed and subscription.queue.empty():
+                yield b"event: overflow\ndata: {}\n\n"
+                return
+            try:
+                event = await asyncio.wait_for(subscription.queue.get() , heartbeat)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            yield f"id: {event.id}\nevent: {event.type}\ndata: {event.toJson()}\n\n".encode()
+    finally:
+        hub.unsubscribe(subscription)
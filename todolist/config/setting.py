@@ -2,6 +2,165 @@ from dotenv import load_dotenv
 import os
 
 
+def _envBool(name: str , default: bool) -> bool:
+    """
+    Reading a boolean environment variable
+
+    Args:
+        name (str): name of the variable
+        default (bool): value when the variable is not set
+
+    Returns:
+        bool: True for 1 , true or yes (any case) , False for any other value
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1" , "true" , "yes")
+
+
+class PoolSetting:
+    """
+    A class used to represent the connection pool settings of the engines (DB_POOL_* variables)
+
+    Attributes:
+        SIZE (int): number of connections each engine keeps open
+        MAX_OVERFLOW (int): number of connections each engine may open above SIZE under load
+        TIMEOUT_SECONDS (float): how long a checkout waits for a free connection before failing
+        RECYCLE_SECONDS (int): connections older than this are replaced at checkout (-1 never)
+        PRE_PING (bool): whether every checkout tests the connection with a round trip first
+    """
+
+    SIZE: int
+    MAX_OVERFLOW: int
+    TIMEOUT_SECONDS: float
+    RECYCLE_SECONDS: int
+    PRE_PING: bool
+
+    def __init__(self , size: int = 5 , overflow: int = 10 , timeout: float = 30 , recycle: int = -1 , pre_ping: bool = True):
+        """
+        Initialize a pool setting instance
+
+        Args:
+            size (int): connections kept open per engine (defaults to 5)
+            overflow (int): extra connections per engine under load (defaults to 10)
+            timeout (float): seconds a checkout waits for a connection (defaults to 30)
+            recycle (int): maximum age of a connection in seconds (defaults to -1 , no maximum)
+            pre_ping (bool): whether checkouts test the connection first (defaults to True)
+        """
+        self.SIZE = size
+        self.MAX_OVERFLOW = overflow
+        self.TIMEOUT_SECONDS = timeout
+        self.RECYCLE_SECONDS = recycle
+        self.PRE_PING = pre_ping
+
+    @classmethod
+    def initializeSettings(cls):
+        """
+        make a new pool setting from the DB_POOL_SIZE , DB_MAX_OVERFLOW and DB_POOL_* environment variables
+        """
+        return cls(
+            size = int(os.getenv("DB_POOL_SIZE" , 5 )) ,
+            overflow = int(os.getenv("DB_MAX_OVERFLOW" , 10 )) ,
+            timeout = float(os.getenv("DB_POOL_TIMEOUT_SECONDS" , 30 )) ,
+            recycle = int(os.getenv("DB_POOL_RECYCLE_SECONDS" , -1 )) ,
+            pre_ping = _envBool("DB_POOL_PRE_PING" , True) ,
+        )
+
+
+class ProfilingSetting:
+    """
+    A class used to represent the profiling settings of the API (PROFILING_* variables)
+
+    Attributes:
+        ENABLED (bool): whether the API records per route metrics (served at /metrics)
+        SLOW_REQUEST_MS (float): profiled requests taking at least this long keep their profile
+        SAMPLE_RATE (float): fraction of the requests run under cProfile (0 never)
+        DIR (str): directory of the kept profiles
+        N_PLUS_ONE_THRESHOLD (int): a statement run this many times by one request is flagged as N+1
+    """
+
+    ENABLED: bool
+    SLOW_REQUEST_MS: float
+    SAMPLE_RATE: float
+    DIR: str
+    N_PLUS_ONE_THRESHOLD: int
+
+    def __init__(self , enabled: bool = False , slow_ms: float = 500 , rate: float = 0 , directory: str = "profiles" , n_plus_one: int = 10):
+        """
+        Initialize a profiling setting instance
+
+        Args:
+            enabled (bool): whether the API records per route metrics (defaults to False)
+            slow_ms (float): minimum duration of a kept profile in milliseconds (defaults to 500)
+            rate (float): fraction of the requests profiled (defaults to zero)
+            directory (str): directory of the kept profiles (defaults to profiles)
+            n_plus_one (int): runs of one statement in a request flagged as N+1 (defaults to 10)
+        """
+        self.ENABLED = enabled
+        self.SLOW_REQUEST_MS = slow_ms
+        self.SAMPLE_RATE = rate
+        self.DIR = directory
+        self.N_PLUS_ONE_THRESHOLD = n_plus_one
+
+    @classmethod
+    def initializeSettings(cls):
+        """
+        make a new profiling setting from the PROFILING_* environment variables
+        """
+        return cls(
+            enabled = _envBool("PROFILING_ENABLED" , False) ,
+            slow_ms = float(os.getenv("PROFILING_SLOW_REQUEST_MS" , 500 )) ,
+            rate = float(os.getenv("PROFILING_SAMPLE_RATE" , 0 )) ,
+            directory = os.getenv("PROFILING_DIR" , "profiles") ,
+            n_plus_one = int(os.getenv("PROFILING_N_PLUS_ONE_THRESHOLD" , 10 )) ,
+        )
+
+
+class StorageSetting:
+    """
+    A class used to represent where the projects and tasks are kept (STORAGE_BACKEND and its database)
+
+    Attributes:
+        BACKEND ({postgres , sqlite , memory}): where the projects and tasks are kept (memory: in the process , CLI and benchmarks only)
+        SQLITE_PATH (str): database file of the sqlite backend
+        DATABASE_URL (str): database of the postgres backend (sync engine)
+        ASYNC_DATABASE_URL (str): database of the postgres backend for the async engine , derived from DATABASE_URL when empty
+    """
+
+    BACKEND: str
+    SQLITE_PATH: str
+    DATABASE_URL: str
+    ASYNC_DATABASE_URL: str
+
+    def __init__(self , backend: str = "postgres" , sqlite_path: str = "todolist.db" , database_url: str = "" , async_database_url: str = ""):
+        """
+        Initialize a storage setting instance
+
+        Args:
+            backend ({postgres , sqlite , memory}): storage of the projects and tasks (defaults to postgres)
+            sqlite_path (str): database file of the sqlite backend (defaults to todolist.db)
+            database_url (str): database url of the postgres backend (defaults to empty)
+            async_database_url (str): asyncio database url of the postgres backend (defaults to empty , derived from database_url)
+        """
+        self.BACKEND = backend
+        self.SQLITE_PATH = sqlite_path
+        self.DATABASE_URL = database_url
+        self.ASYNC_DATABASE_URL = async_database_url
+
+    @classmethod
+    def initializeSettings(cls):
+        """
+        make a new storage setting from the STORAGE_BACKEND , SQLITE_PATH , DATABASE_URL and ASYNC_DATABASE_URL environment variables
+        """
+        return cls(
+            backend = os.getenv("STORAGE_BACKEND" , "postgres").strip().lower() ,
+            sqlite_path = os.getenv("SQLITE_PATH" , "todolist.db") ,
+            database_url = os.getenv("DATABASE_URL" , "") ,
+            async_database_url = os.getenv("ASYNC_DATABASE_URL" , "") ,
+        )
+
+
 class Setting:
     """
     A class used to represent the .env variables as the program setting
@@ -11,14 +170,44 @@ class Setting:
         MAX_NUMBER_OF_TASKS (int): the maximum allowed number of tasks
         MAX_NAME_WORD_LENGTH (int): the maximum word length of a name
         MAX_DESC_WORD_LENGTH (int): the maximum word length of a description
+        AUTO_CLOSE_CHUNK_SIZE (int): number of overdue tasks closed per statement by the auto close job (0 closes all at once)
+        CACHE_ENABLED (bool): whether project and task lookups by id go through the read-through cache
+        CACHE_MAX_SIZE (int): maximum number of cached projects (and of cached tasks)
+        CACHE_TTL_SECONDS (float): seconds a cached row stays valid
+        EVENTS_BROKER ({local , postgres}): how the change feed events reach the subscribers (postgres: LISTEN / NOTIFY , for several workers)
+        EVENTS_QUEUE_SIZE (int): maximum number of events waiting to be sent to one subscriber before it is cut off
+        SCHEDULER_ENABLED (bool): whether this process runs the background jobs (auto close)
+        SCHEDULER_JITTER_SECONDS (float): maximum random delay added to the due time of a job
+        SCHEDULER_LEASE_SECONDS (float): how long a worker keeps a job to itself if it dies while running it
+        DEADLINE_TIMER_ENABLED (bool): whether the API closes overdue tasks within seconds of their deadline (not only daily)
+        DEADLINE_TIMER_HORIZON_SECONDS (float): how far ahead the deadline timer holds deadlines in memory
+        DEADLINE_TIMER_MAX_SIZE (int): maximum number of deadlines the deadline timer holds
+        pool (PoolSetting): connection pool of the engines
+        profiling (ProfilingSetting): per route metrics and profiles of the API
+        storage (StorageSetting): where the projects and tasks are kept
     """
 
     MAX_NUMBER_OF_PROJECTS: int
     MAX_NUMBER_OF_TASKS: int
     MAX_NAME_WORD_LENGTH: int
     MAX_DESC_WORD_LENGTH: int
+    AUTO_CLOSE_CHUNK_SIZE: int
+    CACHE_ENABLED: bool
+    CACHE_MAX_SIZE: int
+    CACHE_TTL_SECONDS: float
+    EVENTS_BROKER: str
+    EVENTS_QUEUE_SIZE: int
+    SCHEDULER_ENABLED: bool
+    SCHEDULER_JITTER_SECONDS: float
+    SCHEDULER_LEASE_SECONDS: float
+    DEADLINE_TIMER_ENABLED: bool
+    DEADLINE_TIMER_HORIZON_SECONDS: float
+    DEADLINE_TIMER_MAX_SIZE: int
+    pool: PoolSetting
+    profiling: ProfilingSetting
+    storage: StorageSetting
 
-    def __init__(self , max_p: int = 0 , max_t: int =  0 , max_nw: int = 0 , max_dw: int = 0):
+    def __init__(self , max_p: int = 0 , max_t: int =  0 , max_nw: int = 0 , max_dw: int = 0 , close_chunk: int = 0 , cache_on: bool = False , cache_size: int = 0 , cache_ttl: float = 0 , events_broker: str = "local" , events_queue: int = 100 , scheduler_on: bool = True , scheduler_jitter: float = 0 , scheduler_lease: float = 600 , timer_on: bool = False , timer_horizon: float = 3600 , timer_size: int = 10000 , pool: PoolSetting | None = None , profiling: ProfilingSetting | None = None , storage: StorageSetting | None = None):
         """
         Initialize a setting instance
 
@@ -27,11 +216,41 @@ class Setting:
             max_t (int): the maximum allowed number of tasks (defaults to zero)
             max_nw (int): the maximum word length of a name (defaults to zero)
             max_dw (int): the maximum word length of a description (defaults to zero)
+            close_chunk (int): number of overdue tasks closed per statement (defaults to zero , everything at once)
+            cache_on (bool): whether lookups by id go through the cache (defaults to False)
+            cache_size (int): maximum number of cached rows per kind (defaults to zero)
+            cache_ttl (float): seconds a cached row stays valid (defaults to zero , until evicted)
+            events_broker ({local , postgres}): broker of the change feed (defaults to local)
+            events_queue (int): maximum number of pending events per subscriber (defaults to 100)
+            scheduler_on (bool): whether the background jobs run in this process (defaults to True)
+            scheduler_jitter (float): maximum random delay of a job in seconds (defaults to zero)
+            scheduler_lease (float): seconds a job lease holds (defaults to 600)
+            timer_on (bool): whether the deadline timer runs (defaults to False)
+            timer_horizon (float): seconds of deadlines held by the deadline timer (defaults to 3600)
+            timer_size (int): maximum number of deadlines held by the deadline timer (defaults to 10000)
+            pool (PoolSetting | None): connection pool of the engines (defaults to None , a PoolSetting with its defaults)
+            profiling (ProfilingSetting | None): profiling of the API (defaults to None , off)
+            storage (StorageSetting | None): storage of the projects and tasks (defaults to None , postgres)
         """
         self.MAX_NUMBER_OF_PROJECTS = max_p
         self.MAX_NUMBER_OF_TASKS = max_t
         self.MAX_NAME_WORD_LENGTH = max_nw
         self.MAX_DESC_WORD_LENGTH = max_dw
+        self.AUTO_CLOSE_CHUNK_SIZE = close_chunk
+        self.CACHE_ENABLED = cache_on
+        self.CACHE_MAX_SIZE = cache_size
+        self.CACHE_TTL_SECONDS = cache_ttl
+        self.EVENTS_BROKER = events_broker
+        self.EVENTS_QUEUE_SIZE = events_queue
+        self.SCHEDULER_ENABLED = scheduler_on
+        self.SCHEDULER_JITTER_SECONDS = scheduler_jitter
+        self.SCHEDULER_LEASE_SECONDS = scheduler_lease
+        self.DEADLINE_TIMER_ENABLED = timer_on
+        self.DEADLINE_TIMER_HORIZON_SECONDS = timer_horizon
+        self.DEADLINE_TIMER_MAX_SIZE = timer_size
+        self.pool = pool if pool is not None else PoolSetting()
+        self.profiling = profiling if profiling is not None else ProfilingSetting()
+        self.storage = storage if storage is not None else StorageSetting()
 
     @classmethod
     def initializeSettings(cls):
@@ -47,5 +266,20 @@ class Setting:
             max_t = int(os.getenv("MAX_NUMBER_OF_TASKS" , 10 )) ,
             max_nw = int(os.getenv("MAX_NAME_WORD_LENGTH" , 30 )) ,
             max_dw = int(os.getenv("MAX_DESC_WORD_LENGTH" , 150 )) ,
+            close_chunk = int(os.getenv("AUTO_CLOSE_CHUNK_SIZE" , 0 )) ,
+            cache_on = _envBool("CACHE_ENABLED" , False) ,
+            cache_size = int(os.getenv("CACHE_MAX_SIZE" , 10000 )) ,
+            cache_ttl = float(os.getenv("CACHE_TTL_SECONDS" , 30 )) ,
+            events_broker = os.getenv("EVENTS_BROKER" , "local").strip().lower() ,
+            events_queue = int(os.getenv("EVENTS_QUEUE_SIZE" , 100 )) ,
+            scheduler_on = _envBool("SCHEDULER_ENABLED" , True) ,
+            scheduler_jitter = float(os.getenv("SCHEDULER_JITTER_SECONDS" , 30 )) ,
+            scheduler_lease = float(os.getenv("SCHEDULER_LEASE_SECONDS" , 600 )) ,
+            timer_on = _envBool("DEADLINE_TIMER_ENABLED" , False) ,
+            timer_horizon = float(os.getenv("DEADLINE_TIMER_HORIZON_SECONDS" , 3600 )) ,
+            timer_size = int(os.getenv("DEADLINE_TIMER_MAX_SIZE" , 10000 )) ,
+            pool = PoolSetting.initializeSettings() ,
+            profiling = ProfilingSetting.initializeSettings() ,
+            storage = StorageSetting.initializeSettings() ,
         )
 
@@ -0,0 +1,162 @@
+from datetime import timedelta
+from typing import Callable
+
+from todolist.config.setting import Setting
+from todolist.data.cache import CacheBackend, LRUCache
+from todolist.db import configure_engine, configure_async_engine, pool_metrics, async_pool_metrics
+from todolist.events import EventHub, EventBroker, LocalBroker, PostgresBroker
+from todolist.data.projects_repo import ProjectsRepo
+from todolist.data.tasks_repo import TasksRepo
+from todolist.data.async_projects_repo import AsyncProjectsRepo
+from todolist.data.async_tasks_repo import AsyncTasksRepo
+from todolist.data.async_stats_repo import AsyncStatsRepo
+from todolist.data.jobs_repo import JobsRepo
+from todolist.data.memory_store import MemoryStore
+from todolist.data.memory_projects_repo import MemoryProjectsRepo
+from todolist.data.memory_tasks_repo import MemoryTasksRepo
+from todolist.data.memory_jobs_repo import MemoryJobsRepo
+from todolist.data.protocols import ProjectsRepository, TasksRepository, JobsRepository
+from todolist.core.commands.scheduler import Scheduler
+from todolist.core.commands.deadlines import DeadlineTimer
+from todolist.core.services.project_service import ProjectService
+from todolist.core.services.task_service import TaskService
+from todolist.core.services.async_project_service import AsyncProjectService
+from todolist.core.services.async_task_service import AsyncTaskService
+from todolist.core.services.async_search_service import AsyncSearchService
+from todolist.core.services.async_stats_service import AsyncStatsService
+
+
+class ServiceContainer:
+    """
+    A class used to hold the application scoped setting, repositories and services.
+    Built once per process (API lifespan or CLI start) and shared by everything that needs a service.
+
+    Attributes:
+        setting (Setting): rules and constraints loaded once from the environment
+        engine (Engine | None): sync engine built from the setting (CLI , scheduler) , None with the memory backend
+        async_engine (AsyncEngine | None): async engine built from the setting (API) , None with the memory backend
+        project_service (ProjectService): sync project service (CLI , scheduler) , on the repos of STORAGE_BACKEND
+        task_service (TaskService): sync task service (CLI , scheduler) , on the repos of STORAGE_BACKEND
+        async_project_service (AsyncProjectService): async project service (API)
+        async_task_service (AsyncTaskService): async task service (API)
+        async_search_service (AsyncSearchService): full text search of the projects and tasks (API)
+        async_stats_service (AsyncStatsService): statistics of the tasks of the projects (API)
+        project_cache (CacheBackend | None): cache of the projects by id , None when disabled
+        task_cache (CacheBackend | None): cache of the tasks by id , None when disabled
+        event_hub (EventHub): delivers the change feed events to the subscribers of the process
+        events (EventBroker): where the services publish the change feed events (started by the API lifespan)
+        scheduler (Scheduler): background jobs of the process (see scheduleCommands) , started by the API lifespan or the CLI
+        deadline_timer (DeadlineTimer | None): closes overdue tasks at their deadline , started by the API lifespan. None when disabled
+    """
+
+    def __init__(self , setting: Setting , cacheFactory: Callable[[str], CacheBackend] | None = None):
+        """
+        Initializing a service container
+
+        Args:
+            setting (Setting): rules and constraints shared by every service
+            cacheFactory (Callable[[str], CacheBackend] | None , optional): builds the cache of a kind of row ("projects" or "tasks")
+                when setting.CACHE_ENABLED , e.g. a backend shared between processes. defaults to None (an in-process LRUCache)
+        """
+        self.setting = setting
+        # the repos open their sessions on these engines , so they are built from the setting held here
+        self.engine = configure_engine(setting)
+        self.async_engine = configure_async_engine(setting)
+
+        self.project_cache = None
+        self.task_cache = None
+        if setting.CACHE_ENABLED:
+            if cacheFactory is None:
+                cacheFactory = lambda kind: LRUCache(setting.CACHE_MAX_SIZE , setting.CACHE_TTL_SECONDS)
+            self.project_cache = cacheFactory("projects")
+            self.task_cache = cacheFactory("tasks")
+
+        self.event_hub = EventHub(setting.EVENTS_QUEUE_SIZE)
+        self.events = self._buildBroker(setting)
+
+        projects_repo , tasks_repo , jobs_repo = self._buildRepos(setting)
+        self.project_service = ProjectService(projects_repo , tasks_repo , setting , self.events)
+        self.task_service = TaskService(projects_repo , tasks_repo , setting , self.events)
+
+        async_projects_repo = AsyncProjectsRepo(cache=self.project_cache , task_cache=self.task_cache)
+        async_tasks_repo = AsyncTasksRepo(cache=self.task_cache)
+        self.async_project_service = AsyncProjectService(async_projects_repo , async_tasks_repo , setting , self.events)
+        self.async_task_service = AsyncTaskService(async_projects_repo , async_tasks_repo , setting , self.events)
+        self.async_search_service = AsyncSearchService(async_projects_repo , async_tasks_repo)
+        self.async_stats_service = AsyncStatsService(async_projects_repo , AsyncStatsRepo())
+
+        self.scheduler = Scheduler(jobs_repo , setting.SCHEDULER_JITTER_SECONDS , setting.SCHEDULER_LEASE_SECONDS)
+        self.deadline_timer = None
+        if setting.DEADLINE_TIMER_ENABLED:
+            self.deadline_timer = DeadlineTimer(
+                self.async_task_service ,
+                self.event_hub ,
+                timedelta(seconds=setting.DEADLINE_TIMER_HORIZON_SECONDS) ,
+                setting.DEADLINE_TIMER_MAX_SIZE ,
+            )
+
+    def _buildRepos(self , setting: Setting) -> tuple[ProjectsRepository , TasksRepository , JobsRepository]:
+        """
+        Sync repositories of the storage backend chosen by setting.storage.BACKEND (the async ones always use the database)
+
+        Raises:
+            ValueError: if the backend is unknown
+        """
+        if setting.storage.BACKEND in ("postgres" , "sqlite"):
+            # sync and async repos share the caches , so writes of the scheduler invalidate what the API reads
+            return ProjectsRepo(cache=self.project_cache , task_cache=self.task_cache) , TasksRepo(cache=self.task_cache) , JobsRepo()
+        if setting.storage.BACKEND == "memory":
+            store = MemoryStore()
+            return MemoryProjectsRepo(store) , MemoryTasksRepo(store) , MemoryJobsRepo(store)
+        raise ValueError(f"Unknown storage backend: {setting.storage.BACKEND}")
+
+    def _buildBroker(self , setting: Setting) -> EventBroker:
+        """
+        Broker of the change feed chosen by setting.EVENTS_BROKER
+
+        Raises:
+            ValueError: if the broker is unknown
+        """
+        if setting.EVENTS_BROKER == "local":
+            return LocalBroker(self.event_hub)
+        if setting.EVENTS_BROKER == "postgres":
+            return PostgresBroker(self.event_hub , self.async_engine , self.engine)
+        raise ValueError(f"Unknown events broker: {setting.EVENTS_BROKER}")
+
+    def cacheStats(self) -> dict:
+        """
+        Counters of the caches
+
+        Returns:
+            dict: whether the cache is enabled and the counters of the projects and tasks caches (None when disabled)
+        """
+        return {
+            "enabled": self.setting.CACHE_ENABLED ,
+            "projects": self.project_cache.stats() if self.project_cache else None ,
+            "tasks": self.task_cache.stats() if self.task_cache else None ,
+        }
+
+    def poolStats(self) -> dict:
+        """
+        State and counters of the connection pools
+
+        Returns:
+            dict: the pool of the sync engine (CLI , scheduler) and of the async engine (API) , an engine the
+                storage backend has not built (memory) is left out
+        """
+        pools = {}
+        if self.engine is not None:
+            pools["sync_engine"] = pool_metrics.stats(self.engine.pool)
+        if self.async_engine is not None:
+            pools["async_engine"] = async_pool_metrics.stats(self.async_engine.sync_engine.pool)
+        return pools
+
+    @classmethod
+    def build(cls) -> "ServiceContainer":
+        """
+        make a new container with the settings read from the environment
+
+        Returns:
+            ServiceContainer: the built container
+        """
+        return cls(Setting.initializeSettings())
@@ -1,2 +1,4 @@
 from .models import Task
-from .models import Project
\ No newline at end of file
+from .models import Project
+from .models import Counter
+from .models import JobRun
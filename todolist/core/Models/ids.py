@@ -0,0 +1,40 @@
+import os
+import threading
+import time
+
+# length of the ids made by newId , the id columns also hold the 8 character ids made before (uuid4 prefixes)
+ID_LENGTH = 26
+
+# Crockford's base32 in lower case (the case of the older ids) , ascending in ASCII so the ids sort like their values
+_ALPHABET = "0123456789abcdefghjkmnpqrstvwxyz"
+_RANDOM_BITS = 80
+
+_lock = threading.Lock()
+_lastMs = -1
+_lastRandom = 0
+
+
+def newId() -> str:
+    """
+    A new time ordered id (ULID layout): 48 bits of unix time in milliseconds then 80 random bits , as 26 base32
+    characters. Ids made later sort after the ones made before , so inserts land at the end of the primary key index
+    instead of random pages , and 80 random bits per millisecond leave no practical chance of a collision.
+    Within one millisecond the random part is incremented , so the ids of a process stay ordered
+
+    Returns:
+        str: the id
+    """
+    global _lastMs , _lastRandom
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms <= _lastMs:
+            # same millisecond (or the clock went back): keep the order of this process
+            ms = _lastMs
+            random = _lastRandom + 1
+            if random >> _RANDOM_BITS:
+                ms , random = ms + 1 , int.from_bytes(os.urandom(10) , "big")
+        else:
+            random = int.from_bytes(os.urandom(10) , "big")
+        _lastMs , _lastRandom = ms , random
+    value = (ms << _RANDOM_BITS) | random
+    return "".join(_ALPHABET[(value >> shift) & 31] for shift in range(125 , -1 , -5))
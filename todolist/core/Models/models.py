@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from uuid import uuid4
 from datetime import datetime , timezone
 
-from sqlalchemy import String, Text, DateTime, ForeignKey
+from sqlalchemy import String, Text, DateTime, Integer, Float, ForeignKey, Index, case, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from todolist.db import Base
+from todolist.core.Models.ids import ID_LENGTH, newId
+from todolist.db.search import searchable
+from todolist.db.rollups import projectStatsRollup
 
 from typing import Optional , List
 
@@ -15,17 +17,22 @@ class Project(Base):
     A class used to represent a project instance
 
     Attributes:
-        id (str): unique universal id made with uuid4 (only the first 8 characters)
+        id (str): unique time ordered id made with newId (ids made before it are the first 8 characters of a uuid4)
         name (str): unique title of the project 
         desc (str): the description of the project  
+        version (int): incremented on every update of the project (ETag / If-Match)
+        tasks_version (int): incremented on every write to the tasks of the project (ETag of the task list). deferred , read with ProjectsRepo.get_tasks_version
     
     """
 
     __tablename__ = "projects"
 
-    id: Mapped[str] = mapped_column(String(8) , primary_key=True)
+    id: Mapped[str] = mapped_column(String(ID_LENGTH) , primary_key=True)
     name: Mapped[str] = mapped_column(String(100) , unique=True, nullable=False,)
     desc: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    # bumped by the task repos with an UPDATE , deferred so loaded (and cached or merged) projects never carry a stale copy
+    tasks_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0", deferred=True)
 
     tasks: Mapped[List[Task]] = relationship(
         back_populates="project",
@@ -43,15 +50,16 @@ class Project(Base):
             desc (str , optional) : description to initialize the project with. defaults to ""
          
         """
-        self.id = str(uuid4())[:8]
+        self.id = newId()
         self.name = name
         self.desc = desc
+        self.version = 1
     
     # Methods to control the representation of the class object
     def __str__(self):
-        return f"Project(id: {self.id[:8]} , name: {self.name}, description: {self.desc})"
+        return f"Project(id: {self.id} , name: {self.name}, description: {self.desc})"
     def __repr__(self):
-        return f"Project(id: {self.id[:8]} , name: {self.name}, description: {self.desc})"
+        return f"Project(id: {self.id} , name: {self.name}, description: {self.desc})"
 
     def edit(self , * , newName: str | None = None , newDesc: str | None = None) -> None:
         """
@@ -69,24 +77,57 @@ class Project(Base):
         if newDesc:
             self.desc = newDesc
 
+    @staticmethod
+    def editValues(* , newName: str | None = None , newDesc: str | None = None) -> dict:
+        """
+        SQL counterpart of edit: the SET clause of an UPDATE on projects following the same rules
+
+        Args:
+            newName (str | None) : new title to give the Project. defaults to None
+            newDesc (str | None) : new description to give the Project. defaults to None
+
+        Returns:
+            dict: column name to new value (or SQL expression) , empty if nothing changes
+        """
+        values = {}
+        if newName:
+            values["name"] = newName
+        if newDesc:
+            values["desc"] = newDesc
+        if values:
+            values["version"] = Project.version + 1
+        return values
+
 class Task(Base):
     """
     A class used to represent a task instance
 
     Attributes:
-        id (str): unique universal id made with uuid4 (only the first 8 characters)
+        id (str): unique time ordered id made with newId (ids made before it are the first 8 characters of a uuid4)
         name (str): A title of the task 
         desc (str): The description of the task  
         status ({todo , doing , done}): The status of the task. defaults to todo  
         deadline (datetime | None): The deadline of the task. if not specified , defaults to None    
+        at_created (datetime | None): when the task was created (start of its time to close). None for tasks created before it was recorded
+        version (int): incremented on every update of the task (ETag / If-Match)
     
     """
     __tablename__ = "tasks"
+    __table_args__ = (
+        # list_by_project(_page) / stream_by_project / delete_project: for_project equality , ordered by id
+        Index("ix_tasks_for_project_id", "for_project", "id"),
+        # overdue scan of close_overdue only looks at open tasks
+        Index("ix_tasks_open_deadline", "deadline", postgresql_where=text("status <> 'done'"), sqlite_where=text("status <> 'done'")),
+        # filtered listings (TaskFilter): deadline range / sort in a project , status and deadline across projects , closed since
+        Index("ix_tasks_for_project_deadline_id", "for_project", "deadline", "id"),
+        Index("ix_tasks_status_deadline_id", "status", "deadline", "id"),
+        Index("ix_tasks_at_closed_id", "at_closed", "id"),
+    )
 
 
-    id:Mapped[str] = mapped_column(String(8), primary_key=True)
+    id:Mapped[str] = mapped_column(String(ID_LENGTH), primary_key=True)
 
-    for_project: Mapped[str] = mapped_column( String(8), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    for_project: Mapped[str] = mapped_column( String(ID_LENGTH), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     
     name: Mapped[str] = mapped_column( String(100), nullable=False )
     
@@ -101,6 +142,10 @@ class Task(Base):
         nullable=True,
     )
 
+    at_created: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+
     project: Mapped["Project"] = relationship(
         back_populates="tasks",
         primaryjoin="Task.for_project == Project.id",
@@ -118,21 +163,23 @@ class Task(Base):
             status ({todo , doing , done} , optional) : status to initialize the task with. defaults to todo
             deadline (datetime | None) : initial deadline of the task. defaults to None
         """
-        self.id = str(uuid4())[:8]
+        self.id = newId()
         self.name = name
         self.desc = desc
         self.for_project = for_project
         self.deadline = deadline
         self.at_closed = at_closed
         self.status = status
+        self.version = 1
+        self.at_created = datetime.now(timezone.utc)
         if status == "done" and at_closed is None:
             self.at_closed = self.at_closed = datetime.now(timezone.utc)
     
     # Methods to control the representation of the class object
     def __str__(self):
-         return f"Task(id: {self.id[:8]},name: {self.name}, description: {self.desc},status: {self.status}, for project: {self.for_project[:8]})"
+         return f"Task(id: {self.id},name: {self.name}, description: {self.desc},status: {self.status}, for project: {self.for_project})"
     def __repr__ (self):
-         return f"Task(id: {self.id[:8]},name: {self.name}, description: {self.desc},status: {self.status}, for project: {self.for_project[:8]})"
+         return f"Task(id: {self.id},name: {self.name}, description: {self.desc},status: {self.status}, for project: {self.for_project})"
 
     def edit(self , * , newName: str | None = None , newDesc: str | None = None , newStatus: str | None = None , newDeadline: datetime | None = None) -> None :
         """
@@ -178,4 +225,120 @@ class Task(Base):
         self.status = newStatus
 
         if newStatus == "done" and not previously_done and self.at_closed is None:
-            self.at_closed = datetime.now(timezone.utc)
\ No newline at end of file
+            self.at_closed = datetime.now(timezone.utc)
+
+    @staticmethod
+    def editValues(* , newName: str | None = None , newDesc: str | None = None , newStatus: str | None = None , newDeadline: datetime | None = None , now: datetime | None = None) -> dict:
+        """
+        SQL counterpart of edit and changeStatus: the SET clause of an UPDATE on tasks following the same rules
+
+        Args:
+            newName (str | None) : new title to give the Task. defaults to None
+            newDesc (str | None) : new description to give the Task. defaults to None
+            newStatus (str | None) : new status to give the Task. defaults to None
+            newDeadline (datetime | None ): new Deadline to give the Task. defaults to None
+            now (datetime | None): closing time stamped on the first transition to done. defaults to the current time
+
+        Returns:
+            dict: column name to new value (or SQL expression) , empty if nothing changes
+        """
+        values = {}
+        if newName:
+            values["name"] = newName
+        if newDesc:
+            values["desc"] = newDesc
+        if newStatus:
+            values["status"] = newStatus
+            if newStatus == "done":
+                # the CASE sees the row before the update , so at_closed is only stamped when leaving another status
+                values["at_closed"] = case(
+                    (Task.status != "done" , func.coalesce(Task.at_closed , now or datetime.now(timezone.utc))),
+                    else_=Task.at_closed,
+                )
+        if newDeadline:
+            values["deadline"] = newDeadline
+        if values:
+            values["version"] = Task.version + 1
+        return values
+
+
+# full text index of the names and descriptions (GET /api/search)
+searchable(Project.__table__)
+searchable(Task.__table__)
+# per project counters of the tasks kept up to date by triggers (GET /api/projects/{id}/stats , GET /api/stats)
+projectStatsRollup(Task.__table__)
+
+
+class ProjectStats(Base):
+    """
+    A class used to represent the rollup of the tasks of a project , maintained by triggers on every write to tasks
+    (see todolist/db/rollups.py) and rebuilt from the tasks with StatsRepo.rebuild
+
+    Attributes:
+        project_id (str): id of the project
+        todo (int): number of tasks with status todo
+        doing (int): number of tasks with status doing
+        done (int): number of tasks with status done
+        closed_timed (int): number of done tasks with a known creation and closing time
+        close_seconds (float): total time to close of the closed_timed tasks , in seconds
+        closed_late (int): number of done tasks closed after their deadline
+    """
+    __tablename__ = "project_stats"
+
+    project_id: Mapped[str] = mapped_column(String(ID_LENGTH), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    todo: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    doing: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    done: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    closed_timed: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    close_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0, server_default="0")
+    closed_late: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    # Methods to control the representation of the class object
+    def __str__(self):
+        return f"ProjectStats(project id: {self.project_id}, todo: {self.todo}, doing: {self.doing}, done: {self.done})"
+    def __repr__(self):
+        return f"ProjectStats(project id: {self.project_id}, todo: {self.todo}, doing: {self.doing}, done: {self.done})"
+
+
+class Counter(Base):
+    """
+    A class used to represent a maintained row counter of a table (used for the quota checks)
+
+    Attributes:
+        name (str): name of the counted table (projects , tasks)
+        value (int): current number of rows of the table
+    """
+    __tablename__ = "counters"
+
+    name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Methods to control the representation of the class object
+    def __str__(self):
+        return f"Counter(name: {self.name}, value: {self.value})"
+    def __repr__(self):
+        return f"Counter(name: {self.name}, value: {self.value})"
+
+
+class JobRun(Base):
+    """
+    A class used to represent the run state of a scheduled job , shared by every process running the scheduler
+
+    Attributes:
+        name (str): name of the job
+        last_run_at (datetime | None): when the last successful run started. None if it never ran
+        lease_owner (str | None): scheduler currently running the job , None if nobody is
+        lease_until (datetime | None): until when the lease of lease_owner holds , an expired lease can be taken over
+    """
+    __tablename__ = "job_runs"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    last_run_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    lease_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Methods to control the representation of the class object
+    def __str__(self):
+        return f"JobRun(name: {self.name}, last run at: {self.last_run_at}, lease owner: {self.lease_owner})"
+    def __repr__(self):
+        return f"JobRun(name: {self.name}, last run at: {self.last_run_at}, lease owner: {self.lease_owner})"
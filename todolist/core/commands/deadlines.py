@@ -0,0 +1,285 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from todolist.core.services.async_task_service import AsyncTaskService
+from todolist.events import EventHub, Event, Subscription
+
+logger = logging.getLogger(__name__)
+
+# cursor before every deadline
+_START = (datetime.min.replace(tzinfo=timezone.utc) , "")
+
+
+def _deadline(value) -> datetime | None:
+    # events relayed by postgres carry iso strings , deadlines given without an offset are local times (see validateDeadline)
+    if value is None:
+        return None
+    if isinstance(value , str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.astimezone()
+    return value
+
+
+class DeadlineTimer:
+    """
+    A class used to close overdue tasks within seconds of their deadline (API only , next to the daily auto close job).
+    Keeps a heap of the deadlines of the open tasks up to `horizon` ahead , loaded in pages from the index on the
+    open deadlines and kept up to date from the change feed of the process. Tasks written by another process are
+    seen through the change feed with EVENTS_BROKER=postgres , otherwise at the latest by the daily job.
+
+    Attributes:
+        horizon (timedelta): how far ahead deadlines are held
+        maxSize (int): maximum number of deadlines held , the horizon shrinks when it is reached
+        resolution (float): shortest sleep in seconds , deadlines passing meanwhile are closed with one statement
+        batchSize (int): maximum number of tasks closed per statement
+        retrySeconds (float): delay before a tick is tried again after it failed (database unreachable) ,
+            the change feed is still followed meanwhile
+        closed (int): number of tasks closed by the timer
+        failures (int): number of ticks that raised
+        lastError (str | None): error of the last failed tick
+    """
+
+    def __init__(
+        self ,
+        taskService: AsyncTaskService ,
+        hub: EventHub ,
+        horizon: timedelta = timedelta(hours=1) ,
+        maxSize: int = 10000 ,
+        resolution: float = 1.0 ,
+        batchSize: int = 500 ,
+        retrySeconds: float = 60 ,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc) ,
+    ):
+        """
+        Initializing a deadline timer
+
+        Args:
+            taskService (AsyncTaskService): service closing the tasks and reading the deadlines
+            hub (EventHub): change feed of the process
+            horizon (timedelta , optional): how far ahead deadlines are held. defaults to one hour
+            maxSize (int , optional): maximum number of deadlines held. defaults to 10000
+            resolution (float , optional): shortest sleep in seconds. defaults to 1
+            batchSize (int , optional): maximum number of tasks closed per statement. defaults to 500
+            retrySeconds (float , optional): delay before a failed tick is tried again. defaults to 60
+            clock (Callable[[], datetime] , optional): source of the current (timezone aware) time. defaults to utc now
+        """
+        self.taskService = taskService
+        self.hub = hub
+        self.horizon = horizon
+        self.maxSize = maxSize
+        self.resolution = resolution
+        self.batchSize = batchSize
+        self.retrySeconds = retrySeconds
+        self.closed = 0
+        self.failures = 0
+        self.lastError = None
+        self._clock = clock
+        self._heap: list[tuple[datetime , str]] = []
+        self._deadlines: dict[str , datetime] = {}
+        # (deadline , id) of the last loaded task , every open task up to it is held
+        self._loadedUntil = _START
+        # set after a failed tick , no tick before then
+        self._retryAt: datetime | None = None
+        self._subscription: Subscription | None = None
+        self._task: asyncio.Task | None = None
+
+    def _push(self , taskId: str , deadline: datetime) -> None:
+        """
+        Holding the deadline of a task. entries replaced or dropped stay in the heap and are skipped when popped
+        """
+        self._deadlines[taskId] = deadline
+        heapq.heappush(self._heap , (deadline , taskId))
+        self._compact()
+
+    def _forget(self , taskId: str) -> None:
+        self._deadlines.pop(taskId , None)
+        self._compact()
+
+    def _compact(self) -> None:
+        """
+        Rebuilding the heap once most of its entries are stale
+        """
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(deadline , taskId) for taskId , deadline in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    async def _refill(self , now: datetime) -> None:
+        """
+        Loading the deadlines that entered the horizon , from where the last load stopped
+        """
+        until = now + self.horizon
+        while len(self._deadlines) < self.maxSize and self._loadedUntil[0] < until:
+            limit = min(self.batchSize , self.maxSize - len(self._deadlines))
+            rows = await self.taskService.upcomingDeadlines(self._loadedUntil , until , limit)
+            for row in rows:
+                self._push(row.id , _deadline(row.deadline))
+            if len(rows) < limit:
+                # nothing else until the horizon
+                self._loadedUntil = (until , "")
+                return
+            self._loadedUntil = (_deadline(rows[-1].deadline) , rows[-1].id)
+
+    def _reset(self) -> None:
+        """
+        Dropping every deadline , they are loaded again (after writes the change feed does not describe)
+        """
+        self._heap = []
+        self._deadlines = {}
+        self._loadedUntil = _START
+
+    def _apply(self , event: Event) -> None:
+        """
+        Updating the deadlines from an event of the change feed
+        """
+        if event.type in ("task.created" , "task.updated"):
+            taskId = event.data["id"]
+            deadline = _deadline(event.data.get("deadline"))
+            if deadline is None or event.data.get("status") == "done":
+                self._forget(taskId)
+            elif (deadline , taskId) <= self._loadedUntil:
+                self._push(taskId , deadline)
+                if len(self._deadlines) > self.maxSize:
+                    # shrink the horizon to make room , the dropped deadlines are loaded again later
+                    latestId = max(self._deadlines , key=lambda i: (self._deadlines[i] , i))
+                    self._loadedUntil = (self._deadlines[latestId] , "")
+                    self._forget(latestId)
+            else:
+                # past the horizon , loaded when the horizon gets there
+                self._forget(taskId)
+        elif event.type == "task.deleted":
+            self._forget(event.data["id"])
+        elif event.type == "task.bulk_created":
+            self._reset()
+
+    async def _closeDue(self , now: datetime) -> int:
+        """
+        Closing the tasks whose deadline passed
+
+        Returns:
+            int: number of tasks closed
+        """
+        due = []
+        deadlines = {}
+        while self._heap and self._heap[0][0] < now:
+            deadline , taskId = heapq.heappop(self._heap)
+            if self._deadlines.get(taskId) == deadline:
+                del self._deadlines[taskId]
+                due.append(taskId)
+                deadlines[taskId] = deadline
+        closed = 0
+        for start in range(0 , len(due) , self.batchSize):
+            try:
+                closed += await self.taskService.closeOverdueTasks(due[start:start + self.batchSize])
+            except Exception:
+                # held again , so the next tick closes them
+                for taskId in due[start:]:
+                    self._push(taskId , deadlines[taskId])
+                self.closed += closed
+                raise
+        self.closed += closed
+        return closed
+
+    def _secondsUntilNext(self , now: datetime) -> float:
+        """
+        How long to wait for events: until the next deadline or until the horizon has to move , at least resolution
+        """
+        if self._retryAt is not None:
+            return max(self.resolution , (self._retryAt - now).total_seconds())
+        wakeAt = self._loadedUntil[0] - self.horizon / 2
+        if len(self._deadlines) >= self.maxSize:
+            # full , the horizon moves once deadlines are closed
+            wakeAt = now + self.horizon / 2
+        if self._heap:
+            wakeAt = min(wakeAt , self._heap[0][0])
+        return max(self.resolution , (wakeAt - now).total_seconds())
+
+    async def tick(self) -> int:
+        """
+        Closing what is due and loading what entered the horizon
+
+        Returns:
+            int: number of tasks closed
+        """
+        now = self._clock()
+        closed = await self._closeDue(now)
+        # reloaded once half of the horizon went by
+        if self._loadedUntil[0] - now < self.horizon / 2:
+            await self._refill(now)
+        return closed
+
+    async def _guardedTick(self) -> None:
+        """
+        Ticking , a failure is logged and counted and the next tick waits retrySeconds
+        """
+        try:
+            await self.tick()
+        except Exception as error:
+            logger.error("Deadline timer tick failed , retrying in %s seconds" , self.retrySeconds , exc_info=error)
+            self.failures += 1
+            self.lastError = repr(error)
+            self._retryAt = self._clock() + timedelta(seconds=self.retrySeconds)
+            return
+        self._retryAt = None
+
+    async def run(self) -> None:
+        """
+        Run loop of the timer , until cancelled
+        """
+        while True:
+            if self._retryAt is None or self._clock() >= self._retryAt:
+                await self._guardedTick()
+            if self._subscription.overflowed:
+                # missed some events
+                self.hub.unsubscribe(self._subscription)
+                self._subscription = self.hub.subscribe()
+                self._reset()
+                continue
+            try:
+                event = await asyncio.wait_for(self._subscription.queue.get() , self._secondsUntilNext(self._clock()))
+            except asyncio.TimeoutError:
+                continue
+            self._apply(event)
+            while not self._subscription.queue.empty():
+                self._apply(self._subscription.queue.get_nowait())
+
+    def start(self) -> None:
+        """
+        Starting the run loop as a task of the running event loop (returns right away)
+        """
+        if self._task is None:
+            self._subscription = self.hub.subscribe()
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Stopping the run loop started by start
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self.hub.unsubscribe(self._subscription)
+        self._task = None
+        self._subscription = None
+
+    def stats(self) -> dict:
+        """
+        Counters of the timer
+
+        Returns:
+            dict: number of deadlines held , end of the loaded horizon , number of tasks closed , failed ticks and last error
+        """
+        return {
+            "held": len(self._deadlines) ,
+            "loaded_until": self._loadedUntil[0] if self._loadedUntil != _START else None ,
+            "closed": self.closed ,
+            "failures": self.failures ,
+            "last_error": self.lastError ,
+        }
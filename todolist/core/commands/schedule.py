@@ -1,12 +1,15 @@
-import schedule
+from datetime import time
+
+from todolist.core.commands.scheduler import Scheduler, Job
 from todolist.core.services.task_service import TaskService 
 from todolist.core.services.project_service import ProjectService 
 
-def scheduleCommands(taskService: TaskService , projectService: ProjectService) -> None:
+def scheduleCommands(scheduler: Scheduler , taskService: TaskService , projectService: ProjectService) -> None:
     """
-    schdules services
+    schdules services on the background scheduler (nothing runs until the scheduler is started)
 
     Params:
+        scheduler: Scheduler
         taskService: TaskService
         projectService: ProjectService
 
@@ -14,7 +17,5 @@ def scheduleCommands(taskService: TaskService , projectService: ProjectService)
         None
     """
 
-    schedule.every().day.at("00:00:01").do(taskService.autoCloseOverdueTasks)
-
-    #  Running all when the program runs
-    schedule.run_all() 
\ No newline at end of file
+    # a run missed while no scheduler was up is caught up once when one starts
+    scheduler.add(Job("auto_close_overdue_tasks" , taskService.autoCloseOverdueTasks , at=time(0 , 0 , 1)))
@@ -0,0 +1,320 @@
+import asyncio
+import logging
+import os
+import random
+import socket
+import threading
+from datetime import datetime, time, timedelta
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+from todolist.data.protocols import JobsRepository
+
+logger = logging.getLogger(__name__)
+
+
+def localNow() -> datetime:
+    """
+    Current local time , timezone aware (daily jobs run at the local time of the server)
+    """
+    return datetime.now().astimezone()
+
+
+class Job:
+    """
+    A class used to represent a job of the scheduler: a function run every `every` , or every day at `at`
+
+    Attributes:
+        name (str): unique name of the job , key of its run state in the database
+        func (Callable[[], object]): the job , a blocking function run in a worker thread
+        every (timedelta | None): interval between two runs
+        at (time | None): time of the day of the daily run (in the timezone of the scheduler clock)
+    """
+
+    def __init__(self , name: str , func: Callable[[], object] , * , every: timedelta | None = None , at: time | None = None):
+        """
+        Initializing a job
+
+        Args:
+            name (str): unique name of the job
+            func (Callable[[], object]): the job
+            every (timedelta | None , optional): interval between two runs. defaults to None
+            at (time | None , optional): time of the day of the daily run. defaults to None
+
+        Raises:
+            ValueError: if not exactly one of every and at is given
+        """
+        if (every is None) == (at is None):
+            raise ValueError("A job runs either every interval or daily at a time")
+        self.name = name
+        self.func = func
+        self.every = every
+        self.at = at
+
+    def nextRun(self , lastRun: datetime | None , now: datetime) -> datetime:
+        """
+        When the job is due. Missed runs are caught up once , right away
+
+        Args:
+            lastRun (datetime | None): start of the last run , None if it never ran
+            now (datetime): current time
+
+        Returns:
+            datetime: time of the next run (may be in the past)
+        """
+        if lastRun is None:
+            return now
+        if self.every is not None:
+            return lastRun + self.every
+        lastRun = lastRun.astimezone(now.tzinfo)
+        candidate = datetime.combine(lastRun.date() , self.at , tzinfo=lastRun.tzinfo)
+        if candidate <= lastRun:
+            candidate += timedelta(days=1)
+        return candidate
+
+
+class JobState:
+    """
+    A class used to represent what a scheduler knows about one of its jobs
+
+    Attributes:
+        lastRun (datetime | None): start of the last run (by any scheduler) , None if it never ran
+        due (datetime | None): when this scheduler tries the job next (jitter included) , None before the first look
+        runs (int): number of runs of this scheduler
+        failures (int): number of runs of this scheduler that raised , the job or the jobs repo
+        lastError (str | None): error of the last failed run
+    """
+
+    def __init__(self):
+        """
+        Initializing the state of a job not looked at yet
+        """
+        self.lastRun = None
+        self.due = None
+        self.runs = 0
+        self.failures = 0
+        self.lastError = None
+
+
+class Scheduler:
+    """
+    A class used to run the jobs of the process in the background , on an asyncio task (API) or a thread (CLI).
+    Every worker may run a scheduler: the last run of each job is kept in the database and a lease taken
+    with a conditional UPDATE makes sure only one of them runs a job at a time.
+
+    Attributes:
+        owner (str): id of this scheduler in the leases
+        jitter (float): up to this many seconds are added at random to each due time , so workers don't all wake at once
+        leaseSeconds (float): how long a lease holds if the scheduler dies while running a job. a run should not take longer
+        pollSeconds (float): longest sleep of the run loop , also the retry delay of a failed or busy job
+            (a failing jobs repo included , so a database outage never stops the run loop)
+    """
+
+    def __init__(
+        self ,
+        jobsRepo: JobsRepository ,
+        jitter: float = 0 ,
+        leaseSeconds: float = 600 ,
+        pollSeconds: float = 60 ,
+        clock: Callable[[], datetime] = localNow ,
+        sleep: Callable[[float], Awaitable] = asyncio.sleep ,
+        rng: random.Random | None = None ,
+    ):
+        """
+        Initializing a scheduler
+
+        Args:
+            jobsRepo (JobsRepository): run state of the jobs
+            jitter (float , optional): maximum random delay added to each due time in seconds. defaults to 0
+            leaseSeconds (float , optional): how long a lease holds. defaults to 600
+            pollSeconds (float , optional): longest sleep of the run loop. defaults to 60
+            clock (Callable[[], datetime] , optional): source of the current (timezone aware) time. defaults to localNow
+            sleep (Callable[[float], Awaitable] , optional): waits the given seconds. defaults to asyncio.sleep
+            rng (random.Random | None , optional): source of the jitter. defaults to None (a new Random)
+        """
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.jitter = jitter
+        self.leaseSeconds = leaseSeconds
+        self.pollSeconds = pollSeconds
+        self._repo = jobsRepo
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._jobs: dict[str , Job] = {}
+        self._states: dict[str , JobState] = {}
+        self._loaded = False
+        self._task: asyncio.Task | None = None
+
+    def add(self , job: Job) -> None:
+        """
+        Registering a job
+
+        Args:
+            job (Job): the job
+
+        Raises:
+            ValueError: if a job with the same name is registered
+        """
+        if job.name in self._jobs:
+            raise ValueError(f"Job already scheduled: {job.name}")
+        self._jobs[job.name] = job
+        self._states[job.name] = JobState()
+
+    def _setLastRun(self , job: Job , lastRun: datetime | None , now: datetime) -> None:
+        state = self._states[job.name]
+        state.lastRun = lastRun
+        state.due = job.nextRun(lastRun , now) + timedelta(seconds=self._rng.uniform(0 , self.jitter))
+
+    async def _load(self) -> None:
+        """
+        Reading the last runs of the jobs. done by the run loop , so startup never waits on the database
+        """
+        now = self._clock()
+        for job in self._jobs.values():
+            await asyncio.to_thread(self._repo.ensure , job.name)
+            self._setLastRun(job , await asyncio.to_thread(self._repo.last_run , job.name) , now)
+        self._loaded = True
+
+    async def _runJob(self , job: Job , now: datetime) -> bool:
+        """
+        Running a due job if no other scheduler runs it or already ran it
+
+        Returns:
+            bool: whether the job ran
+        """
+        state = self._states[job.name]
+        jobRun = await asyncio.to_thread(self._repo.acquire , job.name , self.owner , now , self.leaseSeconds)
+        if jobRun is None:
+            # another worker is running it , its last run is read once it is done
+            state.due = now + timedelta(seconds=self.pollSeconds)
+            return False
+
+        if job.nextRun(jobRun.last_run_at , now) > now:
+            # another worker ran it since we last looked
+            await asyncio.to_thread(self._repo.release , job.name , self.owner)
+            self._setLastRun(job , jobRun.last_run_at , now)
+            return False
+
+        try:
+            await asyncio.to_thread(job.func)
+        except Exception as error:
+            self._failed(job , now , error)
+            await asyncio.to_thread(self._repo.release , job.name , self.owner)
+            return False
+
+        state.runs += 1
+        self._setLastRun(job , now , now)
+        await asyncio.to_thread(self._repo.release , job.name , self.owner , now)
+        return True
+
+    async def runPending(self) -> int:
+        """
+        Running every job that is due (reading the last runs of the jobs first , on the first call).
+        Errors of the jobs and of the jobs repo are recorded in stats , never raised
+
+        Returns:
+            int: number of jobs that ran
+        """
+        if not self._loaded:
+            try:
+                await self._load()
+            except Exception as error:
+                now = self._clock()
+                for job in self._jobs.values():
+                    self._failed(job , now , error)
+                return 0
+        ran = 0
+        for job in self._jobs.values():
+            now = self._clock()
+            if self._states[job.name].due > now:
+                continue
+            try:
+                if await self._runJob(job , now):
+                    ran += 1
+            except Exception as error:
+                # the jobs repo failed (database unreachable) , the job is tried again later like a failed run
+                self._failed(job , now , error)
+        return ran
+
+    def _failed(self , job: Job , now: datetime , error: Exception) -> None:
+        """
+        Recording a failed run of a job (or a failure of the jobs repo) , the job is tried again pollSeconds later at the earliest
+        """
+        logger.error("Scheduled job %s failed , retrying in %s seconds" , job.name , self.pollSeconds , exc_info=error)
+        state = self._states[job.name]
+        state.failures += 1
+        state.lastError = repr(error)
+        retry = now + timedelta(seconds=self.pollSeconds)
+        # a run that only failed to record itself keeps its next due time
+        state.due = retry if state.due is None else max(state.due , retry)
+
+    def secondsUntilNext(self) -> float:
+        """
+        How long the run loop sleeps: until the next due job , at most pollSeconds
+
+        Returns:
+            float: seconds to sleep
+        """
+        now = self._clock()
+        dues = [(state.due - now).total_seconds() for state in self._states.values()]
+        return max(0.0 , min([self.pollSeconds , *dues]))
+
+    async def run(self) -> None:
+        """
+        Run loop of the scheduler , until cancelled
+        """
+        while True:
+            await self.runPending()
+            await self._sleep(self.secondsUntilNext())
+
+    def start(self) -> None:
+        """
+        Starting the run loop as a task of the running event loop (returns right away)
+        """
+        if self._task is None and self._jobs:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Stopping the run loop started by start
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def startInThread(self) -> threading.Thread | None:
+        """
+        Starting the run loop on a daemon thread with its own event loop , for programs without one (CLI)
+
+        Returns:
+            threading.Thread | None: the thread , None if there is no job
+        """
+        if not self._jobs:
+            return None
+        thread = threading.Thread(target=asyncio.run , args=(self.run() ,) , name="scheduler" , daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> list[dict]:
+        """
+        State of the jobs as seen by this scheduler
+
+        Returns:
+            list[dict]: name , last run , next due time , runs , failures and last error of every job
+        """
+        return [
+            {
+                "name": name ,
+                "last_run": state.lastRun ,
+                "next_run": state.due ,
+                "runs": state.runs ,
+                "failures": state.failures ,
+                "last_error": state.lastError ,
+            }
+            for name , state in self._states.items()
+        ]
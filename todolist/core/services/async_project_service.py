@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from todolist.core.Models.models import Project
+from todolist.data.async_projects_repo import AsyncProjectsRepo
+from todolist.data.async_tasks_repo import AsyncTasksRepo
+from todolist.config.setting import Setting
+from todolist.core.validation.validation import validateTextLength , validateProjectName , validateProjectNumber , validateFields , PROJECT_FIELDS
+from todolist.events import EventBroker, Event, rowData
+
+# number of projects deleted per statement by the bulk delete
+BULK_DELETE_BATCH_SIZE = 500
+
+class AsyncProjectService:
+    """
+    A class used to represent the services provided for projects on top of the async repositories.
+    Mirrors ProjectService one to one, every method has to be awaited.
+
+    Attributes:
+        projects (AsyncProjectsRepo): a project repository to work with
+        tasks (AsyncTasksRepo): a task repository to work with
+        setting (Setting): rules and constraints for the service
+        events (EventBroker | None): where the changes are published , None to not publish them
+    """
+
+    def __init__(self , projects_repo: AsyncProjectsRepo , tasks_repo: AsyncTasksRepo , setting: Setting , events: EventBroker | None = None):
+        """
+        Initializing an async project service
+
+        Args:
+            projects_repo (AsyncProjectsRepo) : Project repository to work with
+            tasks_repo (AsyncTasksRepo) : Task repository to work with
+            events (EventBroker | None , optional) : where the changes are published. defaults to None
+        """
+        self.projects = projects_repo
+        self.tasks = tasks_repo
+        self.setting = setting
+        self.events = events
+
+    def _publish(self , type: str , projectId: str | None , data: dict) -> None:
+        """
+        Publishing an event of a committed change to the change feed (if the service has a broker)
+        """
+        if self.events:
+            self.events.publish(Event(type , projectId , data))
+
+    async def createProject(self , name: str , desc: str = "") -> Project:
+        """
+        Creating a project
+
+        Args:
+            name (str): title to be given to the newly made project
+            desc (str , optional): description to be given to the newly made project. defaults to ""
+
+        Returns:
+            Project: created project
+        """
+        validateTextLength(name , self.setting.MAX_NAME_WORD_LENGTH , "Project name")
+        validateTextLength(desc , self.setting.MAX_DESC_WORD_LENGTH , "Project description")
+
+        newProject = Project(name , desc)
+        async with self.projects.unit_of_work():
+            validateProjectName(await self.projects.name_exists(name))
+            validateProjectNumber(await self.projects.reserve_slots(self.setting.MAX_NUMBER_OF_PROJECTS))
+            await self.projects.add(newProject)
+        self._publish("project.created" , newProject.id , rowData(newProject))
+        return newProject
+
+    async def editProject(self , projectId:str , newName: str | None = None , newDesc: str | None = None , expectedVersion: int | None = None) -> Project:
+        """
+        Updating a project
+
+        Args:
+            projectId (str) : id of the project we want to have changes upon
+            newName (str | None , optional): new title to be given to the project. defaults to None
+            newDesc (str | None , optional): new description to be given to the project. defaults to None
+            expectedVersion (int | None , optional): version the project must still have (optimistic concurrency). defaults to None
+
+        Raises:
+            ValueError: if project is not found or its version is not expectedVersion
+
+        Returns:
+            Project: updated project
+        """
+        if newName:
+            validateTextLength(newName , self.setting.MAX_NAME_WORD_LENGTH , "Project name")
+            validateProjectName(await self.projects.name_exists(newName , projectId))
+        if newDesc:
+            validateTextLength(newDesc , self.setting.MAX_DESC_WORD_LENGTH , "Project description")
+
+        values = Project.editValues(newName=newName , newDesc=newDesc)
+        if values:
+            editedProject = await self.projects.update_fields(projectId , values , expectedVersion)
+        else:
+            editedProject = await self.projects.get(projectId)
+            if editedProject and expectedVersion is not None and editedProject.version != expectedVersion:
+                raise ValueError("Project version mismatch")
+
+        if not editedProject:
+            if expectedVersion is not None and await self.projects.get(projectId):
+                raise ValueError("Project version mismatch")
+            raise ValueError("Project not found")
+
+        if values:
+            self._publish("project.updated" , projectId , rowData(editedProject))
+        return editedProject
+
+    async def deleteProject(self , projectId: str , expectedVersion: int | None = None) -> int:
+        """
+        Deleting a project with its tasks (one DELETE , the tasks go through the foreign key cascade)
+
+        Args:
+            projectId (str): id of the project to be deleted
+            expectedVersion (int | None , optional): version the project must still have (optimistic concurrency). defaults to None
+
+        Raises:
+            ValueError: if project is not found or its version is not expectedVersion
+
+        Returns:
+            int: number of deleted tasks of the project
+        """
+        deleted = await self.projects.delete_cascade([projectId] , expectedVersion)
+        if projectId not in deleted:
+            # only looked up to tell the two failures apart
+            if expectedVersion is not None and await self.projects.get(projectId):
+                raise ValueError("Project version mismatch")
+            raise ValueError("Project not found")
+
+        self._publish("project.deleted" , projectId , {"id": projectId , "deleted_tasks": deleted[projectId]})
+        return deleted[projectId]
+
+    async def deleteProjects(self , projectIds: list[str]) -> dict[str , int]:
+        """
+        Deleting many projects with their tasks , BULK_DELETE_BATCH_SIZE projects per statement (and per transaction)
+
+        Args:
+            projectIds (list[str]): ids of the projects to be deleted
+
+        Returns:
+            dict[str , int]: number of deleted tasks of every deleted project , the projects not found are left out
+        """
+        projectIds = list(dict.fromkeys(projectIds))
+        deleted = {}
+        for start in range(0 , len(projectIds) , BULK_DELETE_BATCH_SIZE):
+            batch = await self.projects.delete_cascade(projectIds[start:start + BULK_DELETE_BATCH_SIZE])
+            for projectId , deletedTasks in batch.items():
+                self._publish("project.deleted" , projectId , {"id": projectId , "deleted_tasks": deletedTasks})
+            deleted.update(batch)
+        return deleted
+
+    async def list(self) -> list[Project]:
+        """
+        Listing the projects
+
+        Returns:
+            list[Projects] : list of the projects
+        """
+        return await self.projects.list()
+
+    async def listPage(self , limit: int , after: str | None = None , fields: list[str] | None = None) -> tuple[list , str | None]:
+        """
+        Listing one page of the projects
+
+        Args:
+            limit (int): maximum number of projects in the page
+            after (str | None , optional): cursor returned with the previous page. defaults to None
+            fields (list[str] | None , optional): fields to return for every project. defaults to None (every field)
+
+        Raises:
+            ValueError: if one of the fields is unknown
+
+        Returns:
+            tuple[list , str | None]: the page and the cursor of the next page (None on the last page)
+        """
+        if fields:
+            validateFields(fields , PROJECT_FIELDS)
+            fields = ["id"] + [f for f in fields if f != "id"]
+
+        # one extra row tells whether another page exists without a count query
+        rows = await self.projects.list_page(limit + 1 , after , fields)
+        if len(rows) <= limit:
+            return rows , None
+        page = rows[:limit]
+        return page , page[-1]["id"] if fields else page[-1].id
+
+    async def getProject(self, projectId: str) -> Project:
+        """
+        Get a single project by its id.
+
+        Args:
+            projectId (str): id of the project we want
+
+        Raises:
+            ValueError: if project is not found
+
+        Returns:
+            Project: the found project
+        """
+        project = await self.projects.get(projectId)
+        if not project:
+            raise ValueError("Project not found")
+        return project
+
+    async def projectVersion(self , projectId: str) -> int:
+        """
+        Version of a project (its ETag) , read without loading the project
+
+        Args:
+            projectId (str): id of the project
+
+        Raises:
+            ValueError: if project is not found
+
+        Returns:
+            int: the version
+        """
+        version = await self.projects.get_version(projectId)
+        if version is None:
+            raise ValueError("Project not found")
+        return version
+
+    async def getProjects(self , projectIds: list[str]) -> tuple[list[Project] , list[str]]:
+        """
+        Get many projects by their ids with one query (the cached ones are not read again)
+
+        Args:
+            projectIds (list[str]): ids of the projects we want
+
+        Returns:
+            tuple[list[Project] , list[str]]: the found projects and the ids of the missing ones , both in the order of projectIds
+        """
+        found = await self.projects.get_many(projectIds)
+        projectIds = list(dict.fromkeys(projectIds))
+        return [found[rowId] for rowId in projectIds if rowId in found] , [rowId for rowId in projectIds if rowId not in found]
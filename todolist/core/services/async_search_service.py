@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from todolist.data.async_projects_repo import AsyncProjectsRepo
+from todolist.data.async_tasks_repo import AsyncTasksRepo
+from todolist.data.cursor import encodeCursor, decodeCursor
+
+# kinds of the search results , in the order of the results of equal rank
+SEARCH_KINDS = ["project" , "task"]
+
+
+class AsyncSearchService:
+    """
+    A class used to represent the full text search over the projects and the tasks (name and description).
+    Results of both kinds are merged by rank , pages are walked with a keyset cursor on (rank , kind , id)
+
+    Attributes:
+        projects (AsyncProjectsRepo): a project repository to search
+        tasks (AsyncTasksRepo): a task repository to search
+    """
+
+    def __init__(self , projects_repo: AsyncProjectsRepo , tasks_repo: AsyncTasksRepo):
+        """
+        Initializing an async search service
+
+        Args:
+            projects_repo (AsyncProjectsRepo) : Project repository to search
+            tasks_repo (AsyncTasksRepo) : Task repository to search
+        """
+        self.projects = projects_repo
+        self.tasks = tasks_repo
+
+    async def search(self , query: str , limit: int , after: str | None = None , kind: str | None = None) -> tuple[list[dict] , str | None]:
+        """
+        Searching the projects and tasks matching every word of a query , best match first
+
+        Args:
+            query (str): text typed by the user
+            limit (int): maximum number of results in the page
+            after (str | None , optional): cursor returned with the previous page. defaults to None
+            kind (str | None , optional): only search this kind ("project" or "task"). defaults to None (both)
+
+        Raises:
+            ValueError: if the kind is unknown or the cursor is invalid
+
+        Returns:
+            tuple[list[dict] , str | None]: the page (kind , rank and the fields of the row) and the cursor of the next page
+        """
+        if kind is not None and kind not in SEARCH_KINDS:
+            raise ValueError(f"Unknown kind {kind} , please use one from this list: {SEARCH_KINDS}")
+        cursor = self._decode(after) if after else None
+
+        results = []
+        for resultKind , repo in (("project" , self.projects) , ("task" , self.tasks)):
+            if kind is not None and kind != resultKind:
+                continue
+            # one extra row tells whether another page exists without a count query
+            rows = await repo.search(query , limit + 1 , self._after(cursor , resultKind))
+            results += [(rank , resultKind , row) for row , rank in rows]
+
+        results.sort(key=lambda result: (-result[0] , result[1] , result[2].id))
+        nextCursor = None
+        if len(results) > limit:
+            rank , resultKind , row = results[limit - 1]
+            nextCursor = encodeCursor([rank , resultKind , row.id])
+        return [self._result(rank , resultKind , row) for rank , resultKind , row in results[:limit]] , nextCursor
+
+    def _after(self , cursor: tuple | None , kind: str) -> tuple[float , str | None] | None:
+        """
+        Where the search of a kind starts: rows of a kind sorted before the cursor kind only count below the cursor
+        rank , rows of a kind sorted after it also count at the cursor rank
+        """
+        if cursor is None:
+            return None
+        rank , cursorKind , rowId = cursor
+        if kind == cursorKind:
+            return rank , rowId
+        return (rank , "") if SEARCH_KINDS.index(kind) > SEARCH_KINDS.index(cursorKind) else (rank , None)
+
+    def _decode(self , after: str) -> tuple:
+        rank , kind , rowId = decodeCursor(after , 3)
+        if not isinstance(rank , (int , float)) or kind not in SEARCH_KINDS or not isinstance(rowId , str):
+            raise ValueError("Invalid cursor")
+        return float(rank) , kind , rowId
+
+    def _result(self , rank: float , kind: str , row) -> dict:
+        result = {"kind": kind , "rank": rank , "id": row.id , "name": row.name , "desc": row.desc}
+        if kind == "task":
+            result.update(project_id=row.for_project , status=row.status , deadline=row.deadline)
+        return result
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from datetime import datetime , timezone
+
+from todolist.data.async_projects_repo import AsyncProjectsRepo
+from todolist.data.async_stats_repo import AsyncStatsRepo
+
+
+class AsyncStatsService:
+    """
+    A class used to represent the statistics of the tasks (counts by status , overdue and late tasks , mean time to close)
+    of a project or of every project , served from the project_stats rollup
+
+    Attributes:
+        projects (AsyncProjectsRepo): a project repository to check the projects with
+        stats (AsyncStatsRepo): a stats repository to read the rollup from
+    """
+
+    def __init__(self , projects_repo: AsyncProjectsRepo , stats_repo: AsyncStatsRepo):
+        """
+        Initializing an async stats service
+
+        Args:
+            projects_repo (AsyncProjectsRepo) : Project repository to check the projects with
+            stats_repo (AsyncStatsRepo) : Stats repository to read the rollup from
+        """
+        self.projects = projects_repo
+        self.stats = stats_repo
+
+    async def getProjectStats(self , projectId: str) -> dict:
+        """
+        Statistics of the tasks of a project
+
+        Args:
+            projectId (str): id of the project
+
+        Raises:
+            ValueError: if the project does not exist
+
+        Returns:
+            dict: the statistics (see _stats) and the id of the project
+        """
+        async with self.stats.unit_of_work():
+            if not await self.projects.get(projectId):
+                raise ValueError("Project not found")
+            counters = await self.stats.get(projectId)
+            overdue = await self.stats.count_overdue(datetime.now(timezone.utc) , projectId)
+        return {"project_id": projectId , **self._stats(counters , overdue)}
+
+    async def getStats(self) -> dict:
+        """
+        Statistics of the tasks of every project
+
+        Returns:
+            dict: the statistics (see _stats)
+        """
+        async with self.stats.unit_of_work():
+            counters = await self.stats.total()
+            overdue = await self.stats.count_overdue(datetime.now(timezone.utc))
+        return self._stats(counters , overdue)
+
+    async def rebuildStats(self , dryRun: bool = False) -> dict:
+        """
+        Checking the rollup against the tasks and rewriting it from them (consistency check)
+
+        Args:
+            dryRun (bool , optional): only report the drifted projects. defaults to False
+
+        Returns:
+            dict: the ids of the projects whose statistics had drifted and whether the rollup was rewritten
+        """
+        drifted = await self.stats.rebuild(dryRun)
+        return {"drifted": drifted , "rebuilt": not dryRun}
+
+    def _stats(self , counters: dict , overdue: int) -> dict:
+        todo , doing , done = int(counters["todo"]) , int(counters["doing"]) , int(counters["done"])
+        closedTimed = int(counters["closed_timed"])
+        return {
+            "total": todo + doing + done ,
+            "todo": todo ,
+            "doing": doing ,
+            "done": done ,
+            "overdue": overdue ,
+            "closed_late": int(counters["closed_late"]) ,
+            # tasks created before at_created was recorded have no time to close
+            "mean_close_seconds": float(counters["close_seconds"]) / closedTimed if closedTimed else None ,
+        }
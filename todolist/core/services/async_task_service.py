@@ -0,0 +1,562 @@
+from todolist.core.Models.models import Task
+from todolist.data.async_projects_repo import AsyncProjectsRepo
+from todolist.data.async_tasks_repo import AsyncTasksRepo
+from todolist.data.task_filter import TaskFilter
+from todolist.config.setting import Setting
+from todolist.core.validation.validation import validateTextLength , validateStatus , validateTaskNumber , validateDeadline , validateFields , validateSort , TASK_FIELDS , TASK_SORTS
+from todolist.events import EventBroker, Event, rowData
+from datetime import datetime , timezone
+from typing import AsyncIterable , AsyncIterator
+from sqlalchemy.exc import IntegrityError
+
+# number of rows inserted per statement by the bulk import
+BULK_BATCH_SIZE = 1000
+
+class AsyncTaskService:
+    """
+    A class used to represent the services provided for tasks on top of the async repositories.
+    Mirrors TaskService one to one, every method has to be awaited.
+
+    Attributes:
+        projects (AsyncProjectsRepo): a project repository to work with
+        tasks (AsyncTasksRepo): a task repository to work with
+        setting (Setting): rules and constraints for the service
+        events (EventBroker | None): where the changes are published , None to not publish them
+    """
+    def __init__(self, projects_repo: AsyncProjectsRepo , tasks_repo: AsyncTasksRepo , setting: Setting , events: EventBroker | None = None):
+        """
+        Initializing an async task service
+
+        Args:
+            projects_repo (AsyncProjectsRepo) : Project repository to work with
+            tasks_repo (AsyncTasksRepo) : Task repository to work with
+            events (EventBroker | None , optional) : where the changes are published. defaults to None
+        """
+        self.projects = projects_repo
+        self.tasks = tasks_repo
+        self.setting = setting
+        self.events = events
+
+    def _publish(self , type: str , projectId: str | None , data: dict) -> None:
+        """
+        Publishing an event of a committed change to the change feed (if the service has a broker)
+        """
+        if self.events:
+            self.events.publish(Event(type , projectId , data))
+
+    async def addTask(self , projectId: str , name:str , desc: str = "" , status: str = "todo" , deadline: datetime | None = None ) -> Task:
+        """
+        Adding a task to a project
+
+        Args:
+            projectId (str): id of the project to add the task to
+            name (str) : name of the task set to be added
+            desc (str, optional) : description of the task set to be added. defaults to ""
+            status ({todo , doing , done}, optional) : status of the task set to be added. defaults to todo
+            deadline (datetime | None, optional): deadline of the task set to be added. defaults to None
+
+        Raises:
+            ValueError: if project is not found
+
+        Returns:
+            Task: added task
+        """
+        self._validateNewTask(name , desc , status , deadline)
+
+        newTask = Task(projectId , name , desc , status , deadline)
+        async with self.tasks.unit_of_work():
+            validateTaskNumber(await self.tasks.reserve_slots(self.setting.MAX_NUMBER_OF_TASKS))
+            # the project check is folded into the insert
+            if not await self.tasks.add_to_project(newTask):
+                raise ValueError("Project not found")
+        self._publish("task.created" , projectId , rowData(newTask))
+        return newTask
+
+    def _validateNewTask(self , name: str , desc: str , status: str , deadline: datetime | None) -> None:
+        """
+        Validating the fields of a task about to be created
+
+        Raises:
+            ValueError: if one of the fields is not valid
+        """
+        validateTextLength(name , self.setting.MAX_NAME_WORD_LENGTH , "Task name")
+        validateTextLength(desc , self.setting.MAX_DESC_WORD_LENGTH , "Task desc")
+        validateStatus(status)
+
+        if deadline:
+            validateDeadline(deadline)
+
+    async def addTasksBulk(self , projectId: str , rows: AsyncIterable[tuple[int , dict | str]]) -> list[dict]:
+        """
+        Adding many tasks to a project , inserted BULK_BATCH_SIZE at a time as the rows arrive
+
+        Args:
+            projectId (str): id of the project to add the tasks to
+            rows (AsyncIterable[tuple[int , dict | str]]): line number and either the task fields (name , desc , status , deadline) or a parse error
+
+        Raises:
+            ValueError: if project is not found
+
+        Returns:
+            list[dict]: one result per row , {"line" , "id"} when created or {"line" , "error"} when rejected.
+                if the project is deleted during the import , the rows not inserted yet are rejected with "Project not found"
+        """
+        if not await self.projects.get(projectId):
+            raise ValueError("Project not found")
+
+        results = []
+        batch = []
+        projectFound = True
+        async for lineNumber , row in rows:
+            if not projectFound:
+                results.append({"line": lineNumber , "error": "Project not found"})
+                continue
+            if isinstance(row , str):
+                results.append({"line": lineNumber , "error": row})
+                continue
+            try:
+                self._validateNewTask(row["name"] , row["desc"] , row["status"] , row["deadline"])
+            except ValueError as e:
+                results.append({"line": lineNumber , "error": str(e)})
+                continue
+
+            batch.append((lineNumber , Task(projectId , row["name"] , row["desc"] , row["status"] , row["deadline"])))
+            if len(batch) >= BULK_BATCH_SIZE:
+                projectFound = await self._insertBatch(batch , results)
+                batch = []
+        if batch:
+            await self._insertBatch(batch , results)
+
+        results.sort(key=lambda r: r["line"])
+        return results
+
+    async def _insertBatch(self , batch: list[tuple[int , Task]] , results: list[dict]) -> bool:
+        """
+        Inserting one batch of the bulk import in its own transaction
+
+        Args:
+            batch (list[tuple[int , Task]]): line number and task of every row of the batch
+            results (list[dict]): results of the import , one is added per row of the batch
+
+        Raises:
+            IntegrityError: if the insert failed while the project still exists
+
+        Returns:
+            bool: False if the project was deleted since the import started (the batch is not inserted)
+        """
+        projectId = batch[0][1].for_project
+        try:
+            async with self.tasks.unit_of_work():
+                if not await self.tasks.reserve_slots(self.setting.MAX_NUMBER_OF_TASKS , len(batch)):
+                    results.extend({"line": lineNumber , "error": "Max number of tasks reached"} for lineNumber , _ in batch)
+                    return True
+                await self.tasks.add_many([task for _ , task in batch])
+        except IntegrityError:
+            # the foreign key of the tasks , only looked up to tell it from the other failures
+            if await self.projects.get(projectId):
+                raise
+            results.extend({"line": lineNumber , "error": "Project not found"} for lineNumber , _ in batch)
+            return False
+        # one event per batch , NOTIFY payloads are too small for the rows
+        self._publish("task.bulk_created" , projectId , {"count": len(batch)})
+        results.extend({"line": lineNumber , "id": task.id} for lineNumber , task in batch)
+        return True
+
+    async def editTask(self , taskId: str , name: str | None = None , desc: str | None = None , status: str | None = None  , deadline: datetime | None = None , expectedVersion: int | None = None) -> Task:
+        """
+        Updating a task
+
+        Args:
+            taskId (str): id of the task set to be updated
+            name (str | None, optional) : name of the task set to be updated. defaults to None
+            desc (str | None, optional) : description of the task set to be updated. defaults to None
+            status ({todo , doing , done} | None , optional) : status of the task set to be updated. defaults to None
+            deadline (datetime | None, optional): deadline of the task set to be updated. defaults to None
+            expectedVersion (int | None , optional): version the task must still have (optimistic concurrency). defaults to None
+
+        Raises:
+            ValueError: if task is not found or its version is not expectedVersion
+
+        Returns:
+            Task: updated task
+        """
+        self._validateEdit(name , desc , status , deadline)
+
+        values = Task.editValues(newName= name , newDesc= desc , newStatus=status , newDeadline= deadline)
+        if values:
+            editedTask = await self.tasks.update_fields(taskId , values , expectedVersion)
+        else:
+            editedTask = await self.tasks.get(taskId)
+            if editedTask and expectedVersion is not None and editedTask.version != expectedVersion:
+                raise ValueError("Task version mismatch")
+
+        if not editedTask:
+            if expectedVersion is not None and await self.tasks.get(taskId):
+                raise ValueError("Task version mismatch")
+            raise ValueError("Task not found")
+
+        if values:
+            self._publish("task.updated" , editedTask.for_project , rowData(editedTask))
+        return editedTask
+
+    def _validateEdit(self , name: str | None , desc: str | None , status: str | None , deadline: datetime | None) -> None:
+        """
+        Validating the fields given to edit a task
+
+        Raises:
+            ValueError: if one of the fields is not valid
+        """
+        if name:
+            validateTextLength(name , self.setting.MAX_NAME_WORD_LENGTH , "Task name")
+        if desc:
+            validateTextLength(desc , self.setting.MAX_DESC_WORD_LENGTH , "Task desc")
+        if status:
+            validateStatus(status)
+        if deadline:
+            validateDeadline(deadline)
+
+    async def editTasks(self , edits: list[dict]) -> list[dict]:
+        """
+        Updating many tasks in one transaction. Edits making the same change are applied together , with one
+        UPDATE per distinct change (Task.editValues , so at_closed is stamped in SQL on the first transition to done)
+
+        Args:
+            edits (list[dict]): id of the task and the fields to change (name , desc , status , deadline , None to keep) of every edit
+
+        Returns:
+            list[dict]: one result per edit in order , {"id" , "task"} when updated or {"id" , "error"} when rejected
+        """
+        results: list[dict | None] = [None] * len(edits)
+        # change (name , desc , status , deadline) -> indexes of the edits making it
+        changes: dict[tuple , list[int]] = {}
+        seen = set()
+        for index , edit in enumerate(edits):
+            if edit["id"] in seen:
+                results[index] = {"id": edit["id"] , "error": "Task edited twice in the batch"}
+                continue
+            seen.add(edit["id"])
+            try:
+                self._validateEdit(edit["name"] , edit["desc"] , edit["status"] , edit["deadline"])
+            except ValueError as e:
+                results[index] = {"id": edit["id"] , "error": str(e)}
+                continue
+            changes.setdefault((edit["name"] , edit["desc"] , edit["status"] , edit["deadline"]) , []).append(index)
+
+        now = datetime.now(timezone.utc)
+        edited = {}
+        changed = []
+        async with self.tasks.unit_of_work():
+            for (name , desc , status , deadline) , indexes in changes.items():
+                taskIds = [edits[index]["id"] for index in indexes]
+                values = Task.editValues(newName=name , newDesc=desc , newStatus=status , newDeadline=deadline , now=now)
+                if values:
+                    rows = await self.tasks.update_many(taskIds , values)
+                    changed.extend(rows)
+                else:
+                    rows = (await self.tasks.get_many(taskIds)).values()
+                edited.update((task.id , task) for task in rows)
+
+        for index , edit in enumerate(edits):
+            if results[index] is None:
+                task = edited.get(edit["id"])
+                results[index] = {"id": edit["id"] , "task": task} if task else {"id": edit["id"] , "error": "Task not found"}
+        for task in changed:
+            self._publish("task.updated" , task.for_project , rowData(task))
+        return results
+
+    async def changeTaskStatus(self , taskId: str , newStatus: str) -> Task:
+        """
+        Changing the status of a task
+
+        Args:
+            taskId (str): id of the task set to have it's status changed
+            newStatus ({todo , doing , done}): new status for the task
+
+        Raises:
+            ValueError: if task is not found
+
+        Returns:
+            Task: updated task
+        """
+        validateStatus(newStatus)
+
+        changedTask = await self.tasks.update_fields(taskId , Task.editValues(newStatus=newStatus.strip()))
+
+        if not changedTask:
+            raise ValueError("Task not found")
+
+        self._publish("task.updated" , changedTask.for_project , rowData(changedTask))
+        return changedTask
+
+    async def deleteTask(self , taskId: str , expectedVersion: int | None = None) -> bool:
+        """
+        Deleting a task
+
+        Args:
+            taskId (str): id of the task set to get deleted
+            expectedVersion (int | None , optional): version the task must still have (optimistic concurrency). defaults to None
+
+        Raises:
+            ValueError: if the task exists but its version is not expectedVersion
+
+        Returns:
+            bool: A boolean indicating the success of the operation
+        """
+        projectId = await self.tasks.delete(taskId , expectedVersion)
+        if projectId is None:
+            if expectedVersion is not None and await self.tasks.get(taskId):
+                raise ValueError("Task version mismatch")
+            return False
+        self._publish("task.deleted" , projectId , {"id": taskId})
+        return True
+
+    async def listTasks(self , projectId: str) -> list[Task]:
+        """
+        Listing all the tasks of a project
+
+        Args:
+            projectId (str) : id of the project to list it's tasks
+
+        Returns:
+            list[Task]: list of the tasks of project with id == projectId
+        """
+        async with self.tasks.unit_of_work():
+            if not await self.projects.get(projectId):
+                raise ValueError("Project not found")
+
+            return await self.tasks.list_by_project(projectId)
+
+    async def tasksVersion(self , projectId: str) -> int:
+        """
+        Version of the tasks of a project , changed by every write to them (ETag of the task list)
+
+        Args:
+            projectId (str) : id of the project
+
+        Raises:
+            ValueError: if project is not found
+
+        Returns:
+            int: the version
+        """
+        version = await self.projects.get_tasks_version(projectId)
+        if version is None:
+            raise ValueError("Project not found")
+        return version
+
+    async def listTasksPage(
+        self ,
+        projectId: str ,
+        limit: int ,
+        after: str | None = None ,
+        fields: list[str] | None = None ,
+        statuses: list[str] | None = None ,
+        deadlineBefore: datetime | None = None ,
+        deadlineAfter: datetime | None = None ,
+        closedSince: datetime | None = None ,
+        sort: str = "id" ,
+    ) -> tuple[list , str | None]:
+        """
+        Listing one page of the tasks of a project , filtered and sorted in the query
+
+        Args:
+            projectId (str) : id of the project to list it's tasks
+            limit (int): maximum number of tasks in the page
+            after (str | None , optional): cursor returned with the previous page. defaults to None
+            fields (list[str] | None , optional): fields to return for every task. defaults to None (every field)
+            statuses (list[str] | None , optional): only tasks with one of these statuses. defaults to None
+            deadlineBefore (datetime | None , optional): only tasks with a deadline before this time. defaults to None
+            deadlineAfter (datetime | None , optional): only tasks with a deadline at or after this time. defaults to None
+            closedSince (datetime | None , optional): only tasks closed at or after this time. defaults to None
+            sort (str , optional): order of the tasks (see TASK_SORTS). defaults to "id"
+
+        Raises:
+            ValueError: if project is not found , one of the fields , statuses or the sort is unknown or the cursor is invalid
+
+        Returns:
+            tuple[list , str | None]: the page and the cursor of the next page (None on the last page)
+        """
+        taskFilter = self._taskFilter(statuses , deadlineBefore , deadlineAfter , closedSince , sort)
+        selected = self._selectedFields(fields , taskFilter)
+
+        async with self.tasks.unit_of_work():
+            if not await self.projects.get(projectId):
+                raise ValueError("Project not found")
+
+            # one extra row tells whether another page exists without a count query
+            rows = await self.tasks.list_by_project_page(projectId , limit + 1 , after , selected , taskFilter)
+        return self._page(rows , limit , fields , taskFilter)
+
+    async def listAllTasksPage(
+        self ,
+        limit: int ,
+        after: str | None = None ,
+        fields: list[str] | None = None ,
+        statuses: list[str] | None = None ,
+        deadlineBefore: datetime | None = None ,
+        deadlineAfter: datetime | None = None ,
+        closedSince: datetime | None = None ,
+        sort: str = "id" ,
+    ) -> tuple[list , str | None]:
+        """
+        Listing one page of the tasks of every project , filtered and sorted in the query
+
+        Args:
+            limit (int): maximum number of tasks in the page
+            after (str | None , optional): cursor returned with the previous page. defaults to None
+            fields (list[str] | None , optional): fields to return for every task. defaults to None (every field)
+            statuses (list[str] | None , optional): only tasks with one of these statuses. defaults to None
+            deadlineBefore (datetime | None , optional): only tasks with a deadline before this time. defaults to None
+            deadlineAfter (datetime | None , optional): only tasks with a deadline at or after this time. defaults to None
+            closedSince (datetime | None , optional): only tasks closed at or after this time. defaults to None
+            sort (str , optional): order of the tasks (see TASK_SORTS). defaults to "id"
+
+        Raises:
+            ValueError: if one of the fields , statuses or the sort is unknown or the cursor is invalid
+
+        Returns:
+            tuple[list , str | None]: the page and the cursor of the next page (None on the last page)
+        """
+        taskFilter = self._taskFilter(statuses , deadlineBefore , deadlineAfter , closedSince , sort)
+        selected = self._selectedFields(fields , taskFilter)
+        rows = await self.tasks.list_page(limit + 1 , after , selected , taskFilter)
+        return self._page(rows , limit , fields , taskFilter)
+
+    def _taskFilter(self , statuses: list[str] | None , deadlineBefore: datetime | None , deadlineAfter: datetime | None , closedSince: datetime | None , sort: str) -> TaskFilter:
+        for status in statuses or []:
+            validateStatus(status)
+        validateSort(sort , TASK_SORTS)
+        return TaskFilter(statuses , deadlineBefore , deadlineAfter , closedSince , sort)
+
+    def _selectedFields(self , fields: list[str] | None , taskFilter: TaskFilter) -> list[str] | None:
+        """
+        Columns to select for a projection: id first , and the sort column the cursor is made of
+        """
+        if not fields:
+            return None
+        validateFields(fields , TASK_FIELDS)
+        selected = ["id"] + [f for f in fields if f != "id"]
+        if taskFilter.sortKey not in selected:
+            selected.append(taskFilter.sortKey)
+        return selected
+
+    def _page(self , rows: list , limit: int , fields: list[str] | None , taskFilter: TaskFilter) -> tuple[list , str | None]:
+        """
+        The page out of limit + 1 rows and the cursor of the next page , projected rows only keep the requested fields
+        """
+        nextCursor = taskFilter.cursorOf(rows[limit - 1]) if len(rows) > limit else None
+        page = rows[:limit]
+        if fields and taskFilter.sortKey not in fields and taskFilter.sortKey != "id":
+            page = [{name: value for name , value in row.items() if name != taskFilter.sortKey} for row in page]
+        return page , nextCursor
+
+    async def exportTasks(self , projectId: str) -> AsyncIterator:
+        """
+        Exporting all the tasks of a project as a stream of rows
+
+        Args:
+            projectId (str) : id of the project to export it's tasks
+
+        Raises:
+            ValueError: if project is not found
+
+        Returns:
+            AsyncIterator: mappings of the TASK_FIELDS columns (the same for every format) , ordered by id
+        """
+        if not await self.projects.get(projectId):
+            raise ValueError("Project not found")
+
+        return self.tasks.stream_by_project(projectId , TASK_FIELDS)
+
+    async def autoCloseOverdueTasks(self) -> int:
+        """
+        Automatically close all overdue tasks.
+
+        Returns:
+            int: number of tasks that were updated
+        """
+        now = datetime.now(timezone.utc)
+        closed = await self.tasks.close_overdue(now , self.setting.AUTO_CLOSE_CHUNK_SIZE)
+        if closed:
+            # may span every project , subscribers reload what they show
+            self._publish("task.closed" , None , {"count": closed})
+        return closed
+
+    async def closeOverdueTasks(self , taskIds: list[str]) -> int:
+        """
+        Close some overdue tasks (the ones of the deadline timer). tasks that are no longer open or overdue are left as they are
+
+        Args:
+            taskIds (list[str]): ids of the tasks to close
+
+        Returns:
+            int: number of tasks that were updated
+        """
+        closed = await self.tasks.close_overdue_ids(taskIds , datetime.now(timezone.utc))
+        if closed:
+            self._publish("task.closed" , None , {"count": closed})
+        return closed
+
+    async def upcomingDeadlines(self , after: tuple[datetime , str] , until: datetime , limit: int) -> list:
+        """
+        Next deadlines of the open tasks
+
+        Args:
+            after (tuple[datetime , str]): only deadlines after this (deadline , task id) pair
+            until (datetime): only deadlines up to this time
+            limit (int): maximum number of deadlines
+
+        Returns:
+            list: rows with the id and deadline of the tasks , ordered by deadline then id
+        """
+        return await self.tasks.upcoming_deadlines(after , until , limit)
+
+    async def getTask(self, taskId: str) -> Task:
+        """
+        Get a single task by its id.
+
+        Args:
+            taskId (str): id of the task we want
+
+        Raises:
+            ValueError: if task is not found
+
+        Returns:
+            Task: the found task
+        """
+        task = await self.tasks.get(taskId)
+        if not task:
+            raise ValueError("Task not found")
+        return task
+
+    async def taskVersion(self , taskId: str) -> int:
+        """
+        Version of a task (its ETag) , read without loading the task
+
+        Args:
+            taskId (str): id of the task
+
+        Raises:
+            ValueError: if task is not found
+
+        Returns:
+            int: the version
+        """
+        version = await self.tasks.get_version(taskId)
+        if version is None:
+            raise ValueError("Task not found")
+        return version
+
+    async def getTasks(self , taskIds: list[str]) -> tuple[list[Task] , list[str]]:
+        """
+        Get many tasks by their ids with one query (the cached ones are not read again)
+
+        Args:
+            taskIds (list[str]): ids of the tasks we want
+
+        Returns:
+            tuple[list[Task] , list[str]]: the found tasks and the ids of the missing ones , both in the order of taskIds
+        """
+        found = await self.tasks.get_many(taskIds)
+        taskIds = list(dict.fromkeys(taskIds))
+        return [found[rowId] for rowId in taskIds if rowId in found] , [rowId for rowId in taskIds if rowId not in found]
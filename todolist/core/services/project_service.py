@@ -1,8 +1,8 @@
 from todolist.core.Models.models import Project
-from todolist.data.projects_repo import ProjectsRepo
-from todolist.data.tasks_repo import TasksRepo
+from todolist.data.protocols import ProjectsRepository, TasksRepository
 from todolist.config.setting import Setting
 from todolist.core.validation.validation import validateTextLength , validateProjectName , validateProjectNumber
+from todolist.events import EventBroker, Event, rowData
 
 
 class ProjectService:
@@ -10,22 +10,32 @@ class ProjectService:
     A class used to represent the services provided for projects
 
     Attributes:
-        projects (ProjectRepo): a project repository to work with 
-        tasks (TaskRepo): a task repository to work with 
+        projects (ProjectsRepository): a project repository to work with 
+        tasks (TasksRepository): a task repository to work with 
         setting (Setting): rules and constraints for the service
+        events (EventBroker | None): where the changes are published , None to not publish them
     """
     
-    def __init__(self , projects_repo: ProjectsRepo , tasks_repo: TasksRepo , setting: Setting):
+    def __init__(self , projects_repo: ProjectsRepository , tasks_repo: TasksRepository , setting: Setting , events: EventBroker | None = None):
         """
         Initializing a project service
 
         Args:
-            projects_repo (ProjectsRepo) : Project repository to work with
-            tasks_repo (TasksRepo) : Task repository to work with
+            projects_repo (ProjectsRepository) : Project repository to work with (of any storage backend)
+            tasks_repo (TasksRepository) : Task repository to work with (of the same backend)
+            events (EventBroker | None , optional) : where the changes are published. defaults to None
         """
         self.projects = projects_repo
         self.tasks = tasks_repo
         self.setting = setting
+        self.events = events
+
+    def _publish(self , type: str , projectId: str | None , data: dict) -> None:
+        """
+        Publishing an event of a committed change to the change feed (if the service has a broker)
+        """
+        if self.events:
+            self.events.publish(Event(type , projectId , data))
     
     def createProject(self , name: str , desc: str = "") -> Project:
         """
@@ -41,11 +51,13 @@ class ProjectService:
         """
         validateTextLength(name , self.setting.MAX_NAME_WORD_LENGTH , "Project name")
         validateTextLength(desc , self.setting.MAX_DESC_WORD_LENGTH , "Project description")
-        validateProjectName(name , self.projects.list()) 
-        validateProjectNumber(self.projects.length() , self.setting.MAX_NUMBER_OF_PROJECTS)
 
         newProject = Project(name , desc)
-        self.projects.add(newProject)
+        with self.projects.unit_of_work():
+            validateProjectName(self.projects.name_exists(name))
+            validateProjectNumber(self.projects.reserve_slots(self.setting.MAX_NUMBER_OF_PROJECTS))
+            self.projects.add(newProject)
+        self._publish("project.created" , newProject.id , rowData(newProject))
         return newProject
     
     def editProject(self , projectId:str , newName: str | None = None , newDesc: str | None = None ) -> Project:
@@ -65,21 +77,23 @@ class ProjectService:
         """
         if newName:
             validateTextLength(newName , self.setting.MAX_NAME_WORD_LENGTH , "Project name")
-            validateProjectName(newName , self.projects.list() , projectId) 
+            validateProjectName(self.projects.name_exists(newName , projectId)) 
         if newDesc:
             validateTextLength(newDesc , self.setting.MAX_DESC_WORD_LENGTH , "Project description")
 
-        projectToEdit = self.projects.get(projectId)
+        values = Project.editValues(newName=newName , newDesc=newDesc)
+        editedProject = self.projects.update_fields(projectId , values) if values else self.projects.get(projectId)
 
-        if not projectToEdit:
+        if not editedProject:
             raise ValueError("Project not found")
 
-        projectToEdit.edit(newName=newName , newDesc=newDesc)
-        return self.projects.put(projectToEdit)
+        if values:
+            self._publish("project.updated" , projectId , rowData(editedProject))
+        return editedProject
     
-    def deleteProject(self , projectId: str) -> bool:
+    def deleteProject(self , projectId: str) -> int:
         """
-        Deleting a project
+        Deleting a project with its tasks (one DELETE , the tasks go through the foreign key cascade)
 
         Args:
             projectId (str): id of the project to be deleted
@@ -88,18 +102,14 @@ class ProjectService:
             ValueError: if project is not found
             
         Returns:
-            bool: A bollean indicating the success of the operation 
+            int: number of deleted tasks of the project
         """
-        projectToRemove = self.projects.get(projectId)
-
-        if not projectToRemove: 
+        deleted = self.projects.delete_cascade([projectId])
+        if projectId not in deleted:
             raise ValueError("Project not found")
-        
-        result = self.projects.delete(projectId)
-        if result:
-            self.tasks.delete_project(projectId)
-        
-        return result
+
+        self._publish("project.deleted" , projectId , {"id": projectId , "deleted_tasks": deleted[projectId]})
+        return deleted[projectId]
     
     def list(self) -> list[Project]:
         """
@@ -1,8 +1,8 @@
 from todolist.core.Models.models import Task
-from todolist.data.projects_repo import ProjectsRepo
-from todolist.data.tasks_repo import TasksRepo
+from todolist.data.protocols import ProjectsRepository, TasksRepository
 from todolist.config.setting import Setting
 from todolist.core.validation.validation import validateTextLength , validateStatus , validateTaskNumber , validateDeadline
+from todolist.events import EventBroker, Event, rowData
 from datetime import datetime , timezone
 
 class TaskService:
@@ -10,22 +10,32 @@ class TaskService:
     A class used to represent the services provided for taks
 
     Attributes:
-        projects (ProjectRepo): a project repository to work with 
-        tasks (TaskRepo): a task repository to work with 
+        projects (ProjectsRepository): a project repository to work with 
+        tasks (TasksRepository): a task repository to work with 
         setting (Setting): rules and constraints for the service
+        events (EventBroker | None): where the changes are published , None to not publish them
     """
-    def __init__(self, projects_repo: ProjectsRepo , tasks_repo: TasksRepo , setting: Setting):
+    def __init__(self, projects_repo: ProjectsRepository , tasks_repo: TasksRepository , setting: Setting , events: EventBroker | None = None):
         """
         Initializing a project service
 
         Args:
-            projects_repo (ProjectsRepo) : Project repository to work with
-            tasks_repo (TasksRepo) : Task repository to work with
+            projects_repo (ProjectsRepository) : Project repository to work with (of any storage backend)
+            tasks_repo (TasksRepository) : Task repository to work with (of the same backend)
+            events (EventBroker | None , optional) : where the changes are published. defaults to None
         """
         
         self.projects = projects_repo
         self.tasks = tasks_repo
         self.setting = setting
+        self.events = events
+
+    def _publish(self , type: str , projectId: str | None , data: dict) -> None:
+        """
+        Publishing an event of a committed change to the change feed (if the service has a broker)
+        """
+        if self.events:
+            self.events.publish(Event(type , projectId , data))
     
     def addTask(self , projectId: str , name:str , desc: str = "" , status: str = "todo" , deadline: datetime | None = None ) -> Task:
         """
@@ -47,17 +57,18 @@ class TaskService:
         
         validateTextLength(name , self.setting.MAX_NAME_WORD_LENGTH , "Task name")
         validateTextLength(desc , self.setting.MAX_DESC_WORD_LENGTH , "Task desc")
-        validateTaskNumber(self.tasks.length() , self.setting.MAX_NUMBER_OF_TASKS)
         validateStatus(status)
 
         if deadline:
             validateDeadline(deadline)
 
-        if not self.projects.get(projectId):
-            raise ValueError("Project not found")
-
         newTask = Task(projectId , name , desc , status , deadline)
-        self.tasks.add(newTask)
+        with self.tasks.unit_of_work():
+            validateTaskNumber(self.tasks.reserve_slots(self.setting.MAX_NUMBER_OF_TASKS))
+            # the project check is folded into the insert
+            if not self.tasks.add_to_project(newTask):
+                raise ValueError("Project not found")
+        self._publish("task.created" , projectId , rowData(newTask))
         return newTask
 
     def editTask(self , taskId: str , name: str | None = None , desc: str | None = None , status: str | None = None  , deadline: datetime | None = None) -> Task:
@@ -86,13 +97,15 @@ class TaskService:
         if deadline:
             validateDeadline(deadline)
 
-        taskToEdit = self.tasks.get(taskId)
+        values = Task.editValues(newName= name , newDesc= desc , newStatus=status , newDeadline= deadline)
+        editedTask = self.tasks.update_fields(taskId , values) if values else self.tasks.get(taskId)
 
-        if not taskToEdit:
+        if not editedTask:
             raise ValueError("Task not found")
-        
-        taskToEdit.edit(newName= name , newDesc= desc , newStatus=status , newDeadline= deadline)
-        return self.tasks.put(taskToEdit)
+
+        if values:
+            self._publish("task.updated" , editedTask.for_project , rowData(editedTask))
+        return editedTask
     
     def changeTaskStatus(self , taskId: str , newStatus: str) -> Task:
         """
@@ -110,13 +123,13 @@ class TaskService:
         """
         validateStatus(newStatus)
 
-        taskToChange = self.tasks.get(taskId)
-        
-        if not taskToChange:
+        changedTask = self.tasks.update_fields(taskId , Task.editValues(newStatus=newStatus.strip()))
+
+        if not changedTask:
             raise ValueError("Task not found")
-        
-        taskToChange.changeStatus(newStatus)
-        return self.tasks.put(taskToChange)
+
+        self._publish("task.updated" , changedTask.for_project , rowData(changedTask))
+        return changedTask
     
     def deleteTask(self , taskId: str) -> bool:
         """
@@ -128,7 +141,11 @@ class TaskService:
         Returns:
             bool: A boolean indicating the success of the operation 
         """
-        return self.tasks.delete(taskId)
+        projectId = self.tasks.delete(taskId)
+        if projectId is None:
+            return False
+        self._publish("task.deleted" , projectId , {"id": taskId})
+        return True
     
     def listTasks(self , projectId: str) -> list[Task]:
         """
@@ -140,10 +157,11 @@ class TaskService:
         Returns:
             list[Task]: list of the tasks of project with id == projectId   
         """
-        if not self.projects.get(projectId):
-            raise ValueError("Project not found")
+        with self.tasks.unit_of_work():
+            if not self.projects.get(projectId):
+                raise ValueError("Project not found")
 
-        return self.tasks.list_by_project(projectId)
+            return self.tasks.list_by_project(projectId)
     
     def autoCloseOverdueTasks(self) -> int:
         """
@@ -158,7 +176,11 @@ class TaskService:
             int: number of tasks that were updated
         """
         now = datetime.now(timezone.utc)
-        return self.tasks.close_overdue(now)
+        closed = self.tasks.close_overdue(now , self.setting.AUTO_CLOSE_CHUNK_SIZE)
+        if closed:
+            # may span every project , subscribers reload what they show
+            self._publish("task.closed" , None , {"count": closed})
+        return closed
     
     def getTask(self, taskId: str) -> Task:
         """
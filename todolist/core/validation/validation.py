@@ -1,6 +1,9 @@
 from datetime import datetime
 
 STATUS_TAGS = ["todo" , "doing" , "done"]
+PROJECT_FIELDS = ["id" , "name" , "desc"]
+TASK_FIELDS = ["id" , "for_project" , "name" , "desc" , "status" , "deadline" , "at_closed" , "at_created"]
+TASK_SORTS = ["id" , "-id" , "name" , "-name" , "deadline" , "-deadline" , "at_closed" , "-at_closed"]
 
 
 def validateTextLength(text: str , max_word_length: int , context: str) -> None:
@@ -38,14 +41,12 @@ def validateStatus(status: str) -> None:
     if status not in STATUS_TAGS:
         raise ValueError("Invalid status , please use status from this list: " , STATUS_TAGS)
     
-def validateProjectName(name: str , projects: list , excludeId: str | None = None ):
+def validateProjectName(nameTaken: bool):
     """
     validating project names
 
     Args:
-        name (str) : project name to be validated
-        projects (list) : list of all the projects to check
-        excludeId (str | None , optional ): the id of a excluded project. used to exlude a project from the validation. defaults to None
+        nameTaken (bool) : whether another project already uses the name (answered by the repo with an indexed lookup)
     
     Raises:
         ValueError: if the name is not unique
@@ -53,21 +54,15 @@ def validateProjectName(name: str , projects: list , excludeId: str | None = Non
     Returns:
         None 
     """
-    for p in projects:
-        if excludeId:
-            if p.name == name and p.id != excludeId:
-                raise ValueError("Project name must be unique")
-        else:    
-            if p.name == name:
-                raise ValueError("Project name must be unique")
+    if nameTaken:
+        raise ValueError("Project name must be unique")
             
-def validateProjectNumber(currentProjectsNumber: int , max_project_number: int):
+def validateProjectNumber(slotReserved: bool):
     """
     validating the number of projects 
 
     Args:
-        currentProjectsNumber (int) : number of current projects available 
-        max_project_number (int) : maximum number of projects allowed
+        slotReserved (bool) : whether a slot below the maximum could be reserved in the projects counter
     
     Raises:
         ValueError: if the maximum number of projects is reached
@@ -75,16 +70,15 @@ def validateProjectNumber(currentProjectsNumber: int , max_project_number: int):
     Returns:
         None 
     """
-    if currentProjectsNumber == max_project_number: 
+    if not slotReserved: 
         raise ValueError("Max number of projects reached")
 
-def validateTaskNumber(currentTasksNumber: int , max_task_numer: int):
+def validateTaskNumber(slotReserved: bool):
     """
     validating the number of tasks 
 
     Args:
-        currentTasksNumber (int) : number of current tasks available 
-        max_task_numer (int) : maximum number of tasks allowed
+        slotReserved (bool) : whether a slot below the maximum could be reserved in the tasks counter
     
     Raises:
         ValueError: if the maximum number of tasks is reached
@@ -92,7 +86,7 @@ def validateTaskNumber(currentTasksNumber: int , max_task_numer: int):
     Returns:
         None 
     """
-    if currentTasksNumber == max_task_numer: 
+    if not slotReserved: 
         raise ValueError("Max number of tasks reached")
 
 def validateDeadline(deadline: datetime) -> None:
@@ -110,4 +104,39 @@ def validateDeadline(deadline: datetime) -> None:
     """
     today = datetime.now()
     if deadline < today:
-        raise ValueError("deadline can't be in the past!")
\ No newline at end of file
+        raise ValueError("deadline can't be in the past!")
+
+def validateFields(fields: list[str] , allowedFields: list[str]) -> None:
+    """
+    validate requested fields of a projection
+
+    Args:
+        fields (list[str]): names of the requested fields
+        allowedFields (list[str]): names of the fields that can be requested
+
+    Raises:
+        ValueError: if one of the fields is unknown
+
+    Returns:
+        None
+    """
+    unknown = [f for f in fields if f not in allowedFields]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown} , please use fields from this list: {allowedFields}")
+
+def validateSort(sort: str , allowedSorts: list[str]) -> None:
+    """
+    validate the requested order of a listing
+
+    Args:
+        sort (str): requested sort key
+        allowedSorts (list[str]): sort keys that can be requested
+
+    Raises:
+        ValueError: if the sort key is unknown
+
+    Returns:
+        None
+    """
+    if sort not in allowedSorts:
+        raise ValueError(f"Unknown sort {sort} , please use one from this list: {allowedSorts}")
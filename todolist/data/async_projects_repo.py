@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+from sqlalchemy import select, delete, update, func, exists
+from sqlalchemy.exc import IntegrityError
+
+from todolist.db import get_async_session
+from todolist.db.search import searchStatement
+
+from todolist.data.counters import PROJECTS_COUNTER, reserveStatement
+from todolist.data.unit_of_work import AsyncSessionScope, AsyncSessionFactory
+from todolist.data.cache import CacheBackend, RowCache
+from todolist.data.cascade import projectsDeleteStatement, taskCountsQuery, releaseDeletedStatement, cascadeDeleteStatement
+from todolist.core.Models.models import Project, Task
+
+
+class AsyncProjectsRepo(AsyncSessionScope):
+    """
+    A class used to represent the projects in the database, accessed without blocking the event loop
+
+    Attributes:
+        _session_factory (AsyncSessionFactory): protected attribute used to open a new AsyncSession per operation (outside of a unit of work)
+    """
+
+    def __init__(self , session_factory: AsyncSessionFactory = get_async_session , cache: CacheBackend | None = None , task_cache: CacheBackend | None = None):
+        """
+        Initializing an async Project repo instance
+
+        Args:
+            session_factory (AsyncSessionFactory , optional): factory used to open new sessions. defaults to get_async_session
+            cache (CacheBackend | None , optional): read-through cache of get() , invalidated by the writes. defaults to None (no cache)
+            task_cache (CacheBackend | None , optional): cache of the tasks repo , invalidated when projects are deleted with their tasks. defaults to None (no cache)
+        """
+        super().__init__(session_factory)
+        self._cache = RowCache(cache , Project) if cache is not None else None
+        self._task_cache = RowCache(task_cache , Task) if task_cache is not None else None
+
+    async def add(self , newProject: Project) -> Project:
+        """
+        Adding a new Project to the existing project repo
+
+        Args:
+            newProject (Project) : new Project to add
+
+        Raises:
+            ValueError: if the name is already used by another project
+
+        Returns:
+            Project: the Project added gets returned
+        """
+        async with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , newProject.id)
+            session.add(newProject)
+            try:
+                await session.flush()
+            except IntegrityError:
+                # lost a race against another insert of the same name
+                raise ValueError("Project name must be unique")
+            return newProject
+
+    async def get(self , projectId: str ) -> Project | None:
+        """
+        Getting a Project from the Project Repo
+
+        Args:
+            projectId (str): id of the project that we want to get
+
+        Returns:
+            Project: project with id projectId
+        """
+        if self._cache:
+            cached = self._cache.get(projectId)
+            if cached is not None:
+                return cached
+        async with self._session() as session:
+            query = select(Project).where(Project.id == projectId)
+            result = (await session.execute(query)).scalar_one_or_none()
+            # rows read in a unit of work may not be committed yet
+            if self._cache and result is not None and not self._in_unit_of_work():
+                self._cache.put(result)
+            return result
+
+    async def get_many(self , projectIds: list[str]) -> dict[str , Project]:
+        """
+        Getting many Projects at once: the cached ones from the cache , the others with one WHERE id IN (...) query
+
+        Args:
+            projectIds (list[str]): ids of the projects that we want to get
+
+        Returns:
+            dict[str , Project]: found projects by id (missing ids are left out)
+        """
+        found = {}
+        projectIds = list(dict.fromkeys(projectIds))
+        if self._cache:
+            for rowId in projectIds:
+                cached = self._cache.get(rowId)
+                if cached is not None:
+                    found[rowId] = cached
+        missing = [rowId for rowId in projectIds if rowId not in found]
+        if not missing:
+            return found
+        async with self._session() as session:
+            query = select(Project).where(Project.id.in_(missing))
+            rows = (await session.execute(query)).scalars().all()
+            # rows read in a unit of work may not be committed yet
+            cacheable = self._cache and not self._in_unit_of_work()
+            for row in rows:
+                if cacheable:
+                    self._cache.put(row)
+                found[row.id] = row
+            return found
+
+    async def delete_cascade(self , projectIds: list[str] , expectedVersion: int | None = None) -> dict[str , int]:
+        """
+        Deleting Projects along with their tasks: one DELETE relying on the ON DELETE CASCADE foreign key of the tasks
+        (on postgres the tasks are counted and the counters given back by the same statement , see cascadeDeleteStatement)
+
+        Args:
+            projectIds (list[str]): ids of the projects that we want to delete
+            expectedVersion (int | None , optional): only delete the projects whose version is still this one. defaults to None
+
+        Returns:
+            dict[str , int]: number of deleted tasks of every deleted project (missing projects are left out)
+        """
+        if not projectIds:
+            return {}
+        async with self._session() as session:
+            if session.get_bind().dialect.name == "postgresql":
+                deleted = dict((await session.execute(cascadeDeleteStatement(projectIds , expectedVersion))).all())
+            else:
+                # counted first , the cascade of a row runs before the next row is read
+                counts = dict((await session.execute(taskCountsQuery(projectIds))).all())
+                deletedIds = (await session.execute(projectsDeleteStatement(projectIds , expectedVersion))).scalars().all()
+                deleted = {projectId: counts.get(projectId , 0) for projectId in deletedIds}
+                if deleted:
+                    await session.execute(releaseDeletedStatement(len(deleted) , sum(deleted.values())))
+            if self._cache and deleted:
+                self._cache.invalidate(session , *deleted)
+            if self._task_cache and any(deleted.values()):
+                # the ids of the deleted tasks are not known , project deletes are rare enough to drop them all
+                self._task_cache.invalidate_all(session)
+            return deleted
+
+    async def put(self , newProject: Project ) -> Project:
+        """
+        Updating a Project from Project Repo
+
+        Args:
+            newProject (Project): new project to replace the existing one with the same id
+
+        Returns:
+            Project: updated project
+        """
+        async with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , newProject.id)
+            merged = await session.merge(newProject)
+            try:
+                await session.flush()
+            except IntegrityError:
+                raise ValueError("Project name must be unique")
+            return merged
+
+    async def update_fields(self , projectId: str , values: dict , expectedVersion: int | None = None) -> Project | None:
+        """
+        Updating some fields of a Project with a single UPDATE ... RETURNING statement
+
+        Args:
+            projectId (str): id of the project to update
+            values (dict): column name to new value or SQL expression (see Project.editValues)
+            expectedVersion (int | None , optional): only update the project if its version is still this one. defaults to None
+
+        Raises:
+            ValueError: if the name is already used by another project
+
+        Returns:
+            Project | None: the updated project , None if there is no project with id projectId (and version expectedVersion)
+        """
+        stmt = update(Project).where(Project.id == projectId)
+        if expectedVersion is not None:
+            stmt = stmt.where(Project.version == expectedVersion)
+        stmt = stmt.values(**values).returning(Project).execution_options(synchronize_session=False)
+        async with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , projectId)
+            try:
+                result = await session.execute(stmt)
+            except IntegrityError:
+                raise ValueError("Project name must be unique")
+            return result.scalar_one_or_none()
+
+    async def get_version(self , projectId: str) -> int | None:
+        """
+        Getting the version of a Project (its ETag) , without loading the project (never cached)
+
+        Args:
+            projectId (str): id of the project
+
+        Returns:
+            int | None: version of the project , None if there is no project with id projectId
+        """
+        async with self._session() as session:
+            stmt = select(Project.version).where(Project.id == projectId)
+            return (await session.execute(stmt)).scalar_one_or_none()
+
+    async def get_tasks_version(self , projectId: str) -> int | None:
+        """
+        Getting the version of the tasks of a Project , without loading the project (never cached)
+
+        Args:
+            projectId (str): id of the project
+
+        Returns:
+            int | None: tasks version of the project , None if there is no project with id projectId
+        """
+        async with self._session() as session:
+            stmt = select(Project.tasks_version).where(Project.id == projectId)
+            return (await session.execute(stmt)).scalar_one_or_none()
+
+    async def list(self) -> list[Project]:
+        """
+        Listing the Projects
+
+        Returns:
+            list[Projects]: list of all projects
+        """
+        async with self._session() as session:
+            stmt = select(Project)
+            result = await session.execute(stmt)
+            return result.scalars().all()
+
+    async def list_page(self , limit: int , after: str | None = None , fields: list[str] | None = None) -> list:
+        """
+        Listing one page of Projects ordered by id (keyset pagination)
+
+        Args:
+            limit (int): maximum number of projects in the page
+            after (str | None , optional): id of the last project of the previous page. defaults to None
+            fields (list[str] | None , optional): columns to select. if given , rows are returned as mappings instead of Projects. defaults to None
+
+        Returns:
+            list: projects (or mappings of the selected columns) with id greater than after
+        """
+        async with self._session() as session:
+            if fields:
+                stmt = select(*[getattr(Project , f) for f in fields])
+            else:
+                stmt = select(Project)
+            if after:
+                stmt = stmt.where(Project.id > after)
+            stmt = stmt.order_by(Project.id).limit(limit)
+            result = await session.execute(stmt)
+            return result.mappings().all() if fields else result.scalars().all()
+
+    async def name_exists(self , name: str , excludeId: str | None = None) -> bool:
+        """
+        Checking whether a project with the given name exists , using the unique index on projects.name
+
+        Args:
+            name (str): name to look for
+            excludeId (str | None , optional): id of a project to ignore (the one being renamed). defaults to None
+
+        Returns:
+            bool: True if another project already has the name
+        """
+        async with self._session() as session:
+            condition = Project.name == name
+            if excludeId:
+                condition = condition & (Project.id != excludeId)
+            return bool((await session.execute(select(exists().where(condition)))).scalar())
+
+    async def reserve_slots(self , maxCount: int , count: int = 1) -> bool:
+        """
+        Taking `count` slots of the projects counter if it stays within maxCount (O(1) quota check).
+        Must run in the same unit of work as the insert , so a failed insert gives the slots back.
+
+        Args:
+            maxCount (int): maximum allowed number of projects
+            count (int , optional): number of projects about to be inserted. defaults to 1
+
+        Returns:
+            bool: False if the maximum would be exceeded (nothing reserved)
+        """
+        async with self._session() as session:
+            result = await session.execute(reserveStatement(PROJECTS_COUNTER , maxCount , count))
+            return result.first() is not None
+
+    async def length(self) -> int:
+        """
+        getting the number of total projects
+
+        Returns:
+            int: the number of projects
+        """
+        async with self._session() as session:
+            stmt = select(func.count(Project.id))
+            result = (await session.execute(stmt)).scalar_one()
+            return int(result or 0)
+
+    async def search(self , query: str , limit: int , after: tuple[float , str | None] | None = None) -> list:
+        """
+        Projects whose name or description match a free text query , best match first (full text index , see todolist.db.search)
+
+        Args:
+            query (str): text typed by the user
+            limit (int): maximum number of projects
+            after (tuple[float , str | None] | None , optional): (rank , id) of the last project of the previous page. defaults to None
+
+        Returns:
+            list: rows of the Project and its rank (higher is better)
+        """
+        async with self._session() as session:
+            stmt = searchStatement(Project , session.get_bind().dialect.name , query , limit , after)
+            if stmt is None:
+                return []
+            return (await session.execute(stmt)).all()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime
+
+from sqlalchemy import select, delete, func, text, literal_column
+
+from todolist.db import get_async_session
+from todolist.db.rollups import STATS_COLUMNS, statsQuery
+
+from todolist.data.unit_of_work import AsyncSessionScope, AsyncSessionFactory
+from todolist.core.Models.models import ProjectStats, Task
+
+
+class AsyncStatsRepo(AsyncSessionScope):
+    """
+    A class used to represent the task statistics of the projects in the database , read from the project_stats rollup
+    (kept up to date by triggers , see todolist/db/rollups.py) so they cost the same whatever the number of tasks
+
+    Attributes:
+        _session_factory (AsyncSessionFactory): protected attribute used to open a new AsyncSession per operation (outside of a unit of work)
+    """
+
+    def __init__(self , session_factory: AsyncSessionFactory = get_async_session):
+        """
+        Initializing an async stats repo instance
+
+        Args:
+            session_factory (AsyncSessionFactory , optional): factory used to open new sessions. defaults to get_async_session
+        """
+        super().__init__(session_factory)
+
+    async def get(self , projectId: str) -> dict:
+        """
+        Counters of the tasks of a project (one primary key lookup)
+
+        Args:
+            projectId (str): id of the project
+
+        Returns:
+            dict: the STATS_COLUMNS , zeros if the project never had a task
+        """
+        async with self._session() as session:
+            stmt = select(*[getattr(ProjectStats , c) for c in STATS_COLUMNS]).where(ProjectStats.project_id == projectId)
+            row = (await session.execute(stmt)).mappings().first()
+            return {c: row[c] if row else 0 for c in STATS_COLUMNS}
+
+    async def total(self) -> dict:
+        """
+        Counters of the tasks of every project (sum of one row per project)
+
+        Returns:
+            dict: the STATS_COLUMNS
+        """
+        async with self._session() as session:
+            stmt = select(*[func.coalesce(func.sum(getattr(ProjectStats , c)) , 0).label(c) for c in STATS_COLUMNS])
+            row = (await session.execute(stmt)).mappings().one()
+            return dict(row)
+
+    async def count_overdue(self , compareTime: datetime , projectId: str | None = None) -> int:
+        """
+        Number of open tasks whose deadline has passed. counted from the tasks since it changes with the time , only
+        the open tasks with a deadline are read (partial index on deadline of the open tasks , or the deadline index of a project)
+
+        Args:
+            compareTime (datetime): tasks with a deadline before this time are overdue
+            projectId (str | None , optional): only count the tasks of this project. defaults to None (every project)
+
+        Returns:
+            int: number of overdue tasks
+        """
+        # 'done' is inlined (not bound) so the planner can match the partial index predicate
+        stmt = select(func.count()).select_from(Task).where(
+            Task.deadline.is_not(None) , Task.deadline < compareTime , Task.status != literal_column("'done'")
+        )
+        if projectId is not None:
+            stmt = stmt.where(Task.for_project == projectId)
+        async with self._session() as session:
+            return int((await session.execute(stmt)).scalar_one() or 0)
+
+    async def rebuild(self , dryRun: bool = False) -> list[str]:
+        """
+        Comparing the rollup with the counters computed from the tasks and , unless dryRun , rewriting it from the tasks.
+        On postgres the tasks are locked against writes meanwhile (SHARE lock) so the comparison and the rewrite see the same tasks
+
+        Args:
+            dryRun (bool , optional): only report the projects whose counters drifted. defaults to False
+
+        Returns:
+            list[str]: ids of the projects whose counters differ from their tasks
+        """
+        async with self._session() as session:
+            dialect = session.get_bind().dialect.name
+            if dialect == "postgresql":
+                await session.execute(text("LOCK TABLE tasks IN SHARE MODE"))
+            expected = {row["project_id"]: row for row in (await session.execute(text(statsQuery(dialect)))).mappings()}
+            stored = {row.project_id: row for row in (await session.execute(select(ProjectStats))).scalars()}
+
+            drifted = []
+            for projectId in sorted(set(expected) | set(stored)):
+                want , have = expected.get(projectId) , stored.get(projectId)
+                if any(not self._same(want[c] if want else 0 , getattr(have , c) if have else 0) for c in STATS_COLUMNS):
+                    drifted.append(projectId)
+
+            if not dryRun:
+                await session.execute(delete(ProjectStats))
+                await session.execute(text(f"INSERT INTO project_stats (project_id, {', '.join(STATS_COLUMNS)}) {statsQuery(dialect)}"))
+            return drifted
+
+    def _same(self , expected , stored) -> bool:
+        # close_seconds is a float total , adding and subtracting rounds it
+        return math.isclose(float(expected or 0) , float(stored or 0) , rel_tol=1e-9 , abs_tol=1e-3)
@@ -0,0 +1,496 @@
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import select, delete, update, insert, func, exists, literal, literal_column, tuple_
+
+from todolist.db import get_async_session
+from todolist.db.search import searchStatement
+from todolist.data.counters import TASKS_COUNTER, reserveStatement, releaseStatement, bumpTasksVersionStatement
+from todolist.data.unit_of_work import AsyncSessionScope, AsyncSessionFactory
+from todolist.data.cache import CacheBackend, RowCache
+from todolist.data.task_filter import TaskFilter
+from todolist.core.Models.models import Task, Project
+
+class AsyncTasksRepo(AsyncSessionScope):
+    """
+    A class used to represent the tasks in the database, accessed without blocking the event loop
+
+    Attributes:
+        _session_factory (AsyncSessionFactory): protected attribute used to open a new AsyncSession per operation (outside of a unit of work)
+    """
+
+    def __init__(self , session_factory: AsyncSessionFactory = get_async_session , cache: CacheBackend | None = None):
+        """
+        Initializing an async Task repo instance
+
+        Args:
+            session_factory (AsyncSessionFactory , optional): factory used to open new sessions. defaults to get_async_session
+            cache (CacheBackend | None , optional): read-through cache of get() , invalidated by the writes. defaults to None (no cache)
+        """
+        super().__init__(session_factory)
+        self._cache = RowCache(cache , Task) if cache is not None else None
+
+    async def add(self , newTask: Task) -> Task:
+        """
+        Adding a new Task to the existing task repo
+
+        Args:
+            newTask (Task) : new Task to add
+
+        Returns:
+            Task: the Task added gets returned
+        """
+        async with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , newTask.id)
+            session.add(newTask)
+            await session.flush()
+            await session.execute(bumpTasksVersionStatement([newTask.for_project]))
+            return newTask
+
+    async def get(self , taskId : str) -> Task | None:
+        """
+        Getting a Task from the Task Repo
+
+        Args:
+            taskId (str): id of the task that we want to get
+
+        Returns:
+            Task: task with id taskId
+        """
+        if self._cache:
+            cached = self._cache.get(taskId)
+            if cached is not None:
+                return cached
+        async with self._session() as session:
+            stmt = select(Task).where(Task.id == taskId)
+            result = (await session.execute(stmt)).scalar_one_or_none()
+            # rows read in a unit of work may not be committed yet
+            if self._cache and result is not None and not self._in_unit_of_work():
+                self._cache.put(result)
+            return result
+
+    async def get_version(self , taskId: str) -> int | None:
+        """
+        Getting the version of a Task (its ETag) , without loading the task (never cached)
+
+        Args:
+            taskId (str): id of the task
+
+        Returns:
+            int | None: version of the task , None if there is no task with id taskId
+        """
+        async with self._session() as session:
+            stmt = select(Task.version).where(Task.id == taskId)
+            return (await session.execute(stmt)).scalar_one_or_none()
+
+    async def get_many(self , taskIds: list[str]) -> dict[str , Task]:
+        """
+        Getting many Tasks at once: the cached ones from the cache , the others with one WHERE id IN (...) query
+
+        Args:
+            taskIds (list[str]): ids of the tasks that we want to get
+
+        Returns:
+            dict[str , Task]: found tasks by id (missing ids are left out)
+        """
+        found = {}
+        taskIds = list(dict.fromkeys(taskIds))
+        if self._cache:
+            for rowId in taskIds:
+                cached = self._cache.get(rowId)
+                if cached is not None:
+                    found[rowId] = cached
+        missing = [rowId for rowId in taskIds if rowId not in found]
+        if not missing:
+            return found
+        async with self._session() as session:
+            query = select(Task).where(Task.id.in_(missing))
+            rows = (await session.execute(query)).scalars().all()
+            # rows read in a unit of work may not be committed yet
+            cacheable = self._cache and not self._in_unit_of_work()
+            for row in rows:
+                if cacheable:
+                    self._cache.put(row)
+                found[row.id] = row
+            return found
+
+    async def put(self , newTask: Task) -> Task:
+        """
+        Updating a Task from Task Repo
+
+        Args:
+            newTask (Task): new task to replace the existing one with the same id
+
+        Returns:
+            Task: updated task
+        """
+        async with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , newTask.id)
+            merged = await session.merge(newTask)
+            await session.flush()
+            await session.execute(bumpTasksVersionStatement([merged.for_project]))
+            return merged
+
+    async def add_to_project(self , newTask: Task) -> bool:
+        """
+        Inserting a new Task only if its project exists , in a single INSERT ... SELECT ... WHERE EXISTS statement
+
+        Args:
+            newTask (Task) : new Task to add
+
+        Returns:
+            bool: False if the project of the task does not exist (nothing inserted)
+        """
+        table = Task.__table__
+        columns = ["id" , "for_project" , "name" , "desc" , "status" , "deadline" , "at_closed" , "at_created" , "version"]
+        source = select(*[literal(getattr(newTask , c) , table.c[c].type) for c in columns]).where(exists().where(Project.id == newTask.for_project))
+        stmt = insert(Task).from_select(columns , source).returning(Task.id)
+        async with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , newTask.id)
+            result = await session.execute(stmt)
+            if result.first() is None:
+                return False
+            await session.execute(bumpTasksVersionStatement([newTask.for_project]))
+            return True
+
+    async def add_many(self , newTasks: list[Task]) -> int:
+        """
+        Inserting many Tasks with one executemany INSERT (no ORM unit of work per row)
+
+        Args:
+            newTasks (list[Task]) : new Tasks to add
+
+        Returns:
+            int: number of inserted tasks
+        """
+        columns = Task.__table__.columns.keys()
+        rows = [{c: getattr(t , c) for c in columns} for t in newTasks]
+        async with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , *[t.id for t in newTasks])
+            await session.execute(insert(Task.__table__) , rows)
+            await session.execute(bumpTasksVersionStatement(sorted({t.for_project for t in newTasks})))
+            return len(rows)
+
+    async def update_fields(self , taskId: str , values: dict , expectedVersion: int | None = None) -> Task | None:
+        """
+        Updating some fields of a Task with a single UPDATE ... RETURNING statement
+
+        Args:
+            taskId (str): id of the task to update
+            values (dict): column name to new value or SQL expression (see Task.editValues)
+            expectedVersion (int | None , optional): only update the task if its version is still this one. defaults to None
+
+        Returns:
+            Task | None: the updated task , None if there is no task with id taskId (and version expectedVersion)
+        """
+        stmt = update(Task).where(Task.id == taskId)
+        if expectedVersion is not None:
+            stmt = stmt.where(Task.version == expectedVersion)
+        stmt = stmt.values(**values).returning(Task).execution_options(synchronize_session=False)
+        async with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , taskId)
+            updated = (await session.execute(stmt)).scalar_one_or_none()
+            if updated is not None:
+                await session.execute(bumpTasksVersionStatement([updated.for_project]))
+            return updated
+
+    async def update_many(self , taskIds: list[str] , values: dict) -> list[Task]:
+        """
+        Applying the same change to many Tasks with a single UPDATE ... WHERE id IN (...) RETURNING statement
+
+        Args:
+            taskIds (list[str]): ids of the tasks to update
+            values (dict): column name to new value or SQL expression (see Task.editValues) , evaluated on every row
+
+        Returns:
+            list[Task]: the updated tasks (missing ids are left out)
+        """
+        if not taskIds:
+            return []
+        stmt = update(Task).where(Task.id.in_(taskIds)).values(**values).returning(Task).execution_options(synchronize_session=False)
+        async with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , *taskIds)
+            updated = (await session.execute(stmt)).scalars().all()
+            if updated:
+                await session.execute(bumpTasksVersionStatement(list({task.for_project for task in updated})))
+            return updated
+
+    async def delete(self , taskId: str , expectedVersion: int | None = None) -> str | None:
+        """
+        Deleting a Task from the Task Repo
+
+        Args:
+            taskId (str): id of the task that we want to delete
+            expectedVersion (int | None , optional): only delete the task if its version is still this one. defaults to None
+
+        Returns:
+            str | None: id of the project of the deleted task , None if nothing was deleted
+        """
+        async with self._session() as session:
+            stmt = delete(Task).where(Task.id == taskId)
+            if expectedVersion is not None:
+                stmt = stmt.where(Task.version == expectedVersion)
+            projectId = (await session.execute(stmt.returning(Task.for_project))).scalar_one_or_none()
+            if self._cache:
+                self._cache.invalidate(session , taskId)
+            if projectId is None:
+                return None
+            await session.execute(releaseStatement(TASKS_COUNTER , 1))
+            await session.execute(bumpTasksVersionStatement([projectId]))
+            return projectId
+
+    async def delete_project(self , projectId: str) -> int:
+        """
+        Cascade delete of the tasks when the parent project is deleted
+
+        Args:
+            projectId (str) : id of the project deleted
+
+        Returns:
+            int: number of deleted tasks
+        """
+        async with self._session() as session:
+            stmt = delete(Task).where(Task.for_project == projectId)
+            result = await session.execute(stmt)
+            if result.rowcount > 0:
+                # the ids of the deleted tasks are not known , project deletes are rare enough to drop them all
+                if self._cache:
+                    self._cache.invalidate_all(session)
+                await session.execute(releaseStatement(TASKS_COUNTER , result.rowcount))
+            return result.rowcount
+
+    async def list_by_project(self , projectId: str) -> list[Task]:
+        """
+        Listing the tasks of a project
+
+        Args:
+            projectId (str): id of the project to show it's task children
+
+        Returns:
+            list[Task]: list of all tasks of the the project with id = projectId
+        """
+        async with self._session() as session:
+            stmt = select(Task).where(Task.for_project == projectId)
+            result = await session.execute(stmt)
+            return result.scalars().all()
+
+    async def list_by_project_page(self , projectId: str , limit: int , after: str | None = None , fields: list[str] | None = None , taskFilter: TaskFilter | None = None) -> list:
+        """
+        Listing one page of the tasks of a project (keyset pagination) , ordered by id unless the filter sorts them otherwise
+
+        Args:
+            projectId (str): id of the project to show it's task children
+            limit (int): maximum number of tasks in the page
+            after (str | None , optional): cursor of the last task of the previous page (its id when ordered by id). defaults to None
+            fields (list[str] | None , optional): columns to select. if given , rows are returned as mappings instead of Tasks. defaults to None
+            taskFilter (TaskFilter | None , optional): filters and order of the listing. defaults to None (every task , by id)
+
+        Raises:
+            ValueError: if the cursor is invalid
+
+        Returns:
+            list: tasks (or mappings of the selected columns) of the project after the cursor
+        """
+        return await self._page([Task.for_project == projectId] , limit , after , fields , taskFilter)
+
+    async def list_page(self , limit: int , after: str | None = None , fields: list[str] | None = None , taskFilter: TaskFilter | None = None) -> list:
+        """
+        Listing one page of the tasks of every project (keyset pagination)
+
+        Args:
+            limit (int): maximum number of tasks in the page
+            after (str | None , optional): cursor of the last task of the previous page. defaults to None
+            fields (list[str] | None , optional): columns to select. if given , rows are returned as mappings instead of Tasks. defaults to None
+            taskFilter (TaskFilter | None , optional): filters and order of the listing. defaults to None (every task , by id)
+
+        Raises:
+            ValueError: if the cursor is invalid
+
+        Returns:
+            list: tasks (or mappings of the selected columns) after the cursor
+        """
+        return await self._page([] , limit , after , fields , taskFilter)
+
+    async def _page(self , where: list , limit: int , after: str | None , fields: list[str] | None , taskFilter: TaskFilter | None) -> list:
+        """
+        One page of the tasks matching where and the filter , every condition is part of the query
+        """
+        taskFilter = taskFilter or TaskFilter()
+        stmt = select(*[getattr(Task , f) for f in fields]) if fields else select(Task)
+        stmt = stmt.where(*where , *taskFilter.where())
+        if after:
+            stmt = stmt.where(taskFilter.after(after))
+        stmt = stmt.order_by(*taskFilter.orderBy()).limit(limit)
+        async with self._session() as session:
+            result = await session.execute(stmt)
+            return result.mappings().all() if fields else result.scalars().all()
+
+    async def search(self , query: str , limit: int , after: tuple[float , str | None] | None = None) -> list:
+        """
+        Tasks whose name or description match a free text query , best match first (full text index , see todolist.db.search)
+
+        Args:
+            query (str): text typed by the user
+            limit (int): maximum number of tasks
+            after (tuple[float , str | None] | None , optional): (rank , id) of the last task of the previous page. defaults to None
+
+        Returns:
+            list: rows of the Task and its rank (higher is better)
+        """
+        async with self._session() as session:
+            stmt = searchStatement(Task , session.get_bind().dialect.name , query , limit , after)
+            if stmt is None:
+                return []
+            return (await session.execute(stmt)).all()
+
+    async def reserve_slots(self , maxCount: int , count: int = 1) -> bool:
+        """
+        Taking `count` slots of the tasks counter if it stays within maxCount (O(1) quota check).
+        Must run in the same unit of work as the insert , so a failed insert gives the slots back.
+
+        Args:
+            maxCount (int): maximum allowed number of tasks
+            count (int , optional): number of tasks about to be inserted. defaults to 1
+
+        Returns:
+            bool: False if the maximum would be exceeded (nothing reserved)
+        """
+        async with self._session() as session:
+            result = await session.execute(reserveStatement(TASKS_COUNTER , maxCount , count))
+            return result.first() is not None
+
+    async def stream_by_project(self , projectId: str , fields: list[str] , batchSize: int = 1000) -> AsyncIterator:
+        """
+        Streaming the tasks of a project ordered by id through a server side cursor.
+        Rows are plain mappings fetched batchSize at a time , so memory stays constant whatever the number of tasks.
+
+        Args:
+            projectId (str): id of the project to stream it's task children
+            fields (list[str]): columns to select , in order
+            batchSize (int , optional): number of rows fetched per round trip. defaults to 1000
+
+        Yields:
+            RowMapping: the selected columns of one task
+        """
+        stmt = (
+            select(*[getattr(Task , f) for f in fields])
+            .where(Task.for_project == projectId)
+            .order_by(Task.id)
+            .execution_options(yield_per=batchSize)
+        )
+        async with self._session() as session:
+            result = await session.stream(stmt)
+            async for row in result.mappings():
+                yield row
+
+    async def length(self) -> int:
+        """
+        getting the number of total tasks
+
+        Returns:
+            int: the number of tasks
+        """
+        async with self._session() as session:
+            stmt = select(func.count(Task.id))
+            result = (await session.execute(stmt)).scalar_one()
+            return int(result or 0)
+
+    async def close_overdue(self , compareTime: datetime , chunkSize: int = 0) -> int:
+        """
+        Find all tasks whose deadline has passed and are not 'done',
+        mark them as done , set at_closed if missing and bump their version , with set based UPDATE statements
+        (served by the partial index on deadline of the open tasks).
+
+        Args:
+            compareTime (datetime): tasks with a deadline before this time are overdue , also used as the closing time
+            chunkSize (int , optional): if positive , close at most chunkSize tasks per statement (and per transaction
+                outside of a unit of work) walking the primary key , to keep transactions short. defaults to 0 (one statement)
+
+        Returns:
+            int: number of tasks that where updated
+        """
+        # 'done' is inlined (not bound) so the planner can match the partial index predicate , even for prepared statements
+        overdue = (Task.deadline.is_not(None) , Task.deadline < compareTime , Task.status != literal_column("'done'"))
+        values = {"status": "done" , "at_closed": func.coalesce(Task.at_closed , compareTime) , "version": Task.version + 1}
+
+        if chunkSize <= 0:
+            stmt = update(Task).where(*overdue).values(**values).execution_options(synchronize_session=False)
+            async with self._session() as session:
+                # projects are bumped first , while their overdue tasks can still be told apart
+                await session.execute(bumpTasksVersionStatement(select(Task.for_project).where(*overdue)))
+                result = await session.execute(stmt)
+                if self._cache and result.rowcount > 0:
+                    self._cache.invalidate_all(session)
+                return result.rowcount
+
+        closed = 0
+        lastId = ""
+        while True:
+            chunk = select(Task.id).where(*overdue).where(Task.id > lastId).order_by(Task.id).limit(chunkSize)
+            stmt = update(Task).where(Task.id.in_(chunk)).values(**values).returning(Task.id , Task.for_project).execution_options(synchronize_session=False)
+            async with self._session() as session:
+                rows = (await session.execute(stmt)).all()
+                ids = [row.id for row in rows]
+                if ids:
+                    await session.execute(bumpTasksVersionStatement(sorted({row.for_project for row in rows})))
+                if self._cache and ids:
+                    self._cache.invalidate(session , *ids)
+            if not ids:
+                return closed
+            closed += len(ids)
+            lastId = max(ids)
+
+    async def upcoming_deadlines(self , after: tuple[datetime , str] , until: datetime , limit: int) -> list:
+        """
+        Next deadlines of the open tasks , walking (deadline , id) from a cursor with the partial index on deadline of the open tasks
+
+        Args:
+            after (tuple[datetime , str]): only deadlines after this (deadline , id) pair
+            until (datetime): only deadlines up to this time
+            limit (int): maximum number of rows
+
+        Returns:
+            list: rows with the id and deadline of the tasks , ordered by deadline then id
+        """
+        stmt = (
+            select(Task.id , Task.deadline)
+            .where(Task.deadline.is_not(None) , Task.status != literal_column("'done'"))
+            .where(tuple_(Task.deadline , Task.id) > tuple_(literal(after[0] , Task.deadline.type) , literal(after[1])))
+            .where(Task.deadline <= until)
+            .order_by(Task.deadline , Task.id)
+            .limit(limit)
+        )
+        async with self._session() as session:
+            return (await session.execute(stmt)).all()
+
+    async def close_overdue_ids(self , taskIds: list[str] , compareTime: datetime) -> int:
+        """
+        Closing some tasks , only the ones that are still open and overdue (the deadline may have moved since they were picked)
+
+        Args:
+            taskIds (list[str]): ids of the tasks to close
+            compareTime (datetime): tasks with a deadline before this time are overdue , also used as the closing time
+
+        Returns:
+            int: number of tasks that where updated
+        """
+        stmt = (
+            update(Task)
+            .where(Task.id.in_(taskIds) , Task.deadline.is_not(None) , Task.deadline < compareTime , Task.status != literal_column("'done'"))
+            .values(status="done" , at_closed=func.coalesce(Task.at_closed , compareTime) , version=Task.version + 1)
+            .returning(Task.id , Task.for_project)
+            .execution_options(synchronize_session=False)
+        )
+        async with self._session() as session:
+            rows = (await session.execute(stmt)).all()
+            if rows:
+                await session.execute(bumpTasksVersionStatement(sorted({row.for_project for row in rows})))
+                if self._cache:
+                    self._cache.invalidate(session , *[row.id for row in rows])
+            return len(rows)
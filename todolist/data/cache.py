@@ -0,0 +1,235 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+# session.info key holding the invalidations to repeat once the transaction commits
+_PENDING_INVALIDATIONS = "cache_invalidations"
+
+
+class CacheBackend(ABC):
+    """
+    Interface of the read-through cache in front of the repositories , one instance per kind of row.
+    Values are plain dicts of the column values , so a shared backend (redis , memcached ...) only has
+    to implement these methods to share the cache between processes.
+    """
+
+    @abstractmethod
+    def get(self , key: str) -> dict | None:
+        """
+        Getting the cached value of a key
+
+        Args:
+            key (str): id of the row
+
+        Returns:
+            dict | None: the cached column values , None on a miss
+        """
+
+    @abstractmethod
+    def set(self , key: str , value: dict) -> None:
+        """
+        Caching the value of a key
+
+        Args:
+            key (str): id of the row
+            value (dict): column values of the row
+        """
+
+    @abstractmethod
+    def delete(self , *keys: str) -> None:
+        """
+        Dropping some keys from the cache
+
+        Args:
+            keys (str): ids of the rows
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Dropping every key of the cache
+        """
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """
+        Counters of the cache
+
+        Returns:
+            dict: at least hits , misses and evictions
+        """
+
+
+class LRUCache(CacheBackend):
+    """
+    In-process cache bounded in size (least recently used keys are evicted first) and in age (ttl).
+    Thread safe , the API event loop and the scheduler thread share it.
+
+    Attributes:
+        maxSize (int): maximum number of cached keys
+        ttl (float): seconds a value stays valid , 0 or less keeps values until evicted
+        hits (int): number of lookups answered from the cache
+        misses (int): number of lookups that were not (including expired values)
+        evictions (int): number of keys dropped to stay within maxSize
+        expirations (int): number of values dropped because their ttl passed
+    """
+
+    def __init__(self , maxSize: int , ttl: float , clock: Callable[[], float] = time.monotonic):
+        """
+        Initializing an LRU cache
+
+        Args:
+            maxSize (int): maximum number of cached keys
+            ttl (float): seconds a value stays valid , 0 or less keeps values until evicted
+            clock (Callable[[], float], optional): source of the current time in seconds. defaults to time.monotonic
+        """
+        self.maxSize = maxSize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[str , tuple[float | None , dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self , key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expiresAt , value = entry
+            if expiresAt is not None and expiresAt <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self , key: str , value: dict) -> None:
+        if self.maxSize <= 0:
+            return
+        expiresAt = self._clock() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            self._entries[key] = (expiresAt , value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxSize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self , *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key , None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits ,
+                "misses": self.misses ,
+                "evictions": self.evictions ,
+                "expirations": self.expirations ,
+                "size": len(self._entries) ,
+                "max_size": self.maxSize ,
+            }
+
+
+class RowCache:
+    """
+    A class used by the repositories to cache rows of one model by id on top of a CacheBackend.
+    Rows are stored as column values and handed out as new detached instances , so callers can
+    edit what they get without touching the cache.
+
+    Attributes:
+        backend (CacheBackend): where the column values are kept
+        model (type): mapped class of the cached rows
+    """
+
+    def __init__(self , backend: CacheBackend , model: type):
+        """
+        Initializing a row cache
+
+        Args:
+            backend (CacheBackend): where the column values are kept
+            model (type): mapped class of the cached rows
+        """
+        self.backend = backend
+        self.model = model
+        self._columns = [attr.key for attr in model.__mapper__.column_attrs]
+
+    def get(self , rowId: str):
+        """
+        Getting a cached row
+
+        Args:
+            rowId (str): id of the row
+
+        Returns:
+            model | None: a detached instance holding the cached values , None on a miss
+        """
+        values = self.backend.get(rowId)
+        if values is None:
+            return None
+        row = self.model.__mapper__.class_manager.new_instance()
+        for column , value in values.items():
+            setattr(row , column , value)
+        # looks like a row loaded by a closed session , a later merge() updates instead of inserting
+        make_transient_to_detached(row)
+        return row
+
+    def put(self , row) -> None:
+        """
+        Caching a row read from the database
+
+        Args:
+            row (model): the row to cache
+        """
+        # deferred columns that were not loaded stay out of the cache
+        unloaded = inspect(row).unloaded
+        self.backend.set(row.id , {column: getattr(row , column) for column in self._columns if column not in unloaded})
+
+    def invalidate(self , session , *rowIds: str) -> None:
+        """
+        Dropping rows written in a transaction. They are dropped right away and once more when the
+        transaction commits , since a concurrent read may cache the old row in between.
+
+        Args:
+            session (Session | AsyncSession): session of the write
+            rowIds (str): ids of the written rows
+        """
+        self.backend.delete(*rowIds)
+        session.info.setdefault(_PENDING_INVALIDATIONS , []).append(lambda: self.backend.delete(*rowIds))
+
+    def invalidate_all(self , session) -> None:
+        """
+        Dropping every row , for writes that do not know which ids they touched
+
+        Args:
+            session (Session | AsyncSession): session of the write
+        """
+        self.backend.clear()
+        session.info.setdefault(_PENDING_INVALIDATIONS , []).append(self.backend.clear)
+
+
+@event.listens_for(Session , "after_commit")
+def _runPendingInvalidations(session: Session) -> None:
+    for invalidation in session.info.pop(_PENDING_INVALIDATIONS , ()):
+        invalidation()
+
+
+@event.listens_for(Session , "after_rollback")
+def _dropPendingInvalidations(session: Session) -> None:
+    # nothing was written , the rows dropped before the rollback are simply read again
+    session.info.pop(_PENDING_INVALIDATIONS , None)
@@ -0,0 +1,90 @@
+from sqlalchemy import delete, select, update, func, case
+
+from todolist.data.counters import PROJECTS_COUNTER, TASKS_COUNTER
+from todolist.core.Models.models import Counter, Project, Task
+
+
+def projectsDeleteStatement(projectIds: list[str] , expectedVersion: int | None = None):
+    """
+    DELETE of some projects , their tasks (and stats) go with them through the ON DELETE CASCADE foreign keys
+
+    Args:
+        projectIds (list[str]): ids of the projects to delete
+        expectedVersion (int | None , optional): only delete the projects still at this version. defaults to None
+
+    Returns:
+        Delete: statement returning the ids of the deleted projects
+    """
+    stmt = delete(Project).where(Project.id.in_(projectIds))
+    if expectedVersion is not None:
+        stmt = stmt.where(Project.version == expectedVersion)
+    return stmt.returning(Project.id).execution_options(synchronize_session=False)
+
+
+def taskCountsQuery(projectIds: list[str]):
+    """
+    SELECT of the number of tasks of some projects (only the ones with tasks) , counted on ix_tasks_for_project_id
+
+    Args:
+        projectIds (list[str]): ids of the projects
+
+    Returns:
+        Select: rows of (project id , number of tasks)
+    """
+    return (
+        select(Task.for_project , func.count().label("tasks"))
+        .where(Task.for_project.in_(projectIds))
+        .group_by(Task.for_project)
+    )
+
+
+def releaseDeletedStatement(projects: int , tasks: int):
+    """
+    UPDATE giving back the slots of deleted projects and tasks to both counters at once
+
+    Args:
+        projects (int): number of deleted projects
+        tasks (int): number of deleted tasks
+
+    Returns:
+        Update: the statement
+    """
+    return (
+        update(Counter)
+        .where(Counter.name.in_([PROJECTS_COUNTER , TASKS_COUNTER]))
+        .values(value=Counter.value - case((Counter.name == PROJECTS_COUNTER , projects) , else_=tasks))
+    )
+
+
+def cascadeDeleteStatement(projectIds: list[str] , expectedVersion: int | None = None):
+    """
+    Postgres only: one statement deleting some projects (their tasks through the cascade) and giving the slots back
+    to the counters. The tasks are counted by a data-modifying CTE that sees the tasks as they were before the
+    statement , which sqlite can not do (it runs the cascade of a row before the next one is read)
+
+    Args:
+        projectIds (list[str]): ids of the projects to delete
+        expectedVersion (int | None , optional): only delete the projects still at this version. defaults to None
+
+    Returns:
+        Select: rows of (deleted project id , number of deleted tasks)
+    """
+    counted = taskCountsQuery(projectIds).cte("counted")
+    deleted = projectsDeleteStatement(projectIds , expectedVersion).cte("deleted")
+    deletedProjects = select(func.count()).select_from(deleted).scalar_subquery()
+    deletedTasks = (
+        select(func.coalesce(func.sum(counted.c.tasks) , 0))
+        .select_from(deleted.join(counted , counted.c.for_project == deleted.c.id))
+        .scalar_subquery()
+    )
+    released = (
+        update(Counter)
+        .where(Counter.name.in_([PROJECTS_COUNTER , TASKS_COUNTER]) , deletedProjects > 0)
+        .values(value=Counter.value - case((Counter.name == PROJECTS_COUNTER , deletedProjects) , else_=deletedTasks))
+        .cte("released")
+    )
+    return (
+        select(deleted.c.id , func.coalesce(counted.c.tasks , 0))
+        .select_from(deleted.outerjoin(counted , counted.c.for_project == deleted.c.id))
+        .add_cte(released)
+    )
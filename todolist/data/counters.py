@@ -0,0 +1,61 @@
+from sqlalchemy import update
+
+from todolist.core.Models.models import Counter, Project
+
+
+PROJECTS_COUNTER = "projects"
+TASKS_COUNTER = "tasks"
+
+
+def reserveStatement(name: str , maxValue: int , amount: int = 1):
+    """
+    UPDATE that takes `amount` slots of a counter only if it stays within maxValue.
+    The row lock taken by the UPDATE serializes concurrent reservations , so the maximum can't be exceeded.
+
+    Args:
+        name (str): name of the counter
+        maxValue (int): maximum value the counter may reach
+        amount (int , optional): number of slots to take. defaults to 1
+
+    Returns:
+        Update: statement returning the new value , or no row if the reservation was refused
+    """
+    return (
+        update(Counter)
+        .where(Counter.name == name)
+        .where(Counter.value + amount <= maxValue)
+        .values(value=Counter.value + amount)
+        .returning(Counter.value)
+    )
+
+
+def releaseStatement(name: str , amount: int):
+    """
+    UPDATE that gives back `amount` slots of a counter
+
+    Args:
+        name (str): name of the counter
+        amount (int): number of slots to give back
+
+    Returns:
+        Update: the statement
+    """
+    return update(Counter).where(Counter.name == name).values(value=Counter.value - amount)
+
+
+def bumpTasksVersionStatement(projectIds):
+    """
+    UPDATE that increments the tasks version of some projects , run in the transaction of every write to their tasks
+
+    Args:
+        projectIds (list[str] | Select): ids of the projects whose tasks were written , or a SELECT of them
+
+    Returns:
+        Update: the statement
+    """
+    return (
+        update(Project)
+        .where(Project.id.in_(projectIds))
+        .values(tasks_version=Project.tasks_version + 1)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,40 @@
+import base64
+import binascii
+import json
+
+
+def encodeCursor(values: list) -> str:
+    """
+    Opaque cursor of a page made of the sort values of its last row
+
+    Args:
+        values (list): json serializable values (datetimes as iso strings)
+
+    Returns:
+        str: url safe cursor
+    """
+    encoded = json.dumps(values , separators=(",", ":"))
+    return base64.urlsafe_b64encode(encoded.encode()).decode().rstrip("=")
+
+
+def decodeCursor(cursor: str , size: int) -> list:
+    """
+    Values of a cursor made by encodeCursor
+
+    Args:
+        cursor (str): the cursor
+        size (int): number of values the cursor holds
+
+    Raises:
+        ValueError: if the cursor is not one of encodeCursor with size values
+
+    Returns:
+        list: the values
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError , binascii.Error):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values , list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
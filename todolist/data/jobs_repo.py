@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update, or_
+from sqlalchemy.exc import IntegrityError
+
+from todolist.db import get_session
+from todolist.data.unit_of_work import SessionScope, SessionFactory
+from todolist.core.Models.models import JobRun
+
+
+def _utc(value: datetime) -> datetime:
+    # times are stored in utc , sqlite drops the offset and compares them as text
+    return value.astimezone(timezone.utc)
+
+
+def _aware(value: datetime | None) -> datetime | None:
+    # sqlite hands back naive datetimes , see _utc
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class JobsRepo(SessionScope):
+    """
+    A class used to keep the run state of the scheduled jobs in the database , so the scheduler
+    of every worker agrees on when a job last ran and on who is running it
+    """
+
+    def __init__(self , session_factory: SessionFactory = get_session):
+        """
+        Initializing a jobs repo instance
+
+        Args:
+            session_factory (SessionFactory , optional): factory used to open new sessions. defaults to get_session
+        """
+        super().__init__(session_factory)
+
+    def ensure(self , name: str) -> None:
+        """
+        Creating the run state of a job if no scheduler did yet
+
+        Args:
+            name (str): name of the job
+        """
+        try:
+            with self._session() as session:
+                if session.get(JobRun , name) is None:
+                    session.add(JobRun(name=name))
+        except IntegrityError:
+            # another worker created it first
+            pass
+
+    def last_run(self , name: str) -> datetime | None:
+        """
+        Getting when a job last ran
+
+        Args:
+            name (str): name of the job
+
+        Returns:
+            datetime | None: start of the last successful run , None if it never ran
+        """
+        with self._session() as session:
+            stmt = select(JobRun.last_run_at).where(JobRun.name == name)
+            return _aware(session.execute(stmt).scalar_one_or_none())
+
+    def acquire(self , name: str , owner: str , now: datetime , leaseSeconds: float) -> JobRun | None:
+        """
+        Taking the lease of a job with a single conditional UPDATE , only one scheduler gets it
+        until it releases it or the lease expires
+
+        Args:
+            name (str): name of the job
+            owner (str): id of the scheduler asking for the lease
+            now (datetime): current time
+            leaseSeconds (float): how long the lease holds if it is never released
+
+        Returns:
+            JobRun | None: run state of the job as seen under the lease , None if another scheduler holds it
+        """
+        now = _utc(now)
+        stmt = (
+            update(JobRun)
+            .where(JobRun.name == name)
+            .where(or_(JobRun.lease_until.is_(None) , JobRun.lease_until <= now , JobRun.lease_owner == owner))
+            .values(lease_owner=owner , lease_until=now + timedelta(seconds=leaseSeconds))
+            .returning(JobRun)
+            .execution_options(synchronize_session=False)
+        )
+        with self._session() as session:
+            jobRun = session.execute(stmt).scalar_one_or_none()
+            if jobRun is not None:
+                # detached first , normalizing the time must not be flushed back
+                session.expunge(jobRun)
+                jobRun.last_run_at = _aware(jobRun.last_run_at)
+            return jobRun
+
+    def release(self , name: str , owner: str , ranAt: datetime | None = None) -> None:
+        """
+        Giving back the lease of a job
+
+        Args:
+            name (str): name of the job
+            owner (str): id of the scheduler holding the lease
+            ranAt (datetime | None , optional): start of the run to record as the last one. defaults to None (the job did not run)
+        """
+        values = {"lease_owner": None , "lease_until": None}
+        if ranAt is not None:
+            values["last_run_at"] = _utc(ranAt)
+        stmt = (
+            update(JobRun)
+            .where(JobRun.name == name , JobRun.lease_owner == owner)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        with self._session() as session:
+            session.execute(stmt)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from todolist.data.memory_store import MemoryStore, aware
+from todolist.core.Models.models import JobRun
+
+
+class MemoryJobsRepo:
+    """
+    A class used to keep the run state of the scheduled jobs in memory of the program (memory storage backend) ,
+    only the scheduler of this process uses them
+
+    Attributes:
+        _store (MemoryStore): protected attribute holding the rows , shared with the other memory repos
+    """
+
+    def __init__(self , store: MemoryStore):
+        """
+        Initializing a memory jobs repo instance
+
+        Args:
+            store (MemoryStore): where the rows are kept
+        """
+        self._store = store
+
+    def ensure(self , name: str) -> None:
+        """
+        Creating the run state of a job if missing
+
+        Args:
+            name (str): name of the job
+        """
+        store = self._store
+        with store.unit_of_work():
+            if name not in store.jobs:
+                store.set(store.jobs , name , {"name": name , "last_run_at": None , "lease_owner": None , "lease_until": None})
+
+    def last_run(self , name: str) -> datetime | None:
+        """
+        Getting when a job last ran
+
+        Args:
+            name (str): name of the job
+
+        Returns:
+            datetime | None: start of the last successful run , None if it never ran
+        """
+        with self._store.unit_of_work():
+            values = self._store.jobs.get(name)
+            return values["last_run_at"] if values else None
+
+    def acquire(self , name: str , owner: str , now: datetime , leaseSeconds: float) -> JobRun | None:
+        """
+        Taking the lease of a job until it is released or the lease expires
+
+        Args:
+            name (str): name of the job
+            owner (str): id of the scheduler asking for the lease
+            now (datetime): current time
+            leaseSeconds (float): how long the lease holds if it is never released
+
+        Returns:
+            JobRun | None: run state of the job as seen under the lease , None if another scheduler holds it
+        """
+        store = self._store
+        now = aware(now)
+        with store.unit_of_work():
+            values = store.jobs.get(name)
+            if values is None:
+                return None
+            if values["lease_until"] is not None and values["lease_until"] > now and values["lease_owner"] != owner:
+                return None
+            values = {**values , "lease_owner": owner , "lease_until": now + timedelta(seconds=leaseSeconds)}
+            store.set(store.jobs , name , values)
+            return store.row(JobRun , values)
+
+    def release(self , name: str , owner: str , ranAt: datetime | None = None) -> None:
+        """
+        Giving back the lease of a job
+
+        Args:
+            name (str): name of the job
+            owner (str): id of the scheduler holding the lease
+            ranAt (datetime | None , optional): start of the run to record as the last one. defaults to None (the job did not run)
+        """
+        store = self._store
+        with store.unit_of_work():
+            values = store.jobs.get(name)
+            if values is None or values["lease_owner"] != owner:
+                return
+            values = {**values , "lease_owner": None , "lease_until": None}
+            if ranAt is not None:
+                values["last_run_at"] = aware(ranAt)
+            store.set(store.jobs , name , values)
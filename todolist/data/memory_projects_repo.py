@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+from contextlib import AbstractContextManager
+
+from todolist.data.counters import PROJECTS_COUNTER, TASKS_COUNTER
+from todolist.data.memory_store import MemoryStore
+from todolist.core.Models.models import Project
+
+# column defaults of the projects table
+_DEFAULTS = {"version": 1 , "tasks_version": 0}
+
+
+class MemoryProjectsRepo:
+    """
+    A class used to represent the projects in memory of the program (memory storage backend) , indexed by id and by name
+
+    Attributes:
+        _store (MemoryStore): protected attribute holding the rows , shared with the other memory repos
+    """
+
+    def __init__(self , store: MemoryStore):
+        """
+        Initializing a memory Project repo instance
+
+        Args:
+            store (MemoryStore): where the rows are kept , the same one as the MemoryTasksRepo
+        """
+        self._store = store
+
+    def unit_of_work(self) -> AbstractContextManager:
+        """
+        Run every repo call of the block atomically , undone if it raises (see MemoryStore.unit_of_work)
+        """
+        return self._store.unit_of_work()
+
+    def add(self , newProject: Project) -> Project:
+        """
+        Adding a new Project to the existing project repo
+
+        Args:
+            newProject (Project) : new Project to add
+
+        Raises:
+            ValueError: if the name is already used by another project
+
+        Returns:
+            Project: the Project added gets returned
+        """
+        store = self._store
+        with store.unit_of_work():
+            if newProject.name in store.project_names:
+                raise ValueError("Project name must be unique")
+            store.set(store.projects , newProject.id , store.values(newProject , _DEFAULTS))
+            store.set(store.project_names , newProject.name , newProject.id)
+            return newProject
+
+    def get(self , projectId: str) -> Project | None:
+        """
+        Getting a Project from the Project Repo
+
+        Args:
+            projectId (str): id of the project that we want to get
+
+        Returns:
+            Project: project with id projectId
+        """
+        with self._store.unit_of_work():
+            return self._store.row(Project , self._store.projects.get(projectId))
+
+    def get_many(self , projectIds: list[str]) -> dict[str , Project]:
+        """
+        Getting many Projects at once
+
+        Args:
+            projectIds (list[str]): ids of the projects that we want to get
+
+        Returns:
+            dict[str , Project]: found projects by id (missing ids are left out)
+        """
+        store = self._store
+        with store.unit_of_work():
+            return {rowId: store.row(Project , store.projects[rowId]) for rowId in projectIds if rowId in store.projects}
+
+    def delete_cascade(self , projectIds: list[str] , expectedVersion: int | None = None) -> dict[str , int]:
+        """
+        Deleting Projects along with their tasks (through the for_project index)
+
+        Args:
+            projectIds (list[str]): ids of the projects that we want to delete
+            expectedVersion (int | None , optional): only delete the projects whose version is still this one. defaults to None
+
+        Returns:
+            dict[str , int]: number of deleted tasks of every deleted project (missing projects are left out)
+        """
+        store = self._store
+        deleted = {}
+        with store.unit_of_work():
+            for projectId in dict.fromkeys(projectIds):
+                values = store.projects.get(projectId)
+                if values is None or (expectedVersion is not None and values["version"] != expectedVersion):
+                    continue
+                taskIds = store.pop(store.project_tasks , projectId) or {}
+                for taskId in taskIds:
+                    store.pop(store.tasks , taskId)
+                store.pop(store.projects , projectId)
+                store.pop(store.project_names , values["name"])
+                deleted[projectId] = len(taskIds)
+            if deleted:
+                store.count(PROJECTS_COUNTER , -len(deleted))
+                store.count(TASKS_COUNTER , -sum(deleted.values()))
+            return deleted
+
+    def put(self , newProject: Project) -> Project:
+        """
+        Updating a Project from Project Repo (inserted if missing , like a merge)
+
+        Args:
+            newProject (Project): new project to replace the existing one with the same id
+
+        Raises:
+            ValueError: if the name is already used by another project
+
+        Returns:
+            Project: updated project
+        """
+        store = self._store
+        with store.unit_of_work():
+            old = store.projects.get(newProject.id)
+            values = store.values(newProject , _DEFAULTS)
+            if old is not None:
+                # deferred on the loaded rows , never written by a put
+                values["tasks_version"] = old["tasks_version"]
+            self._write(old , values)
+            return store.row(Project , values)
+
+    def update_fields(self , projectId: str , values: dict , expectedVersion: int | None = None) -> Project | None:
+        """
+        Updating some fields of a Project (see MemoryStore.edited for the SQL expressions of Project.editValues)
+
+        Args:
+            projectId (str): id of the project to update
+            values (dict): column name to new value or SQL expression (see Project.editValues)
+            expectedVersion (int | None , optional): only update the project if its version is still this one. defaults to None
+
+        Raises:
+            ValueError: if the name is already used by another project
+
+        Returns:
+            Project | None: the updated project , None if there is no project with id projectId (and version expectedVersion)
+        """
+        store = self._store
+        with store.unit_of_work():
+            old = store.projects.get(projectId)
+            if old is None or (expectedVersion is not None and old["version"] != expectedVersion):
+                return None
+            new = store.edited(old , values)
+            self._write(old , new)
+            return store.row(Project , new)
+
+    def _write(self , old: dict | None , new: dict) -> None:
+        """
+        Storing the new values of a project and keeping the name index up to date
+
+        Raises:
+            ValueError: if the name is already used by another project
+        """
+        store = self._store
+        if store.project_names.get(new["name"] , new["id"]) != new["id"]:
+            raise ValueError("Project name must be unique")
+        if old is not None and old["name"] != new["name"]:
+            store.pop(store.project_names , old["name"])
+        store.set(store.projects , new["id"] , new)
+        store.set(store.project_names , new["name"] , new["id"])
+
+    def get_version(self , projectId: str) -> int | None:
+        """
+        Getting the version of a Project (its ETag)
+
+        Args:
+            projectId (str): id of the project
+
+        Returns:
+            int | None: version of the project , None if there is no project with id projectId
+        """
+        with self._store.unit_of_work():
+            values = self._store.projects.get(projectId)
+            return values["version"] if values is not None else None
+
+    def get_tasks_version(self , projectId: str) -> int | None:
+        """
+        Getting the version of the tasks of a Project
+
+        Args:
+            projectId (str): id of the project
+
+        Returns:
+            int | None: tasks version of the project , None if there is no project with id projectId
+        """
+        with self._store.unit_of_work():
+            values = self._store.projects.get(projectId)
+            return values["tasks_version"] if values is not None else None
+
+    def list(self) -> list[Project]:
+        """
+        Listing the Projects
+
+        Returns:
+            list[Projects]: list of all projects
+        """
+        with self._store.unit_of_work():
+            return [self._store.row(Project , values) for values in self._store.projects.values()]
+
+    def name_exists(self , name: str , excludeId: str | None = None) -> bool:
+        """
+        Checking whether a project with the given name exists , using the name index
+
+        Args:
+            name (str): name to look for
+            excludeId (str | None , optional): id of a project to ignore (the one being renamed). defaults to None
+
+        Returns:
+            bool: True if another project already has the name
+        """
+        with self._store.unit_of_work():
+            projectId = self._store.project_names.get(name)
+            return projectId is not None and projectId != excludeId
+
+    def reserve_slots(self , maxCount: int , count: int = 1) -> bool:
+        """
+        Taking `count` slots of the projects counter if it stays within maxCount (O(1) quota check).
+        In a unit of work with the insert , a failed insert gives the slots back.
+
+        Args:
+            maxCount (int): maximum allowed number of projects
+            count (int , optional): number of projects about to be inserted. defaults to 1
+
+        Returns:
+            bool: False if the maximum would be exceeded (nothing reserved)
+        """
+        store = self._store
+        with store.unit_of_work():
+            if store.counters[PROJECTS_COUNTER] + count > maxCount:
+                return False
+            store.count(PROJECTS_COUNTER , count)
+            return True
+
+    def length(self) -> int:
+        """
+        getting the number of total projects
+
+        Returns:
+            int: the number of projects
+        """
+        with self._store.unit_of_work():
+            return len(self._store.projects)
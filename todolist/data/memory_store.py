@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator
+
+from sqlalchemy.sql import ClauseElement
+from sqlalchemy.orm import configure_mappers, make_transient_to_detached
+
+
+def aware(value: datetime | None) -> datetime | None:
+    # deadlines may be naive , they are compared as utc times (like postgres in a utc session)
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class MemoryStore:
+    """
+    A class used to keep the rows of the memory storage backend in dicts , shared by its repos (MemoryProjectsRepo ,
+    MemoryTasksRepo , MemoryJobsRepo). Rows are kept as column values and handed out as new detached instances , so
+    callers can edit what they get without touching the store. Every repo call runs under one lock , writes are
+    recorded so a unit of work that raises is undone
+
+    Attributes:
+        projects (dict[str , dict]): column values of the projects by id
+        tasks (dict[str , dict]): column values of the tasks by id
+        project_tasks (dict[str , dict[str , None]]): ids of the tasks of every project with at least one task (in insertion order)
+        project_names (dict[str , str]): id of the project with a name (the unique index on projects.name)
+        counters (dict[str , int]): quota counters by name (projects , tasks)
+        jobs (dict[str , dict]): run state of the scheduled jobs by name
+    """
+
+    def __init__(self):
+        """
+        Initializing an empty memory store
+        """
+        self.projects: dict[str , dict] = {}
+        self.tasks: dict[str , dict] = {}
+        self.project_tasks: dict[str , dict[str , None]] = {}
+        self.project_names: dict[str , str] = {}
+        self.counters: dict[str , int] = {"projects": 0 , "tasks": 0}
+        self.jobs: dict[str , dict] = {}
+        self._lock = threading.RLock()
+        # undo actions of the open unit of work , None when there is none
+        self._undo: list | None = None
+        # row hands out instances without going through the mapped constructors (which configure the mappers on first use) ,
+        # e.g. the job leases of the scheduler may be the first rows of the process
+        configure_mappers()
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[None]:
+        """
+        Run every repo call of the block atomically: other threads wait , and the writes are undone if the block raises.
+        Nested units of work join the outer one
+        """
+        with self._lock:
+            if self._undo is not None:
+                yield
+                return
+            self._undo = []
+            try:
+                yield
+            except BaseException:
+                for undo in reversed(self._undo):
+                    undo()
+                raise
+            finally:
+                self._undo = None
+
+    def set(self , mapping: dict , key , value) -> None:
+        """
+        Setting a key of one of the dicts of the store (inside a unit of work)
+
+        Args:
+            mapping (dict): a dict of the store (or one of the nested dicts of project_tasks)
+            key: key to set
+            value: new value , never mutated afterwards (values are replaced , so the undo keeps the old one)
+        """
+        self._remember(mapping , key)
+        mapping[key] = value
+
+    def pop(self , mapping: dict , key):
+        """
+        Removing a key of one of the dicts of the store (inside a unit of work)
+
+        Returns:
+            the removed value , None if the key was missing
+        """
+        self._remember(mapping , key)
+        return mapping.pop(key , None)
+
+    def _remember(self , mapping: dict , key) -> None:
+        if key in mapping:
+            old = mapping[key]
+            self._undo.append(lambda: mapping.__setitem__(key , old))
+        else:
+            self._undo.append(lambda: mapping.pop(key , None))
+
+    def row(self , model: type , values: dict | None):
+        """
+        A detached instance of a model holding column values of the store
+
+        Args:
+            model (type): mapped class of the row
+            values (dict | None): column values
+
+        Returns:
+            model | None: the instance , None if values is None
+        """
+        if values is None:
+            return None
+        row = model.__mapper__.class_manager.new_instance()
+        # loaded values , not attribute changes (no history , no attribute events)
+        row.__dict__.update(values)
+        # looks like a row loaded by a closed session , like the rows of the database repos
+        make_transient_to_detached(row)
+        return row
+
+    def values(self , row , defaults: dict | None = None) -> dict:
+        """
+        Column values of an instance to keep in the store
+
+        Args:
+            row: instance of a mapped class
+            defaults (dict | None , optional): values of the columns left unset (the column defaults of the database). defaults to None
+
+        Returns:
+            dict: column name to value
+        """
+        values = {attr.key: row.__dict__.get(attr.key) for attr in type(row).__mapper__.column_attrs}
+        for column , value in (defaults or {}).items():
+            if values[column] is None:
+                values[column] = value
+        return values
+
+    def edited(self , values: dict , edit: dict , now: datetime | None = None) -> dict:
+        """
+        Column values after an update with the SET clause of Project.editValues / Task.editValues. plain values are set ,
+        the SQL expressions follow the rules of edit: version is incremented , at_closed is stamped (if missing) when the
+        status changes to done from another one
+
+        Args:
+            values (dict): column values before the update
+            edit (dict): column name to new value or SQL expression
+            now (datetime | None , optional): closing time stamped on at_closed. defaults to the current time
+
+        Returns:
+            dict: the new column values (values is left as is)
+        """
+        new = dict(values)
+        for column , value in edit.items():
+            if not isinstance(value , ClauseElement):
+                new[column] = value
+        if isinstance(edit.get("version") , ClauseElement):
+            new["version"] = values["version"] + 1
+        if isinstance(edit.get("at_closed") , ClauseElement) and values["status"] != "done":
+            new["at_closed"] = values["at_closed"] or now or datetime.now(timezone.utc)
+        return new
+
+    def bump_tasks_version(self , *projectIds: str) -> None:
+        """
+        Incrementing the tasks version of projects (the ones that exist) , done by every write to their tasks
+        """
+        for projectId in projectIds:
+            project = self.projects.get(projectId)
+            if project is not None:
+                self.set(self.projects , projectId , {**project , "tasks_version": project["tasks_version"] + 1})
+
+    def count(self , name: str , amount: int) -> None:
+        """
+        Adding amount (negative to give slots back) to a quota counter
+        """
+        self.set(self.counters , name , self.counters[name] + amount)
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+from contextlib import AbstractContextManager
+from datetime import datetime
+
+from todolist.data.counters import TASKS_COUNTER
+from todolist.data.memory_store import MemoryStore, aware
+from todolist.core.Models.models import Task
+
+# column defaults of the tasks table
+_DEFAULTS = {"status": "todo" , "version": 1}
+
+
+class MemoryTasksRepo:
+    """
+    A class used to represent the tasks in memory of the program (memory storage backend) , indexed by id and by
+    for_project
+
+    Attributes:
+        _store (MemoryStore): protected attribute holding the rows , shared with the other memory repos
+    """
+
+    def __init__(self , store: MemoryStore):
+        """
+        Initializing a memory Task repo instance
+
+        Args:
+            store (MemoryStore): where the rows are kept , the same one as the MemoryProjectsRepo
+        """
+        self._store = store
+
+    def unit_of_work(self) -> AbstractContextManager:
+        """
+        Run every repo call of the block atomically , undone if it raises (see MemoryStore.unit_of_work)
+        """
+        return self._store.unit_of_work()
+
+    def add(self , newTask: Task) -> Task:
+        """
+        Adding a new Task to the existing task repo and to the task list of the related project
+
+        Args:
+            newTask (Task) : new Task to add
+
+        Returns:
+            Task: the Task added gets returned
+        """
+        with self._store.unit_of_work():
+            self._write(None , self._store.values(newTask , _DEFAULTS))
+            return newTask
+
+    def get(self , taskId: str) -> Task | None:
+        """
+        Getting a Task from the Task Repo
+
+        Args:
+            taskId (str): id of the task that we want to get
+
+        Returns:
+            Task: task with id taskId
+        """
+        with self._store.unit_of_work():
+            return self._store.row(Task , self._store.tasks.get(taskId))
+
+    def get_version(self , taskId: str) -> int | None:
+        """
+        Getting the version of a Task (its ETag)
+
+        Args:
+            taskId (str): id of the task
+
+        Returns:
+            int | None: version of the task , None if there is no task with id taskId
+        """
+        with self._store.unit_of_work():
+            values = self._store.tasks.get(taskId)
+            return values["version"] if values is not None else None
+
+    def get_many(self , taskIds: list[str]) -> dict[str , Task]:
+        """
+        Getting many Tasks at once
+
+        Args:
+            taskIds (list[str]): ids of the tasks that we want to get
+
+        Returns:
+            dict[str , Task]: found tasks by id (missing ids are left out)
+        """
+        store = self._store
+        with store.unit_of_work():
+            return {rowId: store.row(Task , store.tasks[rowId]) for rowId in taskIds if rowId in store.tasks}
+
+    def put(self , newTask: Task) -> Task:
+        """
+        Updating a Task from Task Repo (inserted if missing , like a merge)
+
+        Args:
+            newTask (Task): new task to replace the existing one with the same id
+
+        Returns:
+            Task: updated task
+        """
+        store = self._store
+        with store.unit_of_work():
+            values = store.values(newTask , _DEFAULTS)
+            self._write(store.tasks.get(newTask.id) , values)
+            return store.row(Task , values)
+
+    def add_to_project(self , newTask: Task) -> bool:
+        """
+        Inserting a new Task only if its project exists
+
+        Args:
+            newTask (Task) : new Task to add
+
+        Returns:
+            bool: False if the project of the task does not exist (nothing inserted)
+        """
+        with self._store.unit_of_work():
+            if newTask.for_project not in self._store.projects:
+                return False
+            self._write(None , self._store.values(newTask , _DEFAULTS))
+            return True
+
+    def update_fields(self , taskId: str , values: dict , expectedVersion: int | None = None) -> Task | None:
+        """
+        Updating some fields of a Task (see MemoryStore.edited for the SQL expressions of Task.editValues)
+
+        Args:
+            taskId (str): id of the task to update
+            values (dict): column name to new value or SQL expression (see Task.editValues)
+            expectedVersion (int | None , optional): only update the task if its version is still this one. defaults to None
+
+        Returns:
+            Task | None: the updated task , None if there is no task with id taskId (and version expectedVersion)
+        """
+        store = self._store
+        with store.unit_of_work():
+            old = store.tasks.get(taskId)
+            if old is None or (expectedVersion is not None and old["version"] != expectedVersion):
+                return None
+            new = store.edited(old , values)
+            self._write(old , new)
+            return store.row(Task , new)
+
+    def update_many(self , taskIds: list[str] , values: dict) -> list[Task]:
+        """
+        Applying the same change to many Tasks (see MemoryStore.edited for the SQL expressions of Task.editValues)
+
+        Args:
+            taskIds (list[str]): ids of the tasks to update
+            values (dict): column name to new value or SQL expression (see Task.editValues) , evaluated on every row
+
+        Returns:
+            list[Task]: the updated tasks (missing ids are left out)
+        """
+        store = self._store
+        updated = []
+        with store.unit_of_work():
+            for taskId in dict.fromkeys(taskIds):
+                old = store.tasks.get(taskId)
+                if old is None:
+                    continue
+                new = store.edited(old , values)
+                self._write(old , new)
+                updated.append(store.row(Task , new))
+            return updated
+
+    def delete(self , taskId: str , expectedVersion: int | None = None) -> str | None:
+        """
+        Deleting a Task from the Task Repo and the related project's task list
+
+        Args:
+            taskId (str): id of the task that we want to delete
+            expectedVersion (int | None , optional): only delete the task if its version is still this one. defaults to None
+
+        Returns:
+            str | None: id of the project of the deleted task , None if nothing was deleted
+        """
+        store = self._store
+        with store.unit_of_work():
+            old = store.tasks.get(taskId)
+            if old is None or (expectedVersion is not None and old["version"] != expectedVersion):
+                return None
+            store.pop(store.tasks , taskId)
+            self._unindex(old)
+            store.count(TASKS_COUNTER , -1)
+            store.bump_tasks_version(old["for_project"])
+            return old["for_project"]
+
+    def delete_project(self , projectId: str) -> int:
+        """
+        Cascade delete of the tasks when the parent project is deleted
+
+        Args:
+            projectId (str) : id of the project deleted
+
+        Returns:
+            int: number of deleted tasks
+        """
+        store = self._store
+        with store.unit_of_work():
+            taskIds = store.pop(store.project_tasks , projectId) or {}
+            for taskId in taskIds:
+                store.pop(store.tasks , taskId)
+            if taskIds:
+                store.count(TASKS_COUNTER , -len(taskIds))
+            return len(taskIds)
+
+    def list_by_project(self , projectId: str) -> list[Task]:
+        """
+        Listing the tasks of a project (through the for_project index)
+
+        Args:
+            projectId (str): id of the project to show it's task children
+
+        Returns:
+            list[Task]: list of all tasks of the the project with id = projectId
+        """
+        store = self._store
+        with store.unit_of_work():
+            return [store.row(Task , store.tasks[taskId]) for taskId in store.project_tasks.get(projectId , ())]
+
+    def reserve_slots(self , maxCount: int , count: int = 1) -> bool:
+        """
+        Taking `count` slots of the tasks counter if it stays within maxCount (O(1) quota check).
+        In a unit of work with the insert , a failed insert gives the slots back.
+
+        Args:
+            maxCount (int): maximum allowed number of tasks
+            count (int , optional): number of tasks about to be inserted. defaults to 1
+
+        Returns:
+            bool: False if the maximum would be exceeded (nothing reserved)
+        """
+        store = self._store
+        with store.unit_of_work():
+            if store.counters[TASKS_COUNTER] + count > maxCount:
+                return False
+            store.count(TASKS_COUNTER , count)
+            return True
+
+    def length(self) -> int:
+        """
+        getting the number of total tasks
+
+        Returns:
+            int: the number of tasks
+        """
+        with self._store.unit_of_work():
+            return len(self._store.tasks)
+
+    def close_overdue(self , compareTime: datetime , chunkSize: int = 0) -> int:
+        """
+        Find all tasks whose deadline has passed and are not 'done',
+        mark them as done , set at_closed if missing and bump their version (a scan of every task)
+
+        Args:
+            compareTime (datetime): tasks with a deadline before this time are overdue , also used as the closing time
+            chunkSize (int , optional): ignored , there is no transaction to keep short. defaults to 0
+
+        Returns:
+            int: number of tasks that where updated
+        """
+        store = self._store
+        compareTime = aware(compareTime)
+        with store.unit_of_work():
+            overdue = [
+                values for values in store.tasks.values()
+                if values["deadline"] is not None and aware(values["deadline"]) < compareTime and values["status"] != "done"
+            ]
+            for values in overdue:
+                store.set(store.tasks , values["id"] , {**values , "status": "done" , "at_closed": values["at_closed"] or compareTime , "version": values["version"] + 1})
+            store.bump_tasks_version(*{values["for_project"] for values in overdue})
+            return len(overdue)
+
+    def _write(self , old: dict | None , new: dict) -> None:
+        """
+        Storing the new values of a task , keeping the for_project index up to date and bumping the tasks version of its project(s)
+        """
+        store = self._store
+        if old is not None and old["for_project"] != new["for_project"]:
+            self._unindex(old)
+        store.set(store.tasks , new["id"] , new)
+        if new["for_project"] not in store.project_tasks:
+            store.set(store.project_tasks , new["for_project"] , {})
+        store.set(store.project_tasks[new["for_project"]] , new["id"] , None)
+        store.bump_tasks_version(*{new["for_project"] , old["for_project"] if old else new["for_project"]})
+
+    def _unindex(self , old: dict) -> None:
+        store = self._store
+        projectTasks = store.project_tasks.get(old["for_project"])
+        if projectTasks is not None:
+            store.pop(projectTasks , old["id"])
+            if not projectTasks:
+                store.pop(store.project_tasks , old["for_project"])
@@ -1,17 +1,16 @@
-from typing import Callable
-
-from sqlalchemy import select, delete, func
-from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, update, func, exists
+from sqlalchemy.exc import IntegrityError
 
 from todolist.db import get_session
 
-from todolist.core.Models.models import Project
-
+from todolist.data.counters import PROJECTS_COUNTER, reserveStatement
+from todolist.data.unit_of_work import SessionScope, SessionFactory
+from todolist.data.cache import CacheBackend, RowCache
+from todolist.data.cascade import projectsDeleteStatement, taskCountsQuery, releaseDeletedStatement, cascadeDeleteStatement
+from todolist.core.Models.models import Project, Task
 
-SessionFactory = Callable[[], Session]
 
-
-class ProjectsRepo:
+class ProjectsRepo(SessionScope):
     """
     A class used to represent the projects in memory of the program
 
@@ -19,11 +18,18 @@ class ProjectsRepo:
         _project (dict[str , Projects]): protected attribure to store the projects in a dictionary with ids as the keys
     """
     
-    def __init__(self , session_factory: SessionFactory = get_session):
+    def __init__(self , session_factory: SessionFactory = get_session , cache: CacheBackend | None = None , task_cache: CacheBackend | None = None):
         """
         Initializing a Project repo instance
+
+        Args:
+            session_factory (SessionFactory , optional): factory used to open new sessions. defaults to get_session
+            cache (CacheBackend | None , optional): read-through cache of get() , invalidated by the writes. defaults to None (no cache)
+            task_cache (CacheBackend | None , optional): cache of the tasks repo , invalidated when projects are deleted with their tasks. defaults to None (no cache)
         """
-        self._session_factory = session_factory
+        super().__init__(session_factory)
+        self._cache = RowCache(cache , Project) if cache is not None else None
+        self._task_cache = RowCache(task_cache , Task) if task_cache is not None else None
     
     def add(self , newProject: Project) -> Project:
         """
@@ -32,14 +38,22 @@ class ProjectsRepo:
         Args:
             newProject (Project) : new Project to add 
 
+        Raises:
+            ValueError: if the name is already used by another project
+
         Returns:
             Project: the Project added gets returned 
         """
 
-        with self._session_factory() as session:
+        with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , newProject.id)
             session.add(newProject)
-            session.commit()
-            session.refresh(newProject)
+            try:
+                session.flush()
+            except IntegrityError:
+                # lost a race against another insert of the same name
+                raise ValueError("Project name must be unique")
             return newProject
 
     def get(self , projectId: str ) -> Project | None:
@@ -52,27 +66,80 @@ class ProjectsRepo:
         Returns:
             Project: project with id projectId 
         """
-        with self._session_factory() as session:
+        if self._cache:
+            cached = self._cache.get(projectId)
+            if cached is not None:
+                return cached
+        with self._session() as session:
             query = select(Project).where(Project.id == projectId)
             result = session.execute(query).scalar_one_or_none()
+            # rows read in a unit of work may not be committed yet
+            if self._cache and result is not None and not self._in_unit_of_work():
+                self._cache.put(result)
             return result
 
-    def delete(self , projectId) -> bool:
+    def get_many(self , projectIds: list[str]) -> dict[str , Project]:
         """
-        Deleting a Project from the Project Repo
+        Getting many Projects at once: the cached ones from the cache , the others with one WHERE id IN (...) query
 
         Args:
-            projectId (str): id of the project that we want to delete
-        
+            projectIds (list[str]): ids of the projects that we want to get
+
         Returns:
-            bool: a boolean value indicating the success of the operation
+            dict[str , Project]: found projects by id (missing ids are left out)
         """
-        with self._session_factory() as session:
-            query = delete(Project).where(Project.id == projectId)
-            result = session.execute(query)
-            session.commit()
-            return result.rowcount > 0
-    
+        found = {}
+        projectIds = list(dict.fromkeys(projectIds))
+        if self._cache:
+            for rowId in projectIds:
+                cached = self._cache.get(rowId)
+                if cached is not None:
+                    found[rowId] = cached
+        missing = [rowId for rowId in projectIds if rowId not in found]
+        if not missing:
+            return found
+        with self._session() as session:
+            query = select(Project).where(Project.id.in_(missing))
+            rows = session.execute(query).scalars().all()
+            # rows read in a unit of work may not be committed yet
+            cacheable = self._cache and not self._in_unit_of_work()
+            for row in rows:
+                if cacheable:
+                    self._cache.put(row)
+                found[row.id] = row
+            return found
+
+    def delete_cascade(self , projectIds: list[str] , expectedVersion: int | None = None) -> dict[str , int]:
+        """
+        Deleting Projects along with their tasks: one DELETE relying on the ON DELETE CASCADE foreign key of the tasks
+        (on postgres the tasks are counted and the counters given back by the same statement , see cascadeDeleteStatement)
+
+        Args:
+            projectIds (list[str]): ids of the projects that we want to delete
+            expectedVersion (int | None , optional): only delete the projects whose version is still this one. defaults to None
+
+        Returns:
+            dict[str , int]: number of deleted tasks of every deleted project (missing projects are left out)
+        """
+        if not projectIds:
+            return {}
+        with self._session() as session:
+            if session.get_bind().dialect.name == "postgresql":
+                deleted = dict(session.execute(cascadeDeleteStatement(projectIds , expectedVersion)).all())
+            else:
+                # counted first , the cascade of a row runs before the next row is read
+                counts = dict(session.execute(taskCountsQuery(projectIds)).all())
+                deletedIds = session.execute(projectsDeleteStatement(projectIds , expectedVersion)).scalars().all()
+                deleted = {projectId: counts.get(projectId , 0) for projectId in deletedIds}
+                if deleted:
+                    session.execute(releaseDeletedStatement(len(deleted) , sum(deleted.values())))
+            if self._cache and deleted:
+                self._cache.invalidate(session , *deleted)
+            if self._task_cache and any(deleted.values()):
+                # the ids of the deleted tasks are not known , project deletes are rare enough to drop them all
+                self._task_cache.invalidate_all(session)
+            return deleted
+
     def put(self , newProject: Project ) -> Project:
         """
         Updating a Project from Project Repo
@@ -86,12 +153,72 @@ class ProjectsRepo:
         Returns:
             Project: updated project
         """
-        with self._session_factory() as session:
+        with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , newProject.id)
             merged = session.merge(newProject)
-            session.commit()
-            session.refresh(merged)
+            try:
+                session.flush()
+            except IntegrityError:
+                raise ValueError("Project name must be unique")
             return merged
     
+    def update_fields(self , projectId: str , values: dict , expectedVersion: int | None = None) -> Project | None:
+        """
+        Updating some fields of a Project with a single UPDATE ... RETURNING statement
+
+        Args:
+            projectId (str): id of the project to update
+            values (dict): column name to new value or SQL expression (see Project.editValues)
+            expectedVersion (int | None , optional): only update the project if its version is still this one. defaults to None
+
+        Raises:
+            ValueError: if the name is already used by another project
+
+        Returns:
+            Project | None: the updated project , None if there is no project with id projectId (and version expectedVersion)
+        """
+        stmt = update(Project).where(Project.id == projectId)
+        if expectedVersion is not None:
+            stmt = stmt.where(Project.version == expectedVersion)
+        stmt = stmt.values(**values).returning(Project).execution_options(synchronize_session=False)
+        with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , projectId)
+            try:
+                result = session.execute(stmt)
+            except IntegrityError:
+                raise ValueError("Project name must be unique")
+            return result.scalar_one_or_none()
+
+    def get_version(self , projectId: str) -> int | None:
+        """
+        Getting the version of a Project (its ETag) , without loading the project (never cached)
+
+        Args:
+            projectId (str): id of the project
+
+        Returns:
+            int | None: version of the project , None if there is no project with id projectId
+        """
+        with self._session() as session:
+            stmt = select(Project.version).where(Project.id == projectId)
+            return session.execute(stmt).scalar_one_or_none()
+
+    def get_tasks_version(self , projectId: str) -> int | None:
+        """
+        Getting the version of the tasks of a Project , without loading the project (never cached)
+
+        Args:
+            projectId (str): id of the project
+
+        Returns:
+            int | None: tasks version of the project , None if there is no project with id projectId
+        """
+        with self._session() as session:
+            stmt = select(Project.tasks_version).where(Project.id == projectId)
+            return session.execute(stmt).scalar_one_or_none()
+
     def list(self) -> list[Project]:
         """
         Listing the Projects
@@ -99,11 +226,44 @@ class ProjectsRepo:
         Returns:
             list[Projects]: list of all projects 
         """
-        with self._session_factory() as session:
+        with self._session() as session:
             stmt = select(Project)
             result = session.execute(stmt).scalars().all()
             return result
     
+    def name_exists(self , name: str , excludeId: str | None = None) -> bool:
+        """
+        Checking whether a project with the given name exists , using the unique index on projects.name
+
+        Args:
+            name (str): name to look for
+            excludeId (str | None , optional): id of a project to ignore (the one being renamed). defaults to None
+
+        Returns:
+            bool: True if another project already has the name
+        """
+        with self._session() as session:
+            condition = Project.name == name
+            if excludeId:
+                condition = condition & (Project.id != excludeId)
+            return bool(session.execute(select(exists().where(condition))).scalar())
+
+    def reserve_slots(self , maxCount: int , count: int = 1) -> bool:
+        """
+        Taking `count` slots of the projects counter if it stays within maxCount (O(1) quota check).
+        Must run in the same unit of work as the insert , so a failed insert gives the slots back.
+
+        Args:
+            maxCount (int): maximum allowed number of projects
+            count (int , optional): number of projects about to be inserted. defaults to 1
+
+        Returns:
+            bool: False if the maximum would be exceeded (nothing reserved)
+        """
+        with self._session() as session:
+            result = session.execute(reserveStatement(PROJECTS_COUNTER , maxCount , count))
+            return result.first() is not None
+
     def length(self) -> int:
         """
         getting the number of total projects
@@ -111,7 +271,7 @@ class ProjectsRepo:
         Returns:
             int: the number of projects
         """
-        with self._session_factory() as session:
+        with self._session() as session:
             stmt = select(func.count(Project.id))
             result = session.execute(stmt).scalar_one()
             return int(result or 0)
\ No newline at end of file
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Protocol
+
+from todolist.core.Models.models import Project, Task, JobRun
+
+
+class ProjectsRepository(Protocol):
+    """
+    Contract of the sync project repositories (ProjectsRepo on postgres or sqlite , MemoryProjectsRepo) ,
+    what ProjectService and TaskService rely on. Rows are handed out detached , editing them changes nothing stored
+    """
+
+    def unit_of_work(self) -> AbstractContextManager:
+        """Run every repo call of the block (of every repo of the backend) atomically , undone if it raises"""
+        ...
+
+    def add(self , newProject: Project) -> Project:
+        """Insert a project , ValueError if its name is taken"""
+        ...
+
+    def get(self , projectId: str) -> Project | None:
+        """Project with this id"""
+        ...
+
+    def get_many(self , projectIds: list[str]) -> dict[str , Project]:
+        """Projects with these ids by id , the missing ones left out"""
+        ...
+
+    def delete_cascade(self , projectIds: list[str] , expectedVersion: int | None = None) -> dict[str , int]:
+        """Delete projects with their tasks (only at expectedVersion if given) and give the slots back , deleted tasks of every deleted project"""
+        ...
+
+    def put(self , newProject: Project) -> Project:
+        """Replace the project with the same id , ValueError if its name is taken"""
+        ...
+
+    def update_fields(self , projectId: str , values: dict , expectedVersion: int | None = None) -> Project | None:
+        """Apply Project.editValues to a project (only at expectedVersion if given) , ValueError if the name is taken"""
+        ...
+
+    def get_version(self , projectId: str) -> int | None:
+        """Version of a project , None if there is no such project"""
+        ...
+
+    def get_tasks_version(self , projectId: str) -> int | None:
+        """Version of the tasks of a project , None if there is no such project"""
+        ...
+
+    def list(self) -> list[Project]:
+        """Every project"""
+        ...
+
+    def name_exists(self , name: str , excludeId: str | None = None) -> bool:
+        """Whether another project has this name"""
+        ...
+
+    def reserve_slots(self , maxCount: int , count: int = 1) -> bool:
+        """Take count slots of the projects quota if it stays within maxCount"""
+        ...
+
+    def length(self) -> int:
+        """Number of projects"""
+        ...
+
+
+class TasksRepository(Protocol):
+    """
+    Contract of the sync task repositories (TasksRepo on postgres or sqlite , MemoryTasksRepo) ,
+    what ProjectService and TaskService rely on. Every write bumps the tasks version of the project of the task
+    """
+
+    def unit_of_work(self) -> AbstractContextManager:
+        """Run every repo call of the block (of every repo of the backend) atomically , undone if it raises"""
+        ...
+
+    def add(self , newTask: Task) -> Task:
+        """Insert a task"""
+        ...
+
+    def get(self , taskId: str) -> Task | None:
+        """Task with this id"""
+        ...
+
+    def get_version(self , taskId: str) -> int | None:
+        """Version of a task , None if there is no such task"""
+        ...
+
+    def get_many(self , taskIds: list[str]) -> dict[str , Task]:
+        """Tasks with these ids by id , the missing ones left out"""
+        ...
+
+    def put(self , newTask: Task) -> Task:
+        """Replace the task with the same id"""
+        ...
+
+    def add_to_project(self , newTask: Task) -> bool:
+        """Insert a task only if its project exists , False if it does not"""
+        ...
+
+    def update_fields(self , taskId: str , values: dict , expectedVersion: int | None = None) -> Task | None:
+        """Apply Task.editValues to a task (only at expectedVersion if given) , None if there is no such task"""
+        ...
+
+    def update_many(self , taskIds: list[str] , values: dict) -> list[Task]:
+        """Apply the same Task.editValues to many tasks , the updated tasks"""
+        ...
+
+    def delete(self , taskId: str , expectedVersion: int | None = None) -> str | None:
+        """Delete a task (only at expectedVersion if given) and give its slot back , id of its project or None"""
+        ...
+
+    def delete_project(self , projectId: str) -> int:
+        """Delete the tasks of a project and give their slots back , number of deleted tasks"""
+        ...
+
+    def list_by_project(self , projectId: str) -> list[Task]:
+        """Tasks of a project"""
+        ...
+
+    def reserve_slots(self , maxCount: int , count: int = 1) -> bool:
+        """Take count slots of the tasks quota if it stays within maxCount"""
+        ...
+
+    def length(self) -> int:
+        """Number of tasks"""
+        ...
+
+    def close_overdue(self , compareTime: datetime , chunkSize: int = 0) -> int:
+        """Mark the open tasks with a deadline before compareTime as done (closed at compareTime) , number of closed tasks"""
+        ...
+
+
+class JobsRepository(Protocol):
+    """
+    Contract of the run state of the scheduled jobs (JobsRepo , MemoryJobsRepo) , what the Scheduler relies on
+    """
+
+    def ensure(self , name: str) -> None:
+        """Create the run state of a job if missing"""
+        ...
+
+    def last_run(self , name: str) -> datetime | None:
+        """Start of the last successful run of a job"""
+        ...
+
+    def acquire(self , name: str , owner: str , now: datetime , leaseSeconds: float) -> JobRun | None:
+        """Take the lease of a job , None if another owner holds an unexpired one"""
+        ...
+
+    def release(self , name: str , owner: str , ranAt: datetime | None = None) -> None:
+        """Give the lease of a job back , recording ranAt as its last run if given"""
+        ...
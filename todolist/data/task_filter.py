@@ -0,0 +1,141 @@
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+from todolist.core.Models.models import Task
+from todolist.data.cursor import encodeCursor, decodeCursor
+
+# sort keys of the task listings , a leading "-" sorts descending
+SORT_COLUMNS = {"id": Task.id , "name": Task.name , "deadline": Task.deadline , "at_closed": Task.at_closed}
+DATETIME_COLUMNS = {"deadline" , "at_closed"}
+
+
+class TaskFilter:
+    """
+    A class used to represent the filters and the order of a task listing , turned into the WHERE and ORDER BY of its query.
+    Pages are walked with a keyset cursor on (sort column , id) , NULLs sort after every value (before them when descending)
+
+    Attributes:
+        statuses (list[str] | None): only tasks with one of these statuses
+        deadlineBefore (datetime | None): only tasks with a deadline before this time
+        deadlineAfter (datetime | None): only tasks with a deadline at or after this time
+        closedSince (datetime | None): only tasks closed at or after this time
+        sort (str): sort key (see SORT_COLUMNS) , "-" prefixed for a descending order
+    """
+
+    def __init__(
+        self ,
+        statuses: list[str] | None = None ,
+        deadlineBefore: datetime | None = None ,
+        deadlineAfter: datetime | None = None ,
+        closedSince: datetime | None = None ,
+        sort: str = "id" ,
+    ):
+        """
+        Initializing a task filter
+
+        Args:
+            statuses (list[str] | None , optional): statuses to keep. defaults to None (every status)
+            deadlineBefore (datetime | None , optional): exclusive upper bound of the deadline. defaults to None
+            deadlineAfter (datetime | None , optional): inclusive lower bound of the deadline. defaults to None
+            closedSince (datetime | None , optional): inclusive lower bound of the closing time. defaults to None
+            sort (str , optional): sort key. defaults to "id"
+        """
+        self.statuses = statuses
+        self.deadlineBefore = deadlineBefore
+        self.deadlineAfter = deadlineAfter
+        self.closedSince = closedSince
+        self.sort = sort
+
+    @property
+    def sortKey(self) -> str:
+        return self.sort.lstrip("-")
+
+    @property
+    def descending(self) -> bool:
+        return self.sort.startswith("-")
+
+    def where(self) -> list:
+        """
+        Conditions of the filters
+
+        Returns:
+            list: WHERE clauses to AND together
+        """
+        clauses = []
+        if self.statuses:
+            clauses.append(Task.status.in_(self.statuses))
+        if self.deadlineBefore is not None:
+            clauses.append(Task.deadline < self.deadlineBefore)
+        if self.deadlineAfter is not None:
+            clauses.append(Task.deadline >= self.deadlineAfter)
+        if self.closedSince is not None:
+            clauses.append(Task.at_closed >= self.closedSince)
+        return clauses
+
+    def orderBy(self) -> list:
+        """
+        ORDER BY of the listing , id breaks the ties so the order is total
+        """
+        if self.sortKey == "id":
+            return [Task.id.desc() if self.descending else Task.id]
+        column = SORT_COLUMNS[self.sortKey]
+        if self.descending:
+            return [column.desc().nulls_first() , Task.id.desc()]
+        return [column.asc().nulls_last() , Task.id]
+
+    def after(self , cursor: str):
+        """
+        Condition keeping the rows after a cursor in the order of the listing
+
+        Args:
+            cursor (str): cursor of the last row of the previous page (see cursorOf)
+
+        Raises:
+            ValueError: if the cursor is not one of this listing
+
+        Returns:
+            the WHERE clause
+        """
+        if self.sortKey == "id":
+            return Task.id < cursor if self.descending else Task.id > cursor
+
+        value , taskId = self._decode(cursor)
+        column = SORT_COLUMNS[self.sortKey]
+        if self.descending:
+            if value is None:
+                return or_(column.is_not(None) , and_(column.is_(None) , Task.id < taskId))
+            return or_(column < value , and_(column == value , Task.id < taskId))
+        if value is None:
+            return and_(column.is_(None) , Task.id > taskId)
+        return or_(column > value , and_(column == value , Task.id > taskId) , column.is_(None))
+
+    def cursorOf(self , row) -> str:
+        """
+        Cursor of a row of the listing , the plain id when sorted by id (the cursor of the unfiltered listing)
+
+        Args:
+            row (Task | Mapping): last row of a page , mappings must hold the sort column
+
+        Returns:
+            str: the cursor
+        """
+        get = row.__getitem__ if hasattr(row , "keys") else lambda name: getattr(row , name)
+        if self.sortKey == "id":
+            return get("id")
+        value = get(self.sortKey)
+        if isinstance(value , datetime):
+            value = value.isoformat()
+        return encodeCursor([self.sort , value , get("id")])
+
+    def _decode(self , cursor: str) -> tuple:
+        sort , value , taskId = decodeCursor(cursor , 3)
+        if value is not None and self.sortKey in DATETIME_COLUMNS:
+            try:
+                value = datetime.fromisoformat(value)
+            except (ValueError , TypeError):
+                raise ValueError("Invalid cursor")
+        if sort != self.sort or not isinstance(taskId , str):
+            # a cursor of another order would skip or repeat rows
+            raise ValueError("Invalid cursor")
+        return value , taskId
@@ -1,15 +1,14 @@
-from typing import Callable
 from datetime import datetime
 
-from sqlalchemy import select, delete, func
-from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, update, insert, func, exists, literal, literal_column
 
 from todolist.db import get_session
-from todolist.core.Models.models import Task
+from todolist.data.counters import TASKS_COUNTER, reserveStatement, releaseStatement, bumpTasksVersionStatement
+from todolist.data.unit_of_work import SessionScope, SessionFactory
+from todolist.data.cache import CacheBackend, RowCache
+from todolist.core.Models.models import Task, Project
 
-SessionFactory = Callable[[], Session]
-
-class TasksRepo:
+class TasksRepo(SessionScope):
     """
     A class used to represent the tasks in memory of the program
 
@@ -18,11 +17,16 @@ class TasksRepo:
         _project_tasks (dict[str , set[str]]): protected attribure to store task ids of a project for every project with at least one task
     """
 
-    def __init__(self , session_factory: SessionFactory = get_session):
+    def __init__(self , session_factory: SessionFactory = get_session , cache: CacheBackend | None = None):
         """
         Initializing a Task repo instance
+
+        Args:
+            session_factory (SessionFactory , optional): factory used to open new sessions. defaults to get_session
+            cache (CacheBackend | None , optional): read-through cache of get() , invalidated by the writes. defaults to None (no cache)
         """
-        self._session_factory = session_factory
+        super().__init__(session_factory)
+        self._cache = RowCache(cache , Task) if cache is not None else None
 
     def add(self , newTask: Task) -> Task:
         """
@@ -34,10 +38,12 @@ class TasksRepo:
         Returns:
             Task: the Task added gets returned 
         """
-        with self._session_factory() as session:
+        with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , newTask.id)
             session.add(newTask)
-            session.commit()
-            session.refresh(newTask)
+            session.flush()
+            session.execute(bumpTasksVersionStatement([newTask.for_project]))
             return newTask
         
     
@@ -51,11 +57,63 @@ class TasksRepo:
         Returns:
             Task: project with id taskId 
         """
-        with self._session_factory() as session:
+        if self._cache:
+            cached = self._cache.get(taskId)
+            if cached is not None:
+                return cached
+        with self._session() as session:
             stmt = select(Task).where(Task.id == taskId)
             result = session.execute(stmt).scalar_one_or_none()
+            # rows read in a unit of work may not be committed yet
+            if self._cache and result is not None and not self._in_unit_of_work():
+                self._cache.put(result)
             return result
     
+    def get_version(self , taskId: str) -> int | None:
+        """
+        Getting the version of a Task (its ETag) , without loading the task (never cached)
+
+        Args:
+            taskId (str): id of the task
+
+        Returns:
+            int | None: version of the task , None if there is no task with id taskId
+        """
+        with self._session() as session:
+            stmt = select(Task.version).where(Task.id == taskId)
+            return session.execute(stmt).scalar_one_or_none()
+
+    def get_many(self , taskIds: list[str]) -> dict[str , Task]:
+        """
+        Getting many Tasks at once: the cached ones from the cache , the others with one WHERE id IN (...) query
+
+        Args:
+            taskIds (list[str]): ids of the tasks that we want to get
+
+        Returns:
+            dict[str , Task]: found tasks by id (missing ids are left out)
+        """
+        found = {}
+        taskIds = list(dict.fromkeys(taskIds))
+        if self._cache:
+            for rowId in taskIds:
+                cached = self._cache.get(rowId)
+                if cached is not None:
+                    found[rowId] = cached
+        missing = [rowId for rowId in taskIds if rowId not in found]
+        if not missing:
+            return found
+        with self._session() as session:
+            query = select(Task).where(Task.id.in_(missing))
+            rows = session.execute(query).scalars().all()
+            # rows read in a unit of work may not be committed yet
+            cacheable = self._cache and not self._in_unit_of_work()
+            for row in rows:
+                if cacheable:
+                    self._cache.put(row)
+                found[row.id] = row
+            return found
+
     def put(self , newTask: Task) -> Task:
         """
         Updating a Task from Task Repo
@@ -69,32 +127,111 @@ class TasksRepo:
         Returns:
             Task: updated task
         """
-        with self._session_factory() as session:
+        with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , newTask.id)
             merged = session.merge(newTask)
-            session.commit()
-            session.refresh(merged)
+            session.flush()
+            session.execute(bumpTasksVersionStatement([merged.for_project]))
             return merged
 
-    def delete(self , taskId: str) -> bool:
+    def add_to_project(self , newTask: Task) -> bool:
+        """
+        Inserting a new Task only if its project exists , in a single INSERT ... SELECT ... WHERE EXISTS statement
+
+        Args:
+            newTask (Task) : new Task to add
+
+        Returns:
+            bool: False if the project of the task does not exist (nothing inserted)
+        """
+        table = Task.__table__
+        columns = ["id" , "for_project" , "name" , "desc" , "status" , "deadline" , "at_closed" , "at_created" , "version"]
+        source = select(*[literal(getattr(newTask , c) , table.c[c].type) for c in columns]).where(exists().where(Project.id == newTask.for_project))
+        stmt = insert(Task).from_select(columns , source).returning(Task.id)
+        with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , newTask.id)
+            result = session.execute(stmt)
+            if result.first() is None:
+                return False
+            session.execute(bumpTasksVersionStatement([newTask.for_project]))
+            return True
+
+    def update_fields(self , taskId: str , values: dict , expectedVersion: int | None = None) -> Task | None:
+        """
+        Updating some fields of a Task with a single UPDATE ... RETURNING statement
+
+        Args:
+            taskId (str): id of the task to update
+            values (dict): column name to new value or SQL expression (see Task.editValues)
+            expectedVersion (int | None , optional): only update the task if its version is still this one. defaults to None
+
+        Returns:
+            Task | None: the updated task , None if there is no task with id taskId (and version expectedVersion)
+        """
+        stmt = update(Task).where(Task.id == taskId)
+        if expectedVersion is not None:
+            stmt = stmt.where(Task.version == expectedVersion)
+        stmt = stmt.values(**values).returning(Task).execution_options(synchronize_session=False)
+        with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , taskId)
+            updated = (session.execute(stmt)).scalar_one_or_none()
+            if updated is not None:
+                session.execute(bumpTasksVersionStatement([updated.for_project]))
+            return updated
+
+    def update_many(self , taskIds: list[str] , values: dict) -> list[Task]:
+        """
+        Applying the same change to many Tasks with a single UPDATE ... WHERE id IN (...) RETURNING statement
+
+        Args:
+            taskIds (list[str]): ids of the tasks to update
+            values (dict): column name to new value or SQL expression (see Task.editValues) , evaluated on every row
+
+        Returns:
+            list[Task]: the updated tasks (missing ids are left out)
+        """
+        if not taskIds:
+            return []
+        stmt = update(Task).where(Task.id.in_(taskIds)).values(**values).returning(Task).execution_options(synchronize_session=False)
+        with self._session() as session:
+            if self._cache:
+                self._cache.invalidate(session , *taskIds)
+            updated = session.execute(stmt).scalars().all()
+            if updated:
+                session.execute(bumpTasksVersionStatement(list({task.for_project for task in updated})))
+            return updated
+
+    def delete(self , taskId: str , expectedVersion: int | None = None) -> str | None:
         """
         Deleting a Task from the Task  Repo and the related project's tasl list 
 
         Args:
             taskId (str): id of the task that we want to delete
+            expectedVersion (int | None , optional): only delete the task if its version is still this one. defaults to None
 
         Raises:
             ValueError: if the task is not found
         
         Returns:
-            bool: a boolean value indicating the success of the operation
+            str | None: id of the project of the deleted task , None if nothing was deleted
         """
-        with self._session_factory() as session:
+        with self._session() as session:
             stmt = delete(Task).where(Task.id == taskId)
-            result = session.execute(stmt)
-            session.commit()
-            return result.rowcount > 0
+            if expectedVersion is not None:
+                stmt = stmt.where(Task.version == expectedVersion)
+            projectId = session.execute(stmt.returning(Task.for_project)).scalar_one_or_none()
+            if self._cache:
+                self._cache.invalidate(session , taskId)
+            if projectId is None:
+                return None
+            session.execute(releaseStatement(TASKS_COUNTER , 1))
+            session.execute(bumpTasksVersionStatement([projectId]))
+            return projectId
     
-    def delete_project(self , projectId: str) -> bool:
+    def delete_project(self , projectId: str) -> int:
         """
         Cascade delete of the tasks when the parent project is deleted
 
@@ -102,12 +239,17 @@ class TasksRepo:
             projectId (str) : id of the project deleted
         
         Returns:
-            bool: A boolean indicating the success of the operation 
+            int: number of deleted tasks
         """
-        with self._session_factory() as session:
+        with self._session() as session:
             stmt = delete(Task).where(Task.for_project == projectId)
-            session.execute(stmt)
-            session.commit()
+            result = session.execute(stmt)
+            if result.rowcount > 0:
+                # the ids of the deleted tasks are not known , project deletes are rare enough to drop them all
+                if self._cache:
+                    self._cache.invalidate_all(session)
+                session.execute(releaseStatement(TASKS_COUNTER , result.rowcount))
+            return result.rowcount
     
     def list_by_project(self , projectId: str) -> list[Task]:
         """
@@ -119,11 +261,27 @@ class TasksRepo:
         Returns:
             list[Task]: list of all tasks of the the project with id = projectId 
         """
-        with self._session_factory() as session:
+        with self._session() as session:
             stmt = select(Task).where(Task.for_project == projectId)
             result = session.execute(stmt).scalars().all()
             return result
 
+    def reserve_slots(self , maxCount: int , count: int = 1) -> bool:
+        """
+        Taking `count` slots of the tasks counter if it stays within maxCount (O(1) quota check).
+        Must run in the same unit of work as the insert , so a failed insert gives the slots back.
+
+        Args:
+            maxCount (int): maximum allowed number of tasks
+            count (int , optional): number of tasks about to be inserted. defaults to 1
+
+        Returns:
+            bool: False if the maximum would be exceeded (nothing reserved)
+        """
+        with self._session() as session:
+            result = session.execute(reserveStatement(TASKS_COUNTER , maxCount , count))
+            return result.first() is not None
+
     def length(self) -> int:
         """
         getting the number of total tasks
@@ -131,30 +289,52 @@ class TasksRepo:
         Returns:
             int: the number of tasks
         """
-        with self._session_factory() as session:
+        with self._session() as session:
             stmt = select(func.count(Task.id))
             result = session.execute(stmt).scalar_one()
             return int(result or 0)
         
-    def close_overdue(self , compareTime: datetime) -> int:
+    def close_overdue(self , compareTime: datetime , chunkSize: int = 0) -> int:
         """
         Find all tasks whose deadline has passed and are not 'done',
-        mark them as done, set at_closed if missing, and commit.
+        mark them as done , set at_closed if missing and bump their version , with set based UPDATE statements
+        (served by the partial index on deadline of the open tasks).
+
+        Args:
+            compareTime (datetime): tasks with a deadline before this time are overdue , also used as the closing time
+            chunkSize (int , optional): if positive , close at most chunkSize tasks per statement (and per transaction
+                outside of a unit of work) walking the primary key , to keep transactions short. defaults to 0 (one statement)
 
         Returns:
             int: number of tasks that where updated
         """
-        with self._session_factory() as session:
-            stmt = select(Task).where(Task.deadline.is_not(None)).where(Task.deadline < compareTime).where(Task.status != "done")
-            tasks = session.execute(stmt).scalars().all()
-
-            for task in tasks:
-                task.status = "done"
-                if task.at_closed is None:
-                    task.at_closed = compareTime
-
-            session.commit()
-            return len(tasks)
-
+        # 'done' is inlined (not bound) so the planner can match the partial index predicate , even for prepared statements
+        overdue = (Task.deadline.is_not(None) , Task.deadline < compareTime , Task.status != literal_column("'done'"))
+        values = {"status": "done" , "at_closed": func.coalesce(Task.at_closed , compareTime) , "version": Task.version + 1}
 
+        if chunkSize <= 0:
+            stmt = update(Task).where(*overdue).values(**values).execution_options(synchronize_session=False)
+            with self._session() as session:
+                # projects are bumped first , while their overdue tasks can still be told apart
+                session.execute(bumpTasksVersionStatement(select(Task.for_project).where(*overdue)))
+                result = session.execute(stmt)
+                if self._cache and result.rowcount > 0:
+                    self._cache.invalidate_all(session)
+                return result.rowcount
 
+        closed = 0
+        lastId = ""
+        while True:
+            chunk = select(Task.id).where(*overdue).where(Task.id > lastId).order_by(Task.id).limit(chunkSize)
+            stmt = update(Task).where(Task.id.in_(chunk)).values(**values).returning(Task.id , Task.for_project).execution_options(synchronize_session=False)
+            with self._session() as session:
+                rows = session.execute(stmt).all()
+                ids = [row.id for row in rows]
+                if ids:
+                    session.execute(bumpTasksVersionStatement(sorted({row.for_project for row in rows})))
+                if self._cache and ids:
+                    self._cache.invalidate(session , *ids)
+            if not ids:
+                return closed
+            closed += len(ids)
+            lastId = max(ids)
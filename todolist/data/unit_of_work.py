@@ -0,0 +1,193 @@
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, AsyncIterator
+
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, AsyncConnection
+
+
+SessionFactory = Callable[[], Session]
+AsyncSessionFactory = Callable[[], AsyncSession]
+
+# session of the unit of work currently open in this thread / asyncio task (if any)
+_active_session: ContextVar[Session | None] = ContextVar("_active_session", default=None)
+_active_async_session: ContextVar[AsyncSession | None] = ContextVar("_active_async_session", default=None)
+
+
+class RequestConnection:
+    """
+    A class used to share one pooled connection between the async sessions of one HTTP request , checked out
+    on first use (requests that never reach the database never take one). every session still runs its own
+    transaction on it.
+
+    Attributes:
+        engine (AsyncEngine): engine the connection is checked out from
+        connection (AsyncConnection | None): the connection , None until the first session needs it
+    """
+
+    def __init__(self , engine: AsyncEngine):
+        """
+        Initializing a request connection
+
+        Args:
+            engine (AsyncEngine): engine the connection is checked out from
+        """
+        self.engine = engine
+        self.connection: AsyncConnection | None = None
+
+    async def get(self) -> AsyncConnection:
+        """
+        The connection of the request , checked out on the first call
+        """
+        if self.connection is None:
+            self.connection = await self.engine.connect()
+        return self.connection
+
+    async def close(self) -> None:
+        """
+        Giving the connection back to the pool (if it was checked out)
+        """
+        if self.connection is not None:
+            await self.connection.close()
+            self.connection = None
+
+
+# connection of the HTTP request handled by this asyncio task (if any)
+_request_connection: ContextVar[RequestConnection | None] = ContextVar("_request_connection", default=None)
+
+
+@asynccontextmanager
+async def request_connection(engine: AsyncEngine) -> AsyncIterator[RequestConnection]:
+    """
+    Run every async repo call of the block (one HTTP request) on a single connection checkout.
+    The connection goes back to the pool when the block ends.
+    """
+    requestConnection = RequestConnection(engine)
+    token = _request_connection.set(requestConnection)
+    try:
+        yield requestConnection
+    finally:
+        _request_connection.reset(token)
+        await requestConnection.close()
+
+
+async def _bindToRequest(session: AsyncSession) -> None:
+    """
+    Binding a new session to the connection of the current request , if there is one
+    """
+    requestConnection = _request_connection.get()
+    if requestConnection is not None:
+        session.bind = await requestConnection.get()
+
+
+class SessionScope:
+    """
+    Base class of the sync repositories. Lets every repo method run either on its own
+    short session or inside a unit of work shared by several repos.
+
+    Attributes:
+        _session_factory (SessionFactory): protected attribute used to open new sessions
+    """
+
+    def __init__(self , session_factory: SessionFactory):
+        """
+        Initializing a session scope
+
+        Args:
+            session_factory (SessionFactory): factory used to open new sessions
+        """
+        self._session_factory = session_factory
+
+    @contextmanager
+    def _session(self) -> Iterator[Session]:
+        """
+        Session to run one repo operation on. Inside a unit of work this is the shared session
+        (the unit of work commits) , otherwise a new session committed when the block ends.
+        """
+        session = _active_session.get()
+        if session is not None:
+            yield session
+            return
+        with self._session_factory() as session , session.begin():
+            yield session
+
+    def _in_unit_of_work(self) -> bool:
+        """
+        Whether a unit of work is open. Its reads may see writes that are not committed yet.
+        """
+        return _active_session.get() is not None
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[Session]:
+        """
+        Run every repo call of the block in one session and one transaction.
+        Commits when the block ends , rolls back if it raises. Nested units of work join the outer one.
+        """
+        session = _active_session.get()
+        if session is not None:
+            yield session
+            return
+        with self._session_factory() as session , session.begin():
+            token = _active_session.set(session)
+            try:
+                yield session
+            finally:
+                _active_session.reset(token)
+
+
+class AsyncSessionScope:
+    """
+    Base class of the async repositories , the AsyncSession counterpart of SessionScope.
+
+    Attributes:
+        _session_factory (AsyncSessionFactory): protected attribute used to open new sessions
+    """
+
+    def __init__(self , session_factory: AsyncSessionFactory):
+        """
+        Initializing an async session scope
+
+        Args:
+            session_factory (AsyncSessionFactory): factory used to open new sessions
+        """
+        self._session_factory = session_factory
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Session to run one repo operation on. Inside a unit of work this is the shared session
+        (the unit of work commits) , otherwise a new session committed when the block ends.
+        """
+        session = _active_async_session.get()
+        if session is not None:
+            yield session
+            return
+        async with self._session_factory() as session:
+            await _bindToRequest(session)
+            async with session.begin():
+                yield session
+
+    def _in_unit_of_work(self) -> bool:
+        """
+        Whether a unit of work is open. Its reads may see writes that are not committed yet.
+        """
+        return _active_async_session.get() is not None
+
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator[AsyncSession]:
+        """
+        Run every repo call of the block in one session and one transaction.
+        Commits when the block ends , rolls back if it raises. Nested units of work join the outer one.
+        """
+        session = _active_async_session.get()
+        if session is not None:
+            yield session
+            return
+        async with self._session_factory() as session:
+            await _bindToRequest(session)
+            async with session.begin():
+                token = _active_async_session.set(session)
+                try:
+                    yield session
+                finally:
+                    _active_async_session.reset(token)
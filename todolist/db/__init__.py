@@ -1,2 +1,3 @@
 from .base import Base
-from .session import engine, SessionLocal, get_session
\ No newline at end of file
+from .session import configure_engine, get_session, pool_metrics
+from .async_session import configure_async_engine, get_async_session, async_pool_metrics
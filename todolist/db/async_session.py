@@ -0,0 +1,57 @@
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from todolist.config.setting import Setting
+from todolist.db.backends import asyncDatabaseUrl, tuneSqlite
+from todolist.db.pool import PoolMetrics, poolOptions
+from todolist.db.profiling import instrument
+
+# checkouts of the async engine (API)
+async_pool_metrics = PoolMetrics()
+
+# built by configure_async_engine from the setting of the ServiceContainer , None with the memory backend (nothing is kept in a database)
+async_engine: AsyncEngine | None = None
+AsyncSessionLocal = None
+_storage_backend: str | None = None
+
+
+def configure_async_engine(setting: Setting) -> AsyncEngine | None:
+    """
+    Build the async engine of the storage backend of the setting , used by get_async_session from then on.
+    Called by the ServiceContainer with its setting , so the engine and the container agree on the database
+
+    Args:
+        setting (Setting): storage backend , database urls and pool configuration
+
+    Returns:
+        AsyncEngine | None: the engine , None for the memory backend
+    """
+    global async_engine, AsyncSessionLocal, _storage_backend
+    url = asyncDatabaseUrl(setting)
+    async_engine = None
+    AsyncSessionLocal = None
+    _storage_backend = setting.storage.BACKEND
+    if url:
+        async_engine = create_async_engine(
+            url,
+            **poolOptions(setting, AsyncAdaptedQueuePool, async_pool_metrics),
+        )
+        tuneSqlite(async_engine.sync_engine)
+        # statements counted per request when profiling is on
+        instrument(async_engine.sync_engine)
+
+        AsyncSessionLocal = async_sessionmaker(
+            autoflush=False,
+            expire_on_commit=False,
+            bind=async_engine,
+        )
+    return async_engine
+
+
+def get_async_session():
+    """Create a new SQLAlchemy AsyncSession."""
+    if AsyncSessionLocal is None:
+        if _storage_backend is None:
+            raise ValueError("The database engine is not configured , build the ServiceContainer first")
+        raise ValueError(f"There is no database with the {_storage_backend} storage backend")
+    return AsyncSessionLocal()
@@ -0,0 +1,107 @@
+from sqlalchemy import Engine, event
+
+from todolist.config.setting import Setting
+
+STORAGE_BACKENDS = ["postgres" , "sqlite" , "memory"]
+
+# run on every new sqlite connection
+SQLITE_PRAGMAS = (
+    # readers and the writer don't block each other , writes are still one at a time
+    "PRAGMA journal_mode=WAL",
+    # fsync at checkpoints only , with WAL a crash may lose the last commits but never corrupts the file
+    "PRAGMA synchronous=NORMAL",
+    # wait for the write lock instead of failing right away (database is locked)
+    "PRAGMA busy_timeout=5000",
+    # ON DELETE CASCADE like on postgres
+    "PRAGMA foreign_keys=ON",
+    # 64 MiB page cache per connection , sorts and temporary indexes in memory , reads through mmap
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def _to_async_url(url: str) -> str:
+    """
+    Turn a sync database url (psycopg2 , pysqlite) into its asyncio counterpart (asyncpg , aiosqlite).
+
+    Args:
+        url (str): database url used by the sync engine
+
+    Returns:
+        str: database url usable by create_async_engine
+    """
+    if url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url[len("postgresql+psycopg2://"):]
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://"):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+def _checkBackend(setting: Setting) -> None:
+    if setting.storage.BACKEND not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend {setting.storage.BACKEND} , please use one from this list: {STORAGE_BACKENDS}")
+
+
+def databaseUrl(setting: Setting) -> str | None:
+    """
+    Url of the database of the sync engine for the storage backend of the setting
+
+    Args:
+        setting (Setting): STORAGE_BACKEND , SQLITE_PATH and DATABASE_URL values (setting.storage)
+
+    Raises:
+        ValueError: if the backend is unknown , or DATABASE_URL is not set for the postgres backend
+
+    Returns:
+        str | None: DATABASE_URL (postgres) , the SQLITE_PATH file (sqlite) , None for the memory backend (no database)
+    """
+    _checkBackend(setting)
+    if setting.storage.BACKEND == "postgres":
+        url = setting.storage.DATABASE_URL
+        if not url:
+            raise ValueError("DATABASE_URL must be set for the postgres storage backend (or use STORAGE_BACKEND=sqlite / memory)")
+        return url
+    if setting.storage.BACKEND == "sqlite":
+        return f"sqlite:///{setting.storage.SQLITE_PATH}"
+    return None
+
+
+def asyncDatabaseUrl(setting: Setting) -> str | None:
+    """
+    Url of the database of the async engine , the asyncio driver of the same database as databaseUrl
+
+    Args:
+        setting (Setting): STORAGE_BACKEND , SQLITE_PATH , DATABASE_URL and ASYNC_DATABASE_URL values (setting.storage)
+
+    Raises:
+        ValueError: if the backend is unknown , or DATABASE_URL is not set for the postgres backend
+
+    Returns:
+        str | None: ASYNC_DATABASE_URL if set (postgres) , else databaseUrl for the asyncio driver. None for the memory backend
+    """
+    _checkBackend(setting)
+    if setting.storage.BACKEND == "postgres" and setting.storage.ASYNC_DATABASE_URL:
+        return setting.storage.ASYNC_DATABASE_URL
+    url = databaseUrl(setting)
+    return _to_async_url(url) if url else None
+
+
+def tuneSqlite(engine: Engine) -> None:
+    """
+    Running SQLITE_PRAGMAS on every connection the engine opens (nothing for other databases)
+
+    Args:
+        engine (Engine): a sync engine , or the sync_engine of an async one
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine , "connect")
+    def _pragmas(dbapiConnection , connectionRecord) -> None:
+        cursor = dbapiConnection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
@@ -0,0 +1,132 @@
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+from todolist.config.setting import Setting
+
+
+# upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1 , 5 , 10 , 25 , 50 , 100 , 250 , 500 , 1000 , 2500 , 5000)
+
+
+class PoolMetrics:
+    """
+    A class used to count the checkouts of a connection pool and how long they waited (thread safe)
+
+    Attributes:
+        checkouts (int): number of connections handed out
+        timeouts (int): number of checkouts that gave up after the pool timeout
+        waitSumMs (float): total time spent in checkouts , in milliseconds
+        waitMaxMs (float): longest checkout , in milliseconds
+    """
+
+    def __init__(self):
+        """
+        Initializing empty pool metrics
+        """
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waitSumMs = 0.0
+        self.waitMaxMs = 0.0
+        self._buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+
+    def observe(self , waitMs: float , timedOut: bool = False) -> None:
+        """
+        Recording one checkout
+
+        Args:
+            waitMs (float): time spent getting the connection (waiting for a free one , connecting , pre ping) in milliseconds
+            timedOut (bool , optional): whether the checkout gave up. defaults to False
+        """
+        bucket = next((i for i , bound in enumerate(WAIT_BUCKETS_MS) if waitMs <= bound) , len(WAIT_BUCKETS_MS))
+        with self._lock:
+            if timedOut:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.waitSumMs += waitMs
+            self.waitMaxMs = max(self.waitMaxMs , waitMs)
+            self._buckets[bucket] += 1
+
+    def stats(self , pool: QueuePool) -> dict:
+        """
+        Live state of a pool and the counters of its checkouts
+
+        Args:
+            pool (QueuePool): the pool these metrics are recorded for
+
+        Returns:
+            dict: size , checked out / in and overflow connections of the pool , checkouts , timeouts and the
+                cumulative wait histogram (number of checkouts that took at most `le` milliseconds)
+        """
+        with self._lock:
+            cumulative = 0
+            buckets = []
+            for bound , count in zip((*WAIT_BUCKETS_MS , None) , self._buckets):
+                cumulative += count
+                buckets.append({"le": bound , "count": cumulative})
+            return {
+                "size": pool.size() ,
+                "checked_out": pool.checkedout() ,
+                "checked_in": pool.checkedin() ,
+                "overflow": pool.overflow() ,
+                "checkouts": self.checkouts ,
+                "timeouts": self.timeouts ,
+                "wait_sum_ms": self.waitSumMs ,
+                "wait_max_ms": self.waitMaxMs ,
+                "wait_buckets": buckets ,
+            }
+
+
+def timedPool(poolClass: type[Pool] , metrics: PoolMetrics) -> type[Pool]:
+    """
+    Subclass of a pool class recording every checkout in metrics.
+    The metrics live on the class , so they survive the pool being recreated (engine.dispose())
+
+    Args:
+        poolClass (type[Pool]): pool class to time
+        metrics (PoolMetrics): where the checkouts are recorded
+
+    Returns:
+        type[Pool]: the pool class to give to create_engine
+    """
+
+    class TimedPool(poolClass):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                connection = super().connect()
+            except PoolTimeoutError:
+                metrics.observe((time.perf_counter() - start) * 1000 , timedOut=True)
+                raise
+            metrics.observe((time.perf_counter() - start) * 1000)
+            return connection
+
+    TimedPool.__name__ = f"Timed{poolClass.__name__}"
+    TimedPool.metrics = metrics
+    return TimedPool
+
+
+def poolOptions(setting: Setting , poolClass: type[Pool] , metrics: PoolMetrics) -> dict:
+    """
+    Keyword arguments of create_engine / create_async_engine for the pool configured in the setting
+
+    Args:
+        setting (Setting): DB_POOL_* values (setting.pool)
+        poolClass (type[Pool]): queue pool class of the engine (QueuePool or AsyncAdaptedQueuePool)
+        metrics (PoolMetrics): where the checkouts are recorded
+
+    Returns:
+        dict: the pool arguments
+    """
+    return {
+        "poolclass": timedPool(poolClass , metrics) ,
+        "pool_size": setting.pool.SIZE ,
+        "max_overflow": setting.pool.MAX_OVERFLOW ,
+        "pool_timeout": setting.pool.TIMEOUT_SECONDS ,
+        "pool_recycle": setting.pool.RECYCLE_SECONDS ,
+        "pool_pre_ping": setting.pool.PRE_PING ,
+    }
@@ -0,0 +1,95 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import Engine, event
+
+
+class StatementStats:
+    """
+    A class used to count the SQL statements run while it is tracked (one HTTP request)
+
+    Attributes:
+        count (int): number of statements
+        seconds (float): total time spent running them (cursor execute , fetching excluded)
+        statements (Counter): number of runs of every statement text
+    """
+
+    def __init__(self):
+        """
+        Initializing empty statement stats
+        """
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self , statement: str , seconds: float) -> None:
+        """
+        Recording one statement
+
+        Args:
+            statement (str): SQL text with its bind placeholders (the same for every run of a query)
+            seconds (float): time it took
+        """
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self , threshold: int) -> list[tuple[str , int]]:
+        """
+        Statements run at least threshold times , the mark of a query issued once per row (N+1)
+
+        Args:
+            threshold (int): minimum number of runs
+
+        Returns:
+            list[tuple[str , int]]: statement text and number of runs , most repeated first
+        """
+        return [(statement , runs) for statement , runs in self.statements.most_common() if runs >= threshold]
+
+
+# statements of the HTTP request handled by this asyncio task (if tracked)
+_current_stats: ContextVar[StatementStats | None] = ContextVar("_current_stats", default=None)
+
+
+@contextmanager
+def track_statements() -> Iterator[StatementStats]:
+    """
+    Count the statements run by the block on every instrumented engine
+    """
+    stats = StatementStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def instrument(engine: Engine) -> None:
+    """
+    Timing the statements of an engine for track_statements (costs nothing outside of a tracked block)
+
+    Args:
+        engine (Engine): a sync engine , or the sync_engine of an async one
+    """
+
+    @event.listens_for(engine , "before_cursor_execute")
+    def _beforeCursorExecute(conn , cursor , statement , parameters , context , executemany):
+        if _current_stats.get() is not None:
+            conn.info.setdefault("statement_start" , []).append(time.perf_counter())
+
+    @event.listens_for(engine , "after_cursor_execute")
+    def _afterCursorExecute(conn , cursor , statement , parameters , context , executemany):
+        stats = _current_stats.get()
+        starts = conn.info.get("statement_start")
+        if stats is not None and starts:
+            stats.record(statement , time.perf_counter() - starts.pop())
+
+    @event.listens_for(engine , "handle_error")
+    def _handleError(exceptionContext):
+        # the failed statement never reaches after_cursor_execute
+        starts = exceptionContext.connection.info.get("statement_start") if exceptionContext.connection is not None else None
+        if _current_stats.get() is not None and starts:
+            starts.pop()
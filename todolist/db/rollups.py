@@ -0,0 +1,125 @@
+from sqlalchemy import DDL, Table, event
+
+# counters of project_stats , in the order of the deltas below
+STATS_COLUMNS = ("todo" , "doing" , "done" , "closed_timed" , "close_seconds" , "closed_late")
+# columns of tasks the counters depend on (updates of the other columns leave them alone)
+_TRACKED = ("for_project" , "status" , "deadline" , "at_closed" , "at_created")
+
+
+def _deltas(row: str , dialect: str) -> list[str]:
+    """
+    What a task row adds to the counters of its project , one SQL expression per column of STATS_COLUMNS
+    """
+    cast = (lambda e: f"({e})::int") if dialect == "postgresql" else (lambda e: f"({e})")
+    timed = f"{row}.status = 'done' AND {row}.at_closed IS NOT NULL AND {row}.at_created IS NOT NULL"
+    if dialect == "postgresql":
+        seconds = f"EXTRACT(EPOCH FROM {row}.at_closed - {row}.at_created)"
+    else:
+        seconds = f"(julianday({row}.at_closed) - julianday({row}.at_created)) * 86400.0"
+    return [
+        cast(f"{row}.status = 'todo'") ,
+        cast(f"{row}.status = 'doing'") ,
+        cast(f"{row}.status = 'done'") ,
+        cast(timed) ,
+        f"CASE WHEN {timed} THEN {seconds} ELSE 0 END" ,
+        # NULL without a deadline
+        f"coalesce({cast(f'{row}.status = {chr(39)}done{chr(39)} AND {row}.at_closed > {row}.deadline')}, 0)" ,
+    ]
+
+
+_COLUMNS = ", ".join(STATS_COLUMNS)
+_ADD = ", ".join(f"{c} = project_stats.{c} + excluded.{c}" for c in STATS_COLUMNS)
+_SUBTRACT = ", ".join(f"{c} = project_stats.{c} - d.{c}" for c in STATS_COLUMNS)
+_SUMS = ", ".join(f"sum({c}) AS {c}" for c in STATS_COLUMNS)
+
+
+def _selected(row: str , sign: str = "") -> str:
+    return ", ".join(f"{sign}{delta} AS {c}" for delta , c in zip(_deltas(row , "postgresql") , STATS_COLUMNS))
+
+
+_CHANGED = f"({', '.join('n.' + c for c in _TRACKED)}) IS DISTINCT FROM ({', '.join('o.' + c for c in _TRACKED)})"
+
+# statement level triggers: one write of project_stats per project touched by a statement , however many tasks it
+# writes (bulk imports , close_overdue)
+_POSTGRES_DDL = (
+    "CREATE FUNCTION project_stats_insert() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+    f"INSERT INTO project_stats (project_id, {_COLUMNS}) "
+    f"SELECT for_project, {_SUMS} FROM (SELECT n.for_project, {_selected('n')} FROM new_rows n) d GROUP BY for_project "
+    f"ON CONFLICT (project_id) DO UPDATE SET {_ADD}; "
+    "RETURN NULL; END $$",
+    "CREATE FUNCTION project_stats_update() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+    f"INSERT INTO project_stats (project_id, {_COLUMNS}) "
+    f"SELECT for_project, {_SUMS} FROM ("
+    f"SELECT n.for_project, {_selected('n')} FROM new_rows n JOIN old_rows o ON o.id = n.id WHERE {_CHANGED} "
+    f"UNION ALL SELECT o.for_project, {_selected('o' , '-')} FROM new_rows n JOIN old_rows o ON o.id = n.id WHERE {_CHANGED}"
+    f") d GROUP BY for_project "
+    f"ON CONFLICT (project_id) DO UPDATE SET {_ADD}; "
+    "RETURN NULL; END $$",
+    # the project may be gone (cascade) , so no row is created
+    "CREATE FUNCTION project_stats_delete() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+    f"UPDATE project_stats SET {_SUBTRACT} "
+    f"FROM (SELECT for_project, {_SUMS} FROM (SELECT o.for_project, {_selected('o')} FROM old_rows o) x GROUP BY for_project) d "
+    "WHERE project_stats.project_id = d.for_project; "
+    "RETURN NULL; END $$",
+    "CREATE TRIGGER tasks_project_stats_insert AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION project_stats_insert()",
+    "CREATE TRIGGER tasks_project_stats_update AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION project_stats_update()",
+    "CREATE TRIGGER tasks_project_stats_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION project_stats_delete()",
+)
+
+
+def _sqliteAdd(row: str) -> str:
+    return (
+        f"INSERT INTO project_stats (project_id, {_COLUMNS}) VALUES ({row}.for_project, {', '.join(_deltas(row , 'sqlite'))}) "
+        f"ON CONFLICT (project_id) DO UPDATE SET {_ADD};"
+    )
+
+
+def _sqliteSubtract(row: str) -> str:
+    sets = ", ".join(f"{c} = {c} - {delta}" for c , delta in zip(STATS_COLUMNS , _deltas(row , "sqlite")))
+    return f"UPDATE project_stats SET {sets} WHERE project_id = {row}.for_project;"
+
+
+# sqlite only has row level triggers
+_SQLITE_DDL = (
+    f"CREATE TRIGGER tasks_project_stats_insert AFTER INSERT ON tasks BEGIN {_sqliteAdd('new')} END",
+    f"CREATE TRIGGER tasks_project_stats_update AFTER UPDATE OF {', '.join(_TRACKED)} ON tasks BEGIN "
+    f"{_sqliteSubtract('old')} {_sqliteAdd('new')} END",
+    f"CREATE TRIGGER tasks_project_stats_delete AFTER DELETE ON tasks BEGIN {_sqliteSubtract('old')} END",
+)
+
+
+def statsQuery(dialect: str) -> str:
+    """
+    Counters of every project computed from the tasks (what project_stats should hold) , for the rebuild
+
+    Args:
+        dialect (str): name of the dialect of the connection ("postgresql" or "sqlite")
+
+    Raises:
+        ValueError: if the dialect has no rollup triggers
+
+    Returns:
+        str: SELECT of project_id and the STATS_COLUMNS , one row per project with tasks
+    """
+    if dialect not in ("postgresql" , "sqlite"):
+        raise ValueError(f"Project stats are not supported on {dialect}")
+    sums = ", ".join(f"sum({delta}) AS {c}" for delta , c in zip(_deltas("tasks" , dialect) , STATS_COLUMNS))
+    return f"SELECT for_project AS project_id, {sums} FROM tasks GROUP BY for_project"
+
+
+def projectStatsRollup(tasks: Table) -> None:
+    """
+    Creating the triggers keeping project_stats up to date along with the tasks table (create_all) , so every write
+    of a task (ORM , core bulk statements , close_overdue , cascades) is counted in the same transaction.
+    Migrated databases get them from the alembic migration.
+
+    Args:
+        tasks (Table): the tasks table
+    """
+    for statement in _POSTGRES_DDL:
+        event.listen(tasks , "after_create" , DDL(statement).execute_if(dialect="postgresql"))
+    for statement in _SQLITE_DDL:
+        event.listen(tasks , "after_create" , DDL(statement).execute_if(dialect="sqlite"))
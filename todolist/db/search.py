@@ -0,0 +1,107 @@
+import re
+
+from sqlalchemy import DDL, Float, Table, and_, column, event, func, literal, literal_column, or_, select, table as tableClause
+
+# text search configuration of postgres , no stemming or stop words so every language is searched the same way
+SEARCH_CONFIG = "simple"
+# weights of the name and desc matches in the sqlite rank , the ratio of the default ts_rank weights of A and B
+NAME_WEIGHT , DESC_WEIGHT = 2.5 , 1.0
+
+_POSTGRES_DDL = (
+    # kept up to date by postgres on every insert / update , whatever statement writes the row
+    "ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('" + SEARCH_CONFIG + "', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('" + SEARCH_CONFIG + "', coalesce(\"desc\", '')), 'B')) STORED",
+    "CREATE INDEX ix_{table}_search_vector ON {table} USING gin (search_vector)",
+)
+
+_SQLITE_DDL = (
+    # external content table: only the index is stored , the text is read from {table}
+    "CREATE VIRTUAL TABLE {table}_fts USING fts5(name, \"desc\", content='{table}', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER {table}_fts_insert AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {table}_fts(rowid, name, \"desc\") VALUES (new.rowid, new.name, new.\"desc\"); END",
+    "CREATE TRIGGER {table}_fts_delete AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {table}_fts({table}_fts, rowid, name, \"desc\") VALUES ('delete', old.rowid, old.name, old.\"desc\"); END",
+    "CREATE TRIGGER {table}_fts_update AFTER UPDATE OF name, \"desc\" ON {table} BEGIN "
+    "INSERT INTO {table}_fts({table}_fts, rowid, name, \"desc\") VALUES ('delete', old.rowid, old.name, old.\"desc\"); "
+    "INSERT INTO {table}_fts(rowid, name, \"desc\") VALUES (new.rowid, new.name, new.\"desc\"); END",
+)
+
+
+def searchable(table: Table) -> None:
+    """
+    Creating the full text index of the name and desc of a table along with it (create_all). on postgres a generated
+    tsvector column with a GIN index , on sqlite an FTS5 table kept up to date by triggers.
+    Migrated databases get them from the alembic migration.
+
+    Args:
+        table (Table): a table with name and desc columns
+    """
+    for statement in _POSTGRES_DDL:
+        event.listen(table , "after_create" , DDL(statement.format(table=table.name)).execute_if(dialect="postgresql"))
+    for statement in _SQLITE_DDL:
+        event.listen(table , "after_create" , DDL(statement.format(table=table.name)).execute_if(dialect="sqlite"))
+
+
+def ftsQuery(query: str) -> str:
+    """
+    FTS5 query matching every word of a free text query (like plainto_tsquery) , the words are quoted so no character
+    of the query is read as FTS5 syntax
+
+    Args:
+        query (str): text typed by the user
+
+    Returns:
+        str: the FTS5 query , empty if the text has no word
+    """
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+" , query))
+
+
+def searchStatement(model , dialect: str , query: str , limit: int , after: tuple[float , str | None] | None = None):
+    """
+    Rows of a model matching a free text query , best match first (ties by id)
+
+    Args:
+        model: mapped class of a searchable table
+        dialect (str): name of the dialect of the connection ("postgresql" or "sqlite")
+        query (str): text typed by the user
+        limit (int): maximum number of rows
+        after (tuple[float , str | None] | None , optional): (rank , id) of the last row of the previous page , the id
+            is None to only keep rows ranked lower. defaults to None
+
+    Raises:
+        ValueError: if the dialect has no full text search
+
+    Returns:
+        the SELECT of the model and its rank (higher is better) , None if the query has no word
+    """
+    table = model.__table__
+    if dialect == "postgresql":
+        tsquery = func.plainto_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig") , query)
+        vector = literal_column(f"{table.name}.search_vector")
+        rank = func.ts_rank(vector , tsquery)
+        stmt = select(model , rank.label("rank")).where(vector.op("@@")(tsquery))
+    elif dialect == "sqlite":
+        match = ftsQuery(query)
+        if not match:
+            return None
+        fts = tableClause(f"{table.name}_fts" , column("rowid"))
+        # ranked in the FTS table alone , then joined on rowid (bm25 is lower for better matches)
+        ranked = (
+            select(fts.c.rowid , (-func.bm25(literal_column(fts.name) , NAME_WEIGHT , DESC_WEIGHT)).label("rank"))
+            .where(literal_column(fts.name).op("MATCH")(match))
+            .subquery()
+        )
+        rank = ranked.c.rank
+        stmt = select(model , rank).join(ranked , literal_column(f"{table.name}.rowid") == ranked.c.rowid)
+    else:
+        raise ValueError(f"Full text search is not supported on {dialect}")
+
+    if after is not None:
+        afterRank , afterId = after
+        afterRank = literal(afterRank , Float)
+        if afterId is None:
+            stmt = stmt.where(rank < afterRank)
+        else:
+            stmt = stmt.where(or_(rank < afterRank , and_(rank == afterRank , model.id > afterId)))
+    return stmt.order_by(rank.desc() , model.id).limit(limit)
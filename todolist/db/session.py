@@ -1,24 +1,59 @@
-import os
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+from sqlalchemy.pool import QueuePool
 
-load_dotenv()
+from todolist.config.setting import Setting
+from todolist.db.backends import databaseUrl, tuneSqlite
+from todolist.db.pool import PoolMetrics, poolOptions
+from todolist.db.profiling import instrument
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+# checkouts of the sync engine (CLI , scheduler jobs)
+pool_metrics = PoolMetrics()
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-)
+# built by configure_engine from the setting of the ServiceContainer , None with the memory backend (nothing is kept in a database)
+engine: Engine | None = None
+SessionLocal = None
+_storage_backend: str | None = None
 
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine
-)
+
+def configure_engine(setting: Setting) -> Engine | None:
+    """
+    Build the sync engine of the storage backend of the setting , used by get_session from then on.
+    Called by the ServiceContainer with its setting , so the engine and the container agree on the database
+
+    Args:
+        setting (Setting): storage backend , database url and pool configuration
+
+    Returns:
+        Engine | None: the engine , None for the memory backend
+    """
+    global engine, SessionLocal, _storage_backend
+    url = databaseUrl(setting)
+    engine = None
+    SessionLocal = None
+    _storage_backend = setting.storage.BACKEND
+    if url:
+        engine = create_engine(
+            url,
+            **poolOptions(setting, QueuePool, pool_metrics),
+        )
+        tuneSqlite(engine)
+        # statements counted per request when profiling is on
+        instrument(engine)
+
+        SessionLocal = sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            expire_on_commit=False,
+            bind=engine
+        )
+    return engine
 
 
 def get_session():
     """Create a new SQLAlchemy session."""
+    if SessionLocal is None:
+        if _storage_backend is None:
+            raise ValueError("The database engine is not configured , build the ServiceContainer first")
+        raise ValueError(f"There is no database with the {_storage_backend} storage backend")
     return SessionLocal()
@@ -0,0 +1,13 @@
+from .event import Event, rowData
+from .hub import EventHub, Subscription
+from .brokers import EventBroker, LocalBroker, PostgresBroker
+
+__all__ = [
+    "Event",
+    "rowData",
+    "EventHub",
+    "Subscription",
+    "EventBroker",
+    "LocalBroker",
+    "PostgresBroker",
+]
@@ -0,0 +1,152 @@
+import asyncio
+from abc import ABC, abstractmethod
+
+from sqlalchemy import Engine, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncConnection
+
+from todolist.events.event import Event
+from todolist.events.hub import EventHub
+
+
+class EventBroker(ABC):
+    """
+    Interface between the services publishing events and the hub delivering them to the subscribers of the process.
+
+    Attributes:
+        hub (EventHub): hub of the process
+    """
+
+    def __init__(self , hub: EventHub):
+        """
+        Initializing a broker
+
+        Args:
+            hub (EventHub): hub of the process
+        """
+        self.hub = hub
+
+    async def start(self) -> None:
+        """
+        Starting the broker on the running event loop (API lifespan)
+        """
+        self.hub.bind(asyncio.get_running_loop())
+
+    async def stop(self) -> None:
+        """
+        Stopping the broker
+        """
+        self.hub.bind(None)
+
+    @abstractmethod
+    def publish(self , event: Event) -> None:
+        """
+        Publishing an event , from any thread and without waiting on the subscribers.
+        Called once the change is committed.
+
+        Args:
+            event (Event): the event
+        """
+
+
+class LocalBroker(EventBroker):
+    """
+    Broker of a single process: events go straight to the hub of the process (default , works with any database)
+    """
+
+    def publish(self , event: Event) -> None:
+        self.hub.dispatchThreadsafe(event)
+
+
+class PostgresBroker(EventBroker):
+    """
+    Broker shared by every worker through postgres LISTEN / NOTIFY: events are sent with pg_notify and every
+    worker (this one included) hands what it receives on the channel to its hub.
+    Needs the asyncpg driver for the async engine.
+
+    Attributes:
+        channel (str): notification channel
+        dropped (int): number of events not sent because the outbox was full
+    """
+
+    def __init__(self , hub: EventHub , asyncEngine: AsyncEngine , syncEngine: Engine , channel: str = "todolist_events" , outboxSize: int = 10000):
+        """
+        Initializing a postgres broker
+
+        Args:
+            hub (EventHub): hub of the process
+            asyncEngine (AsyncEngine): engine of the listening connection (asyncpg)
+            syncEngine (Engine): engine used to notify when no event loop runs the broker (CLI)
+            channel (str , optional): notification channel. defaults to "todolist_events"
+            outboxSize (int , optional): maximum number of events waiting to be sent. defaults to 10000
+        """
+        super().__init__(hub)
+        self.channel = channel
+        self.dropped = 0
+        self._asyncEngine = asyncEngine
+        self._syncEngine = syncEngine
+        self._outboxSize = outboxSize
+        self._outbox: asyncio.Queue[str] | None = None
+        self._connection: AsyncConnection | None = None
+        self._driver = None
+        self._sender: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def start(self) -> None:
+        await super().start()
+        self._loop = asyncio.get_running_loop()
+        self._outbox = asyncio.Queue(maxsize=self._outboxSize)
+        # one dedicated connection , kept out of the pool for the lifetime of the broker
+        self._connection = await self._asyncEngine.connect()
+        self._driver = (await self._connection.get_raw_connection()).driver_connection
+        await self._driver.add_listener(self.channel , self._onNotification)
+        self._sender = asyncio.create_task(self._send())
+
+    async def stop(self) -> None:
+        if self._sender:
+            self._sender.cancel()
+            try:
+                await self._sender
+            except asyncio.CancelledError:
+                pass
+        if self._driver:
+            await self._driver.remove_listener(self.channel , self._onNotification)
+        if self._connection:
+            await self._connection.close()
+        self._sender = self._driver = self._connection = self._loop = None
+        await super().stop()
+
+    def publish(self , event: Event) -> None:
+        payload = event.toJson()
+        loop = self._loop
+        if loop is None:
+            # no running broker in this process (CLI): notify through a short sync transaction
+            with self._syncEngine.begin() as connection:
+                connection.execute(text("SELECT pg_notify(:channel , :payload)") , {"channel": self.channel , "payload": payload})
+            return
+        try:
+            onLoop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            onLoop = False
+        if onLoop:
+            self._enqueue(payload)
+        else:
+            loop.call_soon_threadsafe(self._enqueue , payload)
+
+    def _enqueue(self , payload: str) -> None:
+        try:
+            self._outbox.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _send(self) -> None:
+        # a single sender , asyncpg connections run one query at a time
+        while True:
+            payload = await self._outbox.get()
+            try:
+                await self._driver.execute("SELECT pg_notify($1, $2)" , self.channel , payload)
+            except Exception:
+                # e.g. a payload over the 8000 bytes NOTIFY limit , the feed goes on without it
+                self.dropped += 1
+
+    def _onNotification(self , connection , pid: int , channel: str , payload: str) -> None:
+        self.hub.dispatch(Event.fromJson(payload))
@@ -0,0 +1,76 @@
+import json
+from datetime import date, datetime
+
+from sqlalchemy import inspect
+
+
+class Event:
+    """
+    A class used to represent one change pushed to the subscribers of the change feed
+
+    Attributes:
+        type (str): what happened , <kind>.<action> (e.g. task.created , project.deleted , task.closed)
+        projectId (str | None): project the change belongs to , None when it may concern every project
+        data (dict): payload of the event (fields of the written row , counts ...)
+        id (int | None): sequence number given by the hub delivering the event
+    """
+
+    def __init__(self , type: str , projectId: str | None = None , data: dict | None = None):
+        """
+        Initializing an event
+
+        Args:
+            type (str): what happened , <kind>.<action>
+            projectId (str | None , optional): project the change belongs to. defaults to None (every project)
+            data (dict | None , optional): payload of the event. defaults to None (empty)
+        """
+        self.type = type
+        self.projectId = projectId
+        self.data = data or {}
+        self.id = None
+
+    def __repr__(self):
+        return f"Event(id: {self.id}, type: {self.type}, project: {self.projectId})"
+
+    def toJson(self) -> str:
+        """
+        Serializing the event (without its id , given again by every hub)
+
+        Returns:
+            str: the event as json
+        """
+        return json.dumps({"type": self.type , "project_id": self.projectId , "data": self.data} , default=_jsonDefault)
+
+    @classmethod
+    def fromJson(cls , raw: str) -> "Event":
+        """
+        make an event back from its json
+
+        Args:
+            raw (str): json made by toJson
+
+        Returns:
+            Event: the event
+        """
+        payload = json.loads(raw)
+        return cls(payload["type"] , payload.get("project_id") , payload.get("data"))
+
+
+def rowData(row) -> dict:
+    """
+    Payload of an event about a written row: its loaded columns
+
+    Args:
+        row (Project | Task): the row
+
+    Returns:
+        dict: column name to value
+    """
+    unloaded = inspect(row).unloaded
+    return {attr.key: getattr(row , attr.key) for attr in row.__mapper__.column_attrs if attr.key not in unloaded}
+
+
+def _jsonDefault(value):
+    if isinstance(value , (datetime , date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not json serializable")
@@ -0,0 +1,137 @@
+import asyncio
+from itertools import count
+
+from todolist.events.event import Event
+
+
+class Subscription:
+    """
+    A class used to represent one subscriber of the hub (one open event stream)
+
+    Attributes:
+        projectId (str | None): only events of this project (and events of every project) are delivered , None for all
+        queue (asyncio.Queue): bounded queue of the events not sent yet
+        overflowed (bool): True once an event was dropped because the queue was full. the hub stops feeding the
+            subscription , which should end its stream once the queue is drained so the client resynchronizes
+    """
+
+    def __init__(self , projectId: str | None , queueSize: int):
+        """
+        Initializing a subscription
+
+        Args:
+            projectId (str | None): project to follow , None for all
+            queueSize (int): maximum number of pending events
+        """
+        self.projectId = projectId
+        self.queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=queueSize)
+        self.overflowed = False
+
+    def wants(self , event: Event) -> bool:
+        """
+        Whether the event is delivered to this subscription
+        """
+        return self.projectId is None or event.projectId is None or event.projectId == self.projectId
+
+
+class EventHub:
+    """
+    A class used to fan the events of the process out to the subscriptions, on one asyncio event loop.
+    Publishing never waits on a subscriber: a subscriber too slow to keep up with its bounded queue is cut off.
+
+    Attributes:
+        queueSize (int): maximum number of pending events per subscription
+        dropped (int): number of subscriptions cut off because their queue was full
+    """
+
+    def __init__(self , queueSize: int = 100):
+        """
+        Initializing an event hub
+
+        Args:
+            queueSize (int , optional): maximum number of pending events per subscription. defaults to 100
+        """
+        self.queueSize = queueSize
+        self.dropped = 0
+        self._subscriptions: set[Subscription] = set()
+        self._sequence = count(1)
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def bind(self , loop: asyncio.AbstractEventLoop | None) -> None:
+        """
+        Setting the event loop the subscriptions live on (None once it stops)
+
+        Args:
+            loop (asyncio.AbstractEventLoop | None): the loop
+        """
+        self._loop = loop
+
+    def subscribe(self , projectId: str | None = None) -> Subscription:
+        """
+        Opening a subscription , to be closed with unsubscribe (runs on the hub loop)
+
+        Args:
+            projectId (str | None , optional): project to follow. defaults to None (all)
+
+        Returns:
+            Subscription: the subscription
+        """
+        subscription = Subscription(projectId , self.queueSize)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self , subscription: Subscription) -> None:
+        """
+        Closing a subscription
+
+        Args:
+            subscription (Subscription): the subscription
+        """
+        self._subscriptions.discard(subscription)
+
+    def dispatch(self , event: Event) -> None:
+        """
+        Delivering an event to the subscriptions (runs on the hub loop)
+
+        Args:
+            event (Event): the event
+        """
+        event.id = next(self._sequence)
+        for subscription in list(self._subscriptions):
+            if not subscription.wants(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                self._subscriptions.discard(subscription)
+                self.dropped += 1
+
+    def dispatchThreadsafe(self , event: Event) -> None:
+        """
+        Delivering an event from any thread (scheduler jobs , sync services). Dropped if the hub has no loop
+        (nobody can be subscribed then).
+
+        Args:
+            event (Event): the event
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            onLoop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            onLoop = False
+        if onLoop:
+            self.dispatch(event)
+        else:
+            loop.call_soon_threadsafe(self.dispatch , event)
+
+    def stats(self) -> dict:
+        """
+        Counters of the hub
+
+        Returns:
+            dict: number of open subscriptions and of subscriptions cut off
+        """
+        return {"subscribers": len(self._subscriptions) , "dropped": self.dropped}
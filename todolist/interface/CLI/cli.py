@@ -206,7 +206,7 @@ class CLI:
             print(Fore.CYAN  + "No project in workspace")
             return
         for p in projectList:
-            print(Fore.CYAN  + f"{p.id[:8]} | name: {p.name} | description: {p.desc}")
+            print(Fore.CYAN  + f"{p.id} | name: {p.name} | description: {p.desc}")
 
     def _projectDelete(self , cmd: str) -> None:
         """